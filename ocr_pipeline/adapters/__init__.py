@@ -2,8 +2,29 @@
 Adapters 模組：各種適配器（Input, OCR, Storage）
 """
 
-from .ocr import PaddleOCRAdapter
+from .input import (
+    ArchiveImageAdapter,
+    HotFolderWatcher,
+    ImageLoader,
+    MultiPageTiffAdapter,
+    PdfImageAdapter,
+    UnsupportedPageError,
+)
+from .ocr import PaddleOCRAdapter, BatchingOCRAdapter
+from .storage import ResultSink, JsonlSink, CsvSink, SqliteSink, OcrTextIndex
 
 __all__ = [
+    "ArchiveImageAdapter",
+    "HotFolderWatcher",
+    "ImageLoader",
+    "MultiPageTiffAdapter",
+    "PdfImageAdapter",
+    "UnsupportedPageError",
     "PaddleOCRAdapter",
+    "BatchingOCRAdapter",
+    "ResultSink",
+    "JsonlSink",
+    "CsvSink",
+    "SqliteSink",
+    "OcrTextIndex",
 ]
@@ -0,0 +1,18 @@
+"""
+Input Adapters - 輸入來源適配器模組
+"""
+
+from .archive_adapter import ArchiveImageAdapter
+from .hot_folder import HotFolderWatcher
+from .image_loader import ImageLoader
+from .multipage_tiff import MultiPageTiffAdapter
+from .pdf_adapter import PdfImageAdapter, UnsupportedPageError
+
+__all__ = [
+    "ArchiveImageAdapter",
+    "HotFolderWatcher",
+    "ImageLoader",
+    "MultiPageTiffAdapter",
+    "PdfImageAdapter",
+    "UnsupportedPageError",
+]
@@ -0,0 +1,185 @@
+"""
+ArchiveImageAdapter - 壓縮檔輸入適配器
+
+合作夥伴以 ZIP 或 tar.gz 打包每日的影像批次。先解壓到磁碟會讓 I/O 加倍，
+因此本適配器直接在記憶體中處理成員：
+  1. 逐一迭代壓縮檔成員，成員名稱作為文件 ID
+  2. 串流讀取成員內容，以 cv2.imdecode 在記憶體中解碼
+  3. ZIP 中未壓縮（stored）的成員直接引用檔案映射的切片，不複製資料
+  4. tar 以串流模式（r|*）讀取，tar.gz 不需要隨機存取
+"""
+
+import fnmatch
+import mmap
+import struct
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ...utils.file_utils import is_image_file
+from ...utils.image_utils import read_image_from_buffer
+
+
+# ZIP 本地檔頭：簽章 + 固定長度 30 位元組，檔名與額外欄位長度位於偏移 26
+_ZIP_LOCAL_HEADER = b'PK\x03\x04'
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+MemberData = Union[bytes, memoryview]
+
+
+class ArchiveImageAdapter:
+    """
+    壓縮檔影像適配器（ZIP / tar / tar.gz / tar.bz2 / tar.xz，逐一成員延遲解碼）
+
+    使用方式：
+        with ArchiveImageAdapter('batch.zip') as archive:
+            for name, image in archive.iter_images():
+                ...
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        include: Optional[List[str]] = None,
+        grayscale: bool = False
+    ):
+        """
+        Args:
+            file_path: 壓縮檔路徑
+            include: 成員名稱的萬用字元模式（比對完整成員路徑）；
+                None 時依副檔名只取影像檔
+            grayscale: 是否以灰階模式解碼
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            ValueError: 不是 ZIP 或 tar 壓縮檔
+        """
+        self.file_path = Path(file_path)
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Archive file not found: {self.file_path}")
+
+        self.include = include
+        self.grayscale = grayscale
+        self._data: Optional[mmap.mmap] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+
+        if zipfile.is_zipfile(self.file_path):
+            self.format = 'zip'
+            self._zip = zipfile.ZipFile(self.file_path)
+            if self.file_path.stat().st_size > 0:
+                with open(self.file_path, 'rb') as f:
+                    self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        elif tarfile.is_tarfile(self.file_path):
+            self.format = 'tar'
+        else:
+            raise ValueError(f"Unsupported archive format: {self.file_path}")
+
+    def __iter__(self) -> Iterator[Tuple[str, np.ndarray]]:
+        return self.iter_images()
+
+    def close(self) -> None:
+        """關閉 ZIP 與檔案映射"""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._data is not None and not self._data.closed:
+            try:
+                self._data.close()
+            except BufferError:
+                # 呼叫端仍持有成員切片：交給垃圾回收在引用釋放後關閉
+                pass
+            self._data = None
+
+    def __enter__(self) -> "ArchiveImageAdapter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def iter_members(self) -> Iterator[Tuple[str, MemberData]]:
+        """
+        依壓縮檔中的順序逐一讀取成員（產生器，不解碼）
+
+        ZIP 的 stored 成員回傳檔案映射的 memoryview 切片（零複製，
+        關閉適配器後不可再使用）；其他成員回傳 bytes。
+
+        Yields:
+            (成員名稱, 已編碼的影像資料)
+        """
+        if self.format == 'zip':
+            yield from self._iter_zip()
+        else:
+            yield from self._iter_tar()
+
+    def iter_images(self) -> Iterator[Tuple[str, np.ndarray]]:
+        """
+        逐一解碼成員影像（產生器）
+
+        Yields:
+            (成員名稱, 影像陣列)
+
+        Raises:
+            ValueError: 成員無法解碼為影像
+        """
+        for name, data in self.iter_members():
+            yield name, read_image_from_buffer(data, grayscale=self.grayscale)
+
+    def _accept(self, name: str) -> bool:
+        """成員名稱是否符合 include 模式（未指定時依副檔名判斷）"""
+        if self.include is None:
+            return is_image_file(name)
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.include)
+
+    def _iter_zip(self) -> Iterator[Tuple[str, MemberData]]:
+        if self._zip is None:
+            raise ValueError("ArchiveImageAdapter is closed")
+
+        for info in self._zip.infolist():
+            if info.is_dir() or not self._accept(info.filename):
+                continue
+            data = self._stored_slice(info)
+            if data is None:
+                with self._zip.open(info) as member:
+                    data = member.read()
+            yield info.filename, data
+
+    def _stored_slice(self, info: zipfile.ZipInfo) -> Optional[memoryview]:
+        """
+        未壓縮且未加密的成員：直接回傳檔案映射中資料區段的切片
+
+        Returns:
+            memoryview；無法走零複製路徑時回傳 None
+        """
+        if (
+            self._data is None
+            or info.compress_type != zipfile.ZIP_STORED
+            or info.flag_bits & 0x1
+        ):
+            return None
+
+        offset = info.header_offset
+        header = self._data[offset:offset + _ZIP_LOCAL_HEADER_SIZE]
+        if len(header) < _ZIP_LOCAL_HEADER_SIZE or header[:4] != _ZIP_LOCAL_HEADER:
+            return None
+        # 本地檔頭的額外欄位長度可能與中央目錄不同，需以本地檔頭為準
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        start = offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length
+        end = start + info.file_size
+        if end > len(self._data):
+            return None
+        return memoryview(self._data)[start:end]
+
+    def _iter_tar(self) -> Iterator[Tuple[str, MemberData]]:
+        with tarfile.open(self.file_path, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile() or not self._accept(member.name):
+                    continue
+                handle = archive.extractfile(member)
+                if handle is None:
+                    continue
+                with handle:
+                    data = handle.read()
+                yield member.name, data
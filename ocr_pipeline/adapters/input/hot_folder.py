@@ -0,0 +1,334 @@
+"""
+HotFolderWatcher - 熱資料夾監看（增量變更索引）
+
+各分行把掃描檔丟進共用資料夾。每次輪詢都重新列舉整棵目錄樹的成本
+與檔案總數成正比；本監看器改以磁碟上的 SQLite 索引記錄
+(路徑, 大小, mtime, 內容雜湊, 狀態)：
+  1. 每次輪詢只 stat 已知目錄；只有 mtime 改變的目錄才重新 scandir
+     （新增、刪除、改名都會更新所在目錄的 mtime）
+  2. 尚在等待穩定的檔案每次輪詢 stat 一次，大小與 mtime 持續
+     settle_seconds 秒不變才交出處理，避免讀到寫到一半的檔案
+  3. 處理完成的檔案記錄內容雜湊；重新啟動或檔案被 touch 後內容相同
+     都不會再次 OCR
+  4. 輪詢成本與目錄數加上變更數成正比，與檔案總數無關
+
+限制：原地覆寫既有檔案不會更新目錄的 mtime，這類變更需呼叫 rescan_all()。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Union
+
+from ...utils.file_utils import compute_file_hash, is_image_file, match_any
+
+
+STATUS_PENDING = 'pending'   # 新檔案或已變更，等待穩定
+STATUS_READY = 'ready'       # 已交給呼叫端，尚未回報結果
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# 目錄 mtime 與掃描時間相差不到此值時視為「可能遺漏變更」，下次輪詢再掃一次
+# （檔案系統的 mtime 精度可能只有 1 秒）
+_RACY_WINDOW_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    done_hash TEXT,
+    status TEXT NOT NULL,
+    stable_since REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_status ON files (status);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    scanned_ns INTEGER NOT NULL
+);
+"""
+
+
+class HotFolderWatcher:
+    """
+    熱資料夾監看器（SQLite 增量索引，執行緒安全）
+
+    使用方式：
+        with HotFolderWatcher('inbox', 'inbox.index.db') as watcher:
+            for path in watcher.poll():
+                ...
+                watcher.mark_done(path)
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        index_path: Union[str, Path],
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        settle_seconds: float = 2.0,
+        recursive: bool = True,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            directory: 監看的資料夾
+            index_path: SQLite 索引檔路徑（重新啟動時沿用）
+            include: 包含的模式（規則同 iter_files；None 時依副檔名只取影像檔）
+            exclude: 排除的模式（符合的子目錄不會進入）
+            settle_seconds: 檔案大小與 mtime 需維持不變的秒數
+            recursive: 是否監看子目錄
+            clock: 計算穩定時間用的時鐘（秒）
+
+        Raises:
+            FileNotFoundError: 資料夾不存在
+            ValueError: 無效的 settle_seconds
+        """
+        self.directory = Path(directory).resolve()
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        if settle_seconds < 0:
+            raise ValueError("settle_seconds must be >= 0")
+
+        self.include = list(include) if include is not None else None
+        self.exclude = list(exclude or [])
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(index_path), check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            # 上次執行時已交出但未回報結果的檔案：重新排入
+            self._conn.execute(
+                "UPDATE files SET status = ? WHERE status = ?",
+                (STATUS_PENDING, STATUS_READY)
+            )
+
+    def poll(self) -> List[Path]:
+        """
+        檢查變更，回傳已穩定、待處理的檔案
+
+        回傳的檔案狀態變為 ready，之後的輪詢不會重複回傳；
+        處理後請呼叫 mark_done() 或 mark_failed()。
+
+        Returns:
+            待處理的檔案路徑（依路徑排序）
+        """
+        now = self.clock()
+        with self._lock, self._conn:
+            self._scan_changed_dirs(now)
+            return self._collect_settled(now)
+
+    def mark_done(self, file_path: Union[str, Path]) -> None:
+        """記錄檔案已處理完成（內容未變更前不會再交出）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET status = ?, done_hash = content_hash, error = NULL "
+                "WHERE path = ?",
+                (STATUS_DONE, str(file_path))
+            )
+
+    def mark_failed(self, file_path: Union[str, Path], error: str = '') -> None:
+        """記錄檔案處理失敗（檔案內容變更後才會再交出）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET status = ?, attempts = attempts + 1, error = ? "
+                "WHERE path = ?",
+                (STATUS_FAILED, error, str(file_path))
+            )
+
+    def status(self, file_path: Union[str, Path]) -> Optional[str]:
+        """檔案在索引中的狀態（不在索引中時回傳 None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM files WHERE path = ?", (str(file_path),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """各狀態的檔案數"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM files GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def rescan_all(self) -> None:
+        """下次輪詢時重新掃描所有目錄（用來找出原地覆寫的檔案）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM dirs")
+
+    def close(self) -> None:
+        """關閉索引"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "HotFolderWatcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _scan_changed_dirs(self, now: float) -> None:
+        """stat 所有已知目錄，只重新列舉 mtime 改變（或新發現）的目錄"""
+        known = {
+            path: (mtime_ns, scanned_ns)
+            for path, mtime_ns, scanned_ns in self._conn.execute(
+                "SELECT path, mtime_ns, scanned_ns FROM dirs"
+            )
+        }
+        root = str(self.directory)
+        queue = [root] + [path for path in known if path != root]
+        seen: Set[str] = set()
+
+        while queue:
+            current = queue.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                self._forget_dir(current)
+                continue
+
+            previous = known.get(current)
+            if previous is not None:
+                old_mtime, scanned_ns = previous
+                if old_mtime == mtime_ns and scanned_ns - mtime_ns > _RACY_WINDOW_NS:
+                    continue
+
+            scanned_ns = time.time_ns()
+            subdirs = self._scan_dir(current, now)
+            if subdirs is None:
+                self._forget_dir(current)
+                continue
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, scanned_ns) VALUES (?, ?, ?)",
+                (current, mtime_ns, scanned_ns)
+            )
+            queue.extend(path for path in subdirs if path not in known)
+
+    def _scan_dir(self, directory: str, now: float) -> Optional[List[str]]:
+        """
+        列舉單一目錄：更新檔案索引，移除已消失的未完成檔案
+
+        Returns:
+            要監看的子目錄；目錄無法讀取時回傳 None
+        """
+        files: Dict[str, os.stat_result] = {}
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as scanner:
+                for entry in scanner:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        is_file = not is_dir and entry.is_file()
+                    except OSError:
+                        continue
+                    relative = Path(entry.path).relative_to(self.directory).as_posix()
+                    if self.exclude and match_any(entry.name, relative, self.exclude):
+                        continue
+                    if is_dir:
+                        if self.recursive:
+                            subdirs.append(entry.path)
+                    elif is_file and self._accept(entry.name, relative):
+                        try:
+                            files[entry.path] = entry.stat()
+                        except OSError:
+                            continue
+        except OSError:
+            return None
+
+        indexed = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._conn.execute(
+                "SELECT path, size, mtime_ns FROM files WHERE parent = ?", (directory,)
+            )
+        }
+        for path, stat in files.items():
+            current = (stat.st_size, stat.st_mtime_ns)
+            if path not in indexed:
+                self._conn.execute(
+                    "INSERT INTO files (path, parent, size, mtime_ns, status, stable_since) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (path, directory, current[0], current[1], STATUS_PENDING, now)
+                )
+            elif indexed[path] != current:
+                self._mark_changed(path, current, now)
+
+        removed = [(path,) for path in indexed if path not in files]
+        self._conn.executemany(
+            "DELETE FROM files WHERE path = ? AND status != 'done'", removed
+        )
+        return subdirs
+
+    def _collect_settled(self, now: float) -> List[Path]:
+        """檢查等待穩定的檔案，回傳已穩定且內容未處理過的檔案"""
+        ready: List[Path] = []
+        pending = self._conn.execute(
+            "SELECT path, size, mtime_ns, done_hash, stable_since FROM files "
+            "WHERE status = ? ORDER BY path",
+            (STATUS_PENDING,)
+        ).fetchall()
+
+        for path, size, mtime_ns, done_hash, stable_since in pending:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                continue
+
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != (size, mtime_ns):
+                self._mark_changed(path, current, now)
+                continue
+            if now - stable_since < self.settle_seconds:
+                continue
+
+            try:
+                content_hash = compute_file_hash(path)
+            except OSError:
+                continue
+            # 內容與上次處理完成時相同（例如只被 touch 或重新複製）：不必再處理
+            status = STATUS_DONE if content_hash == done_hash else STATUS_READY
+            self._conn.execute(
+                "UPDATE files SET content_hash = ?, status = ? WHERE path = ?",
+                (content_hash, status, path)
+            )
+            if status == STATUS_READY:
+                ready.append(Path(path))
+
+        return ready
+
+    def _mark_changed(self, path: str, current: tuple, now: float) -> None:
+        """檔案大小或 mtime 改變：重新等待穩定"""
+        self._conn.execute(
+            "UPDATE files SET size = ?, mtime_ns = ?, status = ?, stable_since = ? "
+            "WHERE path = ?",
+            (current[0], current[1], STATUS_PENDING, now, path)
+        )
+
+    def _forget_dir(self, directory: str) -> None:
+        """目錄已消失：移除目錄記錄與其中未完成的檔案"""
+        self._conn.execute("DELETE FROM dirs WHERE path = ?", (directory,))
+        self._conn.execute(
+            "DELETE FROM files WHERE parent = ? AND status != 'done'", (directory,)
+        )
+
+    def _accept(self, name: str, relative: str) -> bool:
+        """檔案是否符合 include 模式（未指定時依副檔名判斷）"""
+        if self.include is None:
+            return is_image_file(name)
+        return match_any(name, relative, self.include)
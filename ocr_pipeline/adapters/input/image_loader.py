@@ -0,0 +1,263 @@
+"""
+ImageLoader - 影像預取與快取
+
+批次處理時，解碼下一張影像的時間可以與目前影像的 OCR 重疊：
+  1. prefetch() 在執行緒池中先解碼接下來的檔案（cv2 解碼時會釋放 GIL）
+  2. 解碼結果放進以位元組數為上限的 LRU 快取，鍵為 (路徑, mtime, 檔案大小)，
+     同一檔案重複處理時不必重新解碼；檔案被修改後自然失效
+  3. 快取中的陣列設為唯讀，避免呼叫端修改到共用的影像
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from ...utils.image_utils import read_image
+
+
+# (絕對路徑, mtime_ns, 檔案大小)
+_CacheKey = Tuple[str, int, int]
+
+
+class ImageLoader:
+    """
+    影像載入器（執行緒池預取 + 位元組上限 LRU 快取，執行緒安全）
+
+    使用方式：
+        loader = ImageLoader(max_workers=2)
+        loader.prefetch(paths[1:5])
+        image = loader.load(paths[0])
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_cache_bytes: int = 256 * 1024 * 1024,
+        grayscale: bool = False,
+        use_mmap: bool = False
+    ):
+        """
+        Args:
+            max_workers: 預取解碼的執行緒數
+            max_cache_bytes: 快取的解碼影像總位元組上限（0 表示不快取）
+            grayscale: 是否以灰階模式讀取
+            use_mmap: 以記憶體映射讀取檔案
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_cache_bytes < 0:
+            raise ValueError("max_cache_bytes must be >= 0")
+
+        self.max_workers = max_workers
+        self.max_cache_bytes = max_cache_bytes
+        self.grayscale = grayscale
+        self.use_mmap = use_mmap
+
+        self._cache: "OrderedDict[_CacheKey, np.ndarray]" = OrderedDict()
+        self._cache_bytes = 0
+        self._pending: Dict[_CacheKey, Future] = {}
+        # 預取後已放進快取、尚未被 load() 取用的鍵（統計 prefetch_hits 用）
+        self._prefetched: Set[_CacheKey] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._hits = 0
+        self._prefetch_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def load(self, file_path: Union[str, Path]) -> np.ndarray:
+        """
+        載入影像（快取 → 預取中的結果 → 直接解碼）
+
+        Args:
+            file_path: 影像檔案路徑
+
+        Returns:
+            唯讀的影像陣列
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            ValueError: 無法讀取影像
+        """
+        key = self._key(file_path)
+
+        with self._lock:
+            future = self._pending.pop(key, None)
+            prefetched = key in self._prefetched
+            self._prefetched.discard(key)
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                if future is not None or prefetched:
+                    self._prefetch_hits += 1
+                else:
+                    self._hits += 1
+                return image
+            if future is not None:
+                self._prefetch_hits += 1
+            else:
+                self._misses += 1
+
+        if future is not None:
+            return future.result()
+
+        image = self._decode(key)
+        self._store(key, image)
+        return image
+
+    def prefetch(self, file_paths: Iterable[Union[str, Path]]) -> int:
+        """
+        在背景解碼檔案（已快取或預取中的檔案會略過）
+
+        Args:
+            file_paths: 影像檔案路徑
+
+        Returns:
+            新排入預取的檔案數（不存在的檔案會略過，待 load() 時再回報錯誤）
+        """
+        scheduled = 0
+        for file_path in file_paths:
+            try:
+                key = self._key(file_path)
+            except FileNotFoundError:
+                continue
+
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("ImageLoader is closed")
+                if key in self._cache or key in self._pending:
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="ocr-image-loader"
+                    )
+                future = self._executor.submit(self._decode_and_store, key)
+                self._pending[key] = future
+                scheduled += 1
+        return scheduled
+
+    def iter_images(
+        self,
+        file_paths: Iterable[Union[str, Path]],
+        lookahead: int = 4
+    ) -> Iterator[Tuple[Union[str, Path], np.ndarray]]:
+        """
+        依序載入影像，同時預取接下來的 lookahead 個檔案
+
+        Args:
+            file_paths: 影像檔案路徑
+            lookahead: 預取的檔案數
+
+        Yields:
+            (路徑, 影像陣列)
+        """
+        paths = list(file_paths)
+        for index, file_path in enumerate(paths):
+            if lookahead > 0:
+                self.prefetch(paths[index + 1:index + 1 + lookahead])
+            yield file_path, self.load(file_path)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        載入統計
+
+        Returns:
+            {'hits': 快取命中, 'prefetch_hits': 預取命中, 'misses': 直接解碼,
+             'hit_rate': 命中率, 'queue_depth': 預取中的檔案數,
+             'cached_items', 'cached_bytes', 'evictions'}
+        """
+        with self._lock:
+            total = self._hits + self._prefetch_hits + self._misses
+            return {
+                'hits': self._hits,
+                'prefetch_hits': self._prefetch_hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits + self._prefetch_hits) / total if total else 0.0,
+                'queue_depth': sum(1 for f in self._pending.values() if not f.done()),
+                'cached_items': len(self._cache),
+                'cached_bytes': self._cache_bytes,
+                'evictions': self._evictions
+            }
+
+    def clear(self) -> None:
+        """清空快取並取消尚未開始的預取"""
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._prefetched.clear()
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def close(self) -> None:
+        """關閉預取執行緒池並清空快取"""
+        with self._lock:
+            self._closed = True
+            executor = self._executor
+            self._executor = None
+        self.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ImageLoader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(file_path: Union[str, Path]) -> _CacheKey:
+        """快取鍵：(絕對路徑, mtime_ns, 檔案大小)"""
+        path = Path(file_path)
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(f"Image file not found: {file_path}")
+        return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    def _decode(self, key: _CacheKey) -> np.ndarray:
+        image = read_image(key[0], grayscale=self.grayscale, use_mmap=self.use_mmap)
+        image.flags.writeable = False
+        return image
+
+    def _decode_and_store(self, key: _CacheKey) -> np.ndarray:
+        """
+        預取工作：解碼後放進快取
+
+        放進快取後即移出 _pending，沒有被 load() 取用的預取結果由 LRU 上限約束；
+        無法放進快取時（超過上限）保留在 _pending 直到被 load() 取走。
+        """
+        image = self._decode(key)
+        with self._lock:
+            if self._store_locked(key, image):
+                self._pending.pop(key, None)
+                self._prefetched.add(key)
+        return image
+
+    def _store(self, key: _CacheKey, image: np.ndarray) -> None:
+        """放進 LRU 快取（超過上限時淘汰最舊的項目）"""
+        with self._lock:
+            self._store_locked(key, image)
+
+    def _store_locked(self, key: _CacheKey, image: np.ndarray) -> bool:
+        """放進 LRU 快取（呼叫端需持有 _lock），回傳影像是否在快取中"""
+        size = image.nbytes
+        if self._closed or size > self.max_cache_bytes:
+            return False
+        if key in self._cache:
+            return True
+        while self._cache and self._cache_bytes + size > self.max_cache_bytes:
+            evicted_key, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted.nbytes
+            self._prefetched.discard(evicted_key)
+            self._evictions += 1
+        self._cache[key] = image
+        self._cache_bytes += size
+        return True
@@ -0,0 +1,90 @@
+"""
+MultiPageTiffAdapter - 多頁 TIFF 輸入適配器
+
+傳真閘道送來的多頁 TIFF 若一次全部解碼，記憶體用量與頁數成正比。
+本適配器以 OpenCV 的多影格讀取（imcount / imreadmulti）逐頁解碼，
+任一時間只保留一頁影像；呼叫端停止迭代後就不會再解碼後續頁面。
+"""
+
+from pathlib import Path
+from typing import Iterator, Union
+
+import cv2
+import numpy as np
+
+
+class MultiPageTiffAdapter:
+    """
+    多頁 TIFF 適配器（逐頁延遲解碼）
+
+    使用方式：
+        adapter = MultiPageTiffAdapter('fax.tif')
+        for page in adapter.iter_pages():
+            ...
+    """
+
+    def __init__(self, file_path: Union[str, Path], grayscale: bool = False):
+        """
+        Args:
+            file_path: TIFF 檔案路徑（單頁影像格式也可使用，視為 1 頁）
+            grayscale: 是否以灰階模式解碼
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            ValueError: 無法讀取影像標頭
+        """
+        self.file_path = Path(file_path)
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Image file not found: {self.file_path}")
+
+        self.flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        # imcount 只讀取標頭，不解碼影像資料
+        self.page_count = cv2.imcount(str(self.file_path))
+        if self.page_count < 1:
+            raise ValueError(f"Failed to read image: {self.file_path}")
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self.iter_pages()
+
+    def read_page(self, index: int) -> np.ndarray:
+        """
+        解碼單一頁面
+
+        Args:
+            index: 頁碼（0 起算）
+
+        Returns:
+            影像陣列
+
+        Raises:
+            IndexError: 頁碼超出範圍
+            ValueError: 無法解碼該頁
+        """
+        if not 0 <= index < self.page_count:
+            raise IndexError(f"Page index out of range: {index}")
+
+        ok, pages = cv2.imreadmulti(
+            str(self.file_path),
+            start=index,
+            count=1,
+            flags=self.flags
+        )
+        if not ok or not pages:
+            raise ValueError(f"Failed to read page {index}: {self.file_path}")
+        return pages[0]
+
+    def iter_pages(self, start: int = 0) -> Iterator[np.ndarray]:
+        """
+        逐頁解碼（產生器）
+
+        Args:
+            start: 起始頁碼
+
+        Yields:
+            每一頁的影像陣列
+        """
+        for index in range(start, self.page_count):
+            yield self.read_page(index)
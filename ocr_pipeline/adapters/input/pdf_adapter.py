@@ -0,0 +1,704 @@
+"""
+PdfImageAdapter - 掃描 PDF 輸入適配器
+
+掃描器產生的 PDF 通常每頁只有一張滿版的 JPEG（/DCTDecode）影像。
+透過 PDF 渲染器光柵化既浪費 CPU 又會再壓縮一次影像品質，因此本適配器：
+  1. 以最小的 PDF 物件解析器掃描物件結構（含 PDF 1.5 物件串流）
+  2. 找出「只有一張影像、內容串流只以單一 q … cm /ImN Do Q 畫滿頁面」的頁面
+  3. /DCTDecode 直接交給 cv2.imdecode；簡單的 /FlateDecode 原始像素直接轉成陣列
+  4. 逐頁延遲解碼，只保留目前的頁面
+
+其他頁面（向量內容、多張影像、CCITT/JBIG2/JPX 編碼、加密文件…）
+回報 UnsupportedPageError，或交給外部提供的渲染器處理。
+"""
+
+import mmap
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from ...utils.image_utils import read_image_from_buffer
+
+
+# /Rotate 角度 -> cv2.rotate 代碼
+_ROTATIONS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+class UnsupportedPageError(Exception):
+    """頁面無法以直接解碼影像的方式處理"""
+    pass
+
+
+class PdfRef(NamedTuple):
+    """間接物件參照（n g R）"""
+    num: int
+    gen: int
+
+
+class PdfStream:
+    """串流物件：字典 + 原始資料在檔案中的位置"""
+
+    def __init__(self, attrs: Dict[str, Any], start: int):
+        self.attrs = attrs
+        self.start = start
+
+
+# 渲染器：(PDF 路徑, 頁碼) -> 影像陣列
+PageRenderer = Callable[[Path, int], np.ndarray]
+
+_WHITESPACE = b'\x00\t\n\x0c\r '
+_OBJ_RE = re.compile(rb'(\d+)\s+(\d+)\s+obj\b')
+_NUMBER_RE = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_REF_RE = re.compile(rb'\s+(\d+)\s+R\b')
+_NAME_END_RE = re.compile(rb'[\x00\t\n\x0c\r ()<>\[\]{}/%]')
+_TRAILER_RE = re.compile(rb'trailer\s*<<')
+
+_OPERATOR_RE = re.compile(rb"[A-Za-z'\"][A-Za-z0-9*'\"]*")
+# 直接解碼頁面的內容串流只允許這些運算子（文字、路徑、內嵌影像等一律不支援）
+_DIRECT_OPERATORS = {'q', 'Q', 'cm', 'Do'}
+# 影像涵蓋 MediaBox 的容許誤差（佔頁面寬高的比例）
+_COVER_TOLERANCE = 0.01
+
+# 單一影像即可直接解碼的色彩空間（通道數）
+_COLOR_CHANNELS = {'DeviceGray': 1, 'CalGray': 1, 'DeviceRGB': 3, 'CalRGB': 3}
+
+
+class _PdfParser:
+    """最小 PDF 物件解析器（只支援讀取，不處理加密）"""
+
+    def __init__(self, data, scan: bool = True):
+        """
+        Args:
+            data: PDF 內容（bytes 或 mmap）
+            scan: 是否建立物件位置表（解析物件串流內容時不需要）
+        """
+        self.data = data
+        self.offsets: Dict[int, int] = {}
+        # 物件號碼 -> (物件串流號碼, 串流內索引)
+        self.compressed: Dict[int, Tuple[int, int]] = {}
+        # 物件串流號碼 -> (解碼後內容, 物件號碼列表, 各物件位移)
+        self._objstm_cache: Dict[int, Tuple[bytes, List[int], List[int]]] = {}
+        if scan:
+            self._scan()
+
+    # ---- 詞法 ----
+
+    def skip_ws(self, pos: int) -> int:
+        data = self.data
+        length = len(data)
+        while pos < length:
+            ch = data[pos]
+            if ch in _WHITESPACE:
+                pos += 1
+            elif ch == 0x25:  # % 註解
+                while pos < length and data[pos] not in b'\r\n':
+                    pos += 1
+            else:
+                break
+        return pos
+
+    def parse_object(self, pos: int) -> Tuple[Any, int]:
+        """解析一個直接物件，回傳 (值, 結束位置)"""
+        data = self.data
+        pos = self.skip_ws(pos)
+        ch = data[pos:pos + 1]
+
+        if data[pos:pos + 2] == b'<<':
+            result: Dict[str, Any] = {}
+            pos += 2
+            while True:
+                pos = self.skip_ws(pos)
+                if data[pos:pos + 2] == b'>>':
+                    return result, pos + 2
+                key, pos = self.parse_object(pos)
+                value, pos = self.parse_object(pos)
+                result[key] = value
+
+        if ch == b'[':
+            items = []
+            pos += 1
+            while True:
+                pos = self.skip_ws(pos)
+                if data[pos:pos + 1] == b']':
+                    return items, pos + 1
+                value, pos = self.parse_object(pos)
+                items.append(value)
+
+        if ch == b'/':
+            match = _NAME_END_RE.search(data, pos + 1)
+            end = match.start() if match else len(data)
+            raw = bytes(data[pos + 1:end])
+            name = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), raw)
+            return name.decode('latin-1'), end
+
+        if ch == b'(':
+            return self._parse_literal_string(pos)
+
+        if ch == b'<':
+            end = data.find(b'>', pos)
+            hex_text = re.sub(rb'\s', b'', bytes(data[pos + 1:end]))
+            if len(hex_text) % 2:
+                hex_text += b'0'
+            return bytes.fromhex(hex_text.decode('ascii')), end + 1
+
+        match = _NUMBER_RE.match(data, pos)
+        if match:
+            text = match.group()
+            if b'.' in text:
+                return float(text), match.end()
+            ref = _REF_RE.match(data, match.end())
+            if ref:
+                return PdfRef(int(text), int(ref.group(1))), ref.end()
+            return int(text), match.end()
+
+        for keyword, value in ((b'true', True), (b'false', False), (b'null', None)):
+            if data[pos:pos + len(keyword)] == keyword:
+                return value, pos + len(keyword)
+
+        raise ValueError(f"Unexpected PDF token at offset {pos}")
+
+    def _parse_literal_string(self, pos: int) -> Tuple[bytes, int]:
+        data = self.data
+        depth = 0
+        out = bytearray()
+        pos += 1
+        while True:
+            ch = data[pos]
+            if ch == 0x5C:  # 反斜線：跳脫字元原樣保留下一個位元組
+                out.append(data[pos + 1])
+                pos += 2
+                continue
+            if ch == 0x28:
+                depth += 1
+            elif ch == 0x29:
+                if depth == 0:
+                    return bytes(out), pos + 1
+                depth -= 1
+            out.append(ch)
+            pos += 1
+
+    # ---- 物件表 ----
+
+    def _scan(self) -> None:
+        """
+        掃描所有 'n g obj' 建立物件位置表
+
+        不依賴 xref 表（掃描器產生的 PDF 常有錯誤的位移），
+        遇到串流時直接跳到 endstream，避免把影像資料誤判為物件。
+        同一物件號碼以最後出現者為準（增量更新）。
+        """
+        data = self.data
+        pos = 0
+        objstms = []
+        while True:
+            match = _OBJ_RE.search(data, pos)
+            if match is None:
+                break
+            num = int(match.group(1))
+            self.offsets[num] = match.start()
+            pos = match.end()
+            try:
+                value, end = self.parse_object(pos)
+            except (ValueError, IndexError):
+                continue
+            pos = end
+            stream_start = self._stream_start(end)
+            if stream_start is not None:
+                if isinstance(value, dict) and value.get('Type') == 'ObjStm':
+                    objstms.append(num)
+                endstream = data.find(b'endstream', stream_start)
+                pos = endstream if endstream != -1 else len(data)
+
+        for stream_num in objstms:
+            try:
+                _, numbers, _ = self._load_objstm(stream_num)
+            except (ValueError, zlib.error, UnsupportedPageError):
+                continue
+            for index, num in enumerate(numbers):
+                if num not in self.offsets:
+                    self.compressed[num] = (stream_num, index)
+
+    def _stream_start(self, pos: int) -> Optional[int]:
+        """物件字典後若為 stream 關鍵字，回傳資料起始位置"""
+        pos = self.skip_ws(pos)
+        if self.data[pos:pos + 6] != b'stream':
+            return None
+        pos += 6
+        if self.data[pos:pos + 2] == b'\r\n':
+            return pos + 2
+        if self.data[pos:pos + 1] in (b'\n', b'\r'):
+            return pos + 1
+        return pos
+
+    def get(self, num: int) -> Any:
+        """取得間接物件（串流回傳 PdfStream）"""
+        if num in self.offsets:
+            match = _OBJ_RE.match(self.data, self.offsets[num])
+            value, end = self.parse_object(match.end())
+            stream_start = self._stream_start(end)
+            if stream_start is not None:
+                return PdfStream(value, stream_start)
+            return value
+
+        if num in self.compressed:
+            stream_num, index = self.compressed[num]
+            content, _, offsets = self._load_objstm(stream_num)
+            value, _ = _PdfParser(content, scan=False).parse_object(offsets[index])
+            return value
+
+        return None
+
+    def resolve(self, value: Any) -> Any:
+        """解開間接參照"""
+        seen = 0
+        while isinstance(value, PdfRef):
+            value = self.get(value.num)
+            seen += 1
+            if seen > 32:
+                raise ValueError("Reference chain too deep")
+        return value
+
+    def stream_data(self, stream: PdfStream) -> bytes:
+        """
+        取得串流的原始（未解碼）資料
+
+        回傳複本而非檔案映射的 memoryview：解碼失敗時例外的 traceback 仍會引用資料，
+        若是映射的 view，close() 會因 BufferError 而蓋掉真正的錯誤。
+        """
+        length = self.resolve(stream.attrs.get('Length'))
+        if not isinstance(length, int):
+            end = self.data.find(b'endstream', stream.start)
+            length = end - stream.start
+        return self.data[stream.start:stream.start + length]
+
+    def _load_objstm(self, stream_num: int) -> Tuple[bytes, List[int], List[int]]:
+        """解開物件串流（PDF 1.5），回傳 (內容, 物件號碼列表, 各物件位移)"""
+        if stream_num in self._objstm_cache:
+            return self._objstm_cache[stream_num]
+
+        stream = self.get(stream_num)
+        if not isinstance(stream, PdfStream):
+            raise ValueError(f"Object {stream_num} is not a stream")
+        content = decode_filters(self, stream, stop_before=None)
+
+        count = stream.attrs.get('N', 0)
+        first = stream.attrs.get('First', 0)
+        header = content[:first].split()
+        numbers = [int(header[i]) for i in range(0, count * 2, 2)]
+        offsets = [first + int(header[i]) for i in range(1, count * 2, 2)]
+
+        self._objstm_cache[stream_num] = (content, numbers, offsets)
+        return self._objstm_cache[stream_num]
+
+    # ---- 文件結構 ----
+
+    def trailer(self) -> Dict[str, Any]:
+        """最後一個含 /Root 的 trailer（或 XRef 串流字典）"""
+        candidates = []
+        for match in _TRAILER_RE.finditer(self.data):
+            try:
+                value, _ = self.parse_object(match.end() - 2)
+            except (ValueError, IndexError):
+                continue
+            candidates.append((match.start(), value))
+        for num, offset in self.offsets.items():
+            value = self.get(num)
+            if isinstance(value, PdfStream) and value.attrs.get('Type') == 'XRef':
+                candidates.append((offset, value.attrs))
+
+        for _, value in sorted(candidates, key=lambda item: item[0], reverse=True):
+            if 'Root' in value:
+                return value
+
+        # 沒有 trailer：直接找 Catalog
+        for num in list(self.offsets) + list(self.compressed):
+            value = self.get(num)
+            if isinstance(value, dict) and value.get('Type') == 'Catalog':
+                return {'Root': PdfRef(num, 0)}
+        raise ValueError("PDF trailer not found")
+
+    def pages(self) -> List[Dict[str, Any]]:
+        """依順序列出所有頁面字典（已套用繼承的 /Resources、/MediaBox 與 /Rotate）"""
+        root = self.resolve(self.trailer()['Root'])
+        result: List[Dict[str, Any]] = []
+        self._walk_pages(root.get('Pages'), None, None, 0, result, set())
+        return result
+
+    def _walk_pages(self, node_ref, resources, media_box, rotate, result, visited) -> None:
+        if isinstance(node_ref, PdfRef):
+            if node_ref.num in visited:
+                return
+            visited.add(node_ref.num)
+        node = self.resolve(node_ref)
+        if not isinstance(node, dict):
+            return
+        resources = node.get('Resources', resources)
+        media_box = node.get('MediaBox', media_box)
+        rotate = node.get('Rotate', rotate)
+        if node.get('Type') == 'Pages' or 'Kids' in node:
+            for kid in self.resolve(node.get('Kids')) or []:
+                self._walk_pages(kid, resources, media_box, rotate, result, visited)
+        else:
+            page = dict(node)
+            page['Resources'] = resources
+            page['MediaBox'] = media_box
+            page['Rotate'] = rotate
+            result.append(page)
+
+
+def decode_filters(parser: _PdfParser, stream: PdfStream, stop_before: Optional[str]) -> bytes:
+    """
+    依 /Filter 解碼串流資料
+
+    Args:
+        parser: 解析器
+        stream: 串流物件
+        stop_before: 遇到此濾鏡即停止（其資料交給呼叫端處理），None 表示全部解碼
+
+    Raises:
+        UnsupportedPageError: 不支援的濾鏡或預測器
+    """
+    data = parser.stream_data(stream)
+    filters = _as_list(parser.resolve(stream.attrs.get('Filter')))
+    parms = _as_list(parser.resolve(stream.attrs.get('DecodeParms')))
+
+    for index, name in enumerate(filters):
+        if name == stop_before:
+            break
+        if name != 'FlateDecode':
+            raise UnsupportedPageError(f"Unsupported PDF filter: {name}")
+        parm = parser.resolve(parms[index]) if index < len(parms) else None
+        if parm and parser.resolve(parm.get('Predictor', 1)) > 1:
+            raise UnsupportedPageError("Flate predictors are not supported")
+        data = zlib.decompress(data)
+    return bytes(data)
+
+
+def _multiply(m: Tuple[float, ...], n: Tuple[float, ...]) -> Tuple[float, ...]:
+    """PDF 轉換矩陣相乘 m × n（[a b c d e f] 表示 3x3 仿射矩陣）"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + b * c2, a * b2 + b * d2,
+        c * a2 + d * c2, c * b2 + d * d2,
+        e * a2 + f * c2 + e2, e * b2 + f * d2 + f2
+    )
+
+
+def _as_list(value) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class PdfImageAdapter:
+    """
+    掃描 PDF 適配器（單一影像頁面直接解碼，逐頁延遲處理）
+
+    使用方式：
+        adapter = PdfImageAdapter('scan.pdf')
+        for page in adapter.iter_pages():
+            ...
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        renderer: Optional[PageRenderer] = None,
+        grayscale: bool = False
+    ):
+        """
+        Args:
+            file_path: PDF 檔案路徑
+            renderer: 無法直接解碼的頁面改由此函數處理：(路徑, 頁碼) -> 影像陣列；
+                None 時這些頁面會拋出 UnsupportedPageError
+            grayscale: 是否輸出灰階影像
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            ValueError: 無法解析 PDF 結構
+        """
+        self.file_path = Path(file_path)
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {self.file_path}")
+
+        self.renderer = renderer
+        self.grayscale = grayscale
+
+        with open(self.file_path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._parser = _PdfParser(self._data)
+        trailer = self._parser.trailer()
+        self.encrypted = 'Encrypt' in trailer
+        self._pages = self._parser.pages()
+
+    @property
+    def page_count(self) -> int:
+        """頁數"""
+        return len(self._pages)
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return self.iter_pages()
+
+    def close(self) -> None:
+        """釋放檔案映射"""
+        if not self._data.closed:
+            self._data.close()
+
+    def __enter__(self) -> "PdfImageAdapter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def is_direct(self, index: int) -> bool:
+        """頁面是否可直接解碼（不需渲染器）"""
+        try:
+            self._page_image(index)
+        except UnsupportedPageError:
+            return False
+        return True
+
+    def read_page(self, index: int) -> np.ndarray:
+        """
+        解碼單一頁面
+
+        Args:
+            index: 頁碼（0 起算）
+
+        Returns:
+            影像陣列（BGR，grayscale=True 時為單通道）
+
+        Raises:
+            IndexError: 頁碼超出範圍
+            UnsupportedPageError: 無法直接解碼且沒有渲染器
+        """
+        if not 0 <= index < self.page_count:
+            raise IndexError(f"Page index out of range: {index}")
+
+        try:
+            image = self._decode_image(self._page_image(index))
+        except UnsupportedPageError:
+            if self.renderer is None:
+                raise
+            # 渲染器的輸出已套用頁面旋轉
+            image = self.renderer(self.file_path, index)
+        else:
+            image = self._apply_rotation(image, index)
+
+        return self._normalize_channels(image)
+
+    def iter_pages(self, start: int = 0) -> Iterator[np.ndarray]:
+        """
+        逐頁解碼（產生器）
+
+        Args:
+            start: 起始頁碼
+
+        Yields:
+            每一頁的影像陣列
+        """
+        for index in range(start, self.page_count):
+            yield self.read_page(index)
+
+    def _apply_rotation(self, image: np.ndarray, index: int) -> np.ndarray:
+        """
+        套用頁面的 /Rotate（顯示時順時針旋轉的角度）
+
+        Raises:
+            UnsupportedPageError: 不是 90 的倍數
+        """
+        rotate = self._parser.resolve(self._pages[index].get('Rotate', 0))
+        if not isinstance(rotate, int) or rotate % 90:
+            raise UnsupportedPageError(f"Unsupported page rotation: {rotate}")
+        code = _ROTATIONS.get(rotate % 360)
+        return image if code is None else cv2.rotate(image, code)
+
+    def _page_image(self, index: int) -> PdfStream:
+        """
+        取得頁面唯一的影像 XObject
+
+        Raises:
+            UnsupportedPageError: 加密文件、沒有影像、多張影像、含表單 XObject，
+                或內容串流不是單純以該影像畫滿頁面
+        """
+        if self.encrypted:
+            raise UnsupportedPageError("Encrypted PDF")
+
+        parser = self._parser
+        page = self._pages[index]
+        resources = parser.resolve(page.get('Resources')) or {}
+        xobjects = parser.resolve(resources.get('XObject')) or {}
+
+        images = []
+        for name, ref in xobjects.items():
+            xobject = parser.resolve(ref)
+            if not isinstance(xobject, PdfStream):
+                continue
+            if xobject.attrs.get('Subtype') != 'Image':
+                raise UnsupportedPageError(f"Page {index} contains non-image XObjects")
+            images.append((name, xobject))
+
+        if len(images) != 1:
+            raise UnsupportedPageError(f"Page {index} has {len(images)} images, expected 1")
+        name, image = images[0]
+        self._check_full_page_image(index, name)
+        return image
+
+    def _check_full_page_image(self, index: int, name: str) -> None:
+        """
+        確認內容串流只以 q … cm /name Do Q 把影像畫滿 MediaBox
+
+        Raises:
+            UnsupportedPageError: 有文字 / 路徑等其他內容、影像未畫滿頁面、
+                影像經旋轉或翻轉放置，或內容串流無法解析
+        """
+        parser = self._parser
+        page = self._pages[index]
+
+        content = b''
+        for ref in _as_list(parser.resolve(page.get('Contents'))):
+            stream = parser.resolve(ref)
+            if not isinstance(stream, PdfStream):
+                raise UnsupportedPageError(f"Page {index} has an invalid content stream")
+            try:
+                content += decode_filters(parser, stream, stop_before=None) + b'\n'
+            except zlib.error:
+                raise UnsupportedPageError(f"Page {index} has a corrupt content stream")
+
+        ctm = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+        stack = []
+        placement = None
+        operands: List[Any] = []
+        tokens = _PdfParser(content, scan=False)
+        pos = tokens.skip_ws(0)
+        try:
+            while pos < len(content):
+                match = _OPERATOR_RE.match(content, pos)
+                if match is None or match.group() in (b'true', b'false', b'null'):
+                    value, pos = tokens.parse_object(pos)
+                    operands.append(value)
+                    pos = tokens.skip_ws(pos)
+                    continue
+
+                operator = match.group().decode('latin-1')
+                pos = tokens.skip_ws(match.end())
+                if operator not in _DIRECT_OPERATORS:
+                    raise UnsupportedPageError(
+                        f"Page {index} has content besides the image ({operator})"
+                    )
+                if operator == 'q':
+                    stack.append(ctm)
+                elif operator == 'Q':
+                    if not stack:
+                        raise UnsupportedPageError(f"Page {index} has unbalanced q/Q")
+                    ctm = stack.pop()
+                elif operator == 'cm':
+                    if len(operands) != 6 or not all(
+                            isinstance(v, (int, float)) for v in operands):
+                        raise UnsupportedPageError(f"Page {index} has an invalid cm operator")
+                    ctm = _multiply(tuple(float(v) for v in operands), ctm)
+                elif operands != [name] or placement is not None:
+                    raise UnsupportedPageError(f"Page {index} draws other XObjects")
+                else:
+                    placement = ctm
+                operands = []
+        except (ValueError, IndexError):
+            raise UnsupportedPageError(f"Page {index} has an unparsable content stream")
+
+        if placement is None:
+            raise UnsupportedPageError(f"Page {index} does not draw its image")
+
+        a, b, c, d, e, f = placement
+        if b or c or a <= 0 or d <= 0:
+            raise UnsupportedPageError(f"Page {index} image is rotated, skewed or flipped")
+
+        media_box = [parser.resolve(v) for v in _as_list(parser.resolve(page.get('MediaBox')))]
+        if len(media_box) != 4 or not all(isinstance(v, (int, float)) for v in media_box):
+            raise UnsupportedPageError(f"Page {index} has no valid MediaBox")
+        x0, x1 = sorted(media_box[0::2])
+        y0, y1 = sorted(media_box[1::2])
+        tol_x = (x1 - x0) * _COVER_TOLERANCE
+        tol_y = (y1 - y0) * _COVER_TOLERANCE
+        if e > x0 + tol_x or f > y0 + tol_y or e + a < x1 - tol_x or f + d < y1 - tol_y:
+            raise UnsupportedPageError(f"Page {index} image does not cover the page")
+
+    def _decode_image(self, stream: PdfStream) -> np.ndarray:
+        """直接解碼影像串流"""
+        parser = self._parser
+        attrs = stream.attrs
+        filters = _as_list(parser.resolve(attrs.get('Filter')))
+
+        if filters and filters[-1] == 'DCTDecode':
+            data = decode_filters(parser, stream, stop_before='DCTDecode') \
+                if len(filters) > 1 else parser.stream_data(stream)
+            return read_image_from_buffer(data, self.grayscale)
+
+        if parser.resolve(attrs.get('ImageMask')):
+            raise UnsupportedPageError("Image masks are not supported")
+
+        raw = decode_filters(parser, stream, stop_before=None)
+        return self._raw_to_array(raw, attrs)
+
+    def _raw_to_array(self, raw: bytes, attrs: Dict[str, Any]) -> np.ndarray:
+        """未壓縮（或 Flate 解開後）的像素資料轉為陣列"""
+        parser = self._parser
+        width = parser.resolve(attrs.get('Width'))
+        height = parser.resolve(attrs.get('Height'))
+        bits = parser.resolve(attrs.get('BitsPerComponent', 8))
+        channels = self._channels(parser.resolve(attrs.get('ColorSpace')))
+
+        if bits == 8:
+            expected = width * height * channels
+            if len(raw) < expected:
+                raise ValueError("Image stream is shorter than expected")
+            image = np.frombuffer(raw, dtype=np.uint8, count=expected)
+            image = image.reshape(height, width, channels) if channels > 1 \
+                else image.reshape(height, width)
+        elif bits == 1 and channels == 1:
+            row_bytes = (width + 7) // 8
+            packed = np.frombuffer(raw, dtype=np.uint8, count=row_bytes * height)
+            bitmap = np.unpackbits(packed.reshape(height, row_bytes), axis=1)[:, :width]
+            image = bitmap * np.uint8(255)
+        else:
+            raise UnsupportedPageError(f"Unsupported BitsPerComponent: {bits}")
+
+        decode = parser.resolve(attrs.get('Decode'))
+        if decode and list(decode[:2]) == [1, 0]:
+            image = 255 - image
+
+        if channels == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        return image
+
+    def _channels(self, color_space) -> int:
+        """色彩空間的通道數（不支援者拋出 UnsupportedPageError）"""
+        parser = self._parser
+        if isinstance(color_space, str) and color_space in _COLOR_CHANNELS:
+            return _COLOR_CHANNELS[color_space]
+        if isinstance(color_space, list) and color_space and color_space[0] == 'ICCBased':
+            profile = parser.resolve(color_space[1])
+            channels = parser.resolve(profile.attrs.get('N')) if isinstance(profile, PdfStream) else None
+            if channels in (1, 3):
+                return channels
+        raise UnsupportedPageError(f"Unsupported color space: {color_space}")
+
+    def _normalize_channels(self, image: np.ndarray) -> np.ndarray:
+        """輸出與 read_image 相同的通道格式"""
+        if self.grayscale and image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if not self.grayscale and image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        return image
@@ -3,7 +3,9 @@ OCR Adapters - OCR 引擎適配器模組
 """
 
 from .paddleocr_adapter import PaddleOCRAdapter
+from .batching_adapter import BatchingOCRAdapter
 
 __all__ = [
     "PaddleOCRAdapter",
+    "BatchingOCRAdapter",
 ]
@@ -0,0 +1,241 @@
+"""
+BatchingOCRAdapter - 微批次請求合併器
+
+線上服務的請求一次一張到達，OCR 引擎永遠看不到批次。
+本適配器位於 recognize() 呼叫者與引擎之間：收集同時到達的請求，
+湊滿 max_batch_size 或等待 max_wait_ms 後以單次批次 predict 送出，
+再把各自的結果交還給每個呼叫者。
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# (影像, recognize 參數, 呼叫者的 Future)
+_Request = Tuple[np.ndarray, Dict[str, Any], Future]
+
+
+class BatchingOCRAdapter:
+    """
+    微批次 OCR 適配器
+
+    - 與一般 OCR 適配器相同的 recognize(image) 介面，可直接交給 Orchestrator
+    - 內層適配器有 recognize_batch() 時以單次批次呼叫處理；否則逐張呼叫
+    - 批次失敗時改為逐張重試，確保每個呼叫者只收到自己影像的例外
+    - 派送執行緒本身出錯時，所有等待中的請求都收到該例外，之後的 recognize() 直接失敗
+    - recognize() 的額外參數（如 use_angle_cls）相同的請求才會合併成同一批
+    - 其他屬性（extract_text、config…）轉交內層適配器
+    """
+
+    def __init__(
+        self,
+        ocr_adapter,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Args:
+            ocr_adapter: 內層 OCR 適配器（如 PaddleOCRAdapter）
+            max_batch_size: 單一批次最多影像數
+            max_wait_ms: 收到第一個請求後最多等待多久湊批次（毫秒）
+        """
+        if ocr_adapter is None:
+            raise ValueError("ocr_adapter is required")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.ocr_adapter = ocr_adapter
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        # 派送執行緒中止的原因；目前從佇列取出、尚未完成的請求
+        self._worker_error: Optional[BaseException] = None
+        self._inflight: List[_Request] = []
+
+        self._batch_count = 0
+        self._item_count = 0
+        self._max_batch_seen = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # 僅在一般屬性查找失敗時呼叫：轉交內層適配器
+        if name == 'ocr_adapter':
+            raise AttributeError(name)
+        return getattr(self.ocr_adapter, name)
+
+    def recognize(self, image: np.ndarray, **options) -> List[Any]:
+        """
+        識別影像中的文字（與其他呼叫合併成批次）
+
+        Args:
+            image: 輸入影像
+            **options: 傳給內層適配器的額外參數
+
+        Returns:
+            此影像的識別結果列表
+
+        Raises:
+            RuntimeError: 適配器已關閉，或派送執行緒已中止
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchingOCRAdapter is closed")
+            if self._worker_error is not None:
+                raise RuntimeError(
+                    "BatchingOCRAdapter worker stopped"
+                ) from self._worker_error
+            self._ensure_worker()
+            self._queue.put((image, options, future))
+        return future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        批次統計
+
+        Returns:
+            {'batches': 批次數, 'items': 影像數, 'avg_batch_size': 平均批次大小,
+             'max_batch_size': 實際最大批次, 'queue_depth': 等待中的請求數}
+        """
+        batches = self._batch_count
+        return {
+            'batches': batches,
+            'items': self._item_count,
+            'avg_batch_size': self._item_count / batches if batches else 0.0,
+            'max_batch_size': self._max_batch_seen,
+            'queue_depth': self._queue.qsize()
+        }
+
+    def close(self) -> None:
+        """停止背景派送執行緒（已排入的請求會先處理完）"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+        if worker is not None:
+            worker.join()
+
+    def __enter__(self) -> "BatchingOCRAdapter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _ensure_worker(self) -> None:
+        """延遲啟動背景派送執行緒（呼叫端需持有 _lock）"""
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run,
+                name="ocr-batching",
+                daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        """背景派送執行緒：迴圈本身出錯時讓所有等待中的請求失敗"""
+        try:
+            self._serve()
+        except BaseException as e:
+            self._fail_pending(e)
+
+    def _fail_pending(self, error: BaseException) -> None:
+        """記錄中止原因，並以該例外結束處理中與佇列中的所有請求"""
+        with self._lock:
+            # 持有 _lock 時設定：之後的 recognize() 不會再排入請求
+            self._worker_error = error
+            requests = [request for request in self._inflight if request is not None]
+            while True:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    requests.append(request)
+        self._inflight = []
+        for _, _, future in requests:
+            if future.done():
+                continue
+            if future.running() or future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def _serve(self) -> None:
+        """背景派送迴圈"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            self._inflight = batch
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            stop = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        nxt = self._queue.get(timeout=remaining)
+                    else:
+                        nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            # 依 recognize 參數分組送出
+            groups: Dict[Tuple, List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(tuple(sorted(request[1].items())), []).append(request)
+            for group in groups.values():
+                self._dispatch(group)
+            self._inflight = []
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Request]) -> None:
+        """送出一個批次（參數相同）並把結果分派給各呼叫者"""
+        # 已被呼叫者取消的請求不送進引擎
+        pending = [request for request in batch
+                   if request[2].set_running_or_notify_cancel()]
+        if not pending:
+            return
+        options = pending[0][1]
+        images = [image for image, _, _ in pending]
+        futures = [future for _, _, future in pending]
+
+        self._batch_count += 1
+        self._item_count += len(futures)
+        self._max_batch_seen = max(self._max_batch_seen, len(futures))
+
+        recognize_batch = getattr(self.ocr_adapter, 'recognize_batch', None)
+        if recognize_batch is not None and len(images) > 1:
+            try:
+                results = recognize_batch(images, **options)
+            except Exception:
+                # 批次失敗：逐張重試，讓例外只回到對應的呼叫者
+                results = None
+            if results is not None and len(results) == len(images):
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+                return
+
+        for image, future in zip(images, futures):
+            try:
+                future.set_result(self.ocr_adapter.recognize(image, **options))
+            except Exception as e:
+                future.set_exception(e)
@@ -86,12 +86,17 @@ class PaddleOCRAdapter:
                 return text
         return text
     
-    def recognize(self, image: np.ndarray) -> List[Any]:
+    def recognize(
+        self,
+        image: np.ndarray,
+        use_angle_cls: Optional[bool] = None
+    ) -> List[Any]:
         """
         識別影像中的文字
         
         Args:
             image: 輸入影像
+            use_angle_cls: 本次是否使用文字方向分類（None 表示沿用初始化設定）
             
         Returns:
             PaddleOCR 識別結果列表
@@ -99,31 +104,88 @@ class PaddleOCRAdapter:
         Raises:
             ValueError: 如果影像無效
         """
-        if image is None:
-            raise ValueError("Image cannot be None")
-        
-        if not isinstance(image, np.ndarray):
-            raise ValueError("Image must be a numpy array")
-        
-        # 檢查影像尺寸
-        h, w = image.shape[:2]
-        if h < 100 or w < 100:
-            raise ValueError(f"Image size {w}x{h} is too small. Both width and height must be at least 100 pixels.")
+        self._validate_image(image)
         
         # 初始化 OCR 引擎
         self._init_ocr()
         
         # 執行識別（PaddleOCR 3.x API）
-        result = self._ocr.predict(input=image)
+        result = self._ocr.predict(input=image, **self._predict_options(use_angle_cls))
         
         # result 是 list，每個元素對應一張圖
         if not result or len(result) == 0:
             return []
         
         # 取得第一張圖的結果
-        page_result = result[0]
+        return self._convert_page_result(result[0])
+    
+    def recognize_batch(
+        self,
+        images: List[np.ndarray],
+        use_angle_cls: Optional[bool] = None
+    ) -> List[List[Any]]:
+        """
+        批次識別多張影像（單次 predict 呼叫）
+        
+        Args:
+            images: 輸入影像列表
+            use_angle_cls: 本次是否使用文字方向分類（None 表示沿用初始化設定）
+            
+        Returns:
+            每張影像各自的識別結果列表（順序與輸入相同）
+            
+        Raises:
+            ValueError: 如果任一影像無效
+        """
+        if not images:
+            return []
         
-        # 轉換為統一格式 [[bbox, (text, confidence)], ...]
+        for image in images:
+            self._validate_image(image)
+        
+        self._init_ocr()
+        
+        result = self._ocr.predict(
+            input=list(images),
+            **self._predict_options(use_angle_cls)
+        ) or []
+        
+        converted = [self._convert_page_result(page) for page in result]
+        # 引擎對空白頁可能不回傳結果，補齊長度
+        converted.extend([] for _ in range(len(images) - len(converted)))
+        return converted
+    
+    def _predict_options(self, use_angle_cls: Optional[bool]) -> Dict[str, Any]:
+        """單次 predict 的覆寫參數"""
+        if use_angle_cls is None or use_angle_cls == self.use_angle_cls:
+            return {}
+        return {"use_textline_orientation": use_angle_cls}
+    
+    def _validate_image(self, image: np.ndarray) -> None:
+        """
+        驗證輸入影像
+        
+        Raises:
+            ValueError: 如果影像無效
+        """
+        if image is None:
+            raise ValueError("Image cannot be None")
+        
+        if not isinstance(image, np.ndarray):
+            raise ValueError("Image must be a numpy array")
+        
+        # 檢查影像尺寸
+        h, w = image.shape[:2]
+        if h < 100 or w < 100:
+            raise ValueError(f"Image size {w}x{h} is too small. Both width and height must be at least 100 pixels.")
+    
+    def _convert_page_result(self, page_result) -> List[Any]:
+        """
+        將單頁 PaddleOCR 結果轉換為統一格式
+        
+        Returns:
+            [[bbox, (text, confidence)], ...]
+        """
         converted_result = []
         
         # PaddleOCR 3.x 回傳的是 OCRResult 物件
@@ -197,6 +259,21 @@ class PaddleOCRAdapter:
         
         return results
     
+    def fingerprint(self) -> Dict[str, Any]:
+        """
+        目前生效的引擎設定（結果快取以此判斷是否為相同的引擎設定）
+        
+        Returns:
+            {'lang', 'use_angle_cls', 'min_confidence', 'convert_to_traditional', 'config'}
+        """
+        return {
+            'lang': self.lang,
+            'use_angle_cls': self.use_angle_cls,
+            'min_confidence': self.min_confidence,
+            'convert_to_traditional': self.convert_to_traditional,
+            'config': self.config
+        }
+    
     def set_language(self, lang: str) -> None:
         """
         設定識別語言
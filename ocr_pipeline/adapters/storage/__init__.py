@@ -0,0 +1,18 @@
+"""
+Storage Adapters - 結果儲存適配器模組
+"""
+
+from .base import ResultSink, json_default
+from .jsonl_sink import JsonlSink
+from .csv_sink import CsvSink
+from .sqlite_sink import SqliteSink
+from .text_index import OcrTextIndex
+
+__all__ = [
+    "ResultSink",
+    "JsonlSink",
+    "CsvSink",
+    "SqliteSink",
+    "OcrTextIndex",
+    "json_default",
+]
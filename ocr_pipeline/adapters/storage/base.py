@@ -0,0 +1,135 @@
+"""
+ResultSink - 緩衝批次寫入的結果儲存基底類別
+
+每份文件寫一個 JSON 檔會產生大量的小檔寫入。結果儲存先把結果放在記憶體緩衝區，
+累積 batch_size 份或距上次寫入超過 flush_interval 秒時再一次寫出：
+  - 子類別只需實作 _write_batch(records)，一次處理一整批；分段寫出的子類別以
+    _mark_written(n) 回報已確實寫出的筆數，寫出失敗後重試時從該處繼續，不會重複寫入
+  - 時間條件在 write() 時檢查（不另開執行緒）；close() 時一定會寫出剩下的結果
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+class ResultSink(ABC):
+    """
+    結果儲存基底類別（執行緒安全）
+
+    使用方式：
+        with JsonlSink('results.jsonl') as sink:
+            for result in orchestrator.process_stream(documents):
+                sink.write(result)
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 5.0):
+        """
+        Args:
+            batch_size: 緩衝區累積多少份結果時寫出
+            flush_interval: 距上次寫出超過此秒數時，下一次 write() 會寫出
+
+        Raises:
+            ValueError: 無效的 batch_size 或 flush_interval
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if flush_interval < 0:
+            raise ValueError("flush_interval must be >= 0")
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+
+        self._buffer: List[Dict[str, Any]] = []
+        # 目前這一批中已確實寫出的筆數（_mark_written 累計）
+        self._batch_written = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """
+        加入一份結果（達到大小或時間條件時寫出）
+
+        Raises:
+            RuntimeError: 已關閉
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{type(self).__name__} is closed")
+            self._buffer.append(result)
+            if (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
+
+    def write_many(self, results) -> None:
+        """加入多份結果"""
+        for result in results:
+            self.write(result)
+
+    def flush(self) -> None:
+        """寫出緩衝區中的所有結果"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return
+            records, self._buffer = self._buffer, []
+            self._batch_written = 0
+            try:
+                self._write_batch(records)
+            except Exception:
+                # 寫出失敗：尚未寫出的結果保留在緩衝區，之後可再重試
+                done = self._batch_written
+                self.written += done
+                self._buffer = records[done:] + self._buffer
+                raise
+            self.written += len(records)
+
+    def close(self) -> None:
+        """寫出剩下的結果並釋放資源（可重複呼叫）"""
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._close()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @abstractmethod
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """寫出一批結果（子類別實作）"""
+
+    def _mark_written(self, count: int) -> None:
+        """回報目前這一批又有 count 筆已確實寫出（失敗重試時略過）"""
+        self._batch_written += count
+
+    def _close(self) -> None:
+        """釋放資源（子類別視需要覆寫）"""
+        pass
+
+
+def json_default(value: Any) -> Any:
+    """
+    json.dump 的 default：numpy 型別與集合轉為 JSON 可表示的值
+
+    Raises:
+        TypeError: 無法轉換的型別
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
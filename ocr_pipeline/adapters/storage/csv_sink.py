@@ -0,0 +1,91 @@
+"""
+CsvSink - 平面 CSV 結果檔（每個範本欄位一欄）
+
+欄位：document_id、template_id，接著每個範本欄位的文字；
+include_scores=True 時每個欄位另有 {欄位}_score（total_score）。
+"""
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .base import ResultSink
+
+
+class CsvSink(ResultSink):
+    """
+    CSV 結果儲存
+
+    使用方式：
+        with CsvSink('results.csv', fields=['invoice_number', 'date']) as sink:
+            sink.write(result)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fields: Optional[Sequence[str]] = None,
+        include_scores: bool = False,
+        encoding: str = 'utf-8',
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            path: 輸出檔路徑（已存在且非空時附加，不重寫標題列）
+            fields: 範本欄位名稱（可直接傳入範本的 regions）；
+                None 時以第一份結果的欄位為準
+            include_scores: 是否輸出每個欄位的 total_score
+            encoding: 檔案編碼（給 Excel 開啟可用 'utf-8-sig'）
+            batch_size: 緩衝區累積多少份結果時寫出
+            flush_interval: 距上次寫出超過此秒數時寫出
+        """
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = Path(path)
+        self.fields = list(fields) if fields is not None else None
+        self.include_scores = include_scores
+        self.encoding = encoding
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._writer = None
+
+    def columns(self) -> List[str]:
+        """CSV 欄位名稱（欄位尚未決定時回傳空列表）"""
+        if self.fields is None:
+            return []
+        columns = ['document_id', 'template_id']
+        for name in self.fields:
+            columns.append(name)
+            if self.include_scores:
+                columns.append(f"{name}_score")
+        return columns
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        if self._writer is None:
+            if self.fields is None:
+                self.fields = list(records[0].get('fields', {}))
+            new_file = not self.path.exists() or self.path.stat().st_size == 0
+            self._file = open(self.path, 'a', newline='', encoding=self.encoding)
+            self._writer = csv.writer(self._file)
+            if new_file:
+                self._writer.writerow(self.columns())
+
+        self._writer.writerows(self._row(record) for record in records)
+        self._file.flush()
+
+    def _row(self, record: Dict[str, Any]) -> List[Any]:
+        """結果 -> CSV 列（找不到的欄位為空字串）"""
+        fields = record.get('fields', {})
+        row = [record.get('document_id', ''), record.get('template_id', '')]
+        for name in self.fields:
+            value = fields.get(name)
+            row.append(value.get('text', '') if value else '')
+            if self.include_scores:
+                row.append(round(float(value['total_score']), 4) if value else '')
+        return row
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
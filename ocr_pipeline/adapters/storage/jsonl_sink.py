@@ -0,0 +1,143 @@
+"""
+JsonlSink - 輪替的 JSON Lines 結果檔（可選 gzip 壓縮）
+
+每份結果一行 JSON；一批結果組成單一字串後一次寫入。
+設定 max_bytes 時，檔案超過大小即換下一個分段檔（{stem}-00001.jsonl、-00002…）。
+壓縮時每次寫入是一個獨立的 gzip 成員（多成員的 gzip 檔可正常解壓）。
+寫入中途失敗時截掉不完整的內容；已寫出的分段不會在重試時重複寫入。
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .base import ResultSink, json_default
+
+
+class JsonlSink(ResultSink):
+    """
+    JSON Lines 結果儲存
+
+    使用方式：
+        with JsonlSink('out/results.jsonl', max_bytes=256 * 1024 * 1024, compress=True) as sink:
+            sink.write(result)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: Optional[int] = None,
+        compress: bool = False,
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            path: 輸出檔路徑（compress 時自動加上 .gz）
+            max_bytes: 單一檔案的位元組上限（未壓縮前的大小）；None 表示不輪替
+            compress: 是否以 gzip 壓縮
+            batch_size: 緩衝區累積多少份結果時寫出
+            flush_interval: 距上次寫出超過此秒數時寫出
+
+        Raises:
+            ValueError: 無效的 max_bytes
+        """
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._part = 0
+        self._part_bytes = 0
+        self._file = None
+        self.files: List[Path] = []
+        if max_bytes is not None:
+            # 重新啟動時從新的分段開始，不附加到可能已滿的舊分段
+            while self._part_path(self._part).exists():
+                self._part += 1
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        lines = [
+            json.dumps(record, ensure_ascii=False, default=json_default) + '\n'
+            for record in records
+        ]
+        if self.max_bytes is None:
+            self._write_lines(lines)
+            self._mark_written(len(lines))
+            return
+
+        # 依大小切成多段，每段一次寫入
+        chunk: List[str] = []
+        chunk_bytes = 0
+        for line in lines:
+            size = len(line.encode('utf-8'))
+            filled = self._part_bytes + chunk_bytes
+            if filled and filled + size > self.max_bytes:
+                self._write_lines(chunk)
+                self._mark_written(len(chunk))
+                chunk, chunk_bytes = [], 0
+                self._rotate()
+            chunk.append(line)
+            chunk_bytes += size
+        self._write_lines(chunk)
+        self._mark_written(len(chunk))
+
+    def _write_lines(self, lines: List[str]) -> None:
+        """
+        一次寫入多行（全部寫入或全部不寫）
+
+        Raises:
+            OSError: 寫入失敗（已截掉寫到一半的內容）
+        """
+        if not lines:
+            return
+        if self._file is None:
+            self._open()
+        text = ''.join(lines).encode('utf-8')
+        data = memoryview(gzip.compress(text) if self.compress else text)
+        start = self._file.seek(0, os.SEEK_END)
+        try:
+            while data:
+                data = data[self._file.write(data):]
+        except Exception:
+            # 截掉不完整的行（或 gzip 成員），重試時從這一段重新寫入
+            try:
+                self._file.truncate(start)
+            except OSError:
+                pass
+            raise
+        self._part_bytes += len(text)
+
+    def _open(self) -> None:
+        """開啟目前的分段檔（附加、無緩衝：寫入失敗時可截回寫入前的大小）"""
+        path = self._part_path(self._part)
+        self._file = open(path, 'ab', buffering=0)
+        self._part_bytes = 0
+        self.files.append(path)
+
+    def _rotate(self) -> None:
+        """關閉目前的分段檔，下次寫入時開啟下一段"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._part += 1
+        self._part_bytes = 0
+
+    def _part_path(self, part: int) -> Path:
+        path = self.path
+        if self.max_bytes is not None:
+            path = path.with_name(f"{path.stem}-{part:05d}{path.suffix}")
+        if self.compress:
+            path = path.with_name(path.name + '.gz')
+        return path
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
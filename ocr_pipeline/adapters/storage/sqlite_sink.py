@@ -0,0 +1,93 @@
+"""
+SqliteSink - SQLite 結果資料表（每批一次 executemany 交易）
+
+每份結果一列：document_id、template_id、profile、fields（JSON）、result（完整 JSON）。
+以 WAL 模式寫入，讀取端查詢時不會阻擋寫入。
+"""
+
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from .base import ResultSink, json_default
+
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class SqliteSink(ResultSink):
+    """
+    SQLite 結果儲存
+
+    使用方式：
+        with SqliteSink('results.db') as sink:
+            sink.write(result)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        table: str = 'results',
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            path: SQLite 檔案路徑
+            table: 資料表名稱
+            batch_size: 緩衝區累積多少份結果時寫出
+            flush_interval: 距上次寫出超過此秒數時寫出
+
+        Raises:
+            ValueError: 無效的資料表名稱
+        """
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        if not _IDENTIFIER.match(table):
+            raise ValueError(f"Invalid table name: {table}")
+
+        self.path = Path(path)
+        self.table = table
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "id INTEGER PRIMARY KEY, "
+                "document_id TEXT, "
+                "template_id TEXT, "
+                "profile TEXT, "
+                "fields TEXT NOT NULL, "
+                "result TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_document_id ON {table} (document_id)"
+            )
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        rows = [
+            (
+                record.get('document_id'),
+                record.get('template_id'),
+                record.get('profile'),
+                json.dumps(record.get('fields', {}), ensure_ascii=False, default=json_default),
+                json.dumps(record, ensure_ascii=False, default=json_default),
+                now
+            )
+            for record in records
+        ]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO {self.table} "
+                "(document_id, template_id, profile, fields, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,274 @@
+"""
+OcrTextIndex - 已處理文件的 OCR 全文索引（SQLite FTS5）
+
+稽核需要找出所有出現某個統一編號或金額的發票。本索引把每份文件的
+OCR 文字行（文字、bbox、信心度）與提取欄位寫進 FTS5 資料表：
+  1. trigram 分詞：任意 3 個字以上的子字串都能走索引（中文、編號、金額皆可）；
+     少於 3 個字的查詢改為逐行掃描
+  2. 文字行的 rowid = (文件 rowid << 20) | 行號，查詢結果依 rowid 排序即依文件分組，
+     重新索引同一文件時以 rowid 範圍刪除舊資料
+  3. 以 ResultSink 緩衝，每批結果一次交易寫入
+
+OCR 文字行需要 Orchestrator(keep_ocr_lines=True)；沒有 'ocr_lines' 的結果只索引提取欄位。
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .base import ResultSink, json_default
+
+
+# 每份文件最多的文字行數（含欄位）= 2 ** _LINE_BITS
+_LINE_BITS = 20
+_MAX_LINES = 1 << _LINE_BITS
+_TRIGRAM = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    document_id TEXT NOT NULL UNIQUE,
+    template_id TEXT,
+    fields TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5(
+    text,
+    page UNINDEXED,
+    bbox UNINDEXED,
+    confidence UNINDEXED,
+    field UNINDEXED,
+    tokenize = 'trigram'
+);
+"""
+
+
+class OcrTextIndex(ResultSink):
+    """
+    OCR 全文索引（可作為結果儲存使用）
+
+    使用方式：
+        orchestrator = Orchestrator(ocr, keep_ocr_lines=True)
+        with OcrTextIndex('ocr_index.db') as index:
+            for result in orchestrator.process_stream(documents, sink=index):
+                ...
+            hits = index.search('12345678')
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 500,
+        flush_interval: float = 5.0
+    ):
+        """
+        Args:
+            path: SQLite 檔案路徑
+            batch_size: 緩衝區累積多少份結果時寫出
+            flush_interval: 距上次寫出超過此秒數時寫出
+        """
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """
+        加入一份結果（需含 'document_id'）
+
+        Raises:
+            ValueError: 結果沒有 document_id
+        """
+        if result.get('document_id') is None:
+            raise ValueError("OcrTextIndex requires results with a 'document_id'")
+        super().write(result)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 100,
+        field: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        搜尋包含 query 子字串的文字行（查詢字串視為字面文字，不使用 FTS 語法）
+
+        Args:
+            query: 要搜尋的文字
+            limit: 最多回傳的行數
+            field: 只搜尋指定的提取欄位（None 時搜尋 OCR 文字行與所有欄位）
+
+        Returns:
+            [{'document_id', 'template_id', 'page', 'text', 'bbox', 'confidence', 'field'}]；
+            依文件與行號排序（OCR 文字行的 field 為 None）
+
+        Raises:
+            ValueError: 空白的查詢
+        """
+        where, params = self._where(query, field)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT rowid, text, page, bbox, confidence, field FROM lines "
+                f"WHERE {where} ORDER BY rowid LIMIT ?",
+                params + [limit]
+            ).fetchall()
+            documents = self._documents({rowid >> _LINE_BITS for rowid, *_ in rows})
+
+        hits = []
+        for rowid, text, page, bbox, confidence, field_name in rows:
+            document_id, template_id = documents[rowid >> _LINE_BITS]
+            hits.append({
+                'document_id': document_id,
+                'template_id': template_id,
+                'page': page,
+                'text': text,
+                'bbox': json.loads(bbox) if bbox else None,
+                'confidence': confidence,
+                'field': field_name
+            })
+        return hits
+
+    def search_documents(self, query: str, limit: int = 100) -> List[str]:
+        """
+        搜尋包含 query 的文件
+
+        Args:
+            query: 要搜尋的文字
+            limit: 最多回傳的文件數
+
+        Returns:
+            文件 ID 列表（依索引順序）
+
+        Raises:
+            ValueError: 空白的查詢
+        """
+        where, params = self._where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT rowid >> {_LINE_BITS} AS doc FROM lines "
+                f"WHERE {where} ORDER BY doc LIMIT ?",
+                params + [limit]
+            ).fetchall()
+            documents = self._documents(row[0] for row in rows)
+        return [documents[row[0]][0] for row in rows]
+
+    def get_fields(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """取得文件的提取欄位（不在索引中時回傳 None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def document_count(self) -> int:
+        """已索引的文件數"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    @staticmethod
+    def _where(query: str, field: Optional[str] = None) -> tuple:
+        """查詢字串 -> (WHERE 子句, 參數)；查詢視為字面文字"""
+        query = query.strip()
+        if not query:
+            raise ValueError("query must not be empty")
+
+        if len(query) >= _TRIGRAM:
+            where = "lines MATCH ?"
+            params: List[Any] = ['"' + query.replace('"', '""') + '"']
+        else:
+            # trigram 無法索引太短的查詢：逐行掃描
+            where = "instr(text, ?) > 0"
+            params = [query]
+        if field is not None:
+            where += " AND field = ?"
+            params.append(field)
+        return where, params
+
+    def _documents(self, ids) -> Dict[int, tuple]:
+        """文件 rowid -> (document_id, template_id)"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        rows = self._conn.execute(
+            f"SELECT id, document_id, template_id FROM documents WHERE id IN ({placeholders})",
+            ids
+        )
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def _write_batch(self, records: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        # 同一批中重複的 document_id 只保留最後一份結果
+        latest = {str(record['document_id']): record for record in records}
+        line_rows = []
+        with self._conn:
+            for document_id, record in latest.items():
+                fields = record.get('fields') or {}
+                self._conn.execute(
+                    "INSERT INTO documents (document_id, template_id, fields, indexed_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (document_id) DO UPDATE SET "
+                    "template_id = excluded.template_id, fields = excluded.fields, "
+                    "indexed_at = excluded.indexed_at",
+                    (
+                        document_id,
+                        record.get('template_id'),
+                        json.dumps(fields, ensure_ascii=False, default=json_default),
+                        now
+                    )
+                )
+                doc_rowid = self._conn.execute(
+                    "SELECT id FROM documents WHERE document_id = ?", (document_id,)
+                ).fetchone()[0]
+                base = doc_rowid << _LINE_BITS
+                # 重新索引：刪除此文件的舊文字行
+                self._conn.execute(
+                    "DELETE FROM lines WHERE rowid BETWEEN ? AND ?",
+                    (base, base + _MAX_LINES - 1)
+                )
+                line_rows.extend(
+                    (base + line_no,) + row
+                    for line_no, row in enumerate(self._line_rows(record)[:_MAX_LINES])
+                )
+
+            self._conn.executemany(
+                "INSERT INTO lines (rowid, text, page, bbox, confidence, field) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                line_rows
+            )
+
+    @staticmethod
+    def _line_rows(record: Dict[str, Any]) -> List[tuple]:
+        """結果 -> [(text, page, bbox, confidence, field)]（先提取欄位，再 OCR 文字行）"""
+        rows = []
+        for name, value in (record.get('fields') or {}).items():
+            if not value or not value.get('text'):
+                continue
+            page = (record.get('field_pages') or {}).get(name)
+            confidence = value.get('confidence', value.get('total_score'))
+            rows.append((
+                str(value['text']),
+                page,
+                json.dumps(value.get('bbox'), default=json_default),
+                float(confidence) if confidence is not None else None,
+                name
+            ))
+        for line in record.get('ocr_lines') or []:
+            if not line.get('text'):
+                continue
+            rows.append((
+                str(line['text']),
+                line.get('page'),
+                json.dumps(line.get('bbox'), default=json_default),
+                line.get('confidence'),
+                None
+            ))
+        return rows
+
+    def _close(self) -> None:
+        self._conn.close()
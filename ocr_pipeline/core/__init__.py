@@ -3,9 +3,43 @@ Core 模組：包含 Orchestrator 和 Extractors
 """
 
 from .orchestrator import Orchestrator
+from .async_orchestrator import AsyncOrchestrator
+from .single_flight import SingleFlight
+from .result_cache import ResultCache
+from .near_duplicate import NearDuplicateIndex
+from .budget import TimeBudget
+from .quality_profiles import ProfileController, QUALITY_PROFILES
+from .quality import QUALITY_GATE_DEFAULTS, assess_quality
+from .scheduler import (
+    JobScheduler,
+    DeadlineExceededError,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BULK,
+)
+from .batch_runner import BatchRunner, CheckpointStore
+from .job_queue import DirectoryJobQueue, Job, LeaseLostError, QueueWorker
 from .extractors import HybridExtractor
 
 __all__ = [
     "Orchestrator",
+    "AsyncOrchestrator",
+    "SingleFlight",
+    "ResultCache",
+    "NearDuplicateIndex",
+    "TimeBudget",
+    "ProfileController",
+    "QUALITY_PROFILES",
+    "QUALITY_GATE_DEFAULTS",
+    "assess_quality",
+    "JobScheduler",
+    "DeadlineExceededError",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_BULK",
+    "BatchRunner",
+    "CheckpointStore",
+    "DirectoryJobQueue",
+    "Job",
+    "LeaseLostError",
+    "QueueWorker",
     "HybridExtractor",
 ]
@@ -0,0 +1,187 @@
+"""
+AsyncOrchestrator - asyncio 原生的 OCR 流程編排器
+
+供 asyncio 服務內嵌使用：CPU 密集的 OCR / 提取在執行緒池中執行，
+不會阻塞 event loop。
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from ..utils.image_utils import BUFFER_TYPES
+from .orchestrator import ImageInput, Orchestrator
+
+
+class AsyncOrchestrator:
+    """
+    非同步 OCR 流程編排器
+
+    設計：
+    1. 每個「引擎槽位」對應一個獨立的 Orchestrator（提取器快取不共用）
+    2. 以 asyncio.Semaphore 限制同時執行的工作數
+    3. 檔案讀取與解碼在預設 executor 中執行，不佔用引擎槽位
+       （reduced_decode 縮小解碼的影像檔仍由 process() 解碼，bbox 維持原圖座標）
+    4. 取消尚未開始的工作會立即釋放槽位；已在執行的工作則於
+       引擎完成時釋放（執行緒無法被中斷）
+    """
+
+    def __init__(
+        self,
+        ocr_adapter,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        **orchestrator_options
+    ):
+        """
+        Args:
+            ocr_adapter: OCR 適配器，或每個槽位各一的適配器列表。
+                傳入單一適配器且 max_concurrency > 1 時，該適配器必須是執行緒安全的
+            max_concurrency: 同時執行的工作數上限（預設為適配器數量）
+            executor: 執行 OCR 的 executor（預設自行建立 ThreadPoolExecutor）
+            **orchestrator_options: 傳給每個 Orchestrator 的參數
+                （如共用的 single_flight、profile_controller）。
+                提供 profile_controller 時，會回報等待槽位的工作數
+        """
+        self._slots: List[Orchestrator] = Orchestrator.create_pool(
+            ocr_adapter,
+            max_concurrency,
+            **orchestrator_options
+        )
+        self.max_concurrency = len(self._slots)
+        self.profile_controller = orchestrator_options.get('profile_controller')
+        self._waiting = 0
+        self._idle: List[Orchestrator] = list(self._slots)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="ocr-pipeline"
+        )
+
+    @property
+    def template(self) -> Optional[Dict]:
+        """目前載入的範本"""
+        return self._slots[0].template
+
+    @property
+    def in_flight(self) -> int:
+        """正在佔用引擎槽位的工作數"""
+        return len(self._slots) - len(self._idle)
+
+    def load_template(self, template_input: Union[str, Path, Dict[str, Any]]) -> None:
+        """
+        載入範本（套用到所有槽位）
+
+        Args:
+            template_input: 範本 dict 或 JSON 檔案路徑（檔案變更後自動重新載入）
+        """
+        # 每個編排器各自載入：範本檔變更時各自重新載入
+        for orchestrator in self._slots:
+            orchestrator.load_template(template_input)
+
+    async def process(self, image_input: ImageInput) -> Dict[str, Any]:
+        """
+        非同步處理單張影像
+
+        Args:
+            image_input: 影像路徑、影像陣列或已編碼的影像資料
+
+        Returns:
+            與 Orchestrator.process() 相同結構
+
+        Raises:
+            ValueError: 尚未載入範本
+            FileNotFoundError: 影像檔案不存在
+        """
+        if self.template is None:
+            raise ValueError("No template loaded. Call load_template() first.")
+
+        loop = asyncio.get_running_loop()
+
+        # 檔案讀取與解碼不佔用引擎槽位（縮小解碼的影像檔仍在槽位中解碼）
+        if isinstance(image_input, (str, Path) + BUFFER_TYPES):
+            image_input = await loop.run_in_executor(
+                None, self._slots[0].preload, image_input
+            )
+
+        semaphore = self._get_semaphore(loop)
+        self._waiting += 1
+        self._report_queue_depth()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            self._report_queue_depth()
+        orchestrator = self._idle.pop()
+
+        try:
+            future = self._executor.submit(orchestrator.process, image_input)
+        except BaseException:
+            self._release(orchestrator)
+            raise
+
+        # 引擎真正結束（或工作在開始前被取消）時才歸還槽位
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release, orchestrator)
+        )
+
+        # wrap_future 在被取消時會一併取消尚未開始的 concurrent future
+        return await asyncio.wrap_future(future, loop=loop)
+
+    async def process_many(
+        self,
+        image_inputs: Iterable[ImageInput],
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        非同步批次處理（同時執行數受 max_concurrency 限制）
+
+        Args:
+            image_inputs: 影像路徑、影像陣列或已編碼的影像資料
+            return_exceptions: True 時失敗的項目以例外物件回傳，而非中止整批
+
+        Returns:
+            與輸入順序相同的結果列表
+        """
+        tasks = [asyncio.ensure_future(self.process(item)) for item in image_inputs]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def close(self) -> None:
+        """關閉自行建立的 executor"""
+        if self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self) -> "AsyncOrchestrator":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Semaphore 綁定於第一次使用的 event loop"""
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _report_queue_depth(self) -> None:
+        """回報等待槽位的工作數給設定檔控制器"""
+        if self.profile_controller is not None:
+            self.profile_controller.observe_queue_depth(self._waiting)
+
+    def _release(self, orchestrator: Orchestrator) -> None:
+        """歸還引擎槽位"""
+        self._idle.append(orchestrator)
+        if self._semaphore is not None:
+            self._semaphore.release()
+
@@ -0,0 +1,330 @@
+"""
+BatchRunner - 可續跑的批次處理（SQLite 檢查點）
+
+大型回補批次（數十萬份文件）中途失敗時不必從頭開始：
+  1. 每份文件以輸入 ID 為鍵，記錄 (大小, mtime, 內容雜湊, 狀態, 嘗試次數)
+  2. 結果累積 flush_every 份後以單一交易批次寫入，避免每份文件一次 fsync
+  3. 重新啟動時一次載入檢查點；檔案的大小與 mtime 未變就直接略過（只需 stat），
+     改變時才比對內容雜湊
+  4. 失敗的文件在之後的執行中重試，直到 max_attempts 次為止；已完成的檔案暫時不存在
+     或無法讀取時保留完成狀態，只有內容改變才重新處理
+
+程序中斷時最多遺失最後 flush_every 份文件的檢查點，這些文件會在下次執行時重新處理。
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from ..adapters.storage import ResultSink
+from ..utils.file_utils import compute_file_hash
+from ..utils.image_utils import BUFFER_TYPES, compute_image_hash
+from .orchestrator import ImageInput, Orchestrator
+
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    input_id TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    content_hash TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+BatchItem = Union[ImageInput, Tuple[str, ImageInput]]
+ResultCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class Checkpoint(NamedTuple):
+    """單一輸入的檢查點記錄"""
+    size: Optional[int]
+    mtime_ns: Optional[int]
+    content_hash: Optional[str]
+    status: str
+    attempts: int
+
+
+class CheckpointStore:
+    """
+    SQLite 檢查點儲存（WAL 模式，批次寫入）
+
+    使用方式：
+        store = CheckpointStore('backfill.ckpt.db')
+        checkpoints = store.load()
+        store.record_many([...])
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: SQLite 檔案路徑
+        """
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path))
+        # WAL + NORMAL：批次提交時不必每次等待完整 fsync，中斷時資料庫仍保持一致
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def load(self) -> Dict[str, Checkpoint]:
+        """
+        載入所有檢查點
+
+        Returns:
+            {輸入 ID: Checkpoint}
+        """
+        rows = self._conn.execute(
+            "SELECT input_id, size, mtime_ns, content_hash, status, attempts FROM checkpoints"
+        )
+        return {row[0]: Checkpoint(*row[1:]) for row in rows}
+
+    def record_many(self, records: List[Tuple[str, Checkpoint, Optional[str]]]) -> None:
+        """
+        以單一交易寫入多筆檢查點
+
+        Args:
+            records: [(輸入 ID, Checkpoint, 錯誤訊息或 None)]
+        """
+        if not records:
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(input_id, size, mtime_ns, content_hash, status, attempts, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (input_id, cp.size, cp.mtime_ns, cp.content_hash, cp.status,
+                     cp.attempts, error, now)
+                    for input_id, cp, error in records
+                ]
+            )
+
+    def errors(self) -> Dict[str, str]:
+        """失敗輸入的最後一次錯誤訊息"""
+        rows = self._conn.execute(
+            "SELECT input_id, error FROM checkpoints WHERE status = ?", (STATUS_FAILED,)
+        )
+        return dict(rows)
+
+    def close(self) -> None:
+        """關閉資料庫"""
+        self._conn.close()
+
+    def __enter__(self) -> "CheckpointStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class BatchRunner:
+    """
+    可續跑的批次處理器
+
+    使用方式：
+        runner = BatchRunner(orchestrator, 'backfill.ckpt.db', flush_every=500)
+        summary = runner.run(paths)
+    """
+
+    def __init__(
+        self,
+        orchestrator: Orchestrator,
+        checkpoint_path: Union[str, Path],
+        flush_every: int = 100,
+        max_attempts: int = 3,
+        budget_ms: Optional[float] = None,
+        on_result: Optional[ResultCallback] = None,
+        sink: Optional[ResultSink] = None
+    ):
+        """
+        Args:
+            orchestrator: 已載入範本的 Orchestrator
+            checkpoint_path: 檢查點 SQLite 檔案路徑
+            flush_every: 每處理多少份文件寫入一次檢查點
+            max_attempts: 每份文件最多嘗試次數（含先前執行）
+            budget_ms: 每份文件的時間預算（毫秒）
+            on_result: 每份文件處理成功後呼叫：(輸入 ID, 結果)；
+                在該文件的檢查點寫入前呼叫
+            sink: 結果儲存；每次寫入檢查點前先 flush，檢查點記錄為完成的結果
+                一定已經寫出（run() 結束時不會關閉 sink）
+
+        Raises:
+            ValueError: 無效的 flush_every 或 max_attempts
+        """
+        if flush_every < 1:
+            raise ValueError("flush_every must be >= 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+
+        self.orchestrator = orchestrator
+        self.checkpoint_path = Path(checkpoint_path)
+        self.flush_every = flush_every
+        self.max_attempts = max_attempts
+        self.budget_ms = budget_ms
+        self.on_result = on_result
+        self.sink = sink
+
+    def run(self, inputs: Iterable[BatchItem]) -> Dict[str, int]:
+        """
+        處理批次（略過已完成的輸入，重試未超過次數上限的失敗輸入）
+
+        Args:
+            inputs: 影像路徑，或 (輸入 ID, 影像路徑 / 陣列 / 已編碼的影像資料)；
+                路徑的輸入 ID 為路徑字串
+
+        Returns:
+            {'processed': 成功, 'failed': 本次失敗, 'skipped': 先前已完成,
+             'given_up': 失敗次數已達上限而略過}
+
+        Raises:
+            ValueError: 非路徑輸入未提供輸入 ID
+        """
+        summary = {'processed': 0, 'failed': 0, 'skipped': 0, 'given_up': 0}
+        pending: List[Tuple[str, Checkpoint, Optional[str]]] = []
+
+        with CheckpointStore(self.checkpoint_path) as store:
+            checkpoints = store.load()
+            try:
+                for item in inputs:
+                    if len(pending) >= self.flush_every:
+                        self._flush(store, pending)
+                        pending = []
+
+                    input_id, image_input = self._split(item)
+                    previous = checkpoints.get(input_id)
+                    size, mtime_ns = self._stat(image_input)
+
+                    # 大小與 mtime 未變：不必讀取內容即可判斷
+                    if previous is not None and size is not None \
+                            and (previous.size, previous.mtime_ns) == (size, mtime_ns):
+                        skip = self._skip_reason(previous)
+                        if skip is not None:
+                            summary[skip] += 1
+                            continue
+
+                    content_hash = self._content_hash(image_input)
+                    attempts = 0
+                    if previous is not None and content_hash is not None \
+                            and previous.content_hash == content_hash:
+                        skip = self._skip_reason(previous)
+                        if skip is not None:
+                            # 只有 mtime 改變，內容相同：更新檢查點後略過
+                            pending.append((input_id, previous._replace(
+                                size=size, mtime_ns=mtime_ns), None))
+                            summary[skip] += 1
+                            continue
+                        attempts = previous.attempts
+                    elif previous is not None and content_hash is None:
+                        if previous.status == STATUS_DONE:
+                            # 已完成的檔案暫時不存在或無法讀取：保留完成的檢查點
+                            summary['skipped'] += 1
+                            continue
+                        # 尚未完成：沿用失敗次數，達上限後放棄
+                        if previous.attempts >= self.max_attempts:
+                            summary['given_up'] += 1
+                            continue
+                        attempts = previous.attempts
+
+                    pending.append(self._process(
+                        input_id, image_input, size, mtime_ns, content_hash,
+                        attempts, summary
+                    ))
+            finally:
+                self._flush(store, pending)
+
+        return summary
+
+    def _flush(
+        self,
+        store: CheckpointStore,
+        records: List[Tuple[str, Checkpoint, Optional[str]]]
+    ) -> None:
+        """先寫出結果儲存，再寫入檢查點"""
+        if self.sink is not None:
+            self.sink.flush()
+        store.record_many(records)
+
+    def _process(
+        self,
+        input_id: str,
+        image_input: ImageInput,
+        size: Optional[int],
+        mtime_ns: Optional[int],
+        content_hash: Optional[str],
+        attempts: int,
+        summary: Dict[str, int]
+    ) -> Tuple[str, Checkpoint, Optional[str]]:
+        """處理單一輸入，回傳要寫入的檢查點"""
+        try:
+            result = self.orchestrator.process(
+                image_input, budget_ms=self.budget_ms, document_id=input_id
+            )
+            if self.on_result is not None:
+                self.on_result(input_id, result)
+        except Exception as e:
+            summary['failed'] += 1
+            checkpoint = Checkpoint(size, mtime_ns, content_hash, STATUS_FAILED, attempts + 1)
+            return (input_id, checkpoint, f"{type(e).__name__}: {e}")
+
+        # 結果儲存的錯誤不是單一文件的失敗：直接拋出，中止整個批次
+        if self.sink is not None:
+            self.sink.write(result)
+        summary['processed'] += 1
+        return (input_id, Checkpoint(size, mtime_ns, content_hash, STATUS_DONE, attempts + 1), None)
+
+    @staticmethod
+    def _split(item: BatchItem) -> Tuple[str, ImageInput]:
+        """拆出 (輸入 ID, 影像輸入)"""
+        if isinstance(item, tuple):
+            input_id, image_input = item
+            return str(input_id), image_input
+        if isinstance(item, (str, Path)):
+            return str(item), item
+        raise ValueError("Non-path inputs must be given as (input_id, image) tuples")
+
+    @staticmethod
+    def _stat(image_input: ImageInput) -> Tuple[Optional[int], Optional[int]]:
+        """路徑輸入的 (大小, mtime_ns)；其他輸入或檔案不存在時為 (None, None)"""
+        if not isinstance(image_input, (str, Path)):
+            return None, None
+        try:
+            stat = os.stat(image_input)
+        except OSError:
+            return None, None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _skip_reason(self, previous: Checkpoint) -> Optional[str]:
+        """內容未變時的略過原因：'skipped'（已完成）、'given_up'（失敗次數已達上限）或 None"""
+        if previous.status == STATUS_DONE:
+            return 'skipped'
+        if previous.attempts >= self.max_attempts:
+            return 'given_up'
+        return None
+
+    @staticmethod
+    def _content_hash(image_input: ImageInput) -> Optional[str]:
+        """輸入內容雜湊（檔案無法讀取時為 None，交給 process() 回報錯誤）"""
+        if isinstance(image_input, (str, Path)):
+            try:
+                return compute_file_hash(image_input)
+            except OSError:
+                return None
+        if isinstance(image_input, BUFFER_TYPES):
+            return hashlib.sha256(image_input).hexdigest()
+        if isinstance(image_input, np.ndarray):
+            return compute_image_hash(image_input)
+        return None
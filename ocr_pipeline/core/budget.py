@@ -0,0 +1,45 @@
+"""
+TimeBudget - 單一文件的處理時間預算
+
+Pipeline 在階段之間、欄位之間檢查預算；預算用完後跳過選用的精修步驟
+（第 2/3 層搜尋、非必填欄位），回傳標記為 incomplete 的部分結果。
+"""
+
+import time
+from typing import Optional
+
+
+class TimeBudget:
+    """
+    時間預算（從建立時開始計時）
+
+    budget_ms 為 None 時代表沒有期限，expired() 永遠回傳 False。
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        """
+        Args:
+            budget_ms: 預算（毫秒）
+
+        Raises:
+            ValueError: 預算為負數
+        """
+        if budget_ms is not None and budget_ms < 0:
+            raise ValueError("budget_ms must be >= 0")
+
+        self.budget_ms = budget_ms
+        self._start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        """已經過的時間（毫秒）"""
+        return (time.perf_counter() - self._start) * 1000.0
+
+    def remaining_ms(self) -> Optional[float]:
+        """剩餘時間（毫秒），沒有期限時回傳 None"""
+        if self.budget_ms is None:
+            return None
+        return max(0.0, self.budget_ms - self.elapsed_ms())
+
+    def expired(self) -> bool:
+        """預算是否已用完"""
+        return self.budget_ms is not None and self.elapsed_ms() >= self.budget_ms
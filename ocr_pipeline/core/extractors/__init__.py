@@ -2,6 +2,6 @@
 Extractors - 欄位提取器模組
 """
 
-from .hybrid_extractor import HybridExtractor
+from .hybrid_extractor import HybridExtractor, bbox_to_rect, transform_bbox
 
-__all__ = ['HybridExtractor']
+__all__ = ['HybridExtractor', 'bbox_to_rect', 'transform_bbox']
@@ -16,6 +16,9 @@ import math
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 
+import cv2
+import numpy as np
+
 
 @dataclass
 class MatchCandidate:
@@ -49,11 +52,22 @@ class HybridExtractor:
         
         self.ocr_adapter = ocr_adapter
         self._ocr_cache = None
+        # 最近一次 extract_fields 因時間預算不足而跳過的欄位
+        self.skipped_fields: List[str] = []
+        # 最近一次 extract_fields 是否因必填欄位已達門檻而略過非必填欄位
+        self.stopped_early = False
+        # 最近一次 refine_fields 因時間預算不足而未重新辨識的低分欄位
+        self.unrefined_fields: List[str] = []
     
     def extract_fields(
         self, 
         image, 
-        template: Dict
+        template: Dict,
+        max_fallback_layer: int = 3,
+        required_only: bool = False,
+        ocr_options: Optional[Dict[str, Any]] = None,
+        budget=None,
+        stop_score: Optional[float] = None
     ) -> Dict[str, Optional[Dict]]:
         """
         提取欄位
@@ -61,6 +75,13 @@ class HybridExtractor:
         Args:
             image: 影像陣列 (H, W, 3)
             template: 範本定義（必須包含 regions）
+            max_fallback_layer: 最多使用到第幾層降級策略（1-3）
+            required_only: 只提取必填欄位（其餘欄位回傳 None）
+            ocr_options: 傳給 ocr_adapter.recognize() 的額外參數
+            budget: TimeBudget；用完後非必填欄位跳過，必填欄位只做第 1 層
+                ROI 內搜尋（未完整搜尋的欄位記錄於 skipped_fields）
+            stop_score: 提前結束門檻；必填欄位先提取，全部 total_score >= stop_score
+                時不再提取非必填欄位（回傳 None，並設定 stopped_early = True）
             
         Returns:
             {
@@ -74,40 +95,288 @@ class HybridExtractor:
             }
         """
         # Step 1: 執行全圖 OCR（快取結果）
-        ocr_results = self._get_ocr_results(image)
+        ocr_results = self.get_ocr_results(image, **(ocr_options or {}))
         
         # Step 2: 提取各欄位
         img_h, img_w = image.shape[:2]
         regions = template.get('regions', {})
         
+        self.skipped_fields = []
+        self.stopped_early = False
         extracted = {}
-        for field_name, field_config in regions.items():
+        
+        order = list(regions)
+        if stop_score is not None:
+            # 必填欄位優先，才能盡早判斷是否可以停止
+            order.sort(key=lambda name: not regions[name].get('required', False))
+        
+        for field_name in order:
+            field_config = regions[field_name]
+            required = field_config.get('required', False)
+            if required_only and not required:
+                extracted[field_name] = None
+                continue
+            
+            if (not required and stop_score is not None
+                    and (self.stopped_early
+                         or self.required_satisfied(extracted, template, stop_score))):
+                self.stopped_early = True
+                extracted[field_name] = None
+                continue
+            
+            max_layer = max_fallback_layer
+            if budget is not None and budget.expired():
+                if not required:
+                    self.skipped_fields.append(field_name)
+                    extracted[field_name] = None
+                    continue
+                max_layer = 1
+            
             # 使用三層降級策略
             result = self._extract_with_fallback(
                 ocr_results,
                 field_config,
-                (img_w, img_h)
+                (img_w, img_h),
+                max_layer
             )
+            if result is None and max_layer < max_fallback_layer:
+                # 因預算不足而未完整搜尋
+                self.skipped_fields.append(field_name)
             extracted[field_name] = result
         
-        return extracted
+        # 維持範本的欄位順序
+        return {name: extracted[name] for name in regions}
+    
+    @staticmethod
+    def required_satisfied(
+        fields: Dict[str, Optional[Dict]],
+        template: Dict,
+        min_score: float
+    ) -> bool:
+        """
+        判斷所有必填欄位是否都已有 total_score >= min_score 的結果
+        
+        Args:
+            fields: 欄位結果
+            template: 範本定義
+            min_score: 分數門檻
+            
+        Returns:
+            bool（範本沒有必填欄位時為 True）
+        """
+        for field_name, field_config in template.get('regions', {}).items():
+            if not field_config.get('required', False):
+                continue
+            value = fields.get(field_name)
+            if value is None or value['total_score'] < min_score:
+                return False
+        return True
     
-    def _get_ocr_results(self, image) -> List:
+    def extract_field(
+        self,
+        ocr_results: List,
+        field_config: Dict,
+        image_size: Tuple[int, int],
+        max_fallback_layer: int = 3
+    ) -> Optional[Dict]:
         """
-        執行 OCR（帶快取）
+        以既有的 OCR 結果提取單一欄位（三層降級策略）
+        
+        Args:
+            ocr_results: [(bbox, (text, confidence)), ...]（座標需對應 image_size）
+            field_config: 欄位配置
+            image_size: (width, height)
+            max_fallback_layer: 最多使用到第幾層降級策略
+            
+        Returns:
+            {'text': ..., 'confidence': ..., 'bbox': ..., ...} 或 None
+        """
+        return self._extract_with_fallback(
+            ocr_results,
+            field_config,
+            image_size,
+            max_fallback_layer
+        )
+    
+    def get_field_region(
+        self,
+        field_config: Dict,
+        image_size: Tuple[int, int],
+        tolerance: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        取得欄位 ROI 的像素範圍（含容錯擴展，並裁切到影像內）
+        
+        Args:
+            field_config: 欄位配置（需有 rect_ratio）
+            image_size: (width, height)
+            tolerance: 擴展比例（預設為 tolerance_ratio * 2，即第 2 層的範圍）
+            
+        Returns:
+            {'x', 'y', 'width', 'height'} 或 None（沒有 rect_ratio）
+        """
+        if 'rect_ratio' not in field_config:
+            return None
+        if tolerance is None:
+            tolerance = field_config.get('tolerance_ratio', 0.2) * 2
+        
+        img_w, img_h = image_size
+        roi = self._expand_roi(self._ratio_to_pixel(field_config['rect_ratio'], image_size), tolerance)
+        x2 = min(img_w, roi['x'] + roi['width'])
+        y2 = min(img_h, roi['y'] + roi['height'])
+        return {'x': roi['x'], 'y': roi['y'], 'width': x2 - roi['x'], 'height': y2 - roi['y']}
+    
+    def recognize_region(
+        self,
+        image,
+        region: Dict,
+        upscale: float = 1.0,
+        sharpen: bool = False,
+        min_size: int = 100,
+        ocr_options: Optional[Dict[str, Any]] = None
+    ) -> List:
+        """
+        只對影像的一塊區域執行 OCR（不使用快取）
+        
+        裁切區域可選擇放大、銳化；小於 min_size 時以邊緣複製補齊，
+        以符合 OCR 引擎的最小尺寸限制。回傳的 bbox 已換算回原影像座標。
+        
+        Args:
+            image: 原影像
+            region: {'x', 'y', 'width', 'height'}（像素）
+            upscale: 放大倍率
+            sharpen: 是否做 unsharp mask 銳化
+            min_size: 送進 OCR 的最小寬高
+            ocr_options: 傳給 ocr_adapter.recognize() 的額外參數
+            
+        Returns:
+            [(bbox, (text, confidence)), ...]
+        """
+        x, y = int(region['x']), int(region['y'])
+        crop = image[y:y + int(region['height']), x:x + int(region['width'])]
+        if crop.size == 0:
+            return []
+        
+        if upscale != 1.0:
+            crop = cv2.resize(crop, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
+        
+        if sharpen:
+            blurred = cv2.GaussianBlur(crop, (0, 0), 1.0)
+            crop = cv2.addWeighted(crop, 1.5, blurred, -0.5, 0)
+        
+        h, w = crop.shape[:2]
+        if h < min_size or w < min_size:
+            # 只補右側與下方，座標原點不變
+            crop = cv2.copyMakeBorder(
+                crop, 0, max(0, min_size - h), 0, max(0, min_size - w),
+                cv2.BORDER_REPLICATE
+            )
+        
+        if ocr_options:
+            results = self.ocr_adapter.recognize(crop, **ocr_options)
+        else:
+            results = self.ocr_adapter.recognize(crop)
+        
+        return [
+            (transform_bbox(bbox, 1.0 / upscale, (x, y)), text_conf)
+            for bbox, text_conf in results
+        ]
+    
+    def refine_fields(
+        self,
+        image,
+        fields: Dict[str, Optional[Dict]],
+        template: Dict,
+        threshold: float = 0.8,
+        padding: float = 0.3,
+        upscale: float = 2.0,
+        sharpen: bool = True,
+        ocr_options: Optional[Dict[str, Any]] = None,
+        budget=None
+    ) -> List[str]:
+        """
+        重新辨識低分欄位（只 OCR 候選 bbox 附近的小區域）
+        
+        對 total_score < threshold 的欄位，裁切其 bbox（外加 padding）、
+        放大／銳化後重新辨識，分數較高時取代原結果並標記 'refined': True。
+        
+        Args:
+            image: 原影像（bbox 需為此影像座標）
+            fields: extract_fields() 的結果（就地更新）
+            template: 範本定義
+            threshold: 低於此 total_score 的欄位才重新辨識
+            padding: bbox 四周外擴比例（以 bbox 高度為基準）
+            upscale: 裁切區域放大倍率
+            sharpen: 是否銳化
+            ocr_options: 傳給 ocr_adapter.recognize() 的額外參數
+            budget: TimeBudget；用完後停止重新辨識（未處理的低分欄位記錄於 unrefined_fields）
+            
+        Returns:
+            被取代的欄位名稱列表
+        """
+        img_h, img_w = image.shape[:2]
+        regions = template.get('regions', {})
+        refined = []
+        self.unrefined_fields = []
+        
+        for field_name, value in fields.items():
+            if value is None or value['total_score'] >= threshold:
+                continue
+            if field_name not in regions:
+                continue
+            if budget is not None and budget.expired():
+                self.unrefined_fields.append(field_name)
+                continue
+            
+            x, y, w, h = bbox_to_rect(value['bbox'])
+            pad = max(1, int(round(h * padding)))
+            x1, y1 = max(0, int(x) - pad), max(0, int(y) - pad)
+            x2 = min(img_w, int(math.ceil(x + w)) + pad)
+            y2 = min(img_h, int(math.ceil(y + h)) + pad)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            
+            results = self.recognize_region(
+                image,
+                {'x': x1, 'y': y1, 'width': x2 - x1, 'height': y2 - y1},
+                upscale=upscale,
+                sharpen=sharpen,
+                ocr_options=ocr_options
+            )
+            candidate = self._extract_with_fallback(
+                results, regions[field_name], (img_w, img_h)
+            )
+            if candidate is not None and candidate['total_score'] > value['total_score']:
+                candidate['refined'] = True
+                fields[field_name] = candidate
+                refined.append(field_name)
+        
+        return refined
+    
+    def get_ocr_results(self, image, **ocr_options) -> List:
+        """
+        執行 OCR（帶快取，同一張影像可供多個範本共用）
+        
+        Args:
+            image: 影像陣列
+            **ocr_options: 傳給 ocr_adapter.recognize() 的額外參數
         
         Returns:
             [(bbox, (text, confidence)), ...]
         """
         if self._ocr_cache is None:
-            self._ocr_cache = self.ocr_adapter.recognize(image)
+            if ocr_options:
+                self._ocr_cache = self.ocr_adapter.recognize(image, **ocr_options)
+            else:
+                self._ocr_cache = self.ocr_adapter.recognize(image)
         return self._ocr_cache
     
     def _extract_with_fallback(
         self,
         ocr_results: List,
         field_config: Dict,
-        image_size: Tuple[int, int]
+        image_size: Tuple[int, int],
+        max_layer: int = 3
     ) -> Optional[Dict]:
         """
         三層降級策略提取
@@ -120,6 +389,7 @@ class HybridExtractor:
             ocr_results: OCR 結果列表
             field_config: 欄位配置
             image_size: (width, height)
+            max_layer: 最多使用到第幾層
             
         Returns:
             {'text': ..., 'confidence': ..., 'bbox': ..., ...} 或 None
@@ -137,6 +407,9 @@ class HybridExtractor:
         if candidates:
             return self._select_best_match(candidates, field_config)
         
+        if max_layer < 2:
+            return None
+        
         # Layer 2: 擴大範圍
         candidates = self._find_in_region(
             ocr_results,
@@ -149,7 +422,7 @@ class HybridExtractor:
             return self._select_best_match(candidates, field_config)
         
         # Layer 3: 全圖搜尋（僅必填欄位）
-        if field_config.get('required', False):
+        if max_layer >= 3 and field_config.get('required', False):
             candidates = self._find_in_region(
                 ocr_results,
                 field_config,
@@ -448,6 +721,56 @@ class HybridExtractor:
         
         return max(score, 0.0)
     
+    @property
+    def cached_ocr_results(self) -> Optional[List]:
+        """最近一次全圖 OCR 的結果（clear_cache() 後為 None）"""
+        return self._ocr_cache
+    
     def clear_cache(self):
         """清除 OCR 快取"""
         self._ocr_cache = None
+
+
+def bbox_to_rect(bbox) -> Tuple[float, float, float, float]:
+    """bbox（(x, y, w, h) 或多邊形）轉為外接矩形 (x, y, w, h)"""
+    if isinstance(bbox, np.ndarray):
+        bbox = bbox.tolist()
+    if len(bbox) and isinstance(bbox[0], (list, tuple)):
+        xs = [point[0] for point in bbox]
+        ys = [point[1] for point in bbox]
+        return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+    x, y, w, h = bbox
+    return x, y, w, h
+
+
+def transform_bbox(bbox, scale: float, offset: Tuple[float, float] = (0, 0)):
+    """
+    縮放並平移 bbox（支援 (x, y, w, h) 與多邊形點列表）
+    
+    Args:
+        bbox: (x, y, w, h) 或 [[x1, y1], [x2, y2], ...]
+        scale: 縮放倍率
+        offset: 縮放後加上的 (dx, dy)
+        
+    Returns:
+        與輸入相同結構的 bbox（整數座標維持整數）
+    """
+    if isinstance(bbox, np.ndarray):
+        bbox = bbox.tolist()
+    
+    def convert(value, delta):
+        result = value * scale + delta
+        if isinstance(value, (int, np.integer)):
+            return int(round(result))
+        return result
+    
+    dx, dy = offset
+    if len(bbox) and isinstance(bbox[0], (list, tuple)):
+        # 多邊形：[[x, y], ...]
+        return type(bbox)(
+            type(point)((convert(point[0], dx), convert(point[1], dy)))
+            for point in bbox
+        )
+    
+    x, y, w, h = bbox
+    return type(bbox)((convert(x, dx), convert(y, dy), convert(w, 0), convert(h, 0)))
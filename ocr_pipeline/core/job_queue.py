@@ -0,0 +1,421 @@
+"""
+DirectoryJobQueue - 共用檔案系統上的工作佇列（原子改名租約）
+
+季度重跑需要多台機器一起處理，但不想架設外部訊息佇列。
+本佇列只依賴共用目錄與 os.rename 的原子性：
+  1. 協調者把文件 ID 寫成 pending/ 下的工作檔（先寫暫存檔再改名，不會被讀到一半）
+  2. worker 以改名把工作檔移進 leased/ 取得租約，檔名帶有到期時間；
+     同一工作只有一個 worker 能改名成功。各 worker 從排序後清單中的隨機位置
+     （前 spread 個之內）開始租用，避免所有 worker 同時搶同一個工作
+  3. 完成時先寫入 results/，再把租約檔改名到 done/；租約已被收回時改名失敗
+  4. 任何 worker 都會把到期的租約改名回 pending/，當機的 worker 不會卡住工作
+  5. 工作被租用的次數達到 max_attempts 後移到 failed/
+
+各主機的時鐘需大致同步（誤差遠小於租約時間）。
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..adapters.storage import json_default
+from .orchestrator import ImageInput, Orchestrator
+
+
+_DIRS = ('pending', 'leased', 'done', 'failed', 'results', 'tmp')
+_LEASE_SEPARATOR = '@'
+
+
+class LeaseLostError(Exception):
+    """租約已到期並被收回（其他 worker 可能正在處理同一工作）"""
+    pass
+
+
+@dataclass
+class Job:
+    """已租用的工作"""
+    job_id: str
+    document_id: str
+    attempts: int
+    expires_at: float
+    lease_path: Path
+
+
+class DirectoryJobQueue:
+    """
+    目錄工作佇列（多主機、多行程安全，不需要外部 broker）
+
+    使用方式：
+        queue = DirectoryJobQueue('/mnt/shared/reprocess-q3')
+        queue.enqueue_many(document_ids)          # 協調者
+        job = queue.lease('worker-1', 300)        # worker
+        queue.complete(job, result)
+    """
+
+    def __init__(self, root: Union[str, Path], max_attempts: int = 3, spread: int = 16):
+        """
+        Args:
+            root: 佇列根目錄（不存在時建立）
+            max_attempts: 每個工作最多被租用的次數
+            spread: 每次列出 pending/ 後，從前 spread 個工作中隨機選擇起點
+                （1 表示嚴格依加入順序）
+
+        Raises:
+            ValueError: 無效的 max_attempts 或 spread
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if spread < 1:
+            raise ValueError("spread must be >= 1")
+
+        self.root = Path(root)
+        self.max_attempts = max_attempts
+        self.spread = spread
+        # 待處理檔名快取（反序，pop() 取下一個）：用完時才重新列出目錄；
+        # 其他 worker 搶先取得的工作直接略過
+        self._pending: List[str] = []
+        self._pending_lock = threading.Lock()
+        for name in _DIRS:
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    def enqueue(self, document_id: str) -> str:
+        """
+        加入工作
+
+        Args:
+            document_id: 文件 ID（worker 以此找到影像）
+
+        Returns:
+            工作 ID
+        """
+        # 以時間開頭讓檔名排序約等於加入順序
+        job_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:12]}"
+        record = {'job_id': job_id, 'document_id': str(document_id), 'attempts': 0}
+        self._write_atomic(self._path('pending', job_id), record)
+        return job_id
+
+    def enqueue_many(self, document_ids) -> List[str]:
+        """加入多個工作，回傳工作 ID 列表"""
+        return [self.enqueue(document_id) for document_id in document_ids]
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """
+        租用一個工作（大致依加入順序，見 spread）
+
+        Args:
+            worker_id: worker 識別名稱
+            lease_seconds: 租約秒數，到期前未完成會被收回
+
+        Returns:
+            Job；沒有可租用的工作時回傳 None
+
+        Raises:
+            ValueError: 無效的 lease_seconds
+        """
+        if lease_seconds <= 0:
+            raise ValueError("lease_seconds must be > 0")
+
+        while True:
+            name = self._next_pending()
+            if name is None:
+                return None
+            job_id = name[:-len('.json')]
+            expires_at = time.time() + lease_seconds
+            lease_path = self._lease_path(job_id, expires_at, worker_id)
+            try:
+                os.rename(self.root / 'pending' / name, lease_path)
+            except FileNotFoundError:
+                # 其他 worker 搶先取得：改試快取中的下一個
+                continue
+
+            record = self._read(lease_path)
+            record['attempts'] += 1
+            self._write_atomic(lease_path, record)
+            return Job(job_id, record['document_id'], record['attempts'], expires_at, lease_path)
+
+    def renew(self, job: Job, lease_seconds: float) -> None:
+        """
+        延長租約
+
+        Raises:
+            LeaseLostError: 租約已被收回
+        """
+        expires_at = time.time() + lease_seconds
+        worker_id = self._parse_lease(job.lease_path.name)[2]
+        new_path = self._lease_path(job.job_id, expires_at, worker_id)
+        try:
+            os.rename(job.lease_path, new_path)
+        except FileNotFoundError:
+            raise LeaseLostError(f"Lease lost for job {job.job_id}")
+        job.lease_path = new_path
+        job.expires_at = expires_at
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> None:
+        """
+        提交結果並結束工作
+
+        Raises:
+            LeaseLostError: 租約已被收回（結果仍會寫入，之後的處理者會覆寫）
+        """
+        self._write_atomic(self._path('results', job.job_id), {
+            'job_id': job.job_id,
+            'document_id': job.document_id,
+            'result': result
+        })
+        try:
+            os.rename(job.lease_path, self._path('done', job.job_id))
+        except FileNotFoundError:
+            raise LeaseLostError(f"Lease lost for job {job.job_id}")
+
+    def fail(self, job: Job, error: str) -> bool:
+        """
+        回報工作失敗：未達 max_attempts 時重新排入，否則移到 failed/
+
+        Returns:
+            是否已重新排入
+
+        Raises:
+            LeaseLostError: 租約已被收回
+        """
+        claim = self._claim(job)
+        record = self._read(claim)
+        record['error'] = error
+        retry = record['attempts'] < self.max_attempts
+        self._write_atomic(self._path('pending' if retry else 'failed', job.job_id), record)
+        claim.unlink()
+        if retry:
+            self._invalidate_pending()
+        return retry
+
+    def requeue_expired(self) -> int:
+        """
+        收回到期的租約（超過 max_attempts 的工作移到 failed/）
+
+        Returns:
+            收回的工作數
+        """
+        now = time.time()
+        requeued = 0
+        for name in os.listdir(self.root / 'leased'):
+            try:
+                job_id, expires_at, _ = self._parse_lease(name)
+            except ValueError:
+                continue
+            if expires_at > now:
+                continue
+
+            claim = self.root / 'tmp' / f"{job_id}.{uuid.uuid4().hex}.claim"
+            try:
+                os.rename(self.root / 'leased' / name, claim)
+            except FileNotFoundError:
+                continue
+            record = self._read(claim)
+            record['error'] = 'lease expired'
+            target = 'pending' if record['attempts'] < self.max_attempts else 'failed'
+            self._write_atomic(self._path(target, job_id), record)
+            claim.unlink()
+            requeued += 1
+        if requeued:
+            self._invalidate_pending()
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        """各狀態的工作數：{'pending', 'leased', 'done', 'failed'}"""
+        return {
+            name: sum(1 for entry in os.listdir(self.root / name) if entry.endswith('.json'))
+            for name in ('pending', 'leased', 'done', 'failed')
+        }
+
+    def iter_results(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        讀取已提交的結果
+
+        Yields:
+            (文件 ID, 結果)
+        """
+        for name in sorted(os.listdir(self.root / 'results')):
+            if name.endswith('.json'):
+                record = self._read(self.root / 'results' / name)
+                yield record['document_id'], record['result']
+
+    def _claim(self, job: Job) -> Path:
+        """把租約檔改名到 tmp/ 取得獨佔權，之後才能改寫內容"""
+        claim = self.root / 'tmp' / f"{job.job_id}.{uuid.uuid4().hex}.claim"
+        try:
+            os.rename(job.lease_path, claim)
+        except FileNotFoundError:
+            raise LeaseLostError(f"Lease lost for job {job.job_id}")
+        return claim
+
+    def _next_pending(self) -> Optional[str]:
+        """取出下一個待處理檔名（快取用完時重新列出 pending/）"""
+        with self._pending_lock:
+            if not self._pending:
+                names = sorted(
+                    name for name in os.listdir(self.root / 'pending') if name.endswith('.json')
+                )
+                if len(names) > 1 and self.spread > 1:
+                    offset = random.randrange(min(self.spread, len(names)))
+                    names = names[offset:] + names[:offset]
+                names.reverse()
+                self._pending = names
+            return self._pending.pop() if self._pending else None
+
+    def _invalidate_pending(self) -> None:
+        with self._pending_lock:
+            self._pending = []
+
+    def _path(self, state: str, job_id: str) -> Path:
+        return self.root / state / f"{job_id}.json"
+
+    def _lease_path(self, job_id: str, expires_at: float, worker_id: str) -> Path:
+        worker = worker_id.replace(_LEASE_SEPARATOR, '_').replace(os.sep, '_')
+        name = _LEASE_SEPARATOR.join((job_id, str(int(expires_at * 1000)), worker))
+        return self.root / 'leased' / f"{name}.json"
+
+    @staticmethod
+    def _parse_lease(name: str) -> Tuple[str, float, str]:
+        """租約檔名 -> (工作 ID, 到期時間, worker ID)"""
+        if not name.endswith('.json'):
+            raise ValueError(f"Not a lease file: {name}")
+        job_id, expires_ms, worker_id = name[:-len('.json')].split(_LEASE_SEPARATOR, 2)
+        return job_id, int(expires_ms) / 1000.0, worker_id
+
+    def _write_atomic(self, path: Path, record: Dict[str, Any]) -> None:
+        """先寫入 tmp/ 再改名，讀取端不會看到寫到一半的檔案"""
+        tmp = self.root / 'tmp' / f"{path.name}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, default=json_default)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: Path) -> Dict[str, Any]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+class QueueWorker:
+    """
+    佇列 worker：租用工作 → Orchestrator.process → 提交結果
+
+    可以在任意台主機上啟動任意數量的 worker 行程來擴充處理量。
+    租約秒數需大於單一文件的處理時間（可搭配 budget_ms 限制）。
+    """
+
+    def __init__(
+        self,
+        queue: DirectoryJobQueue,
+        orchestrator: Orchestrator,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 300.0,
+        resolve: Optional[Callable[[str], ImageInput]] = None,
+        budget_ms: Optional[float] = None
+    ):
+        """
+        Args:
+            queue: 工作佇列
+            orchestrator: 已載入範本的 Orchestrator
+            worker_id: worker 識別名稱（預設為 主機名稱-行程 ID）
+            lease_seconds: 租約秒數
+            resolve: 文件 ID -> 影像輸入（預設把文件 ID 當作檔案路徑）
+            budget_ms: 每份文件的時間預算（毫秒）
+        """
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.resolve = resolve
+        self.budget_ms = budget_ms
+
+    def run_once(self) -> Optional[str]:
+        """
+        處理一個工作
+
+        Returns:
+            'completed' / 'failed' / 'lost'（租約被收回）；沒有工作時回傳 None
+        """
+        job = self.queue.lease(self.worker_id, self.lease_seconds)
+        if job is None:
+            return None
+
+        try:
+            image_input = (
+                self.resolve(job.document_id) if self.resolve is not None else job.document_id
+            )
+            result = self.orchestrator.process(
+                image_input, budget_ms=self.budget_ms, document_id=job.document_id
+            )
+        except Exception as e:
+            try:
+                self.queue.fail(job, f"{type(e).__name__}: {e}")
+            except LeaseLostError:
+                return 'lost'
+            return 'failed'
+
+        try:
+            self.queue.complete(job, result)
+        except LeaseLostError:
+            return 'lost'
+        return 'completed'
+
+    def run(
+        self,
+        max_jobs: Optional[int] = None,
+        poll_interval: float = 1.0,
+        idle_timeout: Optional[float] = None,
+        stop_event: Optional[threading.Event] = None,
+        requeue_interval: float = 60.0
+    ) -> Dict[str, int]:
+        """
+        持續處理工作；每隔 requeue_interval 秒及佇列空閒時收回到期的租約
+
+        Args:
+            max_jobs: 最多處理的工作數（None 表示不限）
+            poll_interval: 沒有工作時的等待秒數
+            idle_timeout: 連續沒有工作超過此秒數即結束（None 表示持續等待）
+            stop_event: 設定後停止
+            requeue_interval: 收回到期租約的間隔秒數（佇列很長時，
+                當機 worker 的工作不必等到佇列清空才重新排入）
+
+        Returns:
+            {'completed', 'failed', 'lost'}
+        """
+        summary = {'completed': 0, 'failed': 0, 'lost': 0}
+        idle_since = None
+        last_requeue = time.monotonic()
+
+        while max_jobs is None or sum(summary.values()) < max_jobs:
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            if time.monotonic() - last_requeue >= requeue_interval:
+                self.queue.requeue_expired()
+                last_requeue = time.monotonic()
+
+            outcome = self.run_once()
+            if outcome is not None:
+                summary[outcome] += 1
+                idle_since = None
+                continue
+
+            if self.queue.requeue_expired():
+                continue
+            now = time.monotonic()
+            if idle_since is None:
+                idle_since = now
+            if idle_timeout is not None and now - idle_since >= idle_timeout:
+                break
+            if stop_event is not None:
+                stop_event.wait(poll_interval)
+            else:
+                time.sleep(poll_interval)
+
+        return summary
+
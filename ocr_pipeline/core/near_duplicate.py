@@ -0,0 +1,202 @@
+"""
+NearDuplicateIndex - 以感知雜湊找出重新掃描 / 翻拍的同一份文件
+
+內容雜湊快取（ResultCache）只認得位元組完全相同的送件。重新掃描的同一張發票
+DCT pHash 只差少數位元，本索引以 BK-tree 做 Hamming 距離查詢：
+  1. 每個情境（範本 + 引擎設定 + 設定檔）各一棵樹，不同範本的結果不會互相取用
+  2. 查詢只走訪距離在門檻內可能有結果的子樹，大量文件時仍為次線性
+  3. 超過 max_entries 時淘汰最早加入的四分之一並重建樹
+
+同一範本的不同文件版面相同，pHash 也可能非常接近；因此預設模式為 'verify'，
+由 Orchestrator 以欄位 ROI 重新 OCR 確認必填欄位文字相同後才沿用舊結果。
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from ..utils.image_utils import hamming_distance
+
+
+NEAR_DUPLICATE_MODES = ('verify', 'reuse')
+
+
+class NearMatch(NamedTuple):
+    """近似重複的查詢結果"""
+    distance: int
+    phash: int
+    document_id: Optional[str]
+    result: Dict[str, Any]
+
+
+class BKTree:
+    """
+    Hamming 距離的 BK-tree
+
+    每個節點的子節點依「與該節點的距離」分組；由三角不等式，
+    查詢距離 d、門檻 t 時只需走訪距離在 [d - t, d + t] 的子節點。
+    """
+
+    def __init__(self):
+        # 節點：[雜湊, 值列表, {距離: 子節點}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, phash: int, value: Any) -> None:
+        """加入一筆（相同雜湊的值放在同一節點）"""
+        self._size += 1
+        if self._root is None:
+            self._root = [phash, [value], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(phash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [phash, [value], {}]
+                return
+            node = child
+
+    def search(self, phash: int, max_distance: int) -> List[Tuple[int, int, Any]]:
+        """
+        找出距離不超過 max_distance 的所有值
+
+        Returns:
+            [(距離, 雜湊, 值)]，依距離排序（同距離時先加入者在前）
+        """
+        matches = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(phash, node[0])
+            if distance <= max_distance:
+                matches.extend((distance, node[0], value) for value in node[1])
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in node[2].items() if low <= d <= high)
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class NearDuplicateIndex:
+    """
+    近似重複文件索引（執行緒安全，可由多個 Orchestrator 共用）
+
+    使用方式：
+        index = NearDuplicateIndex(max_distance=8)
+        orchestrator = Orchestrator(ocr, near_duplicates=index)
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 8,
+        mode: str = 'verify',
+        max_entries: int = 100000
+    ):
+        """
+        Args:
+            max_distance: 視為近似重複的最大 Hamming 距離（64 位元雜湊）
+            mode: 'verify'：以欄位 ROI 重新 OCR 確認必填欄位後才沿用；
+                'reuse'：直接沿用（只適合同一範本的文件版面差異很大的情境）
+            max_entries: 最多保留的文件數
+
+        Raises:
+            ValueError: 參數無效
+        """
+        if max_distance < 0:
+            raise ValueError("max_distance must be >= 0")
+        if mode not in NEAR_DUPLICATE_MODES:
+            raise ValueError(
+                f"Unknown near-duplicate mode: {mode}. Available: {list(NEAR_DUPLICATE_MODES)}"
+            )
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_distance = max_distance
+        self.mode = mode
+        self.max_entries = max_entries
+
+        self._trees: Dict[Hashable, BKTree] = {}
+        # 加入順序：序號 -> (情境, 雜湊, document_id, 結果)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._lookups = 0
+        self._matches = 0
+
+    def find(self, phash: int, context: Hashable) -> Optional[NearMatch]:
+        """
+        找出同一情境中最接近的文件
+
+        Args:
+            phash: 感知雜湊
+            context: 情境鍵（範本 + 引擎設定等）
+
+        Returns:
+            NearMatch（結果為副本）；沒有時回傳 None
+        """
+        with self._lock:
+            self._lookups += 1
+            tree = self._trees.get(context)
+            if tree is None:
+                return None
+            matches = tree.search(phash, self.max_distance)
+            if not matches:
+                return None
+            distance, matched_hash, entry_id = matches[0]
+            _, _, document_id, result = self._entries[entry_id]
+            self._matches += 1
+            return NearMatch(distance, matched_hash, document_id, copy.deepcopy(result))
+
+    def add(
+        self,
+        phash: int,
+        context: Hashable,
+        result: Dict[str, Any],
+        document_id: Optional[str] = None
+    ) -> None:
+        """加入一份文件的結果（保留副本）"""
+        stored = copy.deepcopy(result)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (context, phash, document_id, stored)
+            self._trees.setdefault(context, BKTree()).add(phash, entry_id)
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        索引統計
+
+        Returns:
+            {'entries', 'lookups', 'matches'}
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'lookups': self._lookups,
+                'matches': self._matches
+            }
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock:
+            self._trees.clear()
+            self._entries.clear()
+
+    def _evict(self) -> None:
+        """淘汰最早加入的四分之一並重建樹（呼叫端需持有 _lock）"""
+        for _ in range(max(1, len(self._entries) // 4)):
+            self._entries.popitem(last=False)
+        self._trees = {}
+        for entry_id, (context, phash, _, _) in self._entries.items():
+            self._trees.setdefault(context, BKTree()).add(phash, entry_id)
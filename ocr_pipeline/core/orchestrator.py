@@ -2,13 +2,64 @@
 Orchestrator - OCR 流程編排器（混合策略版本）
 """
 
+import copy
 import json
+import threading
+import time
 import numpy as np
-from typing import Dict, Any, Union, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union, Optional
 from pathlib import Path
 
-from ..utils.image_utils import read_image
+from ..adapters.input import (
+    ArchiveImageAdapter,
+    HotFolderWatcher,
+    ImageLoader,
+    MultiPageTiffAdapter,
+    PdfImageAdapter,
+)
+from ..adapters.storage import ResultSink
+from ..utils.image_utils import (
+    BUFFER_TYPES,
+    read_image_from_buffer,
+    read_image_reduced,
+    resize_image,
+    compute_image_hash,
+    compute_perceptual_hash
+)
+from ..template.router import TemplateRouter
 from .extractors import HybridExtractor
+from .extractors.hybrid_extractor import bbox_to_rect, transform_bbox
+from .single_flight import SingleFlight
+from .result_cache import ResultCache, fingerprint
+from .near_duplicate import NearDuplicateIndex
+from .quality import enhance_image, evaluate_quality, validate_quality_gate
+from .quality_profiles import ProfileController, get_profile
+from .budget import TimeBudget
+
+
+# 影像輸入：路徑、已解碼的陣列，或已編碼的影像資料（bytes / memoryview / mmap）
+ImageInput = Union[str, Path, np.ndarray, bytes, bytearray, memoryview]
+
+# 兩段式提取的預設值
+TWO_SPEED_DEFAULTS: Dict[str, Any] = {
+    'scale': 0.5,           # 第一輪 OCR 的縮放比例
+    'min_score': 0.8,       # 必填欄位 total_score 低於此值即升級
+    'escalation': 'roi',    # 'roi'：只重跑欄位 ROI 的原解析度裁切；'full'：原解析度全圖 OCR
+}
+
+# 低分欄位重新辨識的預設值
+REFINE_DEFAULTS: Dict[str, Any] = {
+    'threshold': 0.8,       # total_score 低於此值的欄位才重新辨識
+    'padding': 0.3,         # bbox 外擴比例（以 bbox 高度為基準）
+    'upscale': 2.0,         # 裁切區域放大倍率
+    'sharpen': True,        # 是否銳化
+}
+
+# 欄位結果來源
+SOURCE_LOW_RES = 'low_res'
+SOURCE_ROI_CROP = 'roi_crop'
+SOURCE_FULL_RES = 'full_res'
+SOURCE_REFINED = 'refined'
 
 
 class Orchestrator:
@@ -20,53 +71,1172 @@ class Orchestrator:
     2. 混合提取（全圖 OCR + 位置提示）
     """
     
-    def __init__(self, ocr_adapter):
-        """初始化編排器"""
+    def __init__(
+        self,
+        ocr_adapter,
+        single_flight: Optional[SingleFlight] = None,
+        profile: str = 'full',
+        profile_controller: Optional[ProfileController] = None,
+        two_speed: Optional[Dict[str, Any]] = None,
+        refine: Optional[Dict[str, Any]] = None,
+        early_exit_score: Optional[float] = None,
+        early_exit_skip_optional: bool = False,
+        use_mmap: bool = False,
+        reduced_decode: bool = False,
+        image_loader: Optional[ImageLoader] = None,
+        keep_ocr_lines: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        quality_gate: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化編排器
+        
+        Args:
+            ocr_adapter: OCR 適配器
+            single_flight: 進行中工作合併器；提供時，相同影像內容、範本（ID / 版本 /
+                內容）、引擎設定與設定檔的同時請求只會執行一次 OCR（可由多個
+                Orchestrator 共用）；指定 budget_ms 的請求不合併
+            profile: 品質設定檔（full / fast / minimal）
+            profile_controller: 負載自適應控制器；提供時依負載自動選擇設定檔，
+                並取代 profile 參數（可由多個 Orchestrator 共用）
+            two_speed: 兩段式提取設定（見 TWO_SPEED_DEFAULTS，未指定的鍵使用預設值）；
+                提供時先以低解析度 OCR，只有必填欄位缺漏或分數不足才升級到原解析度，
+                結果另含 'field_sources'
+            refine: 低分欄位重新辨識設定（見 REFINE_DEFAULTS）；提供時在提取後
+                對低分欄位的 bbox 裁切重新 OCR，結果另含 'refined_fields' 與
+                'refine_budget_exhausted'
+            early_exit_score: 提前結束門檻；所有必填欄位的 total_score 都達到此值後，
+                不再執行剩餘的選用工作（重新辨識、其他候選範本、後續頁面），
+                結果另含 'early_exit'
+            early_exit_skip_optional: 達到門檻後是否連非必填欄位都不提取
+            use_mmap: 本機影像檔以記憶體映射讀取後直接解碼（不經過緩衝讀取）
+            reduced_decode: 品質設定檔有 max_side 時，影像檔直接以縮小倍率解碼
+                （JPEG 於 DCT 域縮小），不先完整解碼再縮小；bbox 仍為原圖座標
+            image_loader: 影像檔的載入器（預取 + 解碼快取，可由多個 Orchestrator 共用）；
+                None 時建立預設的 ImageLoader
+            keep_ocr_lines: 結果另含 'ocr_lines'（全圖 OCR 的每一行文字、原圖座標 bbox
+                (x, y, w, h) 與信心度），供全文索引使用
+            result_cache: 結果快取（可由多個 Orchestrator 共用）；提供時 process() 以
+                (影像內容雜湊, 範本 ID / 版本 / 內容, 引擎設定) 為鍵，重複送件直接回傳
+                快取結果，結果另含 'cache_hit'。範本由檔案載入時，檔案變更後自動重新載入，
+                舊的快取結果不再命中
+            near_duplicates: 近似重複索引（可由多個 Orchestrator 共用）；提供時以解碼後影像的
+                感知雜湊找出重新掃描 / 翻拍的文件，依索引的 mode 驗證後沿用先前的結果
+            quality_gate: OCR 前的品質關卡設定（見 core.quality.QUALITY_GATE_DEFAULTS，
+                未指定的鍵使用預設值，傳入 {} 即全部使用預設值）；空白頁不做 OCR，
+                模糊 / 低對比 / 光照不均的影像增強後以目前的設定檔處理，結果另含 'quality'
+        """
         if ocr_adapter is None:
             raise ValueError("ocr_adapter is required for hybrid extraction")
         
+        get_profile(profile)
+        if two_speed is not None:
+            two_speed = self._validate_two_speed(two_speed)
+        if refine is not None:
+            refine = self._validate_refine(refine)
+        if quality_gate is not None:
+            quality_gate = validate_quality_gate(quality_gate)
+        if early_exit_skip_optional and early_exit_score is None:
+            raise ValueError("early_exit_skip_optional requires early_exit_score")
+        
         self.ocr_adapter = ocr_adapter
         self.extractor = HybridExtractor(ocr_adapter)
         self.template: Optional[Dict] = None
+        self.single_flight = single_flight
+        self.profile = profile
+        self.profile_controller = profile_controller
+        self.two_speed = two_speed
+        self.refine = refine
+        self.early_exit_score = early_exit_score
+        self.early_exit_skip_optional = early_exit_skip_optional
+        self.use_mmap = use_mmap
+        self.reduced_decode = reduced_decode
+        self.image_loader = image_loader or ImageLoader(use_mmap=use_mmap)
+        self.keep_ocr_lines = keep_ocr_lines
+        self.result_cache = result_cache
+        self.near_duplicates = near_duplicates
+        self.quality_gate = quality_gate
+        self._options_fingerprint = self._compute_options_fingerprint()
+        # 範本來源檔 (路徑, (mtime_ns, 大小))；由 dict 載入時為 None
+        self._template_file: Optional[Tuple[Path, Tuple[int, int]]] = None
+        self._template_fingerprint: Optional[Tuple[Dict, str]] = None
+        # 提取器帶有 OCR 快取，同一實例的提取需序列化
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def create_pool(
+        cls,
+        ocr_adapter,
+        size: Optional[int] = None,
+        **kwargs
+    ) -> List["Orchestrator"]:
+        """
+        建立一組獨立的編排器（每個工作槽位一個）
+        
+        Args:
+            ocr_adapter: OCR 適配器，或每個槽位各一的適配器列表。
+                傳入單一適配器且 size > 1 時，該適配器必須是執行緒安全的
+            size: 槽位數（預設為適配器數量；單一適配器時為 1）
+            **kwargs: 傳給每個 Orchestrator 的其他參數
+            
+        Returns:
+            Orchestrator 列表
+            
+        Raises:
+            ValueError: 參數無效
+        """
+        if ocr_adapter is None:
+            raise ValueError("ocr_adapter is required for hybrid extraction")
+        
+        if isinstance(ocr_adapter, (list, tuple)):
+            adapters = list(ocr_adapter)
+            if not adapters:
+                raise ValueError("ocr_adapter list must not be empty")
+            if size is None:
+                size = len(adapters)
+            if size > len(adapters):
+                raise ValueError("pool size cannot exceed the number of adapters")
+            adapters = adapters[:size]
+        else:
+            size = 1 if size is None else size
+            adapters = [ocr_adapter] * size
+        
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        
+        # 所有槽位共用同一個影像載入器（快取與預取執行緒池）
+        if kwargs.get('image_loader') is None:
+            kwargs['image_loader'] = ImageLoader(use_mmap=kwargs.get('use_mmap', False))
+        
+        return [cls(adapter, **kwargs) for adapter in adapters]
     
     def load_template(self, template_input: Union[str, Path, Dict[str, Any]]) -> None:
         """
         載入範本
         
         Args:
-            template_input: 範本 dict 或 JSON 檔案路徑
+            template_input: 範本 dict 或 JSON 檔案路徑（檔案變更後，下一次處理時自動重新載入）
         """
         if isinstance(template_input, dict):
             self.template = template_input
+            self._template_file = None
         else:
+            path = Path(template_input)
+            stat = path.stat()
             # 直接使用 json.load
-            with open(template_input, 'r', encoding='utf-8') as f:
+            with open(path, 'r', encoding='utf-8') as f:
                 self.template = json.load(f)
+            self._template_file = (path, (stat.st_mtime_ns, stat.st_size))
     
-    def process(self, image_input: Union[str, Path, np.ndarray]) -> Dict[str, Any]:
-        """處理影像"""
-        if self.template is None:
-            raise ValueError("No template loaded. Call load_template() first.")
+    def process(
+        self,
+        image_input: ImageInput,
+        budget_ms: Optional[float] = None,
+        document_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        處理影像
         
-        # 載入影像
-        if isinstance(image_input, (str, Path)):
-            image_path = Path(image_input)
-            if not image_path.exists():
-                raise FileNotFoundError(f"Image file not found: {image_input}")
-            image = read_image(str(image_input))
+        Args:
+            image_input: 影像路徑、影像陣列或已編碼的影像資料（bytes / memoryview / mmap）
+            budget_ms: 時間預算（毫秒）。各階段與各欄位之間會檢查預算，
+                用完後跳過選用步驟並回傳 'incomplete': True 的部分結果
+            document_id: 文件 ID（例如壓縮檔成員名稱），原樣放進結果
+                
+        Returns:
+            {'template_id', 'fields', 'profile'}；指定 budget_ms 時另含
+            'incomplete'、'skipped_fields'、'elapsed_ms'；啟用 two_speed 時另含
+            'field_sources'（{欄位: 'low_res' / 'roi_crop' / 'full_res' / 'refined' / None}）；
+            啟用 refine 時另含 'refined_fields' 與 'refine_budget_exhausted'（預算用完而有
+            低分欄位未重新辨識，此時 'incomplete' 亦為 True）；設定 early_exit_score 時另含 'early_exit'；
+            指定 document_id 時另含 'document_id'；keep_ocr_lines 時另含 'ocr_lines'；
+            設定 result_cache 時另含 'cache_hit'；設定 near_duplicates 時另含
+            'perceptual_hash' 與 'near_duplicate'（None 或 {'distance', 'document_id',
+            'verified', 'reused'}；沿用的結果中 bbox 為先前那份影像的座標）；
+            設定 quality_gate 時另含 'quality'（{'scores', 'issues', 'action'}）
+        """
+        template = self._current_template()
+        profile = self.current_profile()
+        
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self._result_cache_key(image_input, template, profile, budget_ms)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                cached['cache_hit'] = True
+                if document_id is not None:
+                    cached['document_id'] = document_id
+                return cached
+        
+        budget = TimeBudget(budget_ms) if budget_ms is not None else None
+        image, input_scale = self._load_image_for_profile(image_input, profile)
+        start = time.perf_counter()
+        
+        result = None
+        quality = None
+        original = image
+        if self.quality_gate is not None:
+            image, quality = self._apply_quality_gate(image)
+            if quality['action'] == 'skip':
+                result = self._empty_result(template, profile, budget)
+        
+        phash = None
+        near_duplicate = None
+        if self.near_duplicates is not None and result is None:
+            # 以增強前的影像計算，同一文件不論是否增強都得到相同雜湊
+            phash = compute_perceptual_hash(original)
+            context = ResultCache.make_key(self._result_context(template, profile, budget_ms))
+            match = self.near_duplicates.find(phash, context)
+            if match is not None:
+                verified = None
+                if self.near_duplicates.mode == 'verify':
+                    verified = self._verify_near_duplicate(image, template, profile, match.result)
+                near_duplicate = {
+                    'distance': match.distance,
+                    'document_id': match.document_id,
+                    'verified': verified,
+                    'reused': verified is not False
+                }
+                if near_duplicate['reused']:
+                    result = match.result
+        
+        if result is not None:
+            # 空白頁，或已沿用近似重複文件的結果
+            pass
+        elif self.single_flight is None or budget is not None:
+            # 有預算的請求不合併：領頭者的部分結果不能交給沒有（或不同）預算的呼叫者
+            result = self._run(image, template, profile, budget, input_scale)
         else:
-            image = image_input
+            # 範本版本 / 內容、引擎設定與設定檔都相同才合併
+            # （single_flight 可由設定不同的多個 Orchestrator 共用）
+            key = (compute_image_hash(image), input_scale) \
+                + self._result_context(template, profile, None)
+            result, shared = self.single_flight.do(
+                key, lambda: self._run(image, template, profile, budget, input_scale)
+            )
+            # 每個等待者各自深複製一份，與領頭者及其他等待者互不影響
+            if shared:
+                result = copy.deepcopy(result)
+        
+        if self.profile_controller is not None:
+            self.profile_controller.observe_latency((time.perf_counter() - start) * 1000.0)
+        
+        if quality is not None:
+            result = dict(result)
+            result['quality'] = quality
+        
+        if self.near_duplicates is not None:
+            result = dict(result)
+            result['perceptual_hash'] = f"{phash:016x}" if phash is not None else None
+            result['near_duplicate'] = near_duplicate
+            if phash is not None and not (near_duplicate and near_duplicate['reused']) \
+                    and not result.get('incomplete'):
+                self.near_duplicates.add(phash, context, result, document_id)
+        
+        if cache_key is not None:
+            # 部分結果（預算用完）不快取，下次送件仍會完整處理
+            if not result.get('incomplete'):
+                self.result_cache.put(cache_key, result)
+            result = dict(result)
+            result['cache_hit'] = False
+        
+        if document_id is not None:
+            # 淺複製：single-flight 的結果可能正被其他呼叫者複製
+            result = dict(result)
+            result['document_id'] = document_id
+        
+        return result
+    
+    def process_stream(
+        self,
+        documents: Iterable[Tuple[str, ImageInput]],
+        budget_ms: Optional[float] = None,
+        sink: Optional[ResultSink] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐一處理 (文件 ID, 影像) 串流（產生器）
+        
+        來源為產生器時每次只取用一份文件，呼叫端停止迭代後不再讀取後續文件。
+        
+        Args:
+            documents: (文件 ID, 影像路徑 / 陣列 / 已編碼的影像資料) 的可迭代物件
+            budget_ms: 每份文件的時間預算（毫秒）
+            sink: 結果儲存；每份結果交出前先寫入，串流結束時 flush（不會關閉）
+            
+        Yields:
+            與 process() 相同結構的結果，另含 'document_id'
+        """
+        try:
+            for document_id, image_input in documents:
+                result = self.process(image_input, budget_ms=budget_ms, document_id=document_id)
+                if sink is not None:
+                    sink.write(result)
+                yield result
+        finally:
+            if sink is not None:
+                sink.flush()
+    
+    def process_archive(
+        self,
+        file_path: Union[str, Path],
+        budget_ms: Optional[float] = None,
+        include: Optional[List[str]] = None,
+        sink: Optional[ResultSink] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐一處理 ZIP / tar 壓縮檔中的影像（產生器，不解壓到磁碟）
+        
+        成員以串流方式讀取並在記憶體中解碼，成員名稱作為 'document_id'；
+        ZIP 中未壓縮的成員直接引用檔案映射，不複製資料。
+        
+        Args:
+            file_path: 壓縮檔路徑
+            budget_ms: 每份文件的時間預算（毫秒）
+            include: 成員名稱的萬用字元模式（None 時依副檔名只取影像檔）
+            sink: 結果儲存（同 process_stream()）
+            
+        Yields:
+            與 process() 相同結構的結果，另含 'document_id'
+            
+        Raises:
+            FileNotFoundError: 壓縮檔不存在
+            ValueError: 不支援的壓縮檔格式或成員無法解碼
+        """
+        with ArchiveImageAdapter(file_path, include=include) as archive:
+            yield from self.process_stream(
+                archive.iter_members(), budget_ms=budget_ms, sink=sink
+            )
+    
+    def watch(
+        self,
+        watcher: HotFolderWatcher,
+        poll_interval: float = 1.0,
+        budget_ms: Optional[float] = None,
+        max_polls: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        熱資料夾模式：持續輪詢監看器，處理新增或變更且已穩定的檔案（產生器）
+        
+        處理成功的檔案以 mark_done() 記錄在監看器的索引中，重新啟動後不會再處理；
+        失敗的檔案以 mark_failed() 記錄錯誤訊息，不會產生結果。
+        
+        Args:
+            watcher: 熱資料夾監看器
+            poll_interval: 沒有待處理檔案時，兩次輪詢之間的等待秒數
+            budget_ms: 每份文件的時間預算（毫秒）
+            max_polls: 最多輪詢次數（None 表示持續監看）
+            stop_event: 設定後停止監看
+            
+        Yields:
+            與 process() 相同結構的結果，'document_id' 為檔案路徑
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            if stop_event is not None and stop_event.is_set():
+                return
+            polls += 1
+            
+            paths = watcher.poll()
+            for path in paths:
+                try:
+                    result = self.process(path, budget_ms=budget_ms, document_id=str(path))
+                except Exception as e:
+                    watcher.mark_failed(path, str(e))
+                    continue
+                watcher.mark_done(path)
+                yield result
+            
+            if not paths and (max_polls is None or polls < max_polls):
+                if stop_event is not None:
+                    stop_event.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+    
+    def process_many(
+        self,
+        image_inputs: Iterable[ImageInput],
+        prefetch: int = 4,
+        budget_ms: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        依序處理多張影像；處理目前影像時，影像載入器在背景預先解碼接下來的檔案
+        
+        Args:
+            image_inputs: 影像路徑、影像陣列或已編碼的影像資料
+            prefetch: 預取的檔案數（0 表示不預取）
+            budget_ms: 每張影像的時間預算（毫秒）
+            
+        Returns:
+            與輸入順序相同的結果列表
+        """
+        inputs = list(image_inputs)
+        results = []
+        for index, image_input in enumerate(inputs):
+            if prefetch > 0:
+                upcoming = inputs[index + 1:index + 1 + prefetch]
+                self.image_loader.prefetch(
+                    item for item in upcoming if self._needs_full_decode(item, budget_ms)
+                )
+            results.append(self.process(image_input, budget_ms=budget_ms))
+        return results
+    
+    def _needs_full_decode(self, image_input: ImageInput, budget_ms: Optional[float]) -> bool:
+        """
+        process() 是否會經由影像載入器完整解碼此檔案
+        
+        縮小解碼或結果快取命中時不會，預取只會留下用不到的完整解碼影像。
+        """
+        if not isinstance(image_input, (str, Path)):
+            return False
+        profile = self.current_profile()
+        if self._reduced_side(image_input, profile):
+            return False
+        if self.result_cache is not None:
+            try:
+                key = self._result_cache_key(
+                    image_input, self._current_template(), profile, budget_ms
+                )
+            except FileNotFoundError:
+                return False
+            if self.result_cache.contains(key):
+                return False
+        return True
+    
+    def current_profile(self) -> str:
+        """目前使用的品質設定檔名稱"""
+        if self.profile_controller is not None:
+            return self.profile_controller.current
+        return self.profile
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        取得執行統計
+        
+        Returns:
+            {'single_flight', 'profile', 'result_cache', 'near_duplicates'}（僅包含已啟用的元件）
+        """
+        metrics: Dict[str, Any] = {}
+        if self.single_flight is not None:
+            metrics['single_flight'] = self.single_flight.stats()
+        if self.result_cache is not None:
+            metrics['result_cache'] = self.result_cache.stats()
+        if self.near_duplicates is not None:
+            metrics['near_duplicates'] = self.near_duplicates.stats()
+        if self.profile_controller is not None:
+            metrics['profile'] = self.profile_controller.stats()
+        return metrics
+    
+    def process_pages(
+        self,
+        pages: Iterable[ImageInput],
+        budget_ms: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        處理多頁文件（逐頁提取並合併）
+        
+        頁面依序取用；每頁提取後與前面的結果合併（同一欄位保留分數較高者），
+        範本有必填欄位且其 total_score 都達到 early_exit_score（未設定時為「已找到」）
+        即停止，不再取用後續頁面；沒有必填欄位時處理所有頁面。
+        頁面來源為產生器時會在停止後關閉，讓尚未解碼的頁面不會被讀取。
+        
+        Args:
+            pages: 頁面影像（路徑、陣列或已編碼的影像資料）的可迭代物件
+            budget_ms: 整份文件的時間預算（毫秒）
+            
+        Returns:
+            與 process() 相同結構，另含 'field_pages'（{欄位: 頁碼（0 起算）或 None}）、
+            'pages_processed' 與 'early_exit'；keep_ocr_lines 時 'ocr_lines' 的每一行另含 'page'；
+            設定 quality_gate 時另含 'page_quality'（每頁一筆，空白頁不做 OCR）
+        """
+        template = self._current_template()
+        budget = TimeBudget(budget_ms) if budget_ms is not None else None
+        profile = self.current_profile()
+        regions = template.get('regions', {})
+        min_score = self.early_exit_score if self.early_exit_score is not None else 0.0
+        # 沒有必填欄位時無法判斷是否已找齊：不提前停止
+        has_required = any(config.get('required', False) for config in regions.values())
+        
+        fields: Dict[str, Optional[Dict]] = {name: None for name in regions}
+        field_pages: Dict[str, Optional[int]] = {name: None for name in regions}
+        skipped: List[str] = []
+        pages_processed = 0
+        early_exit = False
+        ocr_lines: List[Dict[str, Any]] = []
+        page_quality: List[Dict[str, Any]] = []
+        
+        iterator = iter(pages)
+        try:
+            for index, page in enumerate(iterator):
+                # 只保留最後處理那一頁的跳過欄位（空白頁沒有跳過任何欄位）
+                skipped = []
+                image = self._load_image(page)
+                pages_processed += 1
+                if self.quality_gate is not None:
+                    image, quality = self._apply_quality_gate(image)
+                    page_quality.append(quality)
+                    if quality['action'] == 'skip':
+                        continue
+                page_result = self._run(image, template, profile, budget)
+                
+                for name, candidate in page_result['fields'].items():
+                    if self._merge_field(fields, name, candidate):
+                        field_pages[name] = index
+                skipped = page_result.get('skipped_fields', [])
+                for line in page_result.get('ocr_lines', []):
+                    line['page'] = index
+                    ocr_lines.append(line)
+                
+                if has_required and self.extractor.required_satisfied(fields, template, min_score):
+                    early_exit = True
+                    break
+                if budget is not None and budget.expired():
+                    # 還有頁面未處理：尚未找到的欄位皆視為跳過
+                    skipped = [name for name, value in fields.items() if value is None]
+                    break
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+        
+        skipped = [name for name in skipped if fields.get(name) is None]
+        result = self._build_result(template, fields, profile, budget, skipped)
+        result['field_pages'] = field_pages
+        result['pages_processed'] = pages_processed
+        result['early_exit'] = early_exit
+        if self.keep_ocr_lines:
+            result['ocr_lines'] = ocr_lines
+        if self.quality_gate is not None:
+            result['page_quality'] = page_quality
+        return result
+    
+    def process_document(
+        self,
+        file_path: Union[str, Path],
+        budget_ms: Optional[float] = None,
+        pdf_renderer=None
+    ) -> Dict[str, Any]:
+        """
+        處理文件檔案（多頁 TIFF / 掃描 PDF 逐頁解碼）
         
-        # 混合提取（全圖 OCR + 位置提示）
-        fields = self.extractor.extract_fields(image, self.template)
+        .pdf 以 PdfImageAdapter 直接解碼頁面影像，其餘格式以 MultiPageTiffAdapter
+        逐頁解碼；頁面交給 process_pages()，必填欄位找到後即停止解碼後續頁面，
+        記憶體只保留一頁影像。
+        
+        Args:
+            file_path: 文件路徑（PDF、TIFF 或單頁影像）
+            budget_ms: 整份文件的時間預算（毫秒）
+            pdf_renderer: PDF 頁面無法直接解碼時使用的渲染器：(路徑, 頁碼) -> 影像陣列
+            
+        Returns:
+            與 process_pages() 相同結構，另含 'page_count'
+            
+        Raises:
+            UnsupportedPageError: PDF 頁面無法直接解碼且未提供渲染器
+        """
+        if Path(file_path).suffix.lower() == '.pdf':
+            with PdfImageAdapter(file_path, renderer=pdf_renderer) as document:
+                result = self.process_pages(document.iter_pages(), budget_ms=budget_ms)
+                result['page_count'] = len(document)
+            return result
+        
+        document = MultiPageTiffAdapter(file_path)
+        result = self.process_pages(document.iter_pages(), budget_ms=budget_ms)
+        result['page_count'] = len(document)
+        return result
+    
+    def process_routed(
+        self,
+        image_input: ImageInput,
+        router: TemplateRouter,
+        max_candidates: int = 3
+    ) -> Dict[str, Any]:
+        """
+        自動選擇範本並處理影像
+        
+        只執行一次全圖 OCR：先以 TemplateRouter 挑出少量候選範本，
+        再對候選範本逐一提取（共用 OCR 快取），選出必填欄位命中最多、
+        總分最高的結果。設定 early_exit_score 時，候選範本的必填欄位
+        都達到門檻即停止嘗試其餘候選。
+        
+        Args:
+            image_input: 影像路徑、影像陣列或已編碼的影像資料
+            router: 已建立索引的範本路由器
+            max_candidates: 進入完整提取的候選範本數上限
+            
+        Returns:
+            與 process() 相同結構，另含 'routing' 候選資訊
+            
+        Raises:
+            ValueError: 沒有任何候選範本
+        """
+        image = self._load_image(image_input)
+        img_h, img_w = image.shape[:2]
+        
+        with self._lock:
+            return self._process_routed(image, (img_w, img_h), router, max_candidates)
+    
+    def _process_routed(
+        self,
+        image: np.ndarray,
+        image_size: tuple,
+        router: TemplateRouter,
+        max_candidates: int
+    ) -> Dict[str, Any]:
+        """process_routed 主體（呼叫端需持有 _lock）"""
+        try:
+            ocr_results = self.extractor.get_ocr_results(image)
+            candidates = router.route(
+                ocr_results,
+                image_size=image_size,
+                max_candidates=max_candidates
+            )
+            if not candidates:
+                raise ValueError("No candidate template matched the image")
+            
+            best = None
+            best_rank = None
+            for candidate in candidates:
+                template = router.get_template(candidate['template_id'])
+                fields = self.extractor.extract_fields(
+                    image, template, stop_score=self._stop_score()
+                )
+                rank = self._rank_fields(fields, template)
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = (template, fields), rank
+                if self._early_exit(fields, template):
+                    # 已有足夠好的範本，不再嘗試其他候選
+                    break
+        finally:
+            self.extractor.clear_cache()
+        
+        template, fields = best
+        result = {
+            'template_id': template.get('template_id', 'unknown'),
+            'fields': fields,
+            'routing': candidates
+        }
+        if self.keep_ocr_lines:
+            result['ocr_lines'] = self._ocr_lines(ocr_results, 1.0)
+        return result
+    
+    def _run(
+        self,
+        image: np.ndarray,
+        template: Dict,
+        profile_name: str,
+        budget: Optional[TimeBudget] = None,
+        input_scale: float = 1.0
+    ) -> Dict[str, Any]:
+        """
+        依品質設定檔執行混合提取（全圖 OCR + 位置提示）
+        
+        input_scale 為 image 相對於原圖的縮放比例（縮小解碼時 < 1），
+        回傳的 bbox 一律換算回原圖座標。
+        """
+        profile = get_profile(profile_name)
+        
+        # 還沒開始 OCR 預算就用完：不再啟動 OCR，直接回傳空結果
+        if budget is not None and budget.expired():
+            return self._empty_result(
+                template, profile_name, budget, skipped=list(template.get('regions', {}))
+            )
+        
+        work_image, scale = self._downscale(image, profile['max_side'])
+        ocr_options = None
+        if profile['use_angle_cls'] is not None:
+            ocr_options = {'use_angle_cls': profile['use_angle_cls']}
+        
+        sources = None
+        with self._lock:
+            try:
+                if self.two_speed is not None:
+                    fields, skipped, sources, (ocr_results, ocr_scale) = self._extract_two_speed(
+                        work_image, template, profile, ocr_options, budget
+                    )
+                else:
+                    fields = self.extractor.extract_fields(
+                        work_image,
+                        template,
+                        max_fallback_layer=profile['max_fallback_layer'],
+                        required_only=profile['required_only'],
+                        ocr_options=ocr_options,
+                        budget=budget,
+                        stop_score=self._stop_score()
+                    )
+                    skipped = list(self.extractor.skipped_fields)
+                    ocr_results, ocr_scale = self.extractor.cached_ocr_results, 1.0
+            finally:
+                self.extractor.clear_cache()
+            
+            if scale != 1.0:
+                # bbox 換算回原圖座標
+                for value in fields.values():
+                    if value is not None:
+                        value['bbox'] = transform_bbox(value['bbox'], 1.0 / scale)
+            
+            early_exit = self._early_exit(fields, template)
+            refined = None
+            unrefined: List[str] = []
+            if self.refine is not None and not early_exit:
+                # 以原圖重新辨識，不受設定檔縮圖影響
+                refined = self.extractor.refine_fields(
+                    image, fields, template,
+                    ocr_options=ocr_options,
+                    budget=budget,
+                    **self.refine
+                )
+                unrefined = list(self.extractor.unrefined_fields)
+        
+        if input_scale != 1.0:
+            for value in fields.values():
+                if value is not None:
+                    value['bbox'] = transform_bbox(value['bbox'], 1.0 / input_scale)
+        
+        result = self._build_result(template, fields, profile_name, budget, skipped)
+        if sources is not None:
+            for name in refined or []:
+                sources[name] = SOURCE_REFINED
+            result['field_sources'] = sources
+        if self.refine is not None:
+            result['refined_fields'] = refined or []
+            # 預算用完而未重新辨識的低分欄位：與「重新辨識後仍低分」區分，結果不算完整
+            result['refine_budget_exhausted'] = bool(unrefined)
+            if unrefined:
+                result['incomplete'] = True
+        if self.early_exit_score is not None:
+            result['early_exit'] = early_exit
+        if self.keep_ocr_lines:
+            result['ocr_lines'] = self._ocr_lines(ocr_results, ocr_scale * scale * input_scale)
+        return result
+    
+    def _extract_two_speed(
+        self,
+        image: np.ndarray,
+        template: Dict,
+        profile: Dict[str, Any],
+        ocr_options: Optional[Dict[str, Any]],
+        budget: Optional[TimeBudget]
+    ) -> tuple:
+        """
+        兩段式提取（呼叫端需持有 _lock）
+        
+        1. 縮小影像做全圖 OCR 與提取
+        2. 必填欄位缺漏或 total_score < min_score 時升級：
+           - 'roi'：對欄位擴展 ROI 裁切原解析度影像重新 OCR，仍不足者再做原解析度全圖 OCR
+           - 'full'：直接做原解析度全圖 OCR
+        3. 同一欄位保留分數較高的結果
+        
+        Returns:
+            (fields, skipped, sources, (最後一次全圖 OCR 結果, 其影像相對於 image 的比例))；
+            bbox 皆為 image 座標
+        """
+        config = self.two_speed
+        img_h, img_w = image.shape[:2]
+        image_size = (img_w, img_h)
+        max_layer = profile['max_fallback_layer']
+        
+        low_image = resize_image(
+            image,
+            width=max(1, int(round(img_w * config['scale']))),
+            height=max(1, int(round(img_h * config['scale'])))
+        )
+        low_scale = low_image.shape[1] / img_w
+        
+        fields = self.extractor.extract_fields(
+            low_image,
+            template,
+            max_fallback_layer=max_layer,
+            required_only=profile['required_only'],
+            ocr_options=ocr_options,
+            budget=budget,
+            stop_score=self._stop_score()
+        )
+        skipped = list(self.extractor.skipped_fields)
+        ocr_lines = (self.extractor.cached_ocr_results, low_scale)
         self.extractor.clear_cache()
         
-        return {
-            'template_id': self.template.get('template_id', 'unknown'),
-            'fields': fields
+        sources: Dict[str, Optional[str]] = {}
+        for name, value in fields.items():
+            if value is not None:
+                value['bbox'] = transform_bbox(value['bbox'], 1.0 / low_scale)
+            sources[name] = SOURCE_LOW_RES if value is not None else None
+        
+        regions = template.get('regions', {})
+        pending = [
+            name for name, field_config in regions.items()
+            if field_config.get('required', False)
+            and not self._is_confident(fields.get(name), config['min_score'])
+        ]
+        
+        if config['escalation'] == 'roi':
+            remaining = []
+            for name in pending:
+                if budget is not None and budget.expired():
+                    remaining.append(name)
+                    continue
+                region = self.extractor.get_field_region(regions[name], image_size)
+                if region is None:
+                    remaining.append(name)
+                    continue
+                crop_results = self.extractor.recognize_region(
+                    image, region, ocr_options=ocr_options
+                )
+                candidate = self.extractor.extract_field(
+                    crop_results, regions[name], image_size, max_layer
+                )
+                if self._merge_field(fields, name, candidate):
+                    sources[name] = SOURCE_ROI_CROP
+                if not self._is_confident(fields[name], config['min_score']):
+                    remaining.append(name)
+            pending = remaining
+        
+        if pending:
+            if budget is not None and budget.expired():
+                skipped.extend(name for name in pending if name not in skipped)
+            else:
+                ocr_results = self.extractor.get_ocr_results(image, **(ocr_options or {}))
+                ocr_lines = (ocr_results, 1.0)
+                for name in pending:
+                    candidate = self.extractor.extract_field(
+                        ocr_results, regions[name], image_size, max_layer
+                    )
+                    if self._merge_field(fields, name, candidate):
+                        sources[name] = SOURCE_FULL_RES
+        
+        return fields, skipped, sources, ocr_lines
+    
+    def _stop_score(self) -> Optional[float]:
+        """傳給提取器的提前結束門檻（僅在要求略過非必填欄位時）"""
+        return self.early_exit_score if self.early_exit_skip_optional else None
+    
+    def _early_exit(self, fields: Dict[str, Optional[Dict]], template: Dict) -> bool:
+        """必填欄位是否都已達 early_exit_score"""
+        if self.early_exit_score is None:
+            return False
+        return self.extractor.required_satisfied(fields, template, self.early_exit_score)
+    
+    @staticmethod
+    def _is_confident(value: Optional[Dict], min_score: float) -> bool:
+        return value is not None and value['total_score'] >= min_score
+    
+    @staticmethod
+    def _merge_field(
+        fields: Dict[str, Optional[Dict]],
+        name: str,
+        candidate: Optional[Dict]
+    ) -> bool:
+        """候選結果分數較高時取代現有結果，回傳是否取代"""
+        if candidate is None:
+            return False
+        current = fields.get(name)
+        if current is not None and current['total_score'] >= candidate['total_score']:
+            return False
+        fields[name] = candidate
+        return True
+    
+    @staticmethod
+    def _validate_refine(refine: Dict[str, Any]) -> Dict[str, Any]:
+        """合併預設值並檢查重新辨識設定"""
+        unknown = set(refine) - set(REFINE_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown refine option(s): {', '.join(sorted(unknown))}")
+        
+        config = dict(REFINE_DEFAULTS, **refine)
+        if config['upscale'] <= 0:
+            raise ValueError("refine upscale must be > 0")
+        if config['padding'] < 0:
+            raise ValueError("refine padding must be >= 0")
+        return config
+    
+    @staticmethod
+    def _validate_two_speed(two_speed: Dict[str, Any]) -> Dict[str, Any]:
+        """合併預設值並檢查兩段式提取設定"""
+        unknown = set(two_speed) - set(TWO_SPEED_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown two_speed option(s): {', '.join(sorted(unknown))}")
+        
+        config = dict(TWO_SPEED_DEFAULTS, **two_speed)
+        if not 0 < config['scale'] < 1:
+            raise ValueError("two_speed scale must be between 0 and 1")
+        if config['escalation'] not in ('roi', 'full'):
+            raise ValueError("two_speed escalation must be 'roi' or 'full'")
+        return config
+    
+    @staticmethod
+    def _ocr_lines(ocr_results: Optional[List], scale: float) -> List[Dict[str, Any]]:
+        """
+        OCR 結果轉為 [{'text', 'bbox', 'confidence'}]
+        
+        scale 為 OCR 影像相對於原圖的比例；bbox 換算回原圖座標的外接矩形 (x, y, w, h)。
+        """
+        lines = []
+        for bbox, (text, confidence) in ocr_results or []:
+            x, y, w, h = bbox_to_rect(transform_bbox(bbox, 1.0 / scale))
+            lines.append({
+                'text': text,
+                'bbox': [int(round(x)), int(round(y)), int(round(w)), int(round(h))],
+                'confidence': float(confidence)
+            })
+        return lines
+    
+    @staticmethod
+    def _build_result(
+        template: Dict,
+        fields: Dict[str, Optional[Dict]],
+        profile_name: str,
+        budget: Optional[TimeBudget] = None,
+        skipped: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """組合 process() 回傳結構"""
+        result = {
+            'template_id': template.get('template_id', 'unknown'),
+            'fields': fields,
+            'profile': profile_name
         }
+        if budget is not None:
+            result['incomplete'] = bool(skipped)
+            result['skipped_fields'] = skipped or []
+            result['elapsed_ms'] = budget.elapsed_ms()
+        return result
+    
+    def _empty_result(
+        self,
+        template: Dict,
+        profile_name: str,
+        budget: Optional[TimeBudget] = None,
+        skipped: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """沒有執行 OCR 的結果（所有欄位為 None）"""
+        regions = template.get('regions', {})
+        result = self._build_result(
+            template, {name: None for name in regions}, profile_name, budget, skipped
+        )
+        if self.keep_ocr_lines:
+            result['ocr_lines'] = []
+        return result
+    
+    def _apply_quality_gate(self, image: np.ndarray) -> tuple:
+        """
+        OCR 前的品質關卡（不改變設定檔：影像可能已依設定檔縮小解碼）
+        
+        Returns:
+            (要處理的影像, 品質評估)；'enhance' 時為增強後的影像
+        """
+        quality = evaluate_quality(image, self.quality_gate)
+        if quality['action'] == 'enhance':
+            return enhance_image(image, quality['issues']), quality
+        return image, quality
+    
+    @staticmethod
+    def _downscale(image: np.ndarray, max_side: Optional[int]) -> tuple:
+        """
+        長邊超過 max_side 時等比例縮小
+        
+        Returns:
+            (影像, 縮放比例)
+        """
+        if not max_side:
+            return image, 1.0
+        h, w = image.shape[:2]
+        if max(h, w) <= max_side:
+            return image, 1.0
+        scale = max_side / max(h, w)
+        resized = resize_image(image, width=max(1, int(round(w * scale))),
+                               height=max(1, int(round(h * scale))))
+        return resized, resized.shape[1] / w
+    
+    def preload(self, image_input: ImageInput) -> ImageInput:
+        """
+        在 process() 之前先行解碼（例如在引擎工作執行緒之外）
+        
+        影像檔放進影像載入器的快取後仍回傳路徑，process() 的縮小解碼與結果快取鍵
+        不受影響；目前設定檔會縮小解碼時不先完整解碼。已編碼的影像資料解碼為陣列。
+        
+        Args:
+            image_input: 影像路徑、影像陣列或已編碼的影像資料
+            
+        Returns:
+            傳給 process() 的輸入
+            
+        Raises:
+            FileNotFoundError: 影像檔案不存在
+            ValueError: 無法讀取影像
+        """
+        if isinstance(image_input, (str, Path)):
+            if not self._reduced_side(image_input, self.current_profile()):
+                self.image_loader.load(image_input)
+            return image_input
+        return self._load_image(image_input)
+    
+    def _reduced_side(self, image_input: ImageInput, profile_name: str) -> Optional[int]:
+        """影像檔以縮小倍率解碼時的長邊上限；不縮小解碼時為 None"""
+        max_side = get_profile(profile_name)['max_side']
+        if self.reduced_decode and max_side and isinstance(image_input, (str, Path)):
+            return max_side
+        return None
+    
+    def _load_image_for_profile(self, image_input: ImageInput, profile_name: str) -> tuple:
+        """
+        依品質設定檔載入影像（reduced_decode 時影像檔直接縮小解碼）
+        
+        Returns:
+            (影像, 相對原圖的縮放比例)
+        """
+        max_side = self._reduced_side(image_input, profile_name)
+        if max_side:
+            if not Path(image_input).exists():
+                raise FileNotFoundError(f"Image file not found: {image_input}")
+            return read_image_reduced(image_input, max_side, use_mmap=self.use_mmap)
+        return self._load_image(image_input), 1.0
+    
+    def _load_image(self, image_input: ImageInput) -> np.ndarray:
+        """載入影像（路徑、陣列或已編碼的影像資料）"""
+        if isinstance(image_input, (str, Path)):
+            return self.image_loader.load(image_input)
+        if isinstance(image_input, BUFFER_TYPES):
+            return read_image_from_buffer(image_input)
+        return image_input
+    
+    @staticmethod
+    def _rank_fields(fields: Dict[str, Optional[Dict]], template: Dict) -> tuple:
+        """候選範本排序依據：(必填欄位命中數, 總分)"""
+        regions = template.get('regions', {})
+        required_found = sum(
+            1 for name, value in fields.items()
+            if value is not None and regions.get(name, {}).get('required', False)
+        )
+        total = sum(value['total_score'] for value in fields.values() if value is not None)
+        return (required_found, total)
+    
+    def _current_template(self) -> Dict:
+        """
+        取得目前的範本；範本檔的 mtime 或大小改變時重新載入
+        
+        Raises:
+            ValueError: 尚未載入範本
+        """
+        if self.template is None:
+            raise ValueError("No template loaded. Call load_template() first.")
+        if self._template_file is not None:
+            path, signature = self._template_file
+            try:
+                stat = path.stat()
+            except OSError:
+                # 範本檔暫時不存在（例如正在被替換）：沿用已載入的範本
+                return self.template
+            if (stat.st_mtime_ns, stat.st_size) != signature:
+                self.load_template(path)
+        return self.template
+    
+    def _result_cache_key(
+        self,
+        image_input: ImageInput,
+        template: Dict,
+        profile_name: str,
+        budget_ms: Optional[float]
+    ) -> str:
+        """結果快取鍵：影像內容 + 處理情境"""
+        return ResultCache.make_key(
+            (self.result_cache.input_digest(image_input),)
+            + self._result_context(template, profile_name, budget_ms)
+        )
+    
+    def _result_context(
+        self,
+        template: Dict,
+        profile_name: str,
+        budget_ms: Optional[float]
+    ) -> tuple:
+        """影像以外決定結果的因素：範本 ID / 版本 / 內容 + 引擎設定 + 設定檔"""
+        if self._template_fingerprint is None or self._template_fingerprint[0] is not template:
+            self._template_fingerprint = (template, fingerprint(template))
+        return (
+            template.get('template_id', 'unknown'),
+            template.get('version', ''),
+            self._template_fingerprint[1],
+            self._engine_fingerprint(),
+            profile_name,
+            # 有預算時結果另含 incomplete / elapsed_ms 等鍵
+            budget_ms is not None
+        )
+    
+    def _verify_near_duplicate(
+        self,
+        image: np.ndarray,
+        template: Dict,
+        profile_name: str,
+        previous: Dict[str, Any]
+    ) -> bool:
+        """
+        以欄位 ROI 重新 OCR，確認先前結果的必填欄位文字也出現在這張影像的相同位置
+        
+        同一範本的不同文件 pHash 可能非常接近；只 OCR 必填欄位的 ROI，
+        成本遠低於全圖 OCR。沒有可驗證的必填欄位時視為未通過。
+        """
+        profile = get_profile(profile_name)
+        ocr_options = None
+        if profile['use_angle_cls'] is not None:
+            ocr_options = {'use_angle_cls': profile['use_angle_cls']}
+        
+        img_h, img_w = image.shape[:2]
+        fields = previous.get('fields', {})
+        checked = 0
+        with self._lock:
+            for name, config in template.get('regions', {}).items():
+                if not config.get('required', False):
+                    continue
+                value = fields.get(name)
+                region = self.extractor.get_field_region(config, (img_w, img_h))
+                if value is None or region is None:
+                    return False
+                expected = ''.join(str(value.get('text', '')).split())
+                results = self.extractor.recognize_region(image, region, ocr_options=ocr_options)
+                found = ''.join(''.join(text.split()) for _, (text, _) in results)
+                if not expected or expected not in found:
+                    return False
+                checked += 1
+        return checked > 0
+    
+    def _engine_fingerprint(self) -> str:
+        """
+        OCR 引擎目前設定 + 提取選項的指紋（任一設定不同即不共用快取結果）
+        
+        每次查詢時重新計算：適配器的語言、門檻等設定可能在建立後被修改
+        （例如 set_language()）。適配器提供 fingerprint() 時以其回傳的
+        生效設定為準，否則取常見的設定屬性。
+        """
+        adapter = self.ocr_adapter
+        hook = getattr(adapter, 'fingerprint', None)
+        if callable(hook):
+            settings = hook()
+        else:
+            settings = {
+                name: getattr(adapter, name, None)
+                for name in ('config', 'lang', 'min_confidence')
+            }
+        return fingerprint({
+            'adapter': type(adapter).__qualname__,
+            'settings': settings,
+            'options': self._options_fingerprint
+        })
+    
+    def _compute_options_fingerprint(self) -> str:
+        """建立後不再改變的提取選項指紋"""
+        return fingerprint({
+            'two_speed': self.two_speed,
+            'refine': self.refine,
+            'early_exit_score': self.early_exit_score,
+            'early_exit_skip_optional': self.early_exit_skip_optional,
+            'reduced_decode': self.reduced_decode,
+            'keep_ocr_lines': self.keep_ocr_lines,
+            'quality_gate': self.quality_gate
+        })
     
     def reset(self) -> None:
         """重置狀態"""
         self.template = None
+        self._template_file = None
         self.extractor.clear_cache()
+
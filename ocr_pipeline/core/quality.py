@@ -0,0 +1,209 @@
+"""
+Quality - OCR 前的影像品質評估（空白頁、模糊、對比、光照均勻度）
+
+空白分隔頁與嚴重模糊的翻拍照片跑完整 OCR 也得不到結果。本模組在 OCR 前
+以縮小的灰階副本（長邊 max_side，數毫秒內）計算品質分數：
+  1. blank_ratio：與背景亮度（灰階中位數）相差不到 24 的像素比例
+  2. sharpness：Laplacian 變異數（越低越模糊）
+  3. contrast：灰階第 95 與第 5 百分位數的差
+  4. brightness / uniformity：去除文字後的背景亮度平均，與最暗 / 最亮區塊的比值
+每個問題可設定處理方式：'skip'（不做 OCR）、'enhance'（增強後以 full 設定檔處理）
+或 'proceed'（照常處理）；多個問題時取最嚴格者。
+"""
+
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
+
+
+QUALITY_ACTIONS = ('proceed', 'enhance', 'skip')
+
+# 品質關卡的預設值
+QUALITY_GATE_DEFAULTS: Dict[str, Any] = {
+    'max_side': 512,            # 評估用縮圖的長邊
+    'blank_ratio': 0.995,       # 背景像素比例達到此值視為空白頁
+    'min_sharpness': 100.0,     # Laplacian 變異數低於此值視為模糊
+    'min_contrast': 40,         # 灰階範圍（p95 - p5）低於此值視為低對比
+    'min_uniformity': 0.6,      # 背景最暗 / 最亮區塊比低於此值視為光照不均
+    'on_blank': 'skip',
+    'on_blur': 'enhance',
+    'on_low_contrast': 'enhance',
+    'on_uneven': 'enhance',
+}
+
+# 問題 -> 處理方式的設定鍵
+_ISSUE_ACTIONS = {
+    'blank': 'on_blank',
+    'blur': 'on_blur',
+    'low_contrast': 'on_low_contrast',
+    'uneven': 'on_uneven',
+}
+
+# 與背景亮度相差超過此值的像素視為內容
+_CONTENT_DELTA = 24
+# 估計背景時以膨脹去除文字的核大小（縮圖像素）
+_BACKGROUND_KERNEL = np.ones((15, 15), dtype=np.uint8)
+
+
+def validate_quality_gate(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    檢查品質關卡設定並補上預設值
+
+    Args:
+        settings: 部分或完整的設定（見 QUALITY_GATE_DEFAULTS）
+
+    Returns:
+        完整設定
+
+    Raises:
+        ValueError: 未知的設定鍵或無效的值
+    """
+    unknown = set(settings) - set(QUALITY_GATE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown quality_gate keys: {sorted(unknown)}")
+    merged = {**QUALITY_GATE_DEFAULTS, **settings}
+    if merged['max_side'] < 32:
+        raise ValueError("quality_gate max_side must be >= 32")
+    if not 0 < merged['blank_ratio'] <= 1:
+        raise ValueError("quality_gate blank_ratio must be in (0, 1]")
+    for key in _ISSUE_ACTIONS.values():
+        if merged[key] not in QUALITY_ACTIONS:
+            raise ValueError(
+                f"Unknown quality action for {key}: {merged[key]}. "
+                f"Available: {list(QUALITY_ACTIONS)}"
+            )
+    return merged
+
+
+def assess_quality(image: np.ndarray, max_side: int = 512) -> Dict[str, float]:
+    """
+    計算影像品質分數（在長邊 max_side 的灰階縮圖上）
+
+    Args:
+        image: 影像陣列（灰階、BGR 或 BGRA）
+        max_side: 縮圖長邊
+
+    Returns:
+        {'blank_ratio', 'sharpness', 'contrast', 'brightness', 'uniformity'}
+
+    Raises:
+        ValueError: 空影像
+    """
+    gray = _thumbnail(image, max_side)
+
+    cdf = np.cumsum(np.bincount(gray.ravel(), minlength=256)) / gray.size
+    background = int(np.searchsorted(cdf, 0.5))
+    low = background - _CONTENT_DELTA
+    high = min(255, background + _CONTENT_DELTA)
+    blank_ratio = cdf[high] - (cdf[low - 1] if low > 0 else 0.0)
+    contrast = int(np.searchsorted(cdf, 0.95)) - int(np.searchsorted(cdf, 0.05))
+
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+    # 膨脹去除深色文字後，以 4x4 區塊平均估計光照
+    backdrop = cv2.dilate(gray, _BACKGROUND_KERNEL)
+    blocks = cv2.resize(backdrop, (4, 4), interpolation=cv2.INTER_AREA)
+    brightest = float(blocks.max())
+
+    return {
+        'blank_ratio': round(float(blank_ratio), 4),
+        'sharpness': round(sharpness, 2),
+        'contrast': contrast,
+        'brightness': round(float(backdrop.mean()), 2),
+        'uniformity': round(float(blocks.min()) / brightest, 4) if brightest else 0.0,
+    }
+
+
+def evaluate_quality(image: np.ndarray, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    評估影像並決定處理方式
+
+    Args:
+        image: 影像陣列
+        settings: validate_quality_gate() 的結果
+
+    Returns:
+        {'scores': assess_quality() 的結果, 'issues': 問題列表, 'action': 處理方式}
+    """
+    scores = assess_quality(image, settings['max_side'])
+
+    issues: List[str] = []
+    if scores['blank_ratio'] >= settings['blank_ratio']:
+        # 空白頁的模糊與對比分數沒有意義
+        issues.append('blank')
+    else:
+        if scores['sharpness'] < settings['min_sharpness']:
+            issues.append('blur')
+        if scores['contrast'] < settings['min_contrast']:
+            issues.append('low_contrast')
+        if scores['uniformity'] < settings['min_uniformity']:
+            issues.append('uneven')
+
+    action = 'proceed'
+    for issue in issues:
+        candidate = settings[_ISSUE_ACTIONS[issue]]
+        if QUALITY_ACTIONS.index(candidate) > QUALITY_ACTIONS.index(action):
+            action = candidate
+    return {'scores': scores, 'issues': issues, 'action': action}
+
+
+def enhance_image(image: np.ndarray, issues: List[str]) -> np.ndarray:
+    """
+    依品質問題增強影像（回傳新陣列，不修改原影像）
+
+    低對比 / 光照不均：亮度通道 CLAHE；模糊：unsharp mask。BGRA 影像只增強色彩通道，
+    alpha 通道原樣保留。
+
+    Args:
+        image: 影像陣列（灰階、BGR 或 BGRA）
+        issues: evaluate_quality() 的問題列表
+
+    Returns:
+        增強後的影像（與輸入相同的通道數）
+    """
+    enhanced = image
+    if 'low_contrast' in issues or 'uneven' in issues:
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        if enhanced.ndim == 2:
+            enhanced = clahe.apply(enhanced)
+        else:
+            lab = cv2.cvtColor(enhanced[:, :, :3], cv2.COLOR_BGR2LAB)
+            lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+            bgr = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+            if enhanced.shape[2] == 4:
+                bgr = np.dstack([bgr, enhanced[:, :, 3]])
+            enhanced = bgr
+    if 'blur' in issues:
+        blurred = cv2.GaussianBlur(enhanced, (0, 0), 2.0)
+        enhanced = cv2.addWeighted(enhanced, 1.8, blurred, -0.8, 0)
+    if enhanced is image:
+        enhanced = image.copy()
+    elif enhanced.ndim == 3 and enhanced.shape[2] == 4:
+        enhanced[:, :, 3] = image[:, :, 3]
+    return enhanced
+
+
+def _thumbnail(image: np.ndarray, max_side: int) -> np.ndarray:
+    """
+    長邊約 max_side 的灰階縮圖
+
+    先以最近鄰縮到 2 倍大小（不複製整張影像），再以整數倍 INTER_AREA 平均，
+    讓雜訊像掃描時一樣被平滑，不會被誤判為內容或銳利邊緣。
+    """
+    if image is None or image.size == 0:
+        raise ValueError("Cannot assess an empty image")
+
+    h, w = image.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    width, height = max(1, int(round(w * scale))), max(1, int(round(h * scale)))
+    if scale < 0.5:
+        image = cv2.resize(image, (width * 2, height * 2), interpolation=cv2.INTER_NEAREST)
+    if image.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        image = cv2.cvtColor(image, code)
+    if image.dtype != np.uint8:
+        image = cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    if image.shape[:2] != (height, width):
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    return image
@@ -0,0 +1,205 @@
+"""
+Quality Profiles - 品質設定檔與負載自適應降級
+
+佇列積壓時（如月底發票高峰），寧可快速回傳信心稍低的結果，也不要逾時。
+
+設定檔：
+  - full:    目前的完整流程
+  - fast:    偵測前縮小影像、關閉方向分類、跳過第三層全圖搜尋
+  - minimal: 同 fast，且只提取必填欄位
+
+ProfileController 依佇列深度或 p95 延遲自動切換設定檔（具遲滯，避免來回震盪）。
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+QUALITY_PROFILES: Dict[str, Dict[str, Any]] = {
+    'full': {
+        'max_side': None,           # 不縮小
+        'use_angle_cls': None,      # 沿用適配器設定
+        'max_fallback_layer': 3,
+        'required_only': False,
+    },
+    'fast': {
+        'max_side': 1600,
+        'use_angle_cls': False,
+        'max_fallback_layer': 2,
+        'required_only': False,
+    },
+    'minimal': {
+        'max_side': 1280,
+        'use_angle_cls': False,
+        'max_fallback_layer': 2,
+        'required_only': True,
+    },
+}
+
+# 由高品質到低品質的降級順序
+PROFILE_ORDER = ('full', 'fast', 'minimal')
+
+# 未指定 latency_low_ms 時的恢復門檻（latency_high_ms 的比例）
+DEFAULT_LATENCY_LOW_RATIO = 0.5
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """
+    取得設定檔內容
+
+    Args:
+        name: 設定檔名稱
+
+    Returns:
+        設定檔 dict
+
+    Raises:
+        ValueError: 未知的設定檔
+    """
+    if name not in QUALITY_PROFILES:
+        raise ValueError(
+            f"Unknown quality profile: '{name}'. "
+            f"Must be one of: {', '.join(QUALITY_PROFILES)}"
+        )
+    return QUALITY_PROFILES[name]
+
+
+class ProfileController:
+    """
+    負載自適應設定檔控制器
+
+    - 佇列深度 >= queue_high 或 p95 延遲 >= latency_high_ms 時降一級
+    - 佇列深度 <= queue_low 且 p95 延遲 <= latency_low_ms 時升一級
+    - 每次切換後至少要再觀察 min_dwell 次才會再次切換（遲滯）
+    """
+
+    def __init__(
+        self,
+        queue_high: Optional[int] = 20,
+        queue_low: Optional[int] = 5,
+        latency_high_ms: Optional[float] = None,
+        latency_low_ms: Optional[float] = None,
+        window: int = 50,
+        min_dwell: int = 10,
+        initial: str = 'full'
+    ):
+        """
+        Args:
+            queue_high: 觸發降級的佇列深度（None 表示不看佇列）
+            queue_low: 允許恢復的佇列深度
+            latency_high_ms: 觸發降級的 p95 延遲（None 表示不看延遲）
+            latency_low_ms: 允許恢復的 p95 延遲（None 時為
+                latency_high_ms * DEFAULT_LATENCY_LOW_RATIO，保留遲滯區間）
+            window: 計算 p95 的最近樣本數
+            min_dwell: 切換後至少需要的觀察次數
+            initial: 初始設定檔
+        """
+        get_profile(initial)
+        if latency_high_ms is not None and latency_low_ms is None:
+            latency_low_ms = latency_high_ms * DEFAULT_LATENCY_LOW_RATIO
+        if queue_high is not None and queue_low is not None and queue_low >= queue_high:
+            raise ValueError("queue_low must be lower than queue_high")
+        if (latency_high_ms is not None and latency_low_ms is not None
+                and latency_low_ms >= latency_high_ms):
+            raise ValueError("latency_low_ms must be lower than latency_high_ms")
+
+        self.queue_high = queue_high
+        self.queue_low = queue_low
+        self.latency_high_ms = latency_high_ms
+        self.latency_low_ms = latency_low_ms
+        self.min_dwell = min_dwell
+
+        self._level = PROFILE_ORDER.index(initial)
+        self._queue_depth = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._since_switch = 0
+        self._switches = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> str:
+        """目前的設定檔名稱"""
+        return PROFILE_ORDER[self._level]
+
+    def observe_queue_depth(self, depth: int) -> str:
+        """
+        回報目前佇列深度
+
+        Returns:
+            評估後的設定檔名稱
+        """
+        with self._lock:
+            self._queue_depth = depth
+            return self._evaluate()
+
+    def observe_latency(self, latency_ms: float) -> str:
+        """
+        回報一筆處理延遲
+
+        Returns:
+            評估後的設定檔名稱
+        """
+        with self._lock:
+            self._latencies.append(latency_ms)
+            return self._evaluate()
+
+    def p95_latency(self) -> Optional[float]:
+        """最近樣本的 p95 延遲（毫秒），沒有樣本時回傳 None"""
+        with self._lock:
+            return self._p95()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        控制器狀態
+
+        Returns:
+            {'profile', 'queue_depth', 'p95_latency_ms', 'switches'}
+        """
+        with self._lock:
+            return {
+                'profile': self.current,
+                'queue_depth': self._queue_depth,
+                'p95_latency_ms': self._p95(),
+                'switches': self._switches
+            }
+
+    def _p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = max(0, math.ceil(len(ordered) * 0.95) - 1)
+        return ordered[index]
+
+    def _evaluate(self) -> str:
+        """依目前觀察值決定是否切換（呼叫端需持有 _lock）"""
+        self._since_switch += 1
+        if self._since_switch < self.min_dwell:
+            return self.current
+
+        p95 = self._p95()
+        queue_pressure = self.queue_high is not None and self._queue_depth >= self.queue_high
+        latency_pressure = (
+            self.latency_high_ms is not None and p95 is not None and p95 >= self.latency_high_ms
+        )
+
+        queue_relaxed = self.queue_low is None or self._queue_depth <= self.queue_low
+        latency_relaxed = (
+            self.latency_low_ms is None or p95 is None or p95 <= self.latency_low_ms
+        )
+
+        if (queue_pressure or latency_pressure) and self._level < len(PROFILE_ORDER) - 1:
+            self._switch(self._level + 1)
+        elif queue_relaxed and latency_relaxed and not (queue_pressure or latency_pressure) \
+                and self._level > 0:
+            self._switch(self._level - 1)
+
+        return self.current
+
+    def _switch(self, level: int) -> None:
+        self._level = level
+        self._since_switch = 0
+        self._switches += 1
+        # 舊設定檔下的延遲樣本不再代表現況
+        self._latencies.clear()
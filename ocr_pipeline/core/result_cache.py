@@ -0,0 +1,251 @@
+"""
+ResultCache - 整份文件提取結果的內容雜湊快取
+
+同一張影像 + 同一範本（ID、版本、內容）+ 同一引擎設定，Orchestrator.process()
+的輸出是確定的。重複送件時直接回傳快取結果，不經過解碼、OCR 與提取：
+  1. 鍵為 (影像內容雜湊, template_id, 範本版本, 範本指紋, 引擎設定指紋, 設定檔)
+  2. 記憶體 LRU 為第一層；指定 persistent_path 時以 SQLite 作為第二層（跨行程、重啟後保留）
+  3. 路徑輸入的內容雜湊依 (路徑, mtime, 大小) 記住，重複送件只需一次 stat
+  4. 持久層的 JSON 保留 tuple（bbox 等），命中時與未命中時的結果型別相同
+"""
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from ..adapters.storage import json_default
+from ..utils.file_utils import compute_file_hash
+from ..utils.image_utils import BUFFER_TYPES, compute_image_hash
+
+
+# 路徑 -> 內容雜湊 的記憶數量上限
+_DIGEST_MEMO_SIZE = 4096
+
+# 持久層 JSON 中標記 tuple 的鍵
+_TUPLE_KEY = '__tuple__'
+
+
+def fingerprint(value: Any) -> str:
+    """
+    任意 JSON 結構的穩定指紋（鍵排序後雜湊）
+
+    Args:
+        value: dict / list / 純量（無法序列化的值以 str() 表示）
+
+    Returns:
+        16 位元組的十六進位雜湊
+    """
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _encode_tuples(value: Any) -> Any:
+    """tuple 轉為 {'__tuple__': [...]}（JSON 會把 tuple 寫成 list）"""
+    if isinstance(value, tuple):
+        return {_TUPLE_KEY: [_encode_tuples(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode_tuples(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode_tuples(item) for key, item in value.items()}
+    return value
+
+
+def _decode_tuples(value: Dict[str, Any]) -> Any:
+    """json.loads 的 object_hook：還原 _encode_tuples 標記的 tuple"""
+    if len(value) == 1 and _TUPLE_KEY in value:
+        return tuple(value[_TUPLE_KEY])
+    return value
+
+
+class ResultCache:
+    """
+    結果快取（記憶體 LRU + 可選 SQLite 持久層，執行緒安全）
+
+    使用方式：
+        cache = ResultCache(max_entries=10000, persistent_path='results.cache.db')
+        orchestrator = Orchestrator(ocr, result_cache=cache)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        persistent_path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Args:
+            max_entries: 記憶體層最多保留的結果數
+            persistent_path: SQLite 持久層路徑（None 表示只用記憶體）
+
+        Raises:
+            ValueError: 無效的 max_entries
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries = max_entries
+        self.persistent_path = Path(persistent_path) if persistent_path is not None else None
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.persistent_path is not None:
+            self._conn = sqlite3.connect(str(self.persistent_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(parts: Iterable[Any]) -> str:
+        """組合快取鍵（各部分以 str() 串接後雜湊）"""
+        data = '\x1f'.join(str(part) for part in parts)
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=20).hexdigest()
+
+    def input_digest(self, image_input: Any) -> str:
+        """
+        影像輸入的內容雜湊
+
+        路徑：檔案內容雜湊（依 (路徑, mtime, 大小) 記住）；
+        已編碼資料：位元組雜湊；陣列：像素雜湊（同一影像的不同輸入形式會得到不同的鍵）
+
+        Raises:
+            FileNotFoundError: 檔案不存在
+            TypeError: 不支援的輸入型別
+        """
+        if isinstance(image_input, (str, Path)):
+            path = Path(image_input)
+            try:
+                stat = path.stat()
+            except (FileNotFoundError, NotADirectoryError):
+                raise FileNotFoundError(f"Image file not found: {image_input}")
+            memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                digest = self._digests.get(memo_key)
+                if digest is not None:
+                    self._digests.move_to_end(memo_key)
+                    return digest
+            digest = 'file:' + compute_file_hash(path, algorithm='blake2b')
+            with self._lock:
+                self._digests[memo_key] = digest
+                while len(self._digests) > _DIGEST_MEMO_SIZE:
+                    self._digests.popitem(last=False)
+            return digest
+        if isinstance(image_input, BUFFER_TYPES):
+            return 'bytes:' + hashlib.blake2b(image_input).hexdigest()
+        if isinstance(image_input, np.ndarray):
+            return 'pixels:' + compute_image_hash(image_input)
+        raise TypeError(f"Unsupported image input: {type(image_input).__name__}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查詢快取（記憶體 → 持久層）
+
+        Returns:
+            結果的副本；沒有時回傳 None
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return copy.deepcopy(result)
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    result = json.loads(row[0], object_hook=_decode_tuples)
+                    self._store(key, result)
+                    self._persistent_hits += 1
+                    return copy.deepcopy(result)
+
+            self._misses += 1
+            return None
+
+    def contains(self, key: str) -> bool:
+        """是否已有此鍵的結果（不計入命中統計、不更新 LRU 順序）"""
+        with self._lock:
+            if key in self._entries:
+                return True
+            if self._conn is not None:
+                return self._conn.execute(
+                    "SELECT 1 FROM results WHERE key = ?", (key,)
+                ).fetchone() is not None
+            return False
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """存入結果（記憶體層保留副本，持久層寫入 JSON）"""
+        stored = copy.deepcopy(result)
+        with self._lock:
+            self._store(key, stored)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results (key, result, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(_encode_tuples(stored), ensure_ascii=False,
+                                         default=json_default),
+                         time.time())
+                    )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        快取統計
+
+        Returns:
+            {'hits': 記憶體命中, 'persistent_hits': 持久層命中, 'misses',
+             'hit_rate', 'entries': 記憶體層結果數}
+        """
+        with self._lock:
+            total = self._hits + self._persistent_hits + self._misses
+            return {
+                'hits': self._hits,
+                'persistent_hits': self._persistent_hits,
+                'misses': self._misses,
+                'hit_rate': (self._hits + self._persistent_hits) / total if total else 0.0,
+                'entries': len(self._entries)
+            }
+
+    def clear(self) -> None:
+        """清空記憶體層與持久層"""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        """關閉持久層"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        """放進記憶體 LRU（呼叫端需持有 _lock）"""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
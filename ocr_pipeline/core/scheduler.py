@@ -0,0 +1,274 @@
+"""
+JobScheduler - 具優先序與截止時間的工作排程器
+
+互動式請求（櫃台等待中的收銀員）與夜間批次工作共用同一批 OCR 引擎。
+排程器位於 Orchestrator 前方：
+  1. 優先序類別：interactive 永遠先於 bulk 派送
+  2. 同類別內以最早截止時間優先（EDF），無截止時間者依到達順序排在後面
+  3. 已過截止時間的工作在 OCR 開始前直接丟棄
+  4. 保留部分 worker 只服務 interactive，避免長時間的 bulk 工作佔滿引擎
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .orchestrator import ImageInput, Orchestrator
+
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+
+class DeadlineExceededError(Exception):
+    """工作在開始 OCR 前已超過截止時間"""
+    pass
+
+
+@dataclass(order=True)
+class _Job:
+    """排程佇列中的工作（依截止時間、到達順序排序）"""
+    deadline: float
+    seq: int
+    image_input: Any = field(compare=False)
+    future: Future = field(compare=False)
+    priority: str = field(compare=False)
+
+
+class JobScheduler:
+    """
+    優先序 + EDF 工作排程器
+
+    每個 worker 執行緒擁有獨立的 Orchestrator；
+    前 interactive_reserved 個 worker 只處理 interactive 工作。
+    """
+
+    def __init__(
+        self,
+        ocr_adapter,
+        workers: Optional[int] = None,
+        interactive_reserved: int = 0,
+        **orchestrator_options
+    ):
+        """
+        Args:
+            ocr_adapter: OCR 適配器，或每個 worker 各一的適配器列表
+            workers: worker 數（預設為適配器數量）
+            interactive_reserved: 保留給 interactive 類別的 worker 數
+            **orchestrator_options: 傳給每個 Orchestrator 的參數
+                （如共用的 single_flight、profile_controller）。
+                提供 profile_controller 時，排程器會回報佇列深度
+        """
+        self._orchestrators = Orchestrator.create_pool(
+            ocr_adapter,
+            workers,
+            **orchestrator_options
+        )
+        self.profile_controller = orchestrator_options.get('profile_controller')
+        self.workers = len(self._orchestrators)
+
+        if interactive_reserved < 0:
+            raise ValueError("interactive_reserved must be >= 0")
+        if interactive_reserved >= self.workers:
+            raise ValueError("interactive_reserved must leave at least one shared worker")
+        self.interactive_reserved = interactive_reserved
+
+        self._queues: Dict[str, List[_Job]] = {p: [] for p in PRIORITIES}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+
+        self._stats = {
+            p: {'submitted': 0, 'completed': 0, 'failed': 0, 'expired': 0}
+            for p in PRIORITIES
+        }
+
+    @property
+    def template(self) -> Optional[Dict]:
+        """目前載入的範本"""
+        return self._orchestrators[0].template
+
+    def load_template(self, template_input: Union[str, Path, Dict[str, Any]]) -> None:
+        """
+        載入範本（套用到所有 worker）
+
+        Args:
+            template_input: 範本 dict 或 JSON 檔案路徑（檔案變更後自動重新載入）
+        """
+        # 每個編排器各自載入：範本檔變更時各自重新載入
+        for orchestrator in self._orchestrators:
+            orchestrator.load_template(template_input)
+
+    def submit(
+        self,
+        image_input: ImageInput,
+        priority: str = PRIORITY_BULK,
+        deadline_ms: Optional[float] = None
+    ) -> Future:
+        """
+        提交工作
+
+        Args:
+            image_input: 影像路徑、影像陣列或已編碼的影像資料
+            priority: 'interactive' 或 'bulk'
+            deadline_ms: 從現在起算的截止時間（毫秒），None 表示無期限
+
+        Returns:
+            concurrent.futures.Future；逾期工作會以 DeadlineExceededError 結束
+
+        Raises:
+            ValueError: 無效的優先序或尚未載入範本
+            RuntimeError: 排程器已關閉
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of: {', '.join(PRIORITIES)}")
+        if self.template is None:
+            raise ValueError("No template loaded. Call load_template() first.")
+
+        deadline = math.inf
+        if deadline_ms is not None:
+            deadline = time.monotonic() + deadline_ms / 1000.0
+
+        future: Future = Future()
+        job = _Job(deadline, next(self._seq), image_input, future, priority)
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("JobScheduler is shut down")
+            self._ensure_started()
+            heapq.heappush(self._queues[priority], job)
+            self._stats[priority]['submitted'] += 1
+            self._report_queue_depth()
+            self._cond.notify_all()
+
+        return future
+
+    def queue_depth(self, priority: Optional[str] = None) -> int:
+        """
+        等待中的工作數
+
+        Args:
+            priority: 指定類別；None 表示全部
+        """
+        with self._cond:
+            if priority is not None:
+                return len(self._queues[priority])
+            return sum(len(q) for q in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        排程統計
+
+        Returns:
+            {'interactive': {'submitted', 'completed', 'failed', 'expired', 'queued'},
+             'bulk': {...}}
+        """
+        with self._cond:
+            return {
+                p: dict(self._stats[p], queued=len(self._queues[p]))
+                for p in PRIORITIES
+            }
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        關閉排程器
+
+        Args:
+            wait: 是否等待 worker 結束
+            cancel_pending: 是否取消尚未開始的工作（否則會先處理完）
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for q in self._queues.values():
+                    for job in q:
+                        job.future.cancel()
+                    q.clear()
+            self._cond.notify_all()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "JobScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
+
+    def _ensure_started(self) -> None:
+        """延遲啟動 worker 執行緒（呼叫端需持有 _cond）"""
+        if self._threads:
+            return
+        for index, orchestrator in enumerate(self._orchestrators):
+            reserved = index < self.interactive_reserved
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(orchestrator, reserved),
+                name=f"ocr-scheduler-{index}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _report_queue_depth(self) -> None:
+        """回報佇列深度給設定檔控制器（呼叫端需持有 _cond）"""
+        if self.profile_controller is not None:
+            self.profile_controller.observe_queue_depth(
+                sum(len(q) for q in self._queues.values())
+            )
+
+    def _next_job(self, reserved: bool) -> Optional[_Job]:
+        """
+        取出下一個可執行的工作（呼叫端需持有 _cond）
+
+        逾期或已取消的工作在此直接結束，不會進入 OCR。
+        """
+        classes = (PRIORITY_INTERACTIVE,) if reserved else PRIORITIES
+        now = time.monotonic()
+
+        for priority in classes:
+            q = self._queues[priority]
+            while q:
+                job = heapq.heappop(q)
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                if job.deadline < now:
+                    self._stats[priority]['expired'] += 1
+                    job.future.set_exception(
+                        DeadlineExceededError("Job deadline passed before OCR started")
+                    )
+                    continue
+                return job
+        return None
+
+    def _worker_loop(self, orchestrator: Orchestrator, reserved: bool) -> None:
+        """worker 主迴圈"""
+        while True:
+            with self._cond:
+                job = self._next_job(reserved)
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                    job = self._next_job(reserved)
+                self._report_queue_depth()
+
+            try:
+                result = orchestrator.process(job.image_input)
+            except Exception as e:
+                with self._cond:
+                    self._stats[job.priority]['failed'] += 1
+                job.future.set_exception(e)
+            else:
+                with self._cond:
+                    self._stats[job.priority]['completed'] += 1
+                job.future.set_result(result)
@@ -0,0 +1,81 @@
+"""
+SingleFlight - 相同工作的進行中合併
+
+上游系統積極重試時，同一張發票常在一秒內重複到達。
+以 key（影像內容雜湊 + 範本 ID）合併進行中的工作：
+第一個呼叫者實際執行，後續相同 key 的呼叫者等待同一個 Future。
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    執行緒安全的進行中工作合併器
+
+    - 只合併「同時進行中」的工作；完成後即移除，不做結果快取
+    - 執行者拋出的例外會傳遞給所有等待者
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        執行工作，或等待相同 key 的進行中工作
+
+        Args:
+            key: 工作識別鍵
+            fn: 實際執行的函式（無參數）
+
+        Returns:
+            (結果, 是否為共用結果)；共用結果與執行者拿到的是同一個物件
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._hits += 1
+                leader = False
+            else:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._in_flight[key] = future
+                self._misses += 1
+                leader = True
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        合併統計
+
+        Returns:
+            {'hits': 共用次數, 'misses': 實際執行次數, 'in_flight': 進行中工作數,
+             'hit_rate': 共用比例}
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'in_flight': len(self._in_flight),
+                'hit_rate': self._hits / total if total else 0.0
+            }
@@ -3,8 +3,11 @@ Template 模組：負責載入和驗證 OCR Template JSON
 """
 
 from .validator import TemplateValidator, ValidationError
+from .router import TemplateRouter, extract_literal_fragments
 
 __all__ = [
     "TemplateValidator", 
     "ValidationError",
+    "TemplateRouter",
+    "extract_literal_fragments",
 ]
@@ -0,0 +1,482 @@
+"""
+Template Router - 範本路由索引
+
+從範本的正則 pattern 字面片段與 anchor_keywords 建立關鍵字倒排索引，
+讓單次全圖 OCR 結果能快速挑出少量候選範本，再交給完整提取流程。
+
+查詢成本與頁面的 OCR 文字量成正比，與範本數量無關。
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# 正則中代表「特殊意義」的字元，遇到即中斷字面片段
+_REGEX_META = set('.^$|()[]{}*+?\\')
+
+# 量詞：會讓前一個字元成為可選/重複，因此前一字元不可視為必備字面
+_QUANTIFIERS = set('*+?{')
+
+# 可視為字面字元的跳脫序列（如 \: \- \.）
+_ESCAPED_LITERALS = set('.^$|()[]{}*+?\\-:/ ')
+
+# 行內旗標群組：(?aiLmsux) 或 (?flags-flags:
+_INLINE_FLAGS_RE = re.compile(r'\(\?([aiLmsux]*)(?:-([imsx]+))?([:)])')
+
+
+def extract_literal_fragments(pattern: str, min_length: int = 2) -> List[str]:
+    """
+    從正則表達式中抽出必定出現的連續字面片段
+
+    例：``隨機碼[:：]\\s*(\\d{4})`` → ``['隨機碼']``
+
+    只做保守的掃描：字元類別、群組邊界、跳脫字元類別（\\d、\\s…）與
+    量詞都會中斷片段；被量詞修飾的字元會從片段中移除。不一定出現的片段
+    （可選 / 可重複零次的群組、| 分支、否定環視）不列入；肯定環視
+    ``(?=…)`` ``(?<=…)`` 的內容仍須出現在文字中，因此保留。
+    不分大小寫（``(?i)``、``(?i:…)``、re.IGNORECASE）的片段轉為小寫。
+
+    Args:
+        pattern: 正則表達式
+        min_length: 片段最短長度（過短的片段辨識度太低）
+
+    Returns:
+        字面片段列表（依出現順序，不重複）
+    """
+    fragments: List[str] = []
+    for text, ignore_case in _scan_fragments(pattern, min_length):
+        if ignore_case:
+            text = text.lower()
+        if text not in fragments:
+            fragments.append(text)
+    return fragments
+
+
+class _Group:
+    """掃描中的群組"""
+
+    def __init__(self, drop: bool, ignore_case: bool):
+        self.fragments: List[Tuple[str, bool]] = []
+        self.alternation = False
+        self.drop = drop
+        self.ignore_case = ignore_case
+
+
+def _scan_fragments(pattern: str, min_length: int) -> List[Tuple[str, bool]]:
+    """
+    掃描正則表達式的必備字面片段
+
+    Returns:
+        [(片段, 是否不分大小寫), ...]（依出現順序，可能重複）
+    """
+    try:
+        global_ignore_case = bool(re.compile(pattern).flags & re.IGNORECASE)
+    except re.error:
+        global_ignore_case = False
+
+    # 每層群組：收集到的片段、是否有 | 分支、是否整組捨棄、是否不分大小寫
+    stack = [_Group(drop=False, ignore_case=global_ignore_case)]
+    current: List[str] = []
+
+    def flush() -> None:
+        text = ''.join(current).strip()
+        if len(text) >= min_length:
+            stack[-1].fragments.append((text, stack[-1].ignore_case))
+        current.clear()
+
+    i = 0
+    length = len(pattern)
+    while i < length:
+        ch = pattern[i]
+
+        if ch == '\\' and i + 1 < length:
+            nxt = pattern[i + 1]
+            if nxt in _ESCAPED_LITERALS:
+                char = nxt
+                i += 2
+            else:
+                # \d \s \w \b 等字元類別
+                flush()
+                i += 2
+                continue
+        elif ch == '[':
+            # 跳過整個字元類別
+            flush()
+            i += 1
+            if i < length and pattern[i] == '^':
+                i += 1
+            if i < length and pattern[i] == ']':
+                i += 1
+            while i < length and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+            continue
+        elif ch == '(':
+            flush()
+            i = _open_group(pattern, i, stack)
+            continue
+        elif ch == ')':
+            flush()
+            group = stack.pop() if len(stack) > 1 else _Group(drop=True, ignore_case=False)
+            i += 1
+            optional, i = _skip_quantifier(pattern, i)
+            if not (optional or group.drop or group.alternation):
+                stack[-1].fragments.extend(group.fragments)
+            continue
+        elif ch == '|':
+            flush()
+            stack[-1].alternation = True
+            i += 1
+            continue
+        elif ch in _REGEX_META:
+            flush()
+            if ch == '{':
+                close = pattern.find('}', i)
+                i = close + 1 if close != -1 else i + 1
+            else:
+                i += 1
+            continue
+        else:
+            char = ch
+            i += 1
+
+        # 下一個字元是量詞時，本字元不可視為必備字面
+        if i < length and pattern[i] in _QUANTIFIERS:
+            flush()
+            continue
+        current.append(char)
+
+    flush()
+    root = stack[0]
+    # 未閉合的群組（無效的正則）或最外層的 | 分支：沒有必定出現的片段
+    if len(stack) > 1 or root.alternation:
+        return []
+    return root.fragments
+
+
+def _open_group(pattern: str, i: int, stack: List[_Group]) -> int:
+    """處理 ( 開頭的群組前綴，回傳群組內容的起始位置"""
+    parent = stack[-1]
+    if not pattern.startswith('(?', i):
+        stack.append(_Group(drop=False, ignore_case=parent.ignore_case))
+        return i + 1
+
+    rest = pattern[i + 2:]
+    if rest.startswith('#'):
+        # 註解：不是群組
+        close = pattern.find(')', i)
+        return close + 1 if close != -1 else len(pattern)
+    if rest.startswith('P='):
+        # 反向參照 (?P=name)：不是字面
+        close = pattern.find(')', i)
+        return close + 1 if close != -1 else len(pattern)
+    if rest.startswith('('):
+        # 條件式 (?(id)yes|no)：內容不一定出現
+        stack.append(_Group(drop=True, ignore_case=parent.ignore_case))
+        return i + 2
+    if rest.startswith('P<') or (rest.startswith('<') and rest[1:2] not in ('=', '!')):
+        close = pattern.find('>', i)
+        stack.append(_Group(drop=False, ignore_case=parent.ignore_case))
+        return close + 1 if close != -1 else len(pattern)
+    for prefix, drop in (('<=', False), ('<!', True), ('=', False), ('!', True), (':', False),
+                         ('>', False)):
+        if rest.startswith(prefix):
+            stack.append(_Group(drop=drop, ignore_case=parent.ignore_case))
+            return i + 2 + len(prefix)
+
+    # 行內旗標：(?i) 作用於整個表達式（已由 re.compile 取得），(?i-s:…) 只作用於群組
+    match = _INLINE_FLAGS_RE.match(pattern, i)
+    if match is None:
+        stack.append(_Group(drop=True, ignore_case=parent.ignore_case))
+        return i + 2
+    if match.group(3) == ')':
+        return match.end()
+    ignore_case = parent.ignore_case
+    if 'i' in match.group(1):
+        ignore_case = True
+    if 'i' in (match.group(2) or ''):
+        ignore_case = False
+    stack.append(_Group(drop=False, ignore_case=ignore_case))
+    return match.end()
+
+
+def _skip_quantifier(pattern: str, i: int) -> Tuple[bool, int]:
+    """
+    跳過群組後的量詞
+
+    Returns:
+        (群組是否可能出現零次, 量詞之後的位置)
+    """
+    if i >= len(pattern):
+        return False, i
+    ch = pattern[i]
+    optional = False
+    if ch in '?*':
+        optional = True
+        i += 1
+    elif ch == '+':
+        i += 1
+    elif ch == '{':
+        close = pattern.find('}', i)
+        if close == -1:
+            return False, i
+        low = pattern[i + 1:close].split(',', 1)[0].strip()
+        optional = low in ('', '0')
+        i = close + 1
+    else:
+        return False, i
+    # 非貪婪 / 佔有量詞
+    if i < len(pattern) and pattern[i] in '?+':
+        i += 1
+    return optional, i
+
+
+class TemplateRouter:
+    """
+    範本路由器（關鍵字倒排索引）
+
+    索引來源：
+    1. 各欄位 ``pattern`` 中的字面片段（如 ``隨機碼``、``統一編號``）；
+       不分大小寫的片段另存一份小寫索引，以小寫的 OCR 文字查詢
+    2. 範本層級與欄位層級的 ``anchor_keywords``
+
+    路由流程：
+    1. 依 ``sampling_metadata.size_range`` 的長寬比排除版面不符的範本
+       （範本座標為 rect_ratio，與解析度無關，因此不比較像素尺寸）
+    2. 以 OCR 文字行的子字串查詢倒排索引，統計每個範本命中的關鍵字數
+    3. 回傳命中數最高的前幾個候選範本
+    """
+
+    def __init__(self, min_fragment_length: int = 2, aspect_tolerance: float = 0.2):
+        """
+        Args:
+            min_fragment_length: 從 pattern 抽取字面片段的最短長度
+            aspect_tolerance: 長寬比容許的相對誤差（見 fits_size()）；長度不固定的
+                單據（如熱感紙捲收據）可調大
+
+        Raises:
+            ValueError: aspect_tolerance 為負數
+        """
+        if aspect_tolerance < 0:
+            raise ValueError("aspect_tolerance must be >= 0")
+        self.min_fragment_length = min_fragment_length
+        self.aspect_tolerance = aspect_tolerance
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._keywords: Dict[str, Set[str]] = {}
+        self._folded_keywords: Dict[str, Set[str]] = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._folded_index: Dict[str, Set[str]] = {}
+        self._key_lengths: Set[int] = set()
+        self._folded_key_lengths: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def add_template(self, template: Dict[str, Any]) -> Set[str]:
+        """
+        將範本加入索引（同 template_id 會取代舊版本）
+
+        Args:
+            template: 範本 dict
+
+        Returns:
+            此範本被索引的關鍵字集合
+
+        Raises:
+            ValueError: 範本缺少 template_id
+        """
+        template_id = template.get('template_id')
+        if not template_id:
+            raise ValueError("template_id is required for routing")
+
+        if template_id in self._templates:
+            self.remove_template(template_id)
+
+        keywords, folded = self._collect_keywords(template)
+        self._templates[template_id] = template
+        self._keywords[template_id] = keywords
+        self._folded_keywords[template_id] = folded
+
+        for keyword in keywords:
+            self._index.setdefault(keyword, set()).add(template_id)
+            self._key_lengths.add(len(keyword))
+        for keyword in folded:
+            self._folded_index.setdefault(keyword, set()).add(template_id)
+            self._folded_key_lengths.add(len(keyword))
+
+        return keywords | folded
+
+    def add_templates(self, templates: Iterable[Dict[str, Any]]) -> None:
+        """批次加入範本"""
+        for template in templates:
+            self.add_template(template)
+
+    def remove_template(self, template_id: str) -> None:
+        """
+        從索引移除範本
+
+        Args:
+            template_id: 範本 ID
+        """
+        self._templates.pop(template_id, None)
+        for keywords, index in ((self._keywords, self._index),
+                                (self._folded_keywords, self._folded_index)):
+            for keyword in keywords.pop(template_id, set()):
+                owners = index.get(keyword)
+                if owners is None:
+                    continue
+                owners.discard(template_id)
+                if not owners:
+                    del index[keyword]
+
+        self._key_lengths = {len(k) for k in self._index}
+        self._folded_key_lengths = {len(k) for k in self._folded_index}
+
+    def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """取得已索引的範本"""
+        return self._templates.get(template_id)
+
+    def route(
+        self,
+        ocr_results: List,
+        image_size: Optional[Tuple[int, int]] = None,
+        max_candidates: int = 3,
+        min_hits: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        依 OCR 結果挑選候選範本
+
+        Args:
+            ocr_results: [(bbox, (text, confidence)), ...]
+            image_size: (width, height)，提供時會以 size_range 的長寬比過濾
+            max_candidates: 最多回傳的候選數
+            min_hits: 至少命中幾個關鍵字才列入候選
+
+        Returns:
+            [{'template_id': ..., 'hits': 2, 'keywords': [...]}, ...]
+            依命中數遞減排序；沒有任何關鍵字的範本以 hits=0 排在最後
+        """
+        hits: Dict[str, Set[str]] = {}
+
+        for text in self._iter_texts(ocr_results):
+            for keyword in self._lookup(text, self._index, self._key_lengths):
+                for template_id in self._index[keyword]:
+                    hits.setdefault(template_id, set()).add(keyword)
+            if self._folded_index:
+                folded_text = text.lower()
+                for keyword in self._lookup(folded_text, self._folded_index,
+                                            self._folded_key_lengths):
+                    for template_id in self._folded_index[keyword]:
+                        hits.setdefault(template_id, set()).add(keyword)
+
+        candidates = []
+        for template_id, matched in hits.items():
+            if len(matched) < min_hits:
+                continue
+            if image_size and not self._fits(template_id, image_size):
+                continue
+            candidates.append({
+                'template_id': template_id,
+                'hits': len(matched),
+                'keywords': sorted(matched)
+            })
+
+        candidates.sort(key=lambda c: (-c['hits'], c['template_id']))
+
+        # 未建立任何關鍵字的範本無法被索引排除，只能放在最後備選
+        if len(candidates) < max_candidates:
+            for template_id, keywords in self._keywords.items():
+                if keywords or self._folded_keywords[template_id]:
+                    continue
+                if image_size and not self._fits(template_id, image_size):
+                    continue
+                candidates.append({'template_id': template_id, 'hits': 0, 'keywords': []})
+
+        return candidates[:max_candidates]
+
+    @staticmethod
+    def fits_size(
+        template: Dict[str, Any],
+        image_size: Tuple[int, int],
+        tolerance: float = 0.2
+    ) -> bool:
+        """
+        判斷影像的長寬比是否符合範本的 size_range
+
+        取樣範圍通常很窄（少數樣本、同一台掃描器），而同一頁以不同解析度掃描
+        像素尺寸會不同，因此只比較長寬比：範圍為 size_range 推得的
+        [最小寬 / 最大高, 最大寬 / 最小高]，上下各放寬 (1 + tolerance) 倍。
+
+        Args:
+            template: 範本 dict
+            image_size: (width, height)
+            tolerance: 長寬比容許的相對誤差
+
+        Returns:
+            沒有完整的寬高 size_range 時一律回傳 True
+        """
+        size_range = (template.get('sampling_metadata') or {}).get('size_range') or {}
+        width_range = size_range.get('width') or {}
+        height_range = size_range.get('height') or {}
+        try:
+            low = width_range['min'] / height_range['max']
+            high = width_range['max'] / height_range['min']
+        except (KeyError, TypeError, ZeroDivisionError):
+            return True
+
+        width, height = image_size
+        if height <= 0:
+            return False
+        aspect = width / height
+        return low / (1 + tolerance) <= aspect <= high * (1 + tolerance)
+
+    def _fits(self, template_id: str, image_size: Tuple[int, int]) -> bool:
+        return self.fits_size(self._templates[template_id], image_size, self.aspect_tolerance)
+
+    def _collect_keywords(self, template: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+        """
+        收集範本的所有路由關鍵字
+
+        Returns:
+            (區分大小寫的關鍵字, 不分大小寫的關鍵字（小寫）)
+        """
+        keywords: Set[str] = set(template.get('anchor_keywords') or [])
+        folded: Set[str] = set()
+
+        for region in (template.get('regions') or {}).values():
+            keywords.update(region.get('anchor_keywords') or [])
+            for key in ('pattern', 'fallback_pattern'):
+                pattern = region.get(key)
+                if not pattern:
+                    continue
+                for text, ignore_case in _scan_fragments(pattern, self.min_fragment_length):
+                    if ignore_case:
+                        folded.add(text.lower())
+                    else:
+                        keywords.add(text)
+
+        return {k for k in keywords if k}, {k for k in folded if k}
+
+    @staticmethod
+    def _lookup(text: str, index: Dict[str, Set[str]], key_lengths: Set[int]) -> Set[str]:
+        """
+        查詢文字行中出現的關鍵字
+
+        只列舉長度等於索引中關鍵字長度的子字串，成本為
+        O(len(text) × 不同關鍵字長度數)。
+        """
+        found = set()
+        text_length = len(text)
+        for key_length in key_lengths:
+            for start in range(text_length - key_length + 1):
+                token = text[start:start + key_length]
+                if token in index:
+                    found.add(token)
+        return found
+
+    @staticmethod
+    def _iter_texts(ocr_results: List) -> Iterable[str]:
+        """從 OCR 結果取出文字"""
+        for item in ocr_results:
+            if len(item) >= 2 and item[1]:
+                yield item[1][0]
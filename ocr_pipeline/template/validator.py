@@ -45,6 +45,8 @@ class TemplateValidator:
         # 可選欄位
         if "preprocess" in data:
             self._validate_preprocess(data["preprocess"])
+        if "anchor_keywords" in data:
+            self._validate_anchor_keywords(data["anchor_keywords"])
 
         return True
 
@@ -204,6 +206,18 @@ class TemplateValidator:
         if "validation" in region and region["validation"] is not None:
             self._validate_region_validation(region["validation"])
 
+        # anchor_keywords（可選）
+        if "anchor_keywords" in region and region["anchor_keywords"] is not None:
+            self._validate_anchor_keywords(region["anchor_keywords"])
+
+    def _validate_anchor_keywords(self, keywords: Any) -> None:
+        # anchor_keywords 必須為非空字串陣列（供範本路由索引使用）
+        if not isinstance(keywords, list):
+            raise ValidationError("anchor_keywords must be an array")
+        for kw in keywords:
+            if not isinstance(kw, str) or not kw:
+                raise ValidationError("anchor_keywords must be array of non-empty strings")
+
     def _validate_region_validation(self, validation: Dict[str, Any]) -> None:
         if not isinstance(validation, dict):
             raise ValidationError("validation must be an object")
@@ -4,12 +4,18 @@ Utility 模組：提供影像處理和檔案操作工具函數
 
 from .image_utils import (
     read_image,
+    read_image_from_buffer,
+    read_image_reduced,
+    get_image_file_size,
     save_image,
     resize_image,
     convert_to_grayscale,
     get_image_size,
     is_valid_image,
-    create_blank_image
+    create_blank_image,
+    compute_image_hash,
+    compute_perceptual_hash,
+    hamming_distance
 )
 
 from .file_utils import (
@@ -17,6 +23,10 @@ from .file_utils import (
     get_file_extension,
     change_file_extension,
     list_files_in_directory,
+    iter_files,
+    match_any,
+    sniff_image_type,
+    compute_file_hash,
     is_image_file,
     get_relative_path,
     join_paths,
@@ -26,17 +36,27 @@ from .file_utils import (
 __all__ = [
     # image_utils
     "read_image",
+    "read_image_from_buffer",
+    "read_image_reduced",
+    "get_image_file_size",
     "save_image",
     "resize_image",
     "convert_to_grayscale",
     "get_image_size",
     "is_valid_image",
     "create_blank_image",
+    "compute_image_hash",
+    "compute_perceptual_hash",
+    "hamming_distance",
     # file_utils
     "ensure_directory_exists",
     "get_file_extension",
     "change_file_extension",
     "list_files_in_directory",
+    "iter_files",
+    "match_any",
+    "sniff_image_type",
+    "compute_file_hash",
     "is_image_file",
     "get_relative_path",
     "join_paths",
@@ -4,8 +4,21 @@
 提供路徑處理、目錄操作、檔案 I/O 等功能
 """
 
+import fnmatch
+import hashlib
+import os
 from pathlib import Path
-from typing import List, Union, Optional
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+
+# 檔頭魔術位元組 -> 影像格式
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'BM', 'bmp'),
+)
 
 
 def ensure_directory_exists(directory: Union[str, Path]) -> Path:
@@ -73,26 +86,205 @@ def list_files_in_directory(
     Raises:
         FileNotFoundError: 目錄不存在
     """
-    directory = Path(directory)
+    if '/' in pattern or '**' in pattern:
+        # 含路徑的模式沿用 pathlib glob 的語意（iter_files 的模式規則不同）
+        directory = Path(directory)
+        if not directory.exists():
+            raise FileNotFoundError(f"Directory not found: {directory}")
+        files = directory.rglob(pattern) if recursive else directory.glob(pattern)
+        return [f for f in files if f.is_file()]
+    
+    return list(iter_files(directory, include=[pattern], recursive=recursive))
+
+
+def iter_files(
+    directory: Union[str, Path],
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    recursive: bool = False,
+    sniff: bool = False,
+    sort: bool = False,
+    chunk_size: int = 1000
+) -> Iterator[Path]:
+    """
+    逐一產生目錄中的檔案（os.scandir 產生器）
     
-    if not directory.exists():
+    直接使用 DirEntry 的檔案類型資訊，不必對每個項目另外 stat；
+    找到第一個檔案就開始產生結果，不需等整個目錄列舉完畢。
+    
+    模式規則（fnmatch）：含 "/" 的模式比對相對於 directory 的路徑，
+    否則比對檔名；exclude 同時適用於子目錄（符合的目錄不會進入）。
+    
+    Args:
+        directory: 目錄路徑
+        include: 包含的模式（None 表示全部）
+        exclude: 排除的模式
+        recursive: 是否遞迴搜尋子目錄
+        sniff: 只產生檔頭為影像格式（JPEG/PNG/TIFF/BMP/WebP）的檔案
+        sort: 依名稱排序；每讀到 chunk_size 個項目就排序並產生一批，
+            大目錄不必全部讀完才開始產生（批次之間不保證順序）
+        chunk_size: 排序的批次大小
+        
+    Yields:
+        檔案路徑
+        
+    Raises:
+        FileNotFoundError: 目錄不存在
+        ValueError: 無效的 chunk_size
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
         raise FileNotFoundError(f"Directory not found: {directory}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
     
-    if recursive:
-        files = list(directory.rglob(pattern))
-    else:
-        files = list(directory.glob(pattern))
+    include = list(include or [])
+    exclude = list(exclude or [])
+    pending = [directory]
+    
+    while pending:
+        current = pending.pop()
+        subdirs: List[Path] = []
+        
+        try:
+            scanner = os.scandir(current)
+        except (PermissionError, FileNotFoundError):
+            # 列舉途中目錄被移除或無權限：略過
+            continue
+        
+        with scanner:
+            chunk: List[os.DirEntry] = []
+            for entry in scanner:
+                chunk.append(entry)
+                if len(chunk) >= chunk_size:
+                    yield from _emit_entries(
+                        chunk, directory, include, exclude, recursive, sniff, sort, subdirs
+                    )
+                    chunk = []
+            yield from _emit_entries(
+                chunk, directory, include, exclude, recursive, sniff, sort, subdirs
+            )
+        
+        # 反向放入堆疊，讓子目錄依原順序處理
+        pending.extend(reversed(sorted(subdirs) if sort else subdirs))
+
+
+def _emit_entries(
+    entries: List[os.DirEntry],
+    root: Path,
+    include: List[str],
+    exclude: List[str],
+    recursive: bool,
+    sniff: bool,
+    sort: bool,
+    subdirs: List[Path]
+) -> Iterator[Path]:
+    """處理一批 DirEntry：產生符合條件的檔案，並收集要進入的子目錄"""
+    if sort:
+        entries = sorted(entries, key=lambda e: e.name)
     
-    # 只回傳檔案，排除目錄
-    return [f for f in files if f.is_file()]
+    for entry in entries:
+        try:
+            # 不跟隨目錄的符號連結，避免循環
+            is_dir = entry.is_dir(follow_symlinks=False)
+            is_file = not is_dir and entry.is_file()
+        except OSError:
+            continue
+        
+        relative = Path(entry.path).relative_to(root).as_posix()
+        if exclude and match_any(entry.name, relative, exclude):
+            continue
+        
+        if is_dir:
+            if recursive:
+                subdirs.append(Path(entry.path))
+            continue
+        if not is_file:
+            continue
+        if include and not match_any(entry.name, relative, include):
+            continue
+        if sniff and sniff_image_type(entry.path) is None:
+            continue
+        
+        yield Path(entry.path)
+
+
+def match_any(name: str, relative: str, patterns: Iterable[str]) -> bool:
+    """
+    檔名或相對路徑是否符合任一模式（與 iter_files 的 include / exclude 規則相同）
+    
+    Args:
+        name: 檔名
+        relative: 相對於根目錄的 POSIX 路徑
+        patterns: fnmatch 模式（含 '/' 的模式比對相對路徑，其餘比對檔名）
+        
+    Returns:
+        是否符合
+    """
+    for pattern in patterns:
+        target = relative if '/' in pattern else name
+        if fnmatch.fnmatchcase(target, pattern):
+            return True
+    return False
+
+
+def sniff_image_type(file_path: Union[str, Path]) -> Optional[str]:
+    """
+    依檔頭魔術位元組判斷影像格式（不信任副檔名）
+    
+    Args:
+        file_path: 檔案路徑
+        
+    Returns:
+        'jpeg' / 'png' / 'tiff' / 'bmp' / 'webp'；無法辨識或無法讀取時回傳 None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    
+    for signature, image_type in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_type
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def compute_file_hash(
+    file_path: Union[str, Path],
+    algorithm: str = 'sha256',
+    chunk_size: int = 1024 * 1024
+) -> str:
+    """
+    計算檔案內容雜湊（分段讀取，不會一次載入整個檔案）
+    
+    Args:
+        file_path: 檔案路徑
+        algorithm: hashlib 支援的演算法名稱
+        chunk_size: 每次讀取的位元組數
+        
+    Returns:
+        十六進位雜湊字串
+        
+    Raises:
+        FileNotFoundError: 檔案不存在
+    """
+    digest = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def is_image_file(file_path: Union[str, Path]) -> bool:
+def is_image_file(file_path: Union[str, Path], sniff: bool = False) -> bool:
     """
     判斷是否為影像檔案
     
     Args:
         file_path: 檔案路徑
+        sniff: 另外檢查檔頭魔術位元組（副檔名錯誤或非影像內容時回傳 False）
         
     Returns:
         是否為影像檔案
@@ -103,7 +295,11 @@ def is_image_file(file_path: Union[str, Path]) -> bool:
     }
     
     extension = get_file_extension(file_path).lower()
-    return extension in image_extensions
+    if extension not in image_extensions:
+        return False
+    if sniff:
+        return sniff_image_type(file_path) is not None
+    return True
 
 
 def get_relative_path(
@@ -4,15 +4,43 @@
 提供基本的影像讀取、儲存、轉換等功能
 """
 
+import hashlib
+import mmap
+
 import cv2
 import numpy as np
 from pathlib import Path
 from typing import Optional, Tuple, Union
 
 
+# 可直接解碼的記憶體緩衝區型別
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+
+# EXIF Orientation 標籤
+_EXIF_ORIENTATION = 0x0112
+
+# 解碼時縮小倍率 -> (彩色, 灰階) 讀取旗標；JPEG 會在 DCT 域直接縮小
+_REDUCE_FLAGS = {
+    1: (cv2.IMREAD_COLOR, cv2.IMREAD_GRAYSCALE),
+    2: (cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    4: (cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+    8: (cv2.IMREAD_REDUCED_COLOR_8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+}
+
+
+def _imread_flags(grayscale: bool, reduce: int) -> int:
+    """取得 imread / imdecode 旗標"""
+    if reduce not in _REDUCE_FLAGS:
+        raise ValueError(f"reduce must be one of: {', '.join(map(str, _REDUCE_FLAGS))}")
+    color, gray = _REDUCE_FLAGS[reduce]
+    return gray if grayscale else color
+
+
 def read_image(
     file_path: Union[str, Path], 
-    grayscale: bool = False
+    grayscale: bool = False,
+    use_mmap: bool = False,
+    reduce: int = 1
 ) -> np.ndarray:
     """
     從檔案讀取影像
@@ -20,24 +48,46 @@ def read_image(
     Args:
         file_path: 影像檔案路徑
         grayscale: 是否以灰階模式讀取
+        use_mmap: 以記憶體映射讀取檔案後直接解碼（不經過緩衝讀取）
+        reduce: 解碼時直接縮小為 1/2、1/4 或 1/8（IMREAD_REDUCED_*）
         
     Returns:
         影像陣列（numpy.ndarray）
         
     Raises:
         FileNotFoundError: 檔案不存在
-        ValueError: 無法讀取影像
+        ValueError: 無法讀取影像或無效的 reduce
     """
     file_path = Path(file_path)
+    flags = _imread_flags(grayscale, reduce)
     
     if not file_path.exists():
         raise FileNotFoundError(f"Image file not found: {file_path}")
     
+    if use_mmap:
+        with open(file_path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空檔案無法映射
+                raise ValueError(f"Failed to read image: {file_path}")
+        try:
+            img = read_image_from_buffer(mapped, grayscale, reduce)
+        except ValueError:
+            # 例外離開 except 後才釋放對映射的引用，錯誤在關閉映射之後再拋出
+            img = None
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # 其他例外的 traceback 仍引用映射：交給垃圾回收關閉
+                pass
+        if img is None:
+            raise ValueError(f"Failed to read image: {file_path}")
+        return img
+    
     # 讀取影像
-    if grayscale:
-        img = cv2.imread(str(file_path), cv2.IMREAD_GRAYSCALE)
-    else:
-        img = cv2.imread(str(file_path))
+    img = cv2.imread(str(file_path), flags)
     
     if img is None:
         raise ValueError(f"Failed to read image: {file_path}")
@@ -45,6 +95,119 @@ def read_image(
     return img
 
 
+def read_image_from_buffer(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+    grayscale: bool = False,
+    reduce: int = 1
+) -> np.ndarray:
+    """
+    從記憶體中的已編碼影像（JPEG、PNG…）解碼
+    
+    以 np.frombuffer 直接引用緩衝區，解碼前不複製資料。
+    
+    Args:
+        buffer: 已編碼的影像資料（bytes、memoryview、mmap…）
+        grayscale: 是否以灰階模式解碼
+        reduce: 解碼時直接縮小為 1/2、1/4 或 1/8
+        
+    Returns:
+        影像陣列（numpy.ndarray）
+        
+    Raises:
+        ValueError: 無法解碼影像或無效的 reduce
+    """
+    flags = _imread_flags(grayscale, reduce)
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if data.size == 0:
+        raise ValueError("Failed to decode image: empty buffer")
+    
+    img = cv2.imdecode(data, flags)
+    
+    if img is None:
+        raise ValueError("Failed to decode image from buffer")
+    
+    return img
+
+
+def get_image_file_size(file_path: Union[str, Path]) -> Optional[Tuple[int, int]]:
+    """
+    只讀取檔頭取得影像尺寸（不解碼像素）
+    
+    與 read_image 一致套用 EXIF 方向：方向 5–8（旋轉 90 度）時寬高互換。
+    
+    Args:
+        file_path: 影像檔案路徑
+        
+    Returns:
+        (width, height)；無法辨識的格式回傳 None
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+            orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+    except (OSError, ValueError):
+        return None
+    
+    if orientation in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def read_image_reduced(
+    file_path: Union[str, Path],
+    max_side: int,
+    grayscale: bool = False,
+    use_mmap: bool = False
+) -> Tuple[np.ndarray, float]:
+    """
+    讀取影像並縮小到長邊不超過 max_side
+    
+    先讀檔頭取得原始尺寸，選擇不會小於 max_side 的最大解碼縮小倍率
+    （1/2、1/4、1/8，JPEG 直接在解碼器中縮小），剩餘的差距再以
+    resize_image 補足。比完整解碼後再縮小快數倍，也省下完整影像的記憶體。
+    
+    Args:
+        file_path: 影像檔案路徑
+        max_side: 長邊上限
+        grayscale: 是否以灰階模式讀取
+        use_mmap: 以記憶體映射讀取檔案
+        
+    Returns:
+        (影像, 縮放比例)；原圖座標 = 影像座標 / 縮放比例
+        
+    Raises:
+        FileNotFoundError: 檔案不存在
+        ValueError: 無法讀取影像或無效的 max_side
+    """
+    if max_side <= 0:
+        raise ValueError("max_side must be positive")
+    
+    size = get_image_file_size(file_path)
+    reduce = 1
+    if size is not None:
+        longest = max(size)
+        for factor in (8, 4, 2):
+            if longest / factor >= max_side:
+                reduce = factor
+                break
+    
+    img = read_image(file_path, grayscale=grayscale, use_mmap=use_mmap, reduce=reduce)
+    h, w = img.shape[:2]
+    original_width = size[0] if size is not None else w
+    
+    if max(h, w) > max_side:
+        ratio = max_side / max(h, w)
+        img = resize_image(img, width=max(1, int(round(w * ratio))),
+                           height=max(1, int(round(h * ratio))))
+    
+    return img, img.shape[1] / original_width
+
+
 def save_image(
     image: np.ndarray, 
     file_path: Union[str, Path]
@@ -214,3 +377,62 @@ def create_blank_image(
         raise ValueError("Channels must be 1 or 3")
     
     return img
+
+
+def compute_image_hash(image: np.ndarray) -> str:
+    """
+    計算影像內容雜湊（含尺寸與資料型別）
+    
+    Args:
+        image: 影像陣列
+        
+    Returns:
+        十六進位雜湊字串
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{image.shape}:{image.dtype}".encode('ascii'))
+    hasher.update(np.ascontiguousarray(image).data)
+    return hasher.hexdigest()
+
+
+def compute_perceptual_hash(image: np.ndarray, hash_size: int = 8, sample_side: int = 256) -> int:
+    """
+    計算影像的感知雜湊（DCT pHash）
+    
+    重新掃描或翻拍的同一份文件位元組不同，但 pHash 只相差少數位元：
+      1. 以整數步距取樣到長邊約 sample_side（不複製整張影像）
+      2. 轉灰階、以 INTER_AREA 縮到 (hash_size * 4) 見方
+      3. 取 DCT 左上 hash_size x hash_size 的低頻係數，與中位數比較得到位元
+    
+    Args:
+        image: 影像陣列（灰階、BGR 或 BGRA）
+        hash_size: 雜湊邊長（位元數為 hash_size ** 2）
+        sample_side: 縮圖前的取樣長邊
+        
+    Returns:
+        hash_size ** 2 位元的整數
+        
+    Raises:
+        ValueError: 空影像
+    """
+    if image is None or image.size == 0:
+        raise ValueError("Cannot hash an empty image")
+    
+    h, w = image.shape[:2]
+    step = max(1, max(h, w) // sample_side)
+    sample = np.ascontiguousarray(image[::step, ::step])
+    if sample.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if sample.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        sample = cv2.cvtColor(sample, code)
+    
+    side = hash_size * 4
+    small = cv2.resize(sample, (side, side), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:hash_size, :hash_size].flatten()
+    # 直流分量只反映整體亮度，不參與中位數
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """兩個雜湊之間不同的位元數"""
+    return bin(a ^ b).count('1')
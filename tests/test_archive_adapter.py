@@ -0,0 +1,179 @@
+"""
+測試 ArchiveImageAdapter - ZIP / tar 壓縮檔串流解碼
+"""
+
+import io
+import tarfile
+import zipfile
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.input import ArchiveImageAdapter
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "archive_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class PixelOCRAdapter:
+    """以左上角像素值產生發票號碼，用來確認成員順序"""
+
+    def recognize(self, image):
+        value = int(image[0, 0, 0])
+        return [((100, 100, 300, 50), (f"AB{value:08d}", 0.95))]
+
+
+def encode_png(value, size=(1000, 1000)):
+    """產生以指定像素值填滿的 PNG"""
+    image = np.full((size[0], size[1], 3), value, dtype=np.uint8)
+    ok, data = cv2.imencode('.png', image)
+    assert ok
+    return data.tobytes()
+
+
+@pytest.fixture
+def members():
+    return {
+        "batch/a.png": encode_png(10),
+        "batch/b.png": encode_png(20),
+        "batch/readme.txt": b"not an image",
+    }
+
+
+def write_zip(path, members, compression):
+    with zipfile.ZipFile(path, "w", compression=compression) as archive:
+        archive.writestr("batch/", b"")
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def write_tar(path, members, mode="w:gz"):
+    with tarfile.open(path, mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+class TestArchiveImageAdapter:
+    """ArchiveImageAdapter 測試"""
+
+    def test_stored_zip_members_are_zero_copy(self, tmp_path, members):
+        """測試：未壓縮的 ZIP 成員直接引用檔案映射"""
+        path = write_zip(tmp_path / "batch.zip", members, zipfile.ZIP_STORED)
+
+        with ArchiveImageAdapter(path) as archive:
+            items = list(archive.iter_members())
+            assert [name for name, _ in items] == ["batch/a.png", "batch/b.png"]
+            assert all(isinstance(data, memoryview) for _, data in items)
+            assert bytes(items[0][1]) == members["batch/a.png"]
+            del items
+
+    def test_deflated_zip_members(self, tmp_path, members):
+        """測試：壓縮的 ZIP 成員串流讀取後解碼"""
+        path = write_zip(tmp_path / "batch.zip", members, zipfile.ZIP_DEFLATED)
+
+        with ArchiveImageAdapter(path) as archive:
+            images = list(archive.iter_images())
+
+        assert [name for name, _ in images] == ["batch/a.png", "batch/b.png"]
+        assert images[1][1][0, 0, 0] == 20
+
+    def test_tar_gz(self, tmp_path, members):
+        """測試：tar.gz 串流讀取"""
+        path = write_tar(tmp_path / "batch.tar.gz", members)
+
+        with ArchiveImageAdapter(path, grayscale=True) as archive:
+            images = list(archive)
+
+        assert [name for name, _ in images] == ["batch/a.png", "batch/b.png"]
+        assert images[0][1].ndim == 2
+
+    def test_include_patterns(self, tmp_path, members):
+        """測試：以萬用字元模式選擇成員"""
+        path = write_zip(tmp_path / "batch.zip", members, zipfile.ZIP_STORED)
+
+        with ArchiveImageAdapter(path, include=["*/b.*"]) as archive:
+            names = [name for name, _ in archive.iter_members()]
+
+        assert names == ["batch/b.png"]
+
+    def test_invalid_input(self, tmp_path):
+        """測試：檔案不存在或不是壓縮檔"""
+        with pytest.raises(FileNotFoundError):
+            ArchiveImageAdapter(tmp_path / "missing.zip")
+
+        path = tmp_path / "plain.bin"
+        path.write_bytes(b"plain data" * 100)
+        with pytest.raises(ValueError):
+            ArchiveImageAdapter(path)
+
+    def test_corrupt_member_raises(self, tmp_path):
+        """測試：無法解碼的成員"""
+        path = write_zip(tmp_path / "bad.zip", {"bad.jpg": b"garbage"}, zipfile.ZIP_STORED)
+
+        with ArchiveImageAdapter(path) as archive:
+            with pytest.raises(ValueError):
+                list(archive.iter_images())
+
+
+class TestOrchestratorArchive:
+    """Orchestrator.process_archive / process_stream 測試"""
+
+    @pytest.mark.parametrize("kind", ["stored", "deflated", "tar"])
+    def test_process_archive(self, tmp_path, members, kind):
+        """測試：成員名稱作為文件 ID"""
+        if kind == "tar":
+            path = write_tar(tmp_path / "batch.tar.gz", members)
+        else:
+            compression = zipfile.ZIP_STORED if kind == "stored" else zipfile.ZIP_DEFLATED
+            path = write_zip(tmp_path / "batch.zip", members, compression)
+        orchestrator = Orchestrator(PixelOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        results = list(orchestrator.process_archive(path))
+
+        assert [r["document_id"] for r in results] == ["batch/a.png", "batch/b.png"]
+        assert results[0]["fields"]["invoice_number"]["text"] == "AB00000010"
+        assert results[1]["fields"]["invoice_number"]["text"] == "AB00000020"
+
+    def test_process_stream_is_lazy(self):
+        """測試：停止迭代後不再取用後續文件"""
+        consumed = []
+
+        def documents():
+            for value in (1, 2, 3):
+                consumed.append(value)
+                yield f"doc-{value}", np.full((1000, 1000, 3), value, dtype=np.uint8)
+
+        orchestrator = Orchestrator(PixelOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        stream = orchestrator.process_stream(documents())
+        first = next(stream)
+        stream.close()
+
+        assert first["document_id"] == "doc-1"
+        assert consumed == [1]
+
+    def test_process_without_document_id(self):
+        """測試：未指定 document_id 時結果不含該鍵"""
+        orchestrator = Orchestrator(PixelOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8))
+
+        assert "document_id" not in result
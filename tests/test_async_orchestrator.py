@@ -0,0 +1,197 @@
+"""
+測試 AsyncOrchestrator - asyncio 原生的 OCR 流程編排器
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.async_orchestrator import AsyncOrchestrator
+
+
+TEMPLATE = {
+    "template_id": "async_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}"
+        }
+    }
+}
+
+
+class SlowOCRAdapter:
+    """模擬耗時的 OCR 引擎，並記錄同時執行數"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def recognize(self, image, **options):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [((100, 100, 150, 30), ("AB12345678", 0.95))]
+
+
+class TestAsyncOrchestrator:
+    """AsyncOrchestrator 測試"""
+
+    def test_init_requires_ocr_adapter(self):
+        with pytest.raises(ValueError, match="ocr_adapter is required"):
+            AsyncOrchestrator(None)
+
+    def test_max_concurrency_cannot_exceed_adapters(self):
+        with pytest.raises(ValueError, match="pool size"):
+            AsyncOrchestrator([SlowOCRAdapter()], max_concurrency=2)
+
+    def test_process_without_template_raises_error(self):
+        orchestrator = AsyncOrchestrator(SlowOCRAdapter())
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        with pytest.raises(ValueError, match="No template loaded"):
+            asyncio.run(orchestrator.process(img))
+
+    def test_template_file_reloads_on_every_slot(self, tmp_path):
+        path = tmp_path / "template.json"
+        path.write_text(json.dumps(TEMPLATE), encoding="utf-8")
+        orchestrator = AsyncOrchestrator([SlowOCRAdapter(), SlowOCRAdapter()])
+        orchestrator.load_template(path)
+        path.write_text(json.dumps({**TEMPLATE, "template_id": "async_test_v2"}),
+                        encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        ids = [slot._current_template()["template_id"] for slot in orchestrator._slots]
+
+        assert ids == ["async_test_v2", "async_test_v2"]
+
+    def test_process_image_array(self):
+        async def run():
+            async with AsyncOrchestrator(SlowOCRAdapter(delay=0)) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                return await orchestrator.process(np.ones((1000, 1000, 3), dtype=np.uint8))
+
+        result = asyncio.run(run())
+
+        assert result["template_id"] == "async_test_v1"
+        assert result["fields"]["invoice_number"]["text"] == "AB12345678"
+
+    def test_process_image_path(self, tmp_path):
+        img_path = tmp_path / "invoice.png"
+        cv2.imwrite(str(img_path), np.ones((1000, 1000, 3), dtype=np.uint8) * 255)
+
+        async def run():
+            async with AsyncOrchestrator(SlowOCRAdapter(delay=0)) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                return await orchestrator.process(img_path)
+
+        assert asyncio.run(run())["template_id"] == "async_test_v1"
+
+    def test_path_is_decoded_through_image_loader(self, tmp_path):
+        """路徑輸入在槽位外解碼進載入器快取，process() 仍收到路徑"""
+        img_path = tmp_path / "invoice.png"
+        cv2.imwrite(str(img_path), np.full((1000, 1000, 3), 255, dtype=np.uint8))
+        orchestrator = AsyncOrchestrator(SlowOCRAdapter(delay=0))
+        orchestrator.load_template(TEMPLATE)
+
+        async def run():
+            async with orchestrator:
+                return await orchestrator.process(img_path)
+
+        asyncio.run(run())
+
+        stats = orchestrator._slots[0].image_loader.stats()
+        assert (stats['misses'], stats['hits']) == (1, 1)
+
+    def test_reduced_decode_is_honored(self, tmp_path):
+        """reduced_decode 時不先完整解碼，bbox 仍為原圖座標"""
+        img_path = tmp_path / "invoice.png"
+        cv2.imwrite(str(img_path), np.full((2000, 4000, 3), 255, dtype=np.uint8))
+        orchestrator = AsyncOrchestrator(
+            SlowOCRAdapter(delay=0), profile="fast", reduced_decode=True
+        )
+        orchestrator.load_template(TEMPLATE)
+
+        async def run():
+            async with orchestrator:
+                return await orchestrator.process(img_path)
+
+        result = asyncio.run(run())
+
+        assert orchestrator._slots[0].image_loader.stats()['misses'] == 0
+        x, y, w, h = result["fields"]["invoice_number"]["bbox"]
+        assert x > 100 and w > 150
+
+    def test_process_missing_file(self, tmp_path):
+        async def run():
+            async with AsyncOrchestrator(SlowOCRAdapter(delay=0)) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                await orchestrator.process(tmp_path / "missing.png")
+
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(run())
+
+    def test_process_many_respects_concurrency_limit(self):
+        adapters = [SlowOCRAdapter(), SlowOCRAdapter()]
+
+        async def run():
+            async with AsyncOrchestrator(adapters) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                images = [np.ones((1000, 1000, 3), dtype=np.uint8)] * 6
+                return await orchestrator.process_many(images)
+
+        results = asyncio.run(run())
+
+        assert len(results) == 6
+        assert sum(a.calls for a in adapters) == 6
+        assert all(a.max_active == 1 for a in adapters)
+
+    def test_event_loop_not_blocked(self):
+        async def run():
+            async with AsyncOrchestrator(SlowOCRAdapter(delay=0.2)) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                task = asyncio.ensure_future(
+                    orchestrator.process(np.ones((1000, 1000, 3), dtype=np.uint8))
+                )
+                ticks = 0
+                while not task.done():
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+                await task
+                return ticks
+
+        assert asyncio.run(run()) > 5
+
+    def test_cancel_queued_job_frees_slot(self):
+        adapter = SlowOCRAdapter(delay=0.1)
+
+        async def run():
+            async with AsyncOrchestrator(adapter) as orchestrator:
+                orchestrator.load_template(TEMPLATE)
+                img = np.ones((1000, 1000, 3), dtype=np.uint8)
+                first = asyncio.ensure_future(orchestrator.process(img))
+                queued = asyncio.ensure_future(orchestrator.process(img))
+                await asyncio.sleep(0.01)
+                queued.cancel()
+                await first
+                with pytest.raises(asyncio.CancelledError):
+                    await queued
+                await asyncio.sleep(0.01)
+                return orchestrator.in_flight
+
+        assert asyncio.run(run()) == 0
+        assert adapter.calls == 1
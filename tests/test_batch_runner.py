@@ -0,0 +1,202 @@
+"""
+測試 BatchRunner - 可續跑的批次處理
+"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.core import batch_runner
+from ocr_pipeline.core.batch_runner import BatchRunner, CheckpointStore
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "batch_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class Crash(BaseException):
+    """模擬程序中斷（不會被當成單一文件的失敗）"""
+
+
+class MockOCRAdapter:
+    """記錄呼叫次數；左上角像素值在 crash_on 中時模擬程序中斷"""
+
+    def __init__(self, crash_on=()):
+        self.calls = 0
+        self.crash_on = set(crash_on)
+
+    def recognize(self, image):
+        self.calls += 1
+        if int(image[0, 0, 0]) in self.crash_on:
+            raise Crash()
+        return [((100, 100, 300, 50), ("AB12345678", 0.95))]
+
+
+def make_orchestrator(adapter):
+    orchestrator = Orchestrator(adapter)
+    orchestrator.load_template(TEMPLATE)
+    return orchestrator
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for value in range(6):
+        path = tmp_path / f"doc{value}.png"
+        cv2.imwrite(str(path), np.full((1000, 1000, 3), value, dtype=np.uint8))
+        paths.append(path)
+    return paths
+
+
+class TestBatchRunner:
+    """BatchRunner 測試"""
+
+    def test_restart_skips_completed_without_hashing(self, tmp_path, image_paths, monkeypatch):
+        """測試：重新執行時已完成的檔案只需 stat 即可略過"""
+        checkpoint = tmp_path / "ckpt.db"
+        adapter = MockOCRAdapter()
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths)
+        assert summary == {'processed': 6, 'failed': 0, 'skipped': 0, 'given_up': 0}
+
+        hashed = []
+        monkeypatch.setattr(batch_runner, "compute_file_hash", lambda p: hashed.append(p))
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths)
+
+        assert summary['skipped'] == 6
+        assert adapter.calls == 6
+        assert hashed == []
+
+    def test_resume_after_crash(self, tmp_path, image_paths):
+        """測試：中斷前已處理的文件會寫入檢查點，續跑時只處理剩下的"""
+        checkpoint = tmp_path / "ckpt.db"
+        runner = BatchRunner(make_orchestrator(MockOCRAdapter(crash_on={3})), checkpoint,
+                             flush_every=2)
+        with pytest.raises(Crash):
+            runner.run(image_paths)
+
+        adapter = MockOCRAdapter()
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths)
+
+        assert summary == {'processed': 3, 'failed': 0, 'skipped': 3, 'given_up': 0}
+        assert adapter.calls == 3
+
+    def test_flush_every_batches_writes(self, tmp_path, image_paths, monkeypatch):
+        """測試：每 flush_every 份文件寫入一次"""
+        writes = []
+        original = CheckpointStore.record_many
+
+        def counting(self, records):
+            writes.append(len(records))
+            original(self, records)
+
+        monkeypatch.setattr(CheckpointStore, "record_many", counting)
+        BatchRunner(make_orchestrator(MockOCRAdapter()), tmp_path / "ckpt.db",
+                    flush_every=4).run(image_paths)
+
+        assert writes == [4, 2]
+
+    def test_failures_retry_up_to_limit(self, tmp_path, image_paths):
+        """測試：失敗的文件在之後的執行中重試，達到上限後放棄"""
+        checkpoint = tmp_path / "ckpt.db"
+        broken = tmp_path / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        inputs = [image_paths[0], broken]
+        summaries = [
+            BatchRunner(make_orchestrator(MockOCRAdapter()), checkpoint, max_attempts=2).run(inputs)
+            for _ in range(3)
+        ]
+
+        assert summaries[0] == {'processed': 1, 'failed': 1, 'skipped': 0, 'given_up': 0}
+        assert summaries[1] == {'processed': 0, 'failed': 1, 'skipped': 1, 'given_up': 0}
+        assert summaries[2] == {'processed': 0, 'failed': 0, 'skipped': 1, 'given_up': 1}
+        with CheckpointStore(checkpoint) as store:
+            assert "ValueError" in store.errors()[str(broken)]
+
+    def test_missing_file_gives_up(self, tmp_path):
+        """測試：不存在的檔案同樣累計失敗次數，達到上限後放棄"""
+        checkpoint = tmp_path / "ckpt.db"
+        missing = tmp_path / "missing.png"
+        adapter = MockOCRAdapter()
+        summaries = [
+            BatchRunner(make_orchestrator(adapter), checkpoint, max_attempts=2).run([missing])
+            for _ in range(3)
+        ]
+
+        assert [s['failed'] for s in summaries] == [1, 1, 0]
+        assert summaries[2]['given_up'] == 1
+        with CheckpointStore(checkpoint) as store:
+            assert store.load()[str(missing)].attempts == 2
+
+    def test_done_file_temporarily_missing_keeps_checkpoint(self, tmp_path, image_paths):
+        """測試：已完成的檔案暫時不存在時保留完成狀態，不累計失敗次數"""
+        checkpoint = tmp_path / "ckpt.db"
+        adapter = MockOCRAdapter()
+        BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths[:2])
+
+        moved = tmp_path / "moved.png"
+        image_paths[0].rename(moved)
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths[:2])
+
+        assert summary == {'processed': 0, 'failed': 0, 'skipped': 2, 'given_up': 0}
+        with CheckpointStore(checkpoint) as store:
+            record = store.load()[str(image_paths[0])]
+            assert (record.status, record.attempts) == ("done", 1)
+
+        moved.rename(image_paths[0])
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths[:2])
+
+        assert summary['skipped'] == 2
+        assert adapter.calls == 2
+
+    def test_changed_content_is_reprocessed(self, tmp_path, image_paths):
+        """測試：只有 mtime 改變時略過，內容改變時重新處理"""
+        checkpoint = tmp_path / "ckpt.db"
+        adapter = MockOCRAdapter()
+        BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths[:2])
+
+        stat = os.stat(image_paths[0])
+        os.utime(image_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+        cv2.imwrite(str(image_paths[1]), np.full((1000, 1000, 3), 99, dtype=np.uint8))
+
+        summary = BatchRunner(make_orchestrator(adapter), checkpoint).run(image_paths[:2])
+
+        assert summary == {'processed': 1, 'failed': 0, 'skipped': 1, 'given_up': 0}
+        assert adapter.calls == 3
+
+    def test_in_memory_inputs_with_ids(self, tmp_path):
+        """測試：陣列與已編碼資料需提供輸入 ID，以內容雜湊判斷是否已完成"""
+        image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        encoded = cv2.imencode('.png', image)[1].tobytes()
+        inputs = [("array-1", image), ("bytes-1", encoded)]
+        received = []
+        adapter = MockOCRAdapter()
+        runner = BatchRunner(make_orchestrator(adapter), tmp_path / "ckpt.db",
+                             on_result=lambda input_id, result: received.append(
+                                 (input_id, result["document_id"])))
+
+        assert runner.run(inputs)['processed'] == 2
+        assert runner.run(inputs)['skipped'] == 2
+        assert received == [("array-1", "array-1"), ("bytes-1", "bytes-1")]
+        assert adapter.calls == 2
+
+        with pytest.raises(ValueError):
+            runner.run([image])
+
+    def test_invalid_arguments(self, tmp_path):
+        """測試：無效參數"""
+        orchestrator = make_orchestrator(MockOCRAdapter())
+        with pytest.raises(ValueError):
+            BatchRunner(orchestrator, tmp_path / "ckpt.db", flush_every=0)
+        with pytest.raises(ValueError):
+            BatchRunner(orchestrator, tmp_path / "ckpt.db", max_attempts=0)
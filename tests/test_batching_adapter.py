@@ -0,0 +1,188 @@
+"""
+測試 BatchingOCRAdapter - 微批次請求合併器
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.ocr.batching_adapter import BatchingOCRAdapter
+from ocr_pipeline.adapters.ocr.paddleocr_adapter import PaddleOCRAdapter
+
+
+class WorkerCrash(BaseException):
+    """模擬逐張重試也攔不住的批次層級錯誤"""
+
+
+class BatchRecordingOCR:
+    """記錄每次批次大小的模擬引擎（以影像第一個像素值作為識別結果）"""
+
+    def __init__(self, fail_on=None, crash=False):
+        self.batch_sizes = []
+        self.fail_on = fail_on
+        self.crash = crash
+        self.config = {"lang": "test"}
+
+    def _recognize_one(self, image):
+        value = int(image[0, 0, 0])
+        if value == self.fail_on:
+            raise ValueError(f"bad image {value}")
+        return [((0, 0, 10, 10), (str(value), 0.9))]
+
+    def recognize(self, image):
+        self.batch_sizes.append(1)
+        if self.crash:
+            raise WorkerCrash()
+        return self._recognize_one(image)
+
+    def recognize_batch(self, images):
+        self.batch_sizes.append(len(images))
+        time.sleep(0.01)
+        if self.crash:
+            raise WorkerCrash()
+        return [self._recognize_one(image) for image in images]
+
+
+def make_image(value):
+    return np.full((120, 120, 3), value, dtype=np.uint8)
+
+
+def run_concurrently(adapter, values):
+    """多執行緒同時呼叫 recognize，回傳 {value: result or exception}"""
+    results = {}
+    barrier = threading.Barrier(len(values))
+
+    def call(value):
+        barrier.wait()
+        try:
+            results[value] = adapter.recognize(make_image(value))
+        except Exception as e:
+            results[value] = e
+
+    threads = [threading.Thread(target=call, args=(v,)) for v in values]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestBatchingOCRAdapter:
+    """微批次適配器測試"""
+
+    def test_init_validation(self):
+        with pytest.raises(ValueError, match="ocr_adapter is required"):
+            BatchingOCRAdapter(None)
+        with pytest.raises(ValueError, match="max_batch_size"):
+            BatchingOCRAdapter(BatchRecordingOCR(), max_batch_size=0)
+
+    def test_single_request(self):
+        inner = BatchRecordingOCR()
+        with BatchingOCRAdapter(inner, max_wait_ms=1) as adapter:
+            result = adapter.recognize(make_image(7))
+
+        assert result == [((0, 0, 10, 10), ("7", 0.9))]
+        assert inner.batch_sizes == [1]
+
+    def test_concurrent_requests_are_batched(self):
+        inner = BatchRecordingOCR()
+        with BatchingOCRAdapter(inner, max_batch_size=8, max_wait_ms=50) as adapter:
+            results = run_concurrently(adapter, list(range(1, 7)))
+            stats = adapter.stats()
+
+        # 每個呼叫者拿到自己的結果
+        for value, result in results.items():
+            assert result[0][1][0] == str(value)
+        assert max(inner.batch_sizes) > 1
+        assert stats["items"] == 6
+        assert stats["batches"] < 6
+
+    def test_max_batch_size_respected(self):
+        inner = BatchRecordingOCR()
+        with BatchingOCRAdapter(inner, max_batch_size=2, max_wait_ms=50) as adapter:
+            run_concurrently(adapter, list(range(1, 6)))
+
+        assert max(inner.batch_sizes) <= 2
+
+    def test_failed_batch_isolates_exception(self):
+        inner = BatchRecordingOCR(fail_on=3)
+        with BatchingOCRAdapter(inner, max_wait_ms=50) as adapter:
+            results = run_concurrently(adapter, [1, 2, 3, 4])
+
+        assert isinstance(results[3], ValueError)
+        assert results[1][0][1][0] == "1"
+        assert results[4][0][1][0] == "4"
+
+    def test_worker_failure_fails_all_pending_requests(self):
+        """測試：派送迴圈出錯時所有等待中的請求都收到例外，之後的呼叫直接失敗"""
+        adapter = BatchingOCRAdapter(BatchRecordingOCR(crash=True), max_wait_ms=50)
+        results = {}
+        barrier = threading.Barrier(4)
+
+        def call(value):
+            barrier.wait()
+            try:
+                results[value] = adapter.recognize(make_image(value))
+            except BaseException as e:
+                results[value] = e
+
+        threads = [threading.Thread(target=call, args=(v,)) for v in range(1, 5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert not any(t.is_alive() for t in threads)
+        assert len(results) == 4
+        assert all(isinstance(r, (WorkerCrash, RuntimeError)) for r in results.values())
+        assert any(isinstance(r, WorkerCrash) for r in results.values())
+        with pytest.raises(RuntimeError, match="worker stopped"):
+            adapter.recognize(make_image(5))
+        adapter.close()
+
+    def test_delegates_attributes(self):
+        adapter = BatchingOCRAdapter(BatchRecordingOCR())
+        assert adapter.config == {"lang": "test"}
+
+    def test_recognize_after_close_raises(self):
+        adapter = BatchingOCRAdapter(BatchRecordingOCR())
+        adapter.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            adapter.recognize(make_image(1))
+
+
+class TestPaddleOCRAdapterBatch:
+    """PaddleOCRAdapter.recognize_batch 測試（模擬 PaddleOCR 引擎）"""
+
+    class FakePaddle:
+        def __init__(self):
+            self.inputs = []
+
+        def predict(self, input):
+            self.inputs.append(input)
+            return [
+                {"rec_polys": [[[0, 0], [1, 0], [1, 1], [0, 1]]],
+                 "rec_texts": [f"page{i}"], "rec_scores": [0.9]}
+                for i in range(len(input))
+            ]
+
+    def test_recognize_batch_single_predict_call(self):
+        adapter = PaddleOCRAdapter(config={"lang": "en"})
+        adapter._ocr = self.FakePaddle()
+
+        results = adapter.recognize_batch([make_image(1), make_image(2)])
+
+        assert len(adapter._ocr.inputs) == 1
+        assert [r[0][1][0] for r in results] == ["page0", "page1"]
+
+    def test_recognize_batch_rejects_small_image(self):
+        adapter = PaddleOCRAdapter(config={"lang": "en"})
+        adapter._ocr = self.FakePaddle()
+
+        with pytest.raises(ValueError, match="too small"):
+            adapter.recognize_batch([make_image(1), np.ones((50, 50, 3), dtype=np.uint8)])
+
+    def test_recognize_batch_empty(self):
+        assert PaddleOCRAdapter().recognize_batch([]) == []
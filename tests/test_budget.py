@@ -0,0 +1,118 @@
+"""
+測試 TimeBudget - 單一文件的處理時間預算
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.budget import TimeBudget
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "budget_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        },
+        "random_code": {
+            "rect_ratio": {"x": 0.6, "y": 0.6, "width": 0.2, "height": 0.05},
+            "pattern": r"^\d{4}$",
+            "required": True
+        },
+        "note": {
+            "rect_ratio": {"x": 0.1, "y": 0.5, "width": 0.3, "height": 0.05},
+            "pattern": r"[a-z]+",
+            "required": False
+        }
+    }
+}
+
+
+class SlowOCRAdapter:
+    """耗時的模擬 OCR：random_code 不在 ROI 內，需要第 3 層全圖搜尋"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [
+            ((100, 100, 300, 50), ("AB12345678", 0.95)),
+            ((100, 900, 100, 50), ("3472", 0.95)),
+            ((100, 500, 300, 50), ("memo", 0.9)),
+        ]
+
+
+class TestTimeBudget:
+    """TimeBudget 測試"""
+
+    def test_no_budget_never_expires(self):
+        budget = TimeBudget()
+        assert not budget.expired()
+        assert budget.remaining_ms() is None
+
+    def test_budget_expires(self):
+        budget = TimeBudget(10)
+        assert not budget.expired()
+        time.sleep(0.02)
+        assert budget.expired()
+        assert budget.remaining_ms() == 0.0
+
+    def test_negative_budget(self):
+        with pytest.raises(ValueError):
+            TimeBudget(-1)
+
+
+class TestOrchestratorBudget:
+    """Orchestrator budget_ms 測試"""
+
+    def test_without_budget_has_no_budget_keys(self):
+        orchestrator = Orchestrator(SlowOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8))
+
+        assert "incomplete" not in result
+        assert result["fields"]["random_code"]["text"] == "3472"
+
+    def test_generous_budget_is_complete(self):
+        orchestrator = Orchestrator(SlowOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8), budget_ms=10000)
+
+        assert result["incomplete"] is False
+        assert result["skipped_fields"] == []
+        assert result["fields"]["note"]["text"] == "memo"
+
+    def test_budget_spent_during_ocr_skips_refinement(self):
+        orchestrator = Orchestrator(SlowOCRAdapter(delay=0.05))
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8), budget_ms=10)
+
+        assert result["incomplete"] is True
+        # 必填欄位仍做 ROI 內搜尋
+        assert result["fields"]["invoice_number"]["text"] == "AB12345678"
+        # 需要全圖搜尋的必填欄位與非必填欄位被跳過
+        assert result["fields"]["random_code"] is None
+        assert result["fields"]["note"] is None
+        assert set(result["skipped_fields"]) == {"random_code", "note"}
+
+    def test_budget_spent_before_ocr_skips_ocr(self):
+        adapter = SlowOCRAdapter()
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8), budget_ms=0)
+
+        assert adapter.calls == 0
+        assert result["incomplete"] is True
+        assert all(value is None for value in result["fields"].values())
@@ -0,0 +1,248 @@
+"""
+測試提前結束規則（early_exit_score）與多頁處理
+"""
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.extractors import HybridExtractor
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.template.router import TemplateRouter
+
+
+TEMPLATE = {
+    "template_id": "early_exit_test_v1",
+    "regions": {
+        "note": {
+            "rect_ratio": {"x": 0.1, "y": 0.5, "width": 0.3, "height": 0.05},
+            "pattern": r"[a-z]+",
+            "required": False
+        },
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"([A-Z]{2}\d{8})",
+            "extract_group": 1,
+            "required": True
+        },
+        "random_code": {
+            "rect_ratio": {"x": 0.6, "y": 0.6, "width": 0.2, "height": 0.05},
+            "pattern": r"^\d{4}$",
+            "required": True
+        }
+    }
+}
+
+FULL_PAGE = [
+    ((100, 100, 300, 50), ("AB12345678", 0.95)),
+    ((600, 600, 200, 50), ("3472", 0.95)),
+    ((100, 500, 300, 50), ("memo", 0.9)),
+]
+
+
+class PageOCRAdapter:
+    """依影像左上角像素值（頁碼）回傳不同頁面的 OCR 結果"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def recognize(self, image):
+        page = int(image[0, 0, 0])
+        self.calls.append(page)
+        return self.pages[page]
+
+
+def _page(index):
+    image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    image[0, 0, 0] = index
+    return image
+
+
+class TestExtractorStopScore:
+    """HybridExtractor stop_score 測試"""
+
+    def test_skips_optional_when_required_satisfied(self):
+        extractor = HybridExtractor(PageOCRAdapter([FULL_PAGE]))
+        fields = extractor.extract_fields(_page(0), TEMPLATE, stop_score=0.8)
+
+        assert extractor.stopped_early is True
+        assert fields['note'] is None
+        assert fields['invoice_number']['text'] == 'AB12345678'
+        # 欄位順序維持範本順序
+        assert list(fields) == list(TEMPLATE['regions'])
+
+    def test_keeps_optional_when_required_below_score(self):
+        extractor = HybridExtractor(PageOCRAdapter([FULL_PAGE]))
+        fields = extractor.extract_fields(_page(0), TEMPLATE, stop_score=1.1)
+
+        assert extractor.stopped_early is False
+        assert fields['note']['text'] == 'memo'
+
+    def test_required_satisfied(self):
+        fields = {
+            'invoice_number': {'total_score': 0.9},
+            'random_code': {'total_score': 0.5},
+        }
+        assert HybridExtractor.required_satisfied(fields, TEMPLATE, 0.5)
+        assert not HybridExtractor.required_satisfied(fields, TEMPLATE, 0.6)
+        assert not HybridExtractor.required_satisfied({}, TEMPLATE, 0.0)
+
+
+class TestOrchestratorEarlyExit:
+    """Orchestrator early_exit_score 測試"""
+
+    def test_skip_optional(self):
+        orchestrator = Orchestrator(
+            PageOCRAdapter([FULL_PAGE]),
+            early_exit_score=0.8,
+            early_exit_skip_optional=True
+        )
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(_page(0))
+
+        assert result['early_exit'] is True
+        assert result['fields']['note'] is None
+
+    def test_optional_still_extracted_by_default(self):
+        orchestrator = Orchestrator(PageOCRAdapter([FULL_PAGE]), early_exit_score=0.8)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(_page(0))
+
+        assert result['early_exit'] is True
+        assert result['fields']['note']['text'] == 'memo'
+
+    def test_refine_skipped_after_early_exit(self):
+        orchestrator = Orchestrator(
+            PageOCRAdapter([FULL_PAGE]),
+            early_exit_score=0.5,
+            refine={'threshold': 1.1}
+        )
+        orchestrator.extractor.refine_fields = pytest.fail
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(_page(0))
+
+        assert result['refined_fields'] == []
+
+    def test_skip_optional_requires_score(self):
+        with pytest.raises(ValueError):
+            Orchestrator(PageOCRAdapter([FULL_PAGE]), early_exit_skip_optional=True)
+
+    def test_routed_stops_after_satisfying_candidate(self):
+        other = dict(TEMPLATE, template_id="early_exit_test_v2")
+        router = TemplateRouter()
+        router.add_templates([TEMPLATE, other])
+        orchestrator = Orchestrator(PageOCRAdapter([FULL_PAGE]), early_exit_score=0.8)
+
+        calls = []
+        original = orchestrator.extractor.extract_fields
+
+        def tracking(image, template, **kwargs):
+            calls.append(template['template_id'])
+            return original(image, template, **kwargs)
+
+        orchestrator.extractor.extract_fields = tracking
+        result = orchestrator.process_routed(_page(0), router)
+
+        assert len(result['routing']) == 2
+        assert len(calls) == 1
+
+
+class TestProcessPages:
+    """Orchestrator.process_pages 測試"""
+
+    def test_stops_after_first_page(self):
+        adapter = PageOCRAdapter([FULL_PAGE, FULL_PAGE, FULL_PAGE])
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+        decoded = []
+
+        def pages():
+            for index in range(3):
+                decoded.append(index)
+                yield _page(index)
+
+        result = orchestrator.process_pages(pages())
+
+        assert result['pages_processed'] == 1
+        assert result['early_exit'] is True
+        assert decoded == [0]
+        assert result['field_pages']['invoice_number'] == 0
+
+    def test_merges_fields_across_pages(self):
+        adapter = PageOCRAdapter([
+            [FULL_PAGE[0], FULL_PAGE[2]],
+            [],
+            [FULL_PAGE[1]],
+            FULL_PAGE,
+        ])
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_pages([_page(i) for i in range(4)])
+
+        assert adapter.calls == [0, 1, 2]
+        assert result['field_pages'] == {
+            'note': 0, 'invoice_number': 0, 'random_code': 2
+        }
+        assert result['fields']['random_code']['text'] == '3472'
+
+    def test_all_pages_when_required_missing(self):
+        adapter = PageOCRAdapter([[FULL_PAGE[0]], [FULL_PAGE[0]]])
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_pages([_page(0), _page(1)])
+
+        assert result['pages_processed'] == 2
+        assert result['early_exit'] is False
+        assert result['fields']['random_code'] is None
+
+    def test_expired_budget(self):
+        adapter = PageOCRAdapter([FULL_PAGE])
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_pages([_page(0), _page(0)], budget_ms=0)
+
+        assert adapter.calls == []
+        assert result['pages_processed'] == 1
+        assert result['incomplete'] is True
+
+    def test_no_required_fields_processes_all_pages(self):
+        """沒有必填欄位時不在第一頁就停止"""
+        template = {
+            "template_id": "optional_only_v1",
+            "regions": {"note": TEMPLATE["regions"]["note"]}
+        }
+        adapter = PageOCRAdapter([[FULL_PAGE[0]], [FULL_PAGE[2]], []])
+        orchestrator = Orchestrator(adapter, early_exit_score=0.5)
+        orchestrator.load_template(template)
+
+        result = orchestrator.process_pages([_page(i) for i in range(3)])
+
+        assert adapter.calls == [0, 1, 2]
+        assert result['early_exit'] is False
+        assert result['field_pages'] == {'note': 1}
+
+    def test_blank_page_resets_skipped_fields(self, monkeypatch):
+        """空白頁不沿用前一頁的跳過欄位"""
+        orchestrator = Orchestrator(PageOCRAdapter([]), quality_gate={})
+        orchestrator.load_template(TEMPLATE)
+        page_results = [{
+            'fields': {name: None for name in TEMPLATE['regions']},
+            'skipped_fields': ['random_code']
+        }]
+        monkeypatch.setattr(orchestrator, "_run", lambda *args: page_results.pop(0))
+        document = np.full((1000, 1000, 3), 255, dtype=np.uint8)
+        document[100:900:40, 100:900] = 0
+        blank = np.full((1000, 1000, 3), 240, dtype=np.uint8)
+
+        result = orchestrator.process_pages([document, blank], budget_ms=60000)
+
+        assert result['pages_processed'] == 2
+        assert result['page_quality'][1]['action'] == 'skip'
+        assert result['skipped_fields'] == []
+        assert result['incomplete'] is False
@@ -14,6 +14,10 @@ from ocr_pipeline.utils.file_utils import (
     get_file_extension,
     change_file_extension,
     list_files_in_directory,
+    iter_files,
+    match_any,
+    sniff_image_type,
+    compute_file_hash,
     is_image_file,
     get_relative_path,
     join_paths,
@@ -118,6 +122,22 @@ class TestFileUtils:
         
         assert len(files) == 2
 
+    @pytest.mark.parametrize("pattern, recursive, expected", [
+        ("sub/*.jpg", False, ["sub/b.jpg"]),
+        ("**/*.jpg", False, ["a.jpg", "sub/b.jpg"]),
+        ("**/*.jpg", True, ["a.jpg", "sub/b.jpg"]),
+        ("*.jpg", True, ["a.jpg", "sub/b.jpg"]),
+    ])
+    def test_list_files_glob_patterns(self, tmp_path, pattern, recursive, expected):
+        """測試：含路徑或 ** 的模式沿用 glob 語意"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "a.jpg").touch()
+        (tmp_path / "sub" / "b.jpg").touch()
+        
+        files = list_files_in_directory(tmp_path, pattern=pattern, recursive=recursive)
+        
+        assert sorted(f.relative_to(tmp_path).as_posix() for f in files) == expected
+
     def test_list_files_empty_directory(self, tmp_path):
         """測試：空目錄"""
         files = list_files_in_directory(tmp_path)
@@ -128,6 +148,115 @@ class TestFileUtils:
         with pytest.raises(FileNotFoundError):
             list_files_in_directory("/nonexistent/directory")
 
+    # ===== 檔案列舉（iter_files）測試 =====
+
+    @pytest.fixture
+    def sample_tree(self, tmp_path):
+        """建立測試用目錄結構"""
+        (tmp_path / "b.jpg").write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 8)
+        (tmp_path / "a.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8)
+        (tmp_path / "fake.jpg").write_bytes(b"not really a jpeg")
+        (tmp_path / "notes.txt").write_text("hello", encoding='utf-8')
+        sub = tmp_path / "sub"
+        sub.mkdir()
+        (sub / "c.tif").write_bytes(b"II*\x00" + b"\x00" * 8)
+        (sub / "d.webp").write_bytes(b"RIFF\x00\x00\x00\x00WEBPVP8 ")
+        skip = tmp_path / "tmp"
+        skip.mkdir()
+        (skip / "e.jpg").write_bytes(b"\xff\xd8\xff\xe0")
+        return tmp_path
+
+    def test_iter_files_is_generator(self, sample_tree):
+        """測試：iter_files 為產生器"""
+        files = iter_files(sample_tree)
+        
+        assert not isinstance(files, list)
+        assert isinstance(next(files), Path)
+
+    def test_iter_files_non_recursive(self, sample_tree):
+        """測試：只列出第一層檔案"""
+        names = {f.name for f in iter_files(sample_tree)}
+        
+        assert names == {"a.png", "b.jpg", "fake.jpg", "notes.txt"}
+
+    def test_iter_files_include_exclude(self, sample_tree):
+        """測試：包含與排除模式（排除的目錄不會進入）"""
+        names = {
+            f.name for f in iter_files(
+                sample_tree, include=["*.jpg", "*.tif"], exclude=["fake*", "tmp"],
+                recursive=True
+            )
+        }
+        
+        assert names == {"b.jpg", "c.tif"}
+
+    def test_iter_files_relative_path_pattern(self, sample_tree):
+        """測試：含 / 的模式比對相對路徑"""
+        files = list(iter_files(sample_tree, include=["sub/*"], recursive=True))
+        
+        assert {f.name for f in files} == {"c.tif", "d.webp"}
+
+    def test_match_any(self):
+        """測試：不含 / 的模式比對檔名，含 / 的模式比對相對路徑"""
+        assert match_any("a.jpg", "sub/a.jpg", ["*.png", "*.jpg"])
+        assert match_any("a.jpg", "sub/a.jpg", ["sub/*"])
+        assert not match_any("a.jpg", "other/a.jpg", ["sub/*"])
+        assert not match_any("a.jpg", "a.jpg", [])
+
+    def test_iter_files_sniff(self, sample_tree):
+        """測試：依檔頭篩選影像檔"""
+        names = {f.name for f in iter_files(sample_tree, sniff=True, recursive=True)}
+        
+        assert names == {"a.png", "b.jpg", "c.tif", "d.webp", "e.jpg"}
+
+    def test_iter_files_sorted(self, sample_tree):
+        """測試：排序輸出（目錄內檔案先於子目錄）"""
+        names = [f.name for f in iter_files(sample_tree, sort=True, recursive=True)]
+        
+        assert names == ["a.png", "b.jpg", "fake.jpg", "notes.txt", "c.tif", "d.webp", "e.jpg"]
+
+    def test_iter_files_sorted_in_chunks(self, tmp_path):
+        """測試：分批排序（每批內有序）"""
+        for name in ["d", "c", "b", "a"]:
+            (tmp_path / name).touch()
+        
+        names = [f.name for f in iter_files(tmp_path, sort=True, chunk_size=2)]
+        
+        assert sorted(names) == ["a", "b", "c", "d"]
+        assert names[0] < names[1] and names[2] < names[3]
+
+    def test_iter_files_invalid_arguments(self, tmp_path):
+        """測試：無效參數"""
+        with pytest.raises(FileNotFoundError):
+            next(iter_files(tmp_path / "missing"))
+        with pytest.raises(ValueError):
+            next(iter_files(tmp_path, chunk_size=0))
+
+    def test_sniff_image_type(self, sample_tree):
+        """測試：依檔頭判斷影像格式"""
+        assert sniff_image_type(sample_tree / "b.jpg") == "jpeg"
+        assert sniff_image_type(sample_tree / "a.png") == "png"
+        assert sniff_image_type(sample_tree / "sub" / "c.tif") == "tiff"
+        assert sniff_image_type(sample_tree / "sub" / "d.webp") == "webp"
+        assert sniff_image_type(sample_tree / "fake.jpg") is None
+        assert sniff_image_type(sample_tree / "missing.jpg") is None
+
+    def test_is_image_file_with_sniff(self, sample_tree):
+        """測試：is_image_file 檢查檔頭"""
+        assert is_image_file(sample_tree / "fake.jpg") is True
+        assert is_image_file(sample_tree / "fake.jpg", sniff=True) is False
+        assert is_image_file(sample_tree / "b.jpg", sniff=True) is True
+
+    def test_compute_file_hash(self, tmp_path):
+        """測試：分段讀取計算內容雜湊"""
+        import hashlib
+        path = tmp_path / "data.bin"
+        content = b"0123456789" * 1000
+        path.write_bytes(content)
+        
+        assert compute_file_hash(path, chunk_size=7) == hashlib.sha256(content).hexdigest()
+        assert compute_file_hash(path, algorithm='md5') == hashlib.md5(content).hexdigest()
+
     # ===== 影像檔案判斷測試 =====
 
     def test_is_image_file_valid_extensions(self):
@@ -0,0 +1,209 @@
+"""
+測試 HotFolderWatcher - 熱資料夾增量索引
+"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.input import HotFolderWatcher
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "hot_folder_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class FakeClock:
+    """可手動推進的時鐘"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MockOCRAdapter:
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return [((100, 100, 300, 50), ("AB12345678", 0.95))]
+
+
+def write_png(path, value=0):
+    image = np.full((1000, 1000, 3), value, dtype=np.uint8)
+    cv2.imwrite(str(path), image)
+    return path
+
+
+def age_directory(path, seconds=60):
+    """把目錄的 mtime 調到過去，避免落在「可能遺漏變更」的時間窗內"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    directory = tmp_path / "inbox"
+    directory.mkdir()
+    return directory
+
+
+class TestHotFolderWatcher:
+    """HotFolderWatcher 測試"""
+
+    def test_settle_interval(self, inbox, tmp_path):
+        """測試：大小維持不變 settle_seconds 後才交出"""
+        clock = FakeClock()
+        (inbox / "a.jpg").write_bytes(b"partial")
+        watcher = HotFolderWatcher(inbox, tmp_path / "index.db", settle_seconds=5, clock=clock)
+
+        assert watcher.poll() == []
+
+        clock.now += 3
+        (inbox / "a.jpg").write_bytes(b"partial, still copying")
+        assert watcher.poll() == []
+
+        clock.now += 4
+        assert watcher.poll() == []
+
+        clock.now += 2
+        assert watcher.poll() == [inbox / "a.jpg"]
+        # 已交出的檔案不會重複回傳
+        assert watcher.poll() == []
+        watcher.close()
+
+    def test_filters_and_subdirectories(self, inbox, tmp_path):
+        """測試：預設只取影像檔，遞迴監看子目錄並套用排除模式"""
+        (inbox / "a.jpg").write_bytes(b"a")
+        (inbox / "notes.txt").write_bytes(b"n")
+        (inbox / "branch1").mkdir()
+        (inbox / "branch1" / "b.png").write_bytes(b"b")
+        (inbox / "tmp").mkdir()
+        (inbox / "tmp" / "c.png").write_bytes(b"c")
+
+        with HotFolderWatcher(inbox, tmp_path / "index.db", exclude=["tmp"],
+                              settle_seconds=0) as watcher:
+            ready = watcher.poll()
+
+        assert ready == [inbox / "a.jpg", inbox / "branch1" / "b.png"]
+
+    def test_done_files_survive_restart(self, inbox, tmp_path):
+        """測試：已完成的檔案重新啟動後不會再交出，未回報的檔案會重新交出"""
+        index = tmp_path / "index.db"
+        (inbox / "a.jpg").write_bytes(b"a")
+        (inbox / "b.jpg").write_bytes(b"b")
+
+        with HotFolderWatcher(inbox, index, settle_seconds=0) as watcher:
+            assert len(watcher.poll()) == 2
+            watcher.mark_done(inbox / "a.jpg")
+
+        with HotFolderWatcher(inbox, index, settle_seconds=0) as watcher:
+            assert watcher.poll() == [inbox / "b.jpg"]
+            assert watcher.status(inbox / "a.jpg") == "done"
+
+    def test_touched_file_with_same_content_is_skipped(self, inbox, tmp_path):
+        """測試：內容不變的檔案（只更新 mtime）不會再處理；內容改變才會"""
+        path = inbox / "a.jpg"
+        path.write_bytes(b"content")
+        watcher = HotFolderWatcher(inbox, tmp_path / "index.db", settle_seconds=0)
+        assert watcher.poll() == [path]
+        watcher.mark_done(path)
+
+        path.write_bytes(b"content")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 5_000_000_000))
+        watcher.rescan_all()
+        assert watcher.poll() == []
+        assert watcher.status(path) == "done"
+
+        path.write_bytes(b"new content")
+        watcher.rescan_all()
+        assert watcher.poll() == [path]
+        watcher.close()
+
+    def test_unchanged_directories_are_not_listed(self, inbox, tmp_path, monkeypatch):
+        """測試：目錄 mtime 未改變時不重新列舉"""
+        (inbox / "branch1").mkdir()
+        (inbox / "branch1" / "a.jpg").write_bytes(b"a")
+        (inbox / "branch2").mkdir()
+        age_directory(inbox / "branch1")
+        age_directory(inbox / "branch2")
+        age_directory(inbox)
+        watcher = HotFolderWatcher(inbox, tmp_path / "index.db", settle_seconds=0)
+        assert len(watcher.poll()) == 1
+
+        listed = []
+        original = os.scandir
+
+        def counting_scandir(path):
+            listed.append(str(path))
+            return original(path)
+
+        monkeypatch.setattr(os, "scandir", counting_scandir)
+
+        assert watcher.poll() == []
+        assert listed == []
+
+        (inbox / "branch2" / "b.jpg").write_bytes(b"b")
+        assert watcher.poll() == [inbox / "branch2" / "b.jpg"]
+        assert listed == [str(inbox / "branch2")]
+        watcher.close()
+
+    def test_removed_files_are_forgotten(self, inbox, tmp_path):
+        """測試：等待中的檔案被移除後從索引刪除"""
+        clock = FakeClock()
+        path = inbox / "a.jpg"
+        path.write_bytes(b"a")
+        watcher = HotFolderWatcher(inbox, tmp_path / "index.db", settle_seconds=5, clock=clock)
+        watcher.poll()
+        assert watcher.counts() == {"pending": 1}
+
+        path.unlink()
+        watcher.poll()
+        assert watcher.counts() == {}
+        watcher.close()
+
+    def test_invalid_arguments(self, tmp_path):
+        """測試：無效參數"""
+        with pytest.raises(FileNotFoundError):
+            HotFolderWatcher(tmp_path / "missing", tmp_path / "index.db")
+        with pytest.raises(ValueError):
+            HotFolderWatcher(tmp_path, tmp_path / "index.db", settle_seconds=-1)
+
+
+class TestOrchestratorWatch:
+    """Orchestrator.watch 測試"""
+
+    def test_watch_processes_and_marks(self, inbox, tmp_path):
+        """測試：成功的檔案標記完成，失敗的檔案記錄錯誤"""
+        write_png(inbox / "a.png")
+        (inbox / "broken.jpg").write_bytes(b"not an image")
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        with HotFolderWatcher(tmp_path / "inbox", tmp_path / "index.db",
+                              settle_seconds=0) as watcher:
+            results = list(orchestrator.watch(watcher, poll_interval=0, max_polls=2))
+
+            assert [r["document_id"] for r in results] == [str(inbox / "a.png")]
+            assert results[0]["fields"]["invoice_number"]["text"] == "AB12345678"
+            assert watcher.status(inbox / "a.png") == "done"
+            assert watcher.status(inbox / "broken.jpg") == "failed"
+
+        with HotFolderWatcher(inbox, tmp_path / "index.db", settle_seconds=0) as watcher:
+            assert list(orchestrator.watch(watcher, poll_interval=0, max_polls=1)) == []
+        assert adapter.calls == 1
@@ -245,5 +245,29 @@ def test_ocr_cache():
     assert call_count == 2
 
 
+def test_max_fallback_layer():
+    """測試限制降級層數（跳過第三層全圖搜尋）"""
+    mock_ocr = MockOCRAdapter(results=[
+        ((900, 900, 50, 50), ('AB-12345678', 0.95))
+    ])
+    template = {
+        'regions': {
+            'invoice_number': {
+                'rect_ratio': {'x': 0.1, 'y': 0.1, 'width': 0.2, 'height': 0.05},
+                'pattern': r'[A-Z]{2}-\d{8}',
+                'required': True
+            }
+        }
+    }
+    fake_image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+    
+    extractor = HybridExtractor(mock_ocr)
+    assert extractor.extract_fields(fake_image, template)['invoice_number'] is not None
+    
+    extractor.clear_cache()
+    result = extractor.extract_fields(fake_image, template, max_fallback_layer=2)
+    assert result['invoice_number'] is None
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,208 @@
+"""
+測試 ImageLoader - 影像預取與快取
+"""
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.input import ImageLoader
+from ocr_pipeline.adapters.input import image_loader as image_loader_module
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.core.result_cache import ResultCache
+
+
+def _write(path, value, size=(100, 100)):
+    cv2.imwrite(str(path), np.full((size[1], size[0], 3), value, dtype=np.uint8))
+    return path
+
+
+@pytest.fixture
+def images(tmp_path):
+    return [_write(tmp_path / f"img_{i}.png", i * 10) for i in range(5)]
+
+
+@pytest.fixture
+def decode_log(monkeypatch):
+    """記錄實際解碼的檔案與執行緒"""
+    log = []
+    original = image_loader_module.read_image
+
+    def tracking(path, **kwargs):
+        log.append((os.path.basename(path), threading.current_thread().name))
+        return original(path, **kwargs)
+
+    monkeypatch.setattr(image_loader_module, "read_image", tracking)
+    return log
+
+
+class TestImageLoader:
+    """ImageLoader 測試"""
+
+    def test_cache_hit_skips_decode(self, images, decode_log):
+        with ImageLoader() as loader:
+            first = loader.load(images[0])
+            second = loader.load(images[0])
+
+            assert first is second
+            assert len(decode_log) == 1
+            stats = loader.stats()
+            assert stats['hits'] == 1 and stats['misses'] == 1
+            assert stats['hit_rate'] == 0.5
+            assert stats['cached_bytes'] == first.nbytes
+
+    def test_cached_arrays_are_read_only(self, images):
+        with ImageLoader() as loader:
+            image = loader.load(images[0])
+            with pytest.raises(ValueError):
+                image[0, 0] = 1
+
+    def test_modified_file_is_reloaded(self, images, decode_log):
+        with ImageLoader() as loader:
+            loader.load(images[0])
+            _write(images[0], 255, size=(120, 100))
+
+            image = loader.load(images[0])
+
+            assert image.shape == (100, 120, 3)
+            assert len(decode_log) == 2
+
+    def test_byte_bound_evicts_oldest(self, images):
+        one_image = 100 * 100 * 3
+        with ImageLoader(max_cache_bytes=one_image * 2) as loader:
+            for path in images[:3]:
+                loader.load(path)
+
+            stats = loader.stats()
+            assert stats['cached_items'] == 2
+            assert stats['evictions'] == 1
+            assert stats['cached_bytes'] <= one_image * 2
+
+    def test_zero_cache(self, images, decode_log):
+        with ImageLoader(max_cache_bytes=0) as loader:
+            loader.load(images[0])
+            loader.load(images[0])
+            assert len(decode_log) == 2
+            assert loader.stats()['cached_items'] == 0
+
+    def test_prefetch_decodes_in_background(self, images, decode_log):
+        with ImageLoader(max_workers=2) as loader:
+            assert loader.prefetch(images[1:3]) == 2
+            assert loader.prefetch(images[1:3]) == 0
+
+            image = loader.load(images[1])
+
+            assert int(image[0, 0, 0]) == 10
+            assert all(name.startswith("ocr-image-loader") for _, name in decode_log)
+            stats = loader.stats()
+            assert stats['prefetch_hits'] == 1
+            assert stats['misses'] == 0
+
+    def test_finished_prefetch_leaves_pending(self, images):
+        """預取結果放進快取後不再留在 _pending，未被 load() 取用也不會累積"""
+        with ImageLoader() as loader:
+            loader.prefetch(images)
+            deadline = time.monotonic() + 5
+            while loader.stats()['cached_items'] < len(images) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert loader.stats()['cached_items'] == len(images)
+            assert loader._pending == {}
+            loader.load(images[0])
+            assert loader.stats()['prefetch_hits'] == 1
+
+    def test_prefetch_without_cache_still_hands_over(self, images, decode_log):
+        with ImageLoader(max_cache_bytes=0) as loader:
+            loader.prefetch([images[0]])
+            loader.load(images[0])
+            assert len(decode_log) == 1
+
+    def test_prefetch_skips_missing_files(self, images, tmp_path):
+        with ImageLoader() as loader:
+            assert loader.prefetch([tmp_path / "missing.png"]) == 0
+            with pytest.raises(FileNotFoundError):
+                loader.load(tmp_path / "missing.png")
+
+    def test_prefetch_error_raised_on_load(self, tmp_path):
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        with ImageLoader() as loader:
+            loader.prefetch([broken])
+            with pytest.raises(ValueError):
+                loader.load(broken)
+
+    def test_iter_images(self, images):
+        with ImageLoader() as loader:
+            values = [int(img[0, 0, 0]) for _, img in loader.iter_images(images, lookahead=2)]
+
+            assert values == [0, 10, 20, 30, 40]
+            assert loader.stats()['prefetch_hits'] == 4
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            ImageLoader(max_workers=0)
+        with pytest.raises(ValueError):
+            ImageLoader(max_cache_bytes=-1)
+
+
+class EchoOCRAdapter:
+    def recognize(self, image, **options):
+        return []
+
+
+class TestOrchestratorImageLoader:
+    """Orchestrator 使用 ImageLoader"""
+
+    TEMPLATE = {"template_id": "loader_test_v1", "regions": {}}
+
+    def test_path_inputs_use_loader(self, images, decode_log):
+        orchestrator = Orchestrator(EchoOCRAdapter())
+        orchestrator.load_template(self.TEMPLATE)
+
+        orchestrator.process(images[0])
+        orchestrator.process(images[0])
+
+        assert len(decode_log) == 1
+        assert orchestrator.image_loader.stats()['hits'] == 1
+
+    def test_process_many_prefetches(self, images):
+        orchestrator = Orchestrator(EchoOCRAdapter())
+        orchestrator.load_template(self.TEMPLATE)
+
+        results = orchestrator.process_many(images + [np.zeros((10, 10, 3), np.uint8)])
+
+        assert len(results) == 6
+        assert orchestrator.image_loader.stats()['prefetch_hits'] == 4
+
+    def test_process_many_skips_prefetch_for_reduced_decode(self, images, decode_log):
+        orchestrator = Orchestrator(EchoOCRAdapter(), profile="fast", reduced_decode=True)
+        orchestrator.load_template(self.TEMPLATE)
+
+        orchestrator.process_many(images)
+
+        assert decode_log == []
+        assert orchestrator.image_loader._pending == {}
+        assert orchestrator.image_loader.stats()['cached_items'] == 0
+
+    def test_process_many_skips_prefetch_for_cached_results(self, images, decode_log):
+        orchestrator = Orchestrator(
+            EchoOCRAdapter(), result_cache=ResultCache(),
+            image_loader=ImageLoader(max_cache_bytes=0)
+        )
+        orchestrator.load_template(self.TEMPLATE)
+        orchestrator.process_many(images)
+        decoded = len(decode_log)
+
+        results = orchestrator.process_many(images)
+
+        assert all(result['cache_hit'] for result in results)
+        assert len(decode_log) == decoded
+        assert orchestrator.image_loader._pending == {}
+
+    def test_pool_shares_loader(self):
+        pool = Orchestrator.create_pool([EchoOCRAdapter(), EchoOCRAdapter()])
+        assert pool[0].image_loader is pool[1].image_loader
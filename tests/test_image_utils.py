@@ -12,6 +12,9 @@ import numpy as np
 from pathlib import Path
 from ocr_pipeline.utils.image_utils import (
     read_image,
+    read_image_from_buffer,
+    read_image_reduced,
+    get_image_file_size,
     save_image,
     resize_image,
     convert_to_grayscale,
@@ -72,6 +75,126 @@ class TestImageUtils:
         with pytest.raises(ValueError):
             read_image(invalid_file)
 
+    def test_read_image_with_mmap(self, temp_image_file, sample_image_array):
+        """測試：以記憶體映射讀取影像"""
+        img = read_image(temp_image_file, use_mmap=True)
+        
+        assert np.array_equal(img, sample_image_array)
+
+    def test_read_empty_file_with_mmap(self, tmp_path):
+        """測試：空檔案以記憶體映射讀取應拋出錯誤"""
+        empty = tmp_path / "empty.png"
+        empty.write_bytes(b"")
+        
+        with pytest.raises(ValueError):
+            read_image(empty, use_mmap=True)
+
+    def test_read_corrupt_file_with_mmap(self, tmp_path):
+        """測試：損壞的檔案以記憶體映射讀取應拋出 ValueError（而非 BufferError）"""
+        corrupt = tmp_path / "corrupt.jpg"
+        corrupt.write_bytes(b"\xff\xd8" + b"\x00" * 1024)
+        
+        with pytest.raises(ValueError):
+            read_image(corrupt, use_mmap=True)
+
+    # ===== 縮小解碼測試 =====
+
+    @pytest.fixture
+    def large_jpeg(self, tmp_path):
+        """建立 4000x3000 的 JPEG"""
+        import cv2
+        image_path = tmp_path / "large.jpg"
+        img = np.zeros((3000, 4000, 3), dtype=np.uint8)
+        img[:, 2000:] = 255
+        cv2.imwrite(str(image_path), img)
+        return image_path
+
+    @pytest.mark.parametrize("reduce", [2, 4, 8])
+    def test_read_image_reduce(self, large_jpeg, reduce):
+        """測試：解碼時直接縮小"""
+        img = read_image(large_jpeg, reduce=reduce)
+        
+        assert img.shape == (3000 // reduce, 4000 // reduce, 3)
+
+    def test_read_image_reduce_grayscale(self, large_jpeg):
+        """測試：灰階縮小解碼"""
+        assert read_image(large_jpeg, grayscale=True, reduce=4).shape == (750, 1000)
+
+    def test_read_image_invalid_reduce(self, large_jpeg):
+        """測試：不支援的縮小倍率"""
+        with pytest.raises(ValueError):
+            read_image(large_jpeg, reduce=3)
+
+    def test_get_image_file_size(self, large_jpeg, tmp_path):
+        """測試：只讀檔頭取得尺寸"""
+        assert get_image_file_size(large_jpeg) == (4000, 3000)
+        
+        invalid = tmp_path / "invalid.jpg"
+        invalid.write_bytes(b"not an image")
+        assert get_image_file_size(invalid) is None
+
+    def test_read_image_reduced_exif_orientation(self, tmp_path):
+        """測試：EXIF 方向 6（旋轉 90 度）時以旋轉後的寬度計算縮放比例"""
+        from PIL import Image
+        path = tmp_path / "rotated.jpg"
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        Image.new("RGB", (3000, 1000), "white").save(path, exif=exif.tobytes())
+        
+        assert get_image_file_size(path) == (1000, 3000)
+        img, scale = read_image_reduced(path, 800)
+        
+        assert img.shape[:2] == (800, 267)
+        assert scale == pytest.approx(267 / 1000)
+
+    @pytest.mark.parametrize("max_side, expected_shape, expected_scale", [
+        (1000, (750, 1000), 0.25),   # 剛好 1/4
+        (1280, (960, 1280), 0.32),   # 1/2 解碼後再縮小
+        (5000, (3000, 4000), 1.0),   # 不需縮小
+    ])
+    def test_read_image_reduced(self, large_jpeg, max_side, expected_shape, expected_scale):
+        """測試：縮小到長邊上限並回傳縮放比例"""
+        img, scale = read_image_reduced(large_jpeg, max_side)
+        
+        assert img.shape[:2] == expected_shape
+        assert scale == pytest.approx(expected_scale)
+        # 座標換算回原圖：黑白交界在 x=2000
+        boundary = int(np.argmax(img[0, :, 0] > 127))
+        assert abs(boundary / scale - 2000) <= 1 / scale + 1
+
+    def test_read_image_reduced_invalid_max_side(self, large_jpeg):
+        """測試：無效的長邊上限"""
+        with pytest.raises(ValueError):
+            read_image_reduced(large_jpeg, 0)
+
+    # ===== 緩衝區解碼測試 =====
+
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+    def test_read_image_from_buffer(self, temp_image_file, sample_image_array, wrap):
+        """測試：從記憶體中的已編碼影像解碼"""
+        img = read_image_from_buffer(wrap(temp_image_file.read_bytes()))
+        
+        assert np.array_equal(img, sample_image_array)
+
+    def test_read_image_from_mmap(self, temp_image_file):
+        """測試：從 mmap 解碼"""
+        import mmap
+        with open(temp_image_file, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            img = read_image_from_buffer(mapped, grayscale=True)
+        finally:
+            mapped.close()
+        
+        assert img.shape == (100, 100)
+
+    def test_read_image_from_invalid_buffer(self):
+        """測試：無法解碼的資料應拋出錯誤"""
+        with pytest.raises(ValueError):
+            read_image_from_buffer(b"not an image")
+        with pytest.raises(ValueError):
+            read_image_from_buffer(b"")
+
     # ===== 影像儲存測試 =====
 
     def test_save_image(self, tmp_path, sample_image_array):
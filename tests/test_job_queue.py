@@ -0,0 +1,229 @@
+"""
+測試 DirectoryJobQueue / QueueWorker - 目錄工作佇列與租約
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core import job_queue
+from ocr_pipeline.core.job_queue import DirectoryJobQueue, LeaseLostError, QueueWorker
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "queue_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class MockOCRAdapter:
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def recognize(self, image):
+        with self._lock:
+            self.calls += 1
+        return [((100, 100, 300, 50), ("AB12345678", np.float32(0.95)))]
+
+
+def make_orchestrator(adapter):
+    orchestrator = Orchestrator(adapter)
+    orchestrator.load_template(TEMPLATE)
+    return orchestrator
+
+
+def resolve(document_id):
+    """文件 ID -> 影像（以 'bad' 開頭的 ID 模擬找不到影像）"""
+    if document_id.startswith("bad"):
+        raise FileNotFoundError(document_id)
+    return np.zeros((1000, 1000, 3), dtype=np.uint8)
+
+
+class TestDirectoryJobQueue:
+    """DirectoryJobQueue 測試"""
+
+    def test_lease_in_enqueue_order(self, tmp_path):
+        """測試：依加入順序租用，同一工作不會被租用兩次"""
+        queue = DirectoryJobQueue(tmp_path / "q", spread=1)
+        queue.enqueue_many(["doc-1", "doc-2"])
+
+        first = queue.lease("w1", 60)
+        second = queue.lease("w2", 60)
+
+        assert (first.document_id, second.document_id) == ("doc-1", "doc-2")
+        assert first.attempts == 1
+        assert queue.lease("w3", 60) is None
+        assert queue.counts() == {'pending': 0, 'leased': 2, 'done': 0, 'failed': 0}
+
+    def test_lease_lists_pending_once_per_batch(self, tmp_path, monkeypatch):
+        """測試：連續租用只列出一次 pending/；其他 worker 搶先時略過而不重新列出"""
+        queue = DirectoryJobQueue(tmp_path / "q", spread=1)
+        other = DirectoryJobQueue(tmp_path / "q", spread=1)
+        queue.enqueue_many(["doc-1", "doc-2", "doc-3", "doc-4"])
+        listed = []
+        original = os.listdir
+
+        def counting(path):
+            listed.append(path)
+            return original(path)
+
+        monkeypatch.setattr(job_queue.os, "listdir", counting)
+
+        assert queue.lease("w1", 60).document_id == "doc-1"
+        # 其他 worker 取走 doc-2：快取中的 doc-2 改名失敗，直接改租 doc-3
+        assert other.lease("w2", 60).document_id == "doc-2"
+        assert queue.lease("w1", 60).document_id == "doc-3"
+        assert queue.lease("w1", 60).document_id == "doc-4"
+        assert len(listed) == 2
+
+        assert queue.lease("w1", 60) is None
+
+    def test_workers_start_at_different_offsets(self, tmp_path, monkeypatch):
+        """測試：從前 spread 個工作中的隨機位置開始，之後繞回開頭"""
+        queue = DirectoryJobQueue(tmp_path / "q", spread=4)
+        queue.enqueue_many([f"doc-{i}" for i in range(1, 7)])
+        offsets = []
+
+        def randrange(n):
+            offsets.append(n)
+            return 2
+
+        monkeypatch.setattr(job_queue.random, "randrange", randrange)
+
+        leased = [queue.lease("w1", 60).document_id for _ in range(6)]
+
+        assert offsets == [4]
+        assert leased == ["doc-3", "doc-4", "doc-5", "doc-6", "doc-1", "doc-2"]
+
+    def test_complete_writes_result(self, tmp_path):
+        """測試：提交結果（numpy 數值轉為 JSON）"""
+        queue = DirectoryJobQueue(tmp_path / "q")
+        queue.enqueue("doc-1")
+        job = queue.lease("w1", 60)
+
+        queue.complete(job, {"score": np.float32(0.5), "bbox": (1, 2, 3, 4)})
+
+        assert queue.counts()['done'] == 1
+        assert list(queue.iter_results()) == [("doc-1", {"score": 0.5, "bbox": [1, 2, 3, 4]})]
+
+    def test_expired_lease_is_requeued(self, tmp_path):
+        """測試：到期的租約被收回，原持有者提交時得到 LeaseLostError"""
+        queue = DirectoryJobQueue(tmp_path / "q")
+        queue.enqueue("doc-1")
+        stale = queue.lease("w1", 0.01)
+        time.sleep(0.03)
+
+        assert queue.requeue_expired() == 1
+        fresh = queue.lease("w2", 60)
+        assert fresh.document_id == "doc-1"
+        assert fresh.attempts == 2
+
+        with pytest.raises(LeaseLostError):
+            queue.complete(stale, {})
+        queue.complete(fresh, {})
+        assert queue.counts()['done'] == 1
+
+    def test_renew_extends_lease(self, tmp_path):
+        """測試：延長租約後不會被收回"""
+        queue = DirectoryJobQueue(tmp_path / "q")
+        queue.enqueue("doc-1")
+        job = queue.lease("w1", 0.01)
+        queue.renew(job, 60)
+        time.sleep(0.03)
+
+        assert queue.requeue_expired() == 0
+        queue.complete(job, {})
+
+    def test_fail_retries_until_max_attempts(self, tmp_path):
+        """測試：失敗的工作重新排入，達到 max_attempts 後移到 failed/"""
+        queue = DirectoryJobQueue(tmp_path / "q", max_attempts=2)
+        queue.enqueue("doc-1")
+
+        assert queue.fail(queue.lease("w1", 60), "boom") is True
+        assert queue.fail(queue.lease("w1", 60), "boom") is False
+        assert queue.lease("w1", 60) is None
+        assert queue.counts()['failed'] == 1
+
+    def test_invalid_arguments(self, tmp_path):
+        """測試：無效參數"""
+        with pytest.raises(ValueError):
+            DirectoryJobQueue(tmp_path / "q", max_attempts=0)
+        with pytest.raises(ValueError):
+            DirectoryJobQueue(tmp_path / "q", spread=0)
+        with pytest.raises(ValueError):
+            DirectoryJobQueue(tmp_path / "q").lease("w1", 0)
+
+
+class TestQueueWorker:
+    """QueueWorker 測試"""
+
+    def test_concurrent_workers_process_each_job_once(self, tmp_path):
+        """測試：多個 worker 同時租用，每份文件只處理一次"""
+        queue = DirectoryJobQueue(tmp_path / "q")
+        document_ids = [f"doc-{i}" for i in range(20)]
+        queue.enqueue_many(document_ids)
+        adapter = MockOCRAdapter()
+        summaries = []
+
+        def work(index):
+            worker = QueueWorker(
+                DirectoryJobQueue(tmp_path / "q"), make_orchestrator(adapter),
+                worker_id=f"w{index}", resolve=resolve
+            )
+            summaries.append(worker.run(poll_interval=0.01, idle_timeout=0.05))
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(s['completed'] for s in summaries) == 20
+        assert adapter.calls == 20
+        results = dict(queue.iter_results())
+        assert sorted(results) == sorted(document_ids)
+        assert results["doc-0"]["document_id"] == "doc-0"
+        assert results["doc-0"]["fields"]["invoice_number"]["text"] == "AB12345678"
+
+    def test_failed_jobs(self, tmp_path):
+        """測試：處理失敗的工作重試後移到 failed/"""
+        queue = DirectoryJobQueue(tmp_path / "q", max_attempts=2)
+        queue.enqueue_many(["bad-1", "doc-1"])
+        worker = QueueWorker(queue, make_orchestrator(MockOCRAdapter()), resolve=resolve)
+
+        summary = worker.run(poll_interval=0, idle_timeout=0)
+
+        assert summary == {'completed': 1, 'failed': 2, 'lost': 0}
+        assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+
+    def test_requeues_expired_leases_on_interval(self, tmp_path):
+        """測試：佇列非空時也會依間隔收回到期租約"""
+        queue = DirectoryJobQueue(tmp_path / "q", spread=1)
+        queue.enqueue_many(["doc-1", "doc-2", "doc-3"])
+        queue.lease("crashed", 0.01)
+        time.sleep(0.03)
+        worker = QueueWorker(queue, make_orchestrator(MockOCRAdapter()), resolve=resolve)
+
+        assert worker.run(max_jobs=1, requeue_interval=0)['completed'] == 1
+        assert [doc for doc, _ in queue.iter_results()] == ["doc-1"]
+        assert queue.counts() == {'pending': 2, 'leased': 0, 'done': 1, 'failed': 0}
+
+    def test_max_jobs(self, tmp_path):
+        """測試：處理 max_jobs 個工作後結束"""
+        queue = DirectoryJobQueue(tmp_path / "q")
+        queue.enqueue_many(["doc-1", "doc-2", "doc-3"])
+        worker = QueueWorker(queue, make_orchestrator(MockOCRAdapter()), resolve=resolve)
+
+        assert worker.run(max_jobs=2)['completed'] == 2
+        assert queue.counts()['pending'] == 1
@@ -0,0 +1,129 @@
+"""
+測試 MultiPageTiffAdapter - 多頁 TIFF 逐頁解碼
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.input import MultiPageTiffAdapter
+from ocr_pipeline.adapters.input import multipage_tiff
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "tiff_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class PageOCRAdapter:
+    """只有指定頁（左上角像素值）有發票號碼"""
+
+    def __init__(self, hit_page):
+        self.hit_page = hit_page
+        self.calls = []
+
+    def recognize(self, image):
+        page = int(image[0, 0, 0])
+        self.calls.append(page)
+        if page == self.hit_page:
+            return [((100, 100, 300, 50), ("AB12345678", 0.95))]
+        return []
+
+
+@pytest.fixture
+def tiff_path(tmp_path):
+    """5 頁的 TIFF，每頁左上角像素值為頁碼"""
+    pages = []
+    for index in range(5):
+        page = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        page[0, 0] = index
+        pages.append(page)
+    path = tmp_path / "fax.tif"
+    assert cv2.imwritemulti(str(path), pages)
+    return path
+
+
+@pytest.fixture
+def decode_counter(monkeypatch):
+    """記錄實際解碼的頁碼"""
+    decoded = []
+    original = cv2.imreadmulti
+
+    def counting(filename, start=0, count=1, flags=cv2.IMREAD_ANYCOLOR):
+        decoded.append(start)
+        return original(filename, start=start, count=count, flags=flags)
+
+    monkeypatch.setattr(multipage_tiff.cv2, "imreadmulti", counting)
+    return decoded
+
+
+class TestMultiPageTiffAdapter:
+    """MultiPageTiffAdapter 測試"""
+
+    def test_page_count(self, tiff_path):
+        assert len(MultiPageTiffAdapter(tiff_path)) == 5
+
+    def test_iter_pages_is_lazy(self, tiff_path, decode_counter):
+        adapter = MultiPageTiffAdapter(tiff_path)
+        pages = adapter.iter_pages()
+        assert decode_counter == []
+
+        first = next(pages)
+        assert first.shape == (1000, 1000, 3)
+        assert decode_counter == [0]
+
+        assert [int(p[0, 0, 0]) for p in pages] == [1, 2, 3, 4]
+
+    def test_read_page(self, tiff_path):
+        adapter = MultiPageTiffAdapter(tiff_path)
+        assert int(adapter.read_page(3)[0, 0, 0]) == 3
+        with pytest.raises(IndexError):
+            adapter.read_page(5)
+
+    def test_grayscale(self, tiff_path):
+        assert MultiPageTiffAdapter(tiff_path, grayscale=True).read_page(0).ndim == 2
+
+    def test_single_page_image(self, tmp_path):
+        path = tmp_path / "single.png"
+        cv2.imwrite(str(path), np.zeros((10, 10, 3), dtype=np.uint8))
+        assert len(list(MultiPageTiffAdapter(path))) == 1
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            MultiPageTiffAdapter(tmp_path / "missing.tif")
+
+
+class TestProcessDocument:
+    """Orchestrator.process_document 測試"""
+
+    def test_stops_decoding_after_required_found(self, tiff_path, decode_counter):
+        adapter = PageOCRAdapter(hit_page=1)
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_document(tiff_path)
+
+        assert result['fields']['invoice_number']['text'] == 'AB12345678'
+        assert result['field_pages']['invoice_number'] == 1
+        assert result['page_count'] == 5
+        assert result['pages_processed'] == 2
+        assert decode_counter == [0, 1]
+        assert adapter.calls == [0, 1]
+
+    def test_processes_all_pages_when_not_found(self, tiff_path):
+        adapter = PageOCRAdapter(hit_page=None)
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_document(tiff_path)
+
+        assert result['pages_processed'] == 5
+        assert result['fields']['invoice_number'] is None
@@ -0,0 +1,190 @@
+"""
+測試 NearDuplicateIndex - 感知雜湊近似重複偵測
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.near_duplicate import BKTree, NearDuplicateIndex
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.utils.image_utils import compute_perceptual_hash, hamming_distance
+
+
+TEMPLATE = {
+    "template_id": "near_dup_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+def make_document(seed):
+    """隨機版面的文件影像"""
+    rng = np.random.default_rng(seed)
+    image = np.full((1400, 1000, 3), 255, dtype=np.uint8)
+    for _ in range(30):
+        x, y = int(rng.integers(50, 700)), int(rng.integers(50, 1350))
+        cv2.putText(image, f"INV{int(rng.integers(10 ** 7)):08d}", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    cv2.rectangle(image, (30, 30), (970, 200), (0, 0, 0), 4)
+    return image
+
+
+def rescan(image, seed):
+    """模擬重新掃描：輕微縮放、位移、雜訊與 JPEG 壓縮"""
+    rng = np.random.default_rng(seed)
+    h, w = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), rng.uniform(-0.5, 0.5), rng.uniform(0.98, 1.02))
+    matrix[:, 2] += rng.uniform(-8, 8, 2)
+    out = cv2.warpAffine(image, matrix, (w, h), borderValue=(255, 255, 255))
+    out = cv2.resize(out, None, fx=0.8, fy=0.8, interpolation=cv2.INTER_AREA)
+    noise = rng.normal(0, 6, out.shape)
+    out = np.clip(out.astype(np.float64) + noise, 0, 255).astype(np.uint8)
+    _, buffer = cv2.imencode('.jpg', out, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+class MockOCRAdapter:
+    """回傳固定的發票號碼；記錄全圖與裁切的呼叫次數"""
+
+    def __init__(self, text="AB12345678"):
+        self.text = text
+        self.calls = 0
+
+    def recognize(self, image, **options):
+        self.calls += 1
+        h, w = image.shape[:2]
+        # 全圖時回傳欄位位置的 bbox；裁切時回傳整塊區域
+        if w >= 500:
+            return [((100, 100, 300, 50), (self.text, 0.95))]
+        return [((0, 0, w, h), (self.text, 0.95))]
+
+
+class TestPerceptualHash:
+    """pHash 計算"""
+
+    def test_rescans_are_close(self):
+        """重新掃描的距離遠小於不同文件"""
+        original = make_document(1)
+        base = compute_perceptual_hash(original)
+
+        assert hamming_distance(base, compute_perceptual_hash(rescan(original, 7))) <= 8
+        assert hamming_distance(base, compute_perceptual_hash(make_document(2))) > 16
+
+    def test_grayscale_and_color_agree(self):
+        """灰階與彩色輸入得到相同雜湊"""
+        image = make_document(3)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        assert compute_perceptual_hash(image) == compute_perceptual_hash(gray)
+
+    def test_empty_image(self):
+        """空影像應拋出 ValueError"""
+        with pytest.raises(ValueError):
+            compute_perceptual_hash(np.zeros((0, 0), dtype=np.uint8))
+
+
+class TestBKTree:
+    """BK-tree 查詢"""
+
+    def test_matches_brute_force(self):
+        """查詢結果與暴力搜尋相同"""
+        rng = np.random.default_rng(0)
+        hashes = [int(value) for value in rng.integers(0, 2 ** 63, 500, dtype=np.int64)]
+        tree = BKTree()
+        for index, value in enumerate(hashes):
+            tree.add(value, index)
+
+        query = hashes[10] ^ 0b1011
+        expected = sorted(
+            index for index, value in enumerate(hashes) if hamming_distance(query, value) <= 20
+        )
+        found = tree.search(query, 20)
+
+        assert sorted(index for _, _, index in found) == expected
+        assert found[0] == (3, hashes[10], 10)
+        assert len(tree) == 500
+
+
+class TestNearDuplicateIndex:
+    """索引與 Orchestrator 整合"""
+
+    def test_contexts_are_separate(self):
+        """不同情境的結果不會互相取用"""
+        index = NearDuplicateIndex(max_distance=4)
+        index.add(0b1111, 'a', {'fields': {}}, document_id='doc-1')
+
+        assert index.find(0b1110, 'b') is None
+        match = index.find(0b1110, 'a')
+        assert (match.distance, match.document_id) == (1, 'doc-1')
+
+    def test_eviction(self):
+        """超過 max_entries 時淘汰最早的文件"""
+        index = NearDuplicateIndex(max_distance=0, max_entries=4)
+        for value in range(5):
+            index.add(value, 'ctx', {'value': value})
+
+        assert index.find(0, 'ctx') is None
+        assert index.find(4, 'ctx').result == {'value': 4}
+        assert index.stats()['entries'] == 4
+
+    def test_invalid_arguments(self):
+        """無效參數應拋出 ValueError"""
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(mode='trust')
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(max_distance=-1)
+
+    def test_verified_rescan_reuses_result(self):
+        """verify 模式：欄位 ROI 文字相符時沿用先前結果，不做全圖 OCR"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, near_duplicates=NearDuplicateIndex())
+        orchestrator.load_template(TEMPLATE)
+        original = make_document(1)
+
+        first = orchestrator.process(original, document_id='scan-1')
+        calls = adapter.calls
+        second = orchestrator.process(rescan(original, 3), document_id='scan-2')
+
+        assert first['near_duplicate'] is None
+        assert second['near_duplicate']['document_id'] == 'scan-1'
+        assert second['near_duplicate']['verified'] is True
+        assert second['near_duplicate']['reused'] is True
+        assert second['fields']['invoice_number']['text'] == "AB12345678"
+        assert second['document_id'] == 'scan-2'
+        assert adapter.calls == calls + 1  # 只 OCR 一個欄位 ROI
+
+    def test_verification_failure_runs_full_ocr(self):
+        """欄位文字不同（同版面的另一份文件）時完整處理"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, near_duplicates=NearDuplicateIndex())
+        orchestrator.load_template(TEMPLATE)
+        original = make_document(1)
+        orchestrator.process(original)
+
+        adapter.text = "CD87654321"
+        result = orchestrator.process(rescan(original, 3))
+
+        assert result['near_duplicate']['verified'] is False
+        assert result['near_duplicate']['reused'] is False
+        assert result['fields']['invoice_number']['text'] == "CD87654321"
+
+    def test_reuse_mode_skips_ocr(self):
+        """reuse 模式直接沿用，不做任何 OCR"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, near_duplicates=NearDuplicateIndex(mode='reuse'))
+        orchestrator.load_template(TEMPLATE)
+        original = make_document(1)
+        orchestrator.process(original)
+        calls = adapter.calls
+
+        result = orchestrator.process(rescan(original, 3))
+
+        assert adapter.calls == calls
+        assert result['near_duplicate']['verified'] is None
+        assert orchestrator.get_metrics()['near_duplicates']['matches'] == 1
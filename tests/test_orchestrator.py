@@ -135,6 +135,35 @@ class TestOrchestrator:
         assert 'template_id' in result
         assert 'fields' in result
     
+    def test_process_with_encoded_bytes(self, mock_ocr_adapter, sample_template, sample_image):
+        """測試：使用已編碼的影像資料（bytes / memoryview）處理"""
+        orchestrator = Orchestrator(mock_ocr_adapter)
+        orchestrator.load_template(sample_template)
+        data = sample_image.read_bytes()
+        
+        from_bytes = orchestrator.process(data)
+        from_view = orchestrator.process(memoryview(data))
+        
+        assert from_bytes['fields']['invoice_number']['text'] == "AB12345678"
+        assert from_bytes == from_view
+    
+    def test_process_with_mmap_path(self, mock_ocr_adapter, sample_template, sample_image):
+        """測試：use_mmap 以記憶體映射讀取影像檔"""
+        orchestrator = Orchestrator(mock_ocr_adapter, use_mmap=True)
+        orchestrator.load_template(sample_template)
+        
+        result = orchestrator.process(sample_image)
+        
+        assert result['fields']['invoice_number']['text'] == "AB12345678"
+    
+    def test_process_with_invalid_bytes_raises_error(self, mock_ocr_adapter, sample_template):
+        """測試：無法解碼的影像資料會拋出錯誤"""
+        orchestrator = Orchestrator(mock_ocr_adapter)
+        orchestrator.load_template(sample_template)
+        
+        with pytest.raises(ValueError):
+            orchestrator.process(b"not an image")
+    
     def test_process_with_nonexistent_image_raises_error(self, mock_ocr_adapter, sample_template):
         """測試：不存在的影像路徑會拋出錯誤"""
         orchestrator = Orchestrator(mock_ocr_adapter)
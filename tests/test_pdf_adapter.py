@@ -0,0 +1,339 @@
+"""
+測試 PdfImageAdapter - 掃描 PDF 直接解碼
+"""
+
+import zlib
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.input import PdfImageAdapter, UnsupportedPageError
+from ocr_pipeline.adapters.input import pdf_adapter
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+def _jpeg(value, size=(80, 60)):
+    image = np.full((size[1], size[0], 3), value, dtype=np.uint8)
+    ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok
+    return encoded.tobytes()
+
+
+def _dct_image(value, size=(80, 60)):
+    return (
+        f"/Type /XObject /Subtype /Image /Width {size[0]} /Height {size[1]} "
+        f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode".encode(),
+        _jpeg(value, size)
+    )
+
+
+def build_pdf(pages, inherit_resources=False, objstm=False, indirect_length=False, rotate=None,
+              media_box=b"0 0 80 60", content=b"q 80 0 0 60 0 0 cm /Im0 Do Q"):
+    """
+    產生測試用 PDF
+
+    Args:
+        pages: 每頁的影像列表 [(影像字典內容, 串流資料), ...]
+        inherit_resources: 第一頁的 /Resources 放在 /Pages 節點（由頁面繼承）
+        objstm: 頁面字典放進物件串流（PDF 1.5）
+        indirect_length: 串流 /Length 使用間接參照
+        rotate: /Pages 節點的 /Rotate（由頁面繼承）
+        media_box: 每頁的 /MediaBox
+        content: 每頁的內容串流
+    """
+    objects = {}
+    plain = {}
+    next_num = [3]
+
+    def alloc():
+        num = next_num[0]
+        next_num[0] += 1
+        return num
+
+    def stream(attrs, data):
+        if indirect_length:
+            length_num = alloc()
+            objects[length_num] = str(len(data)).encode()
+            length = f"{length_num} 0 R".encode()
+        else:
+            length = str(len(data)).encode()
+        return b"<< " + attrs + b" /Length " + length + b" >>\nstream\n" + data + b"\nendstream"
+
+    kids = []
+    pages_resources = b""
+    for page_index, images in enumerate(pages):
+        xobjects = b""
+        for image_index, (attrs, data) in enumerate(images):
+            num = alloc()
+            objects[num] = stream(attrs, data)
+            xobjects += f"/Im{image_index} {num} 0 R ".encode()
+        content_num = alloc()
+        objects[content_num] = stream(b"", content)
+        resources = b"/Resources << /XObject << " + xobjects + b">> >>"
+        if inherit_resources and page_index == 0:
+            pages_resources, resources = resources, b""
+        page_num = alloc()
+        plain[page_num] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [" + media_box + b"] "
+            + resources + f" /Contents {content_num} 0 R >>".encode()
+        )
+        kids.append(page_num)
+
+    plain[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    plain[2] = (
+        b"<< /Type /Pages /Kids [" + " ".join(f"{k} 0 R" for k in kids).encode()
+        + f"] /Count {len(kids)} ".encode() + pages_resources
+        + (f" /Rotate {rotate} ".encode() if rotate is not None else b"") + b">>"
+    )
+
+    if objstm:
+        stm_num = alloc()
+        compressed = {num: body for num, body in plain.items() if num not in (1, 2)}
+        header = b""
+        body = b""
+        for num, obj in compressed.items():
+            header += f"{num} {len(body)} ".encode()
+            body += obj + b"\n"
+        packed = zlib.compress(header + body)
+        objects[stm_num] = (
+            f"<< /Type /ObjStm /N {len(compressed)} /First {len(header)} "
+            f"/Filter /FlateDecode /Length {len(packed)} >>\nstream\n".encode()
+            + packed + b"\nendstream"
+        )
+        objects.update({1: plain[1], 2: plain[2]})
+    else:
+        objects.update(plain)
+
+    out = bytearray(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += f"{num} 0 obj\n".encode() + objects[num] + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {max(objects) + 1}\n0000000000 65535 f \n".encode()
+    for num in range(1, max(objects) + 1):
+        out += f"{offsets.get(num, 0):010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {max(objects) + 1} /Root 1 0 R >>\n".encode()
+    out += f"startxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+@pytest.fixture
+def write_pdf(tmp_path):
+    def write(data, name="scan.pdf"):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return path
+    return write
+
+
+@pytest.fixture
+def decode_counter(monkeypatch):
+    calls = []
+    original = cv2.imdecode
+
+    def counting(buf, flags):
+        calls.append(len(buf))
+        return original(buf, flags)
+
+    monkeypatch.setattr(pdf_adapter.cv2, "imdecode", counting)
+    return calls
+
+
+class TestPdfImageAdapter:
+    """PdfImageAdapter 測試"""
+
+    def test_dct_pages(self, write_pdf):
+        path = write_pdf(build_pdf([[_dct_image(v)] for v in (40, 120, 200)]))
+
+        with PdfImageAdapter(path) as adapter:
+            assert len(adapter) == 3
+            pages = list(adapter.iter_pages())
+
+        assert [p.shape for p in pages] == [(60, 80, 3)] * 3
+        assert [int(round(p.mean())) for p in pages] == pytest.approx([40, 120, 200], abs=3)
+
+    def test_decodes_lazily(self, write_pdf, decode_counter):
+        path = write_pdf(build_pdf([[_dct_image(v)] for v in (40, 120, 200)]))
+
+        with PdfImageAdapter(path) as adapter:
+            pages = adapter.iter_pages()
+            assert decode_counter == []
+            next(pages)
+            assert len(decode_counter) == 1
+            pages.close()
+
+    def test_flate_rgb(self, write_pdf):
+        pixels = np.zeros((2, 3, 3), dtype=np.uint8)
+        pixels[..., 0] = 255  # RGB 紅色
+        attrs = (b"/Type /XObject /Subtype /Image /Width 3 /Height 2 "
+                 b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode")
+        path = write_pdf(build_pdf([[(attrs, zlib.compress(pixels.tobytes()))]]))
+
+        with PdfImageAdapter(path) as adapter:
+            page = adapter.read_page(0)
+
+        assert page.shape == (2, 3, 3)
+        assert page[0, 0].tolist() == [0, 0, 255]  # BGR
+
+    def test_flate_bilevel_with_decode(self, write_pdf):
+        # 10x2 的 1-bit 影像，每列 2 bytes
+        raw = bytes([0b10000000, 0, 0, 0])
+        attrs = (b"/Type /XObject /Subtype /Image /Width 10 /Height 2 "
+                 b"/ColorSpace /DeviceGray /BitsPerComponent 1 /Decode [1 0] "
+                 b"/Filter [/FlateDecode]")
+        path = write_pdf(build_pdf([[(attrs, zlib.compress(raw))]]))
+
+        with PdfImageAdapter(path, grayscale=True) as adapter:
+            page = adapter.read_page(0)
+
+        assert page.shape == (2, 10)
+        assert page[0, 0] == 0 and page[0, 1] == 255
+
+    def test_inherited_resources_and_indirect_length(self, write_pdf):
+        path = write_pdf(build_pdf(
+            [[_dct_image(90)]], inherit_resources=True, indirect_length=True
+        ))
+
+        with PdfImageAdapter(path) as adapter:
+            assert adapter.read_page(0).shape == (60, 80, 3)
+
+    def test_object_stream(self, write_pdf):
+        path = write_pdf(build_pdf([[_dct_image(v)] for v in (10, 250)], objstm=True))
+
+        with PdfImageAdapter(path) as adapter:
+            assert len(adapter) == 2
+            assert adapter.read_page(1).mean() > 200
+
+    def test_multiple_images_unsupported(self, write_pdf):
+        path = write_pdf(build_pdf([[_dct_image(10), _dct_image(20)]]))
+
+        with PdfImageAdapter(path) as adapter:
+            assert not adapter.is_direct(0)
+            with pytest.raises(UnsupportedPageError):
+                adapter.read_page(0)
+
+    def test_unsupported_filter(self, write_pdf):
+        attrs = (b"/Type /XObject /Subtype /Image /Width 8 /Height 8 "
+                 b"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /CCITTFaxDecode")
+        path = write_pdf(build_pdf([[(attrs, b"\x00" * 8)]]))
+
+        with PdfImageAdapter(path) as adapter:
+            with pytest.raises(UnsupportedPageError):
+                adapter.read_page(0)
+
+    def test_renderer_fallback(self, write_pdf):
+        path = write_pdf(build_pdf([[_dct_image(10), _dct_image(20)], [_dct_image(30)]]))
+        rendered = []
+
+        def renderer(file_path, index):
+            rendered.append(index)
+            return np.zeros((5, 5), dtype=np.uint8)
+
+        with PdfImageAdapter(path, renderer=renderer) as adapter:
+            pages = list(adapter)
+
+        assert rendered == [0]
+        assert pages[0].shape == (5, 5, 3)
+        assert pages[1].shape == (60, 80, 3)
+
+    def test_small_image_on_large_page_unsupported(self, write_pdf):
+        # A4 頁面上只有一張 20x10 的標誌：影像不是整頁
+        path = write_pdf(build_pdf(
+            [[_dct_image(40, size=(20, 10))]], media_box=b"0 0 595 842",
+            content=b"q 20 0 0 10 50 780 cm /Im0 Do Q"
+        ))
+
+        with PdfImageAdapter(path) as adapter:
+            assert not adapter.is_direct(0)
+            with pytest.raises(UnsupportedPageError):
+                adapter.read_page(0)
+
+    def test_text_with_image_unsupported(self, write_pdf):
+        content = b"q 80 0 0 60 0 0 cm /Im0 Do Q BT /F1 12 Tf 10 10 Td (Total) Tj ET"
+        path = write_pdf(build_pdf([[_dct_image(40)]], content=content))
+        rendered = []
+
+        def renderer(file_path, index):
+            rendered.append(index)
+            return np.zeros((60, 80), dtype=np.uint8)
+
+        with PdfImageAdapter(path, renderer=renderer) as adapter:
+            assert not adapter.is_direct(0)
+            adapter.read_page(0)
+
+        assert rendered == [0]
+
+    def test_vector_path_with_image_unsupported(self, write_pdf):
+        content = b"q 80 0 0 60 0 0 cm /Im0 Do Q 0 0 m 80 60 l S"
+        path = write_pdf(build_pdf([[_dct_image(40)]], content=content))
+
+        with PdfImageAdapter(path) as adapter:
+            assert not adapter.is_direct(0)
+
+    def test_scaled_full_page_placement(self, write_pdf):
+        # 以兩個 cm 組合出滿版放置（影像像素與頁面點數不同）
+        path = write_pdf(build_pdf(
+            [[_dct_image(40)]], media_box=b"0 0 595 842",
+            content=b"q 2 0 0 2 0 0 cm q 297.5 0 0 421 0 0 cm /Im0 Do Q Q"
+        ))
+
+        with PdfImageAdapter(path) as adapter:
+            assert adapter.read_page(0).shape == (60, 80, 3)
+
+    def test_inherited_rotation(self, write_pdf):
+        path = write_pdf(build_pdf([[_dct_image(40)]], rotate=90))
+
+        with PdfImageAdapter(path) as adapter:
+            assert adapter.read_page(0).shape == (80, 60, 3)
+
+    def test_corrupt_jpeg_raises_decode_error(self, write_pdf):
+        attrs, data = _dct_image(40)
+        path = write_pdf(build_pdf([[(attrs, b"\xff\xd8" + b"\x00" * (len(data) - 2))]]))
+
+        # 例外穿過 __exit__ 時 close() 不可改拋 BufferError
+        with pytest.raises(ValueError):
+            with PdfImageAdapter(path) as adapter:
+                adapter.read_page(0)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            PdfImageAdapter(tmp_path / "missing.pdf")
+
+
+class FirstPageOCRAdapter:
+    """所有頁面都有發票號碼"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return [((8, 6, 24, 3), ("AB12345678", 0.95))]
+
+
+class TestProcessDocumentPdf:
+    """Orchestrator.process_document 處理 PDF"""
+
+    def test_stops_after_first_page(self, write_pdf, decode_counter):
+        path = write_pdf(build_pdf([[_dct_image(v)] for v in (40, 120, 200)]))
+        adapter = FirstPageOCRAdapter()
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template({
+            "template_id": "pdf_test_v1",
+            "regions": {
+                "invoice_number": {
+                    "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+                    "pattern": r"[A-Z]{2}\d{8}",
+                    "required": True
+                }
+            }
+        })
+
+        result = orchestrator.process_document(path)
+
+        assert result['page_count'] == 3
+        assert result['pages_processed'] == 1
+        assert adapter.calls == 1
+        assert len(decode_counter) == 1
@@ -0,0 +1,201 @@
+"""
+測試 Quality - OCR 前的影像品質關卡
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.core.quality import (
+    assess_quality,
+    enhance_image,
+    evaluate_quality,
+    validate_quality_gate,
+)
+
+
+TEMPLATE = {
+    "template_id": "quality_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+def make_document():
+    """白底黑字的文件影像"""
+    rng = np.random.default_rng(0)
+    image = np.full((1400, 1000, 3), 255, dtype=np.uint8)
+    for _ in range(30):
+        x, y = int(rng.integers(50, 700)), int(rng.integers(50, 1350))
+        cv2.putText(image, f"INV{int(rng.integers(10 ** 7)):08d}", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    return image
+
+
+def make_blank():
+    """帶掃描雜訊的空白頁"""
+    noise = np.random.default_rng(1).normal(0, 5, (1400, 1000, 3))
+    return np.clip(240 + noise, 0, 255).astype(np.uint8)
+
+
+class MockOCRAdapter:
+    """記錄每次 OCR 的影像"""
+
+    def __init__(self):
+        self.images = []
+
+    def recognize(self, image, **options):
+        self.images.append(image)
+        return [((100, 140, 300, 50), ("AB12345678", 0.95))]
+
+
+class TestAssessQuality:
+    """品質分數"""
+
+    def test_clean_document(self):
+        """清楚的文件沒有問題"""
+        report = evaluate_quality(make_document(), validate_quality_gate({}))
+
+        assert report['issues'] == []
+        assert report['action'] == 'proceed'
+        assert set(report['scores']) == {
+            'blank_ratio', 'sharpness', 'contrast', 'brightness', 'uniformity'
+        }
+
+    def test_blank_page(self):
+        """空白頁：只回報 blank，預設略過"""
+        report = evaluate_quality(make_blank(), validate_quality_gate({}))
+
+        assert report['issues'] == ['blank']
+        assert report['action'] == 'skip'
+
+    def test_blur_lowers_sharpness(self):
+        """模糊降低 Laplacian 變異數"""
+        image = make_document()
+        sharp = assess_quality(image)['sharpness']
+        blurred = assess_quality(cv2.GaussianBlur(image, (0, 0), 8))['sharpness']
+
+        assert blurred < sharp / 10
+        report = evaluate_quality(cv2.GaussianBlur(image, (0, 0), 8), validate_quality_gate({}))
+        assert 'blur' in report['issues']
+
+    def test_low_contrast_and_uneven_lighting(self):
+        """低對比與光照不均"""
+        image = make_document().astype(np.float64)
+        faded = (image * 0.15 + 180).astype(np.uint8)
+        shaded = (image * np.linspace(0.3, 1.0, image.shape[1])[None, :, None]).astype(np.uint8)
+        settings = validate_quality_gate({})
+
+        assert 'low_contrast' in evaluate_quality(faded, settings)['issues']
+        assert 'uneven' in evaluate_quality(shaded, settings)['issues']
+
+    def test_strictest_action_wins(self):
+        """多個問題時取最嚴格的處理方式"""
+        settings = validate_quality_gate({'on_blur': 'skip', 'on_low_contrast': 'enhance'})
+        image = (cv2.GaussianBlur(make_document(), (0, 0), 8) * 0.15 + 180).astype(np.uint8)
+
+        assert evaluate_quality(image, settings)['action'] == 'skip'
+
+    def test_grayscale_input(self):
+        """灰階輸入與彩色輸入分數相同"""
+        image = make_document()
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        assert assess_quality(image) == assess_quality(gray)
+
+    def test_invalid_settings(self):
+        """未知的鍵或處理方式應拋出 ValueError"""
+        with pytest.raises(ValueError):
+            validate_quality_gate({'min_blur': 10})
+        with pytest.raises(ValueError):
+            validate_quality_gate({'on_blank': 'ignore'})
+
+    def test_enhance_returns_new_array(self):
+        """增強不修改原影像"""
+        image = (make_document() * 0.15 + 180).astype(np.uint8)
+        before = image.copy()
+        enhanced = enhance_image(image, ['low_contrast', 'blur'])
+
+        assert np.array_equal(image, before)
+        assert enhanced.shape == image.shape
+        assert assess_quality(enhanced)['contrast'] > assess_quality(image)['contrast']
+
+    def test_enhance_keeps_alpha_channel(self):
+        """BGRA 影像增強後仍為 4 通道，alpha 通道不變"""
+        bgr = (make_document() * 0.15 + 180).astype(np.uint8)
+        alpha = np.full(bgr.shape[:2], 255, dtype=np.uint8)
+        alpha[:100] = 0
+        image = np.dstack([bgr, alpha])
+        enhanced = enhance_image(image, ['low_contrast', 'blur'])
+
+        assert enhanced.shape == image.shape
+        assert np.array_equal(enhanced[:, :, 3], alpha)
+        assert np.array_equal(enhanced[:, :, :3], enhance_image(bgr, ['low_contrast', 'blur']))
+
+
+class TestOrchestratorQualityGate:
+    """Orchestrator 整合"""
+
+    def test_blank_page_skips_ocr(self):
+        """空白頁不做 OCR，結果記錄品質分數"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, quality_gate={})
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(make_blank(), budget_ms=10000)
+
+        assert adapter.images == []
+        assert result['fields'] == {'invoice_number': None}
+        assert result['quality']['action'] == 'skip'
+        assert result['incomplete'] is False
+
+    def test_blurred_image_uses_enhanced_path(self):
+        """模糊影像增強後仍以目前的設定檔處理"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, profile='fast', quality_gate={})
+        orchestrator.load_template(TEMPLATE)
+        blurred = cv2.GaussianBlur(make_document(), (0, 0), 8)
+
+        result = orchestrator.process(blurred)
+
+        assert result['quality']['action'] == 'enhance'
+        assert result['profile'] == 'fast'
+        assert not np.array_equal(adapter.images[0], blurred)
+        assert result['fields']['invoice_number']['text'] == "AB12345678"
+
+    def test_clean_image_proceeds(self):
+        """清楚的影像照常處理"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, quality_gate={})
+        orchestrator.load_template(TEMPLATE)
+        image = make_document()
+
+        result = orchestrator.process(image)
+
+        assert result['quality']['action'] == 'proceed'
+        assert adapter.images[0] is image
+
+    def test_pages_skip_blank_separator(self):
+        """多頁文件略過空白分隔頁"""
+        adapter = MockOCRAdapter()
+        orchestrator = Orchestrator(adapter, quality_gate={})
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process_pages([make_blank(), make_document()])
+
+        assert len(adapter.images) == 1
+        assert [page['action'] for page in result['page_quality']] == ['skip', 'proceed']
+        assert result['field_pages']['invoice_number'] == 1
+
+    def test_disabled_by_default(self):
+        """未設定時結果沒有 'quality'"""
+        orchestrator = Orchestrator(MockOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        assert 'quality' not in orchestrator.process(make_document())
@@ -0,0 +1,187 @@
+"""
+測試 Quality Profiles - 品質設定檔與負載自適應降級
+"""
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.core.quality_profiles import ProfileController, get_profile
+
+
+TEMPLATE = {
+    "template_id": "profile_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        },
+        "note": {
+            "rect_ratio": {"x": 0.1, "y": 0.5, "width": 0.3, "height": 0.05},
+            "pattern": r"\d{4}",
+            "required": False
+        }
+    }
+}
+
+
+class ScaledOCRAdapter:
+    """回傳與影像尺寸等比例的 bbox，並記錄呼叫參數"""
+
+    def __init__(self):
+        self.calls = []
+
+    def recognize(self, image, **options):
+        self.calls.append((image.shape, options))
+        h, w = image.shape[:2]
+        return [
+            ((int(0.1 * w), int(0.1 * h), int(0.3 * w), int(0.05 * h)), ("AB12345678", 0.95)),
+            ((int(0.1 * w), int(0.5 * h), int(0.3 * w), int(0.05 * h)), ("1234", 0.9)),
+        ]
+
+
+class TestProfileController:
+    """ProfileController 測試"""
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="Unknown quality profile"):
+            ProfileController(initial="turbo")
+        with pytest.raises(ValueError, match="queue_low"):
+            ProfileController(queue_high=5, queue_low=5)
+
+    def test_degrade_on_queue_depth_with_hysteresis(self):
+        controller = ProfileController(queue_high=10, queue_low=2, min_dwell=3)
+
+        # 尚未達到 min_dwell 不切換
+        controller.observe_queue_depth(50)
+        controller.observe_queue_depth(50)
+        assert controller.current == "full"
+        assert controller.observe_queue_depth(50) == "fast"
+
+        # 中間區間維持不變
+        for _ in range(5):
+            controller.observe_queue_depth(5)
+        assert controller.current == "fast"
+
+        for _ in range(3):
+            controller.observe_queue_depth(1)
+        assert controller.current == "full"
+        assert controller.stats()["switches"] == 2
+
+    def test_degrade_on_p95_latency(self):
+        controller = ProfileController(
+            queue_high=None, queue_low=None,
+            latency_high_ms=100, latency_low_ms=50, window=1, min_dwell=1
+        )
+        controller.observe_latency(500)
+        assert controller.current == "fast"
+        controller.observe_latency(500)
+        assert controller.current == "minimal"
+        # 已在最低品質，不再降級
+        controller.observe_latency(500)
+        assert controller.current == "minimal"
+        controller.observe_latency(10)
+        assert controller.current == "fast"
+        # 切換後清除舊樣本
+        assert controller.p95_latency() is None
+        controller.observe_latency(70)
+        assert controller.p95_latency() == 70
+        assert controller.current == "fast"
+
+    def test_latency_low_defaults_below_high(self):
+        """測試：未指定 latency_low_ms 時保留遲滯區間，延遲在門檻附近不會來回切換"""
+        controller = ProfileController(
+            queue_high=None, queue_low=None, latency_high_ms=100, window=1, min_dwell=1
+        )
+        assert controller.latency_low_ms == 50
+
+        for latency in (120, 80, 120, 80, 90, 60):
+            controller.observe_latency(latency)
+        assert controller.current == "minimal"
+        assert controller.stats()["switches"] == 2
+
+        controller.observe_latency(40)
+        assert controller.current == "fast"
+
+
+class TestOrchestratorProfiles:
+    """Orchestrator 品質設定檔測試"""
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError, match="Unknown quality profile"):
+            Orchestrator(ScaledOCRAdapter(), profile="turbo")
+
+    def test_full_profile_is_default(self):
+        adapter = ScaledOCRAdapter()
+        orchestrator = Orchestrator(adapter)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((2000, 3000, 3), dtype=np.uint8))
+
+        assert result["profile"] == "full"
+        assert adapter.calls == [((2000, 3000, 3), {})]
+        assert result["fields"]["note"]["text"] == "1234"
+
+    def test_fast_profile_downscales_and_maps_bbox_back(self):
+        adapter = ScaledOCRAdapter()
+        orchestrator = Orchestrator(adapter, profile="fast")
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((2000, 3200, 3), dtype=np.uint8))
+
+        shape, options = adapter.calls[0]
+        assert max(shape[:2]) == get_profile("fast")["max_side"]
+        assert options == {"use_angle_cls": False}
+        assert result["profile"] == "fast"
+        x, y, w, h = result["fields"]["invoice_number"]["bbox"]
+        assert abs(x - 320) <= 2 and abs(y - 200) <= 2
+
+    def test_reduced_decode_maps_bbox_to_original(self, tmp_path, monkeypatch):
+        import cv2
+        from ocr_pipeline.core import orchestrator as orchestrator_module
+
+        path = tmp_path / "large.jpg"
+        cv2.imwrite(str(path), np.zeros((3000, 4000, 3), dtype=np.uint8))
+        reductions = []
+        original = orchestrator_module.read_image_reduced
+
+        def tracking(file_path, max_side, **kwargs):
+            image, scale = original(file_path, max_side, **kwargs)
+            reductions.append(scale)
+            return image, scale
+
+        monkeypatch.setattr(orchestrator_module, "read_image_reduced", tracking)
+
+        adapter = ScaledOCRAdapter()
+        orchestrator = Orchestrator(adapter, profile="fast", reduced_decode=True)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(path)
+
+        assert reductions == [0.4]
+        assert adapter.calls[0][0][:2] == (1200, 1600)
+        x, y, w, h = result["fields"]["invoice_number"]["bbox"]
+        assert abs(x - 400) <= 3 and abs(y - 300) <= 3
+
+    def test_minimal_profile_skips_optional_fields(self):
+        orchestrator = Orchestrator(ScaledOCRAdapter(), profile="minimal")
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8))
+
+        assert result["fields"]["invoice_number"]["text"] == "AB12345678"
+        assert result["fields"]["note"] is None
+
+    def test_controller_selects_profile_and_records_latency(self):
+        controller = ProfileController(queue_high=5, queue_low=1, min_dwell=1)
+        orchestrator = Orchestrator(ScaledOCRAdapter(), profile_controller=controller)
+        orchestrator.load_template(TEMPLATE)
+        img = np.zeros((1000, 1000, 3), dtype=np.uint8)
+
+        controller.observe_queue_depth(10)
+        result = orchestrator.process(img)
+
+        assert result["profile"] == "fast"
+        # 處理完成回報延遲時再次評估：佇列仍積壓，繼續降級
+        assert orchestrator.get_metrics()["profile"]["profile"] == "minimal"
@@ -0,0 +1,154 @@
+"""
+測試低分欄位重新辨識（refine）
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.budget import TimeBudget
+from ocr_pipeline.core.extractors import HybridExtractor
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "refine_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        },
+        "random_code": {
+            "rect_ratio": {"x": 0.6, "y": 0.6, "width": 0.2, "height": 0.05},
+            "pattern": r"^\d{4}$",
+            "required": True
+        }
+    }
+}
+
+IMAGE = np.zeros((1000, 1000, 3), dtype=np.uint8)
+
+
+class CropFriendlyOCRAdapter:
+    """
+    全圖時 random_code 信心偏低；裁切（非全圖尺寸）時整塊辨識為指定文字、信心高
+    """
+
+    def __init__(self, crop_text="3472", crop_conf=0.98, delay=0.0):
+        self.crop_text = crop_text
+        self.crop_conf = crop_conf
+        self.delay = delay
+        self.calls = []
+
+    def recognize(self, image):
+        h, w = image.shape[:2]
+        self.calls.append((w, h))
+        if (w, h) != (1000, 1000):
+            return [((0, 0, w, h), (self.crop_text, self.crop_conf))]
+        time.sleep(self.delay)
+        return [
+            ((100, 100, 300, 50), ("AB12345678", 0.95)),
+            ((600, 600, 200, 50), ("3472", 0.3)),
+        ]
+
+
+class TestRefineFields:
+    """HybridExtractor.refine_fields 測試"""
+
+    def test_refines_low_score_field(self):
+        adapter = CropFriendlyOCRAdapter()
+        extractor = HybridExtractor(adapter)
+        fields = extractor.extract_fields(IMAGE, TEMPLATE)
+        before = fields['random_code']['total_score']
+
+        refined = extractor.refine_fields(IMAGE, fields, TEMPLATE, threshold=0.8)
+
+        assert refined == ['random_code']
+        assert fields['random_code']['refined'] is True
+        assert fields['random_code']['confidence'] == 0.98
+        assert fields['random_code']['total_score'] > before
+        assert 'refined' not in fields['invoice_number']
+        # 只多一次小區域辨識（放大 2 倍的 bbox + padding）
+        assert len(adapter.calls) == 2
+        assert adapter.calls[1][0] < 1000
+
+    def test_keeps_original_when_crop_is_worse(self):
+        adapter = CropFriendlyOCRAdapter(crop_text="garbage")
+        extractor = HybridExtractor(adapter)
+        fields = extractor.extract_fields(IMAGE, TEMPLATE)
+        original = dict(fields['random_code'])
+
+        assert extractor.refine_fields(IMAGE, fields, TEMPLATE) == []
+        assert fields['random_code'] == original
+
+    def test_expired_budget_records_unrefined_fields(self):
+        """預算用完時不重新辨識，低分欄位記錄於 unrefined_fields"""
+        adapter = CropFriendlyOCRAdapter()
+        extractor = HybridExtractor(adapter)
+        fields = extractor.extract_fields(IMAGE, TEMPLATE)
+
+        refined = extractor.refine_fields(IMAGE, fields, TEMPLATE, budget=TimeBudget(0))
+
+        assert refined == []
+        assert extractor.unrefined_fields == ['random_code']
+        assert 'refined' not in fields['random_code']
+        assert len(adapter.calls) == 1
+
+        extractor.refine_fields(IMAGE, fields, TEMPLATE)
+        assert extractor.unrefined_fields == []
+
+    def test_polygon_bbox(self):
+        adapter = CropFriendlyOCRAdapter()
+        extractor = HybridExtractor(adapter)
+        fields = {
+            'random_code': {
+                'text': '3472', 'confidence': 0.3,
+                'bbox': [[600, 600], [800, 600], [800, 650], [600, 650]],
+                'total_score': 0.4
+            }
+        }
+
+        assert extractor.refine_fields(IMAGE, fields, TEMPLATE) == ['random_code']
+
+
+class TestOrchestratorRefine:
+    """Orchestrator refine 測試"""
+
+    def test_refined_fields_in_result(self):
+        orchestrator = Orchestrator(CropFriendlyOCRAdapter(), refine={'threshold': 0.8})
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(IMAGE)
+
+        assert result['refined_fields'] == ['random_code']
+        assert result['refine_budget_exhausted'] is False
+        assert result['fields']['random_code']['confidence'] == 0.98
+
+    def test_budget_exhausted_before_refine(self):
+        """欄位都已提取但預算在重新辨識前用完：結果標記為不完整"""
+        orchestrator = Orchestrator(CropFriendlyOCRAdapter(delay=0.05), refine={'threshold': 0.8})
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(IMAGE, budget_ms=20)
+
+        assert result['skipped_fields'] == []
+        assert result['refined_fields'] == []
+        assert result['refine_budget_exhausted'] is True
+        assert result['incomplete'] is True
+        assert result['fields']['random_code']['confidence'] == 0.3
+
+    def test_disabled_by_default(self):
+        orchestrator = Orchestrator(CropFriendlyOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+        assert 'refined_fields' not in orchestrator.process(IMAGE)
+
+    @pytest.mark.parametrize("options", [
+        {'upscale': 0},
+        {'padding': -1},
+        {'scale': 2},
+    ])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            Orchestrator(CropFriendlyOCRAdapter(), refine=options)
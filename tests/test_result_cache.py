@@ -0,0 +1,223 @@
+"""
+測試 ResultCache - 內容雜湊結果快取
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.ocr import PaddleOCRAdapter
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.core.result_cache import ResultCache, fingerprint
+
+
+TEMPLATE = {
+    "template_id": "cache_test_v1",
+    "version": "1.0.0",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class MockOCRAdapter:
+    """記錄呼叫次數"""
+
+    def __init__(self, config=None):
+        self.calls = 0
+        self.config = config or {'lang': 'ch'}
+
+    def recognize(self, image, **options):
+        self.calls += 1
+        return [((100, 100, 300, 50), ("AB12345678", 0.95))]
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "doc.png"
+    cv2.imwrite(str(path), np.full((1000, 1000, 3), 255, dtype=np.uint8))
+    return path
+
+
+def make_orchestrator(cache, adapter=None, template=TEMPLATE, **kwargs):
+    orchestrator = Orchestrator(adapter or MockOCRAdapter(), result_cache=cache, **kwargs)
+    orchestrator.load_template(template)
+    return orchestrator
+
+
+class TestResultCache:
+    """快取本身"""
+
+    def test_lru_eviction(self):
+        """超過 max_entries 時淘汰最久未使用的結果"""
+        cache = ResultCache(max_entries=2)
+        cache.put('a', {'v': 1})
+        cache.put('b', {'v': 2})
+        cache.get('a')
+        cache.put('c', {'v': 3})
+
+        assert cache.get('b') is None
+        assert cache.get('a') == {'v': 1}
+        assert cache.stats()['entries'] == 2
+
+    def test_returns_copies(self):
+        """呼叫端修改回傳結果不影響快取"""
+        cache = ResultCache()
+        cache.put('a', {'fields': {'x': {'text': '1'}}})
+        cache.get('a')['fields']['x']['text'] = 'changed'
+
+        assert cache.get('a')['fields']['x']['text'] == '1'
+
+    def test_persistent_tier(self, tmp_path):
+        """持久層在重新開啟後仍可命中"""
+        path = tmp_path / "cache.db"
+        with ResultCache(persistent_path=path) as cache:
+            cache.put('a', {'score': np.float32(0.5)})
+
+        with ResultCache(persistent_path=path) as cache:
+            assert cache.get('a') == {'score': 0.5}
+            assert cache.get('a') == {'score': 0.5}
+            stats = cache.stats()
+        assert stats['persistent_hits'] == 1
+        assert stats['hits'] == 1
+
+    def test_persistent_tier_keeps_tuples(self, tmp_path):
+        """持久層命中時 tuple 仍為 tuple，與記憶體層相同"""
+        path = tmp_path / "cache.db"
+        result = {'bbox': (1, 2, 3, 4), 'lines': [((1, 2), 'a')], 'list': [1, 2]}
+        with ResultCache(persistent_path=path) as cache:
+            cache.put('a', result)
+
+        with ResultCache(persistent_path=path) as cache:
+            restored = cache.get('a')
+
+        assert restored == result
+        assert isinstance(restored['bbox'], tuple)
+        assert isinstance(restored['lines'][0][0], tuple)
+        assert isinstance(restored['list'], list)
+
+    def test_input_digest(self, tmp_path, image_path):
+        """相同內容的檔案得到相同雜湊；不同輸入型別各自雜湊"""
+        cache = ResultCache()
+        copy_path = tmp_path / "copy.png"
+        copy_path.write_bytes(image_path.read_bytes())
+
+        assert cache.input_digest(image_path) == cache.input_digest(copy_path)
+        assert cache.input_digest(image_path.read_bytes()).startswith('bytes:')
+        assert cache.input_digest(np.zeros((4, 4), dtype=np.uint8)).startswith('pixels:')
+        with pytest.raises(FileNotFoundError):
+            cache.input_digest(tmp_path / "missing.png")
+
+    def test_fingerprint_is_order_independent(self):
+        """指紋與 dict 鍵順序無關"""
+        assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+        assert fingerprint({'a': 1}) != fingerprint({'a': 2})
+
+    def test_invalid_max_entries(self):
+        """max_entries < 1 應拋出 ValueError"""
+        with pytest.raises(ValueError):
+            ResultCache(max_entries=0)
+
+
+class TestOrchestratorResultCache:
+    """Orchestrator 整合"""
+
+    def test_repeat_submission_skips_ocr(self, image_path):
+        """重複送件直接回傳快取結果"""
+        adapter = MockOCRAdapter()
+        orchestrator = make_orchestrator(ResultCache(), adapter)
+
+        first = orchestrator.process(image_path)
+        second = orchestrator.process(str(image_path), document_id='doc-2')
+
+        assert adapter.calls == 1
+        assert first['cache_hit'] is False
+        assert second['cache_hit'] is True
+        assert second['document_id'] == 'doc-2'
+        assert second['fields'] == first['fields']
+        assert orchestrator.get_metrics()['result_cache']['hits'] == 1
+
+    def test_shared_cache_respects_engine_config(self, image_path):
+        """引擎設定不同的 Orchestrator 不共用結果"""
+        cache = ResultCache()
+        first = MockOCRAdapter({'lang': 'ch'})
+        second = MockOCRAdapter({'lang': 'en'})
+        make_orchestrator(cache, first).process(image_path)
+        make_orchestrator(cache, second).process(image_path)
+        make_orchestrator(cache, MockOCRAdapter({'lang': 'ch'})).process(image_path)
+
+        assert (first.calls, second.calls) == (1, 1)
+        assert cache.stats()['hits'] == 1
+
+    def test_adapter_setting_change_invalidates(self, image_path):
+        """建立後修改適配器設定（門檻、語言）不再命中舊結果"""
+        adapter = MockOCRAdapter()
+        adapter.min_confidence = 0.6
+        orchestrator = make_orchestrator(ResultCache(), adapter)
+        orchestrator.process(image_path)
+
+        adapter.min_confidence = 0.9
+        assert orchestrator.process(image_path)['cache_hit'] is False
+        assert orchestrator.process(image_path)['cache_hit'] is True
+        assert adapter.calls == 2
+
+    def test_paddle_fingerprint_follows_set_language(self):
+        """PaddleOCRAdapter.fingerprint() 反映 set_language() 與門檻"""
+        adapter = PaddleOCRAdapter(min_confidence=0.6)
+        before = adapter.fingerprint()
+        adapter.set_language('en')
+
+        assert adapter.fingerprint()['lang'] == 'en'
+        assert adapter.fingerprint() != before
+        assert PaddleOCRAdapter(min_confidence=0.8).fingerprint() != \
+            PaddleOCRAdapter(min_confidence=0.6).fingerprint()
+
+    def test_persistent_hit_matches_miss(self, tmp_path, image_path):
+        """持久層命中的結果與第一次處理的結果型別相同"""
+        path = tmp_path / "cache.db"
+        with ResultCache(persistent_path=path) as cache:
+            first = make_orchestrator(cache).process(image_path)
+        with ResultCache(persistent_path=path) as cache:
+            second = make_orchestrator(cache).process(image_path)
+
+        assert second['cache_hit'] is True
+        assert second['fields'] == first['fields']
+        bbox = first['fields']['invoice_number']['bbox']
+        assert type(second['fields']['invoice_number']['bbox']) is type(bbox)
+
+    def test_template_change_invalidates(self, tmp_path, image_path):
+        """範本檔變更後自動重新載入，舊結果不再命中"""
+        template_path = tmp_path / "template.json"
+        template_path.write_text(json.dumps(TEMPLATE), encoding='utf-8')
+        adapter = MockOCRAdapter()
+        orchestrator = make_orchestrator(ResultCache(), adapter, template=template_path)
+        orchestrator.process(image_path)
+
+        changed = json.loads(json.dumps(TEMPLATE))
+        changed['regions']['invoice_number']['required'] = False
+        template_path.write_text(json.dumps(changed), encoding='utf-8')
+        stat = template_path.stat()
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        result = orchestrator.process(image_path)
+        assert result['cache_hit'] is False
+        assert adapter.calls == 2
+        assert orchestrator.template['regions']['invoice_number']['required'] is False
+
+    def test_incomplete_results_not_cached(self, image_path):
+        """預算用完的部分結果不快取"""
+        adapter = MockOCRAdapter()
+        orchestrator = make_orchestrator(ResultCache(), adapter)
+
+        orchestrator.process(image_path, budget_ms=0)
+        result = orchestrator.process(image_path, budget_ms=0)
+
+        assert result['incomplete'] is True
+        assert result['cache_hit'] is False
@@ -0,0 +1,303 @@
+"""
+測試結果儲存 - JsonlSink / CsvSink / SqliteSink
+"""
+
+import csv
+import gzip
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.storage import CsvSink, JsonlSink, ResultSink, SqliteSink
+from ocr_pipeline.core.batch_runner import BatchRunner, CheckpointStore
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "sink_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        },
+        "note": {
+            "rect_ratio": {"x": 0.1, "y": 0.5, "width": 0.3, "height": 0.05},
+            "pattern": r"[a-z]+",
+            "required": False
+        }
+    }
+}
+
+
+def make_result(index, note=None):
+    """模擬 Orchestrator 的結果"""
+    return {
+        "document_id": f"doc-{index}",
+        "template_id": "sink_test_v1",
+        "profile": "full",
+        "fields": {
+            "invoice_number": {
+                "text": f"AB{index:08d}",
+                "total_score": np.float32(0.9),
+                "bbox": (100, 100, 300, 50)
+            },
+            "note": {"text": note, "total_score": 0.7} if note else None
+        }
+    }
+
+
+class MockOCRAdapter:
+    def recognize(self, image):
+        return [((100, 100, 300, 50), ("AB12345678", 0.95))]
+
+
+class RecordingSink(ResultSink):
+    """記錄每次寫出的批次大小"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.fail = False
+
+    def _write_batch(self, records):
+        if self.fail:
+            raise IOError("disk full")
+        self.batches.append([r["document_id"] for r in records])
+
+
+class TestResultSink:
+    """ResultSink 緩衝測試"""
+
+    def test_flush_on_batch_size(self):
+        """測試：累積 batch_size 份才寫出"""
+        sink = RecordingSink(batch_size=2, flush_interval=3600)
+        sink.write_many(make_result(i) for i in range(5))
+
+        assert sink.batches == [["doc-0", "doc-1"], ["doc-2", "doc-3"]]
+        sink.close()
+        assert sink.batches[-1] == ["doc-4"]
+        assert sink.written == 5
+
+    def test_flush_on_interval(self):
+        """測試：超過 flush_interval 時寫出"""
+        sink = RecordingSink(batch_size=100, flush_interval=0)
+        sink.write(make_result(0))
+
+        assert sink.batches == [["doc-0"]]
+
+    def test_failed_write_keeps_buffer(self):
+        """測試：寫出失敗時結果保留在緩衝區"""
+        sink = RecordingSink(batch_size=100, flush_interval=3600)
+        sink.write(make_result(0))
+        sink.fail = True
+        with pytest.raises(IOError):
+            sink.flush()
+
+        sink.fail = False
+        sink.flush()
+        assert sink.batches == [["doc-0"]]
+
+    def test_closed_sink(self):
+        """測試：關閉後不可寫入，重複關閉無作用"""
+        sink = RecordingSink()
+        sink.close()
+        sink.close()
+        with pytest.raises(RuntimeError):
+            sink.write(make_result(0))
+
+    def test_write_batch_is_abstract(self):
+        """測試：未實作 _write_batch 的子類別無法建立"""
+        class Incomplete(ResultSink):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_invalid_arguments(self):
+        """測試：無效參數"""
+        with pytest.raises(ValueError):
+            RecordingSink(batch_size=0)
+        with pytest.raises(ValueError):
+            RecordingSink(flush_interval=-1)
+
+
+class TestJsonlSink:
+    """JsonlSink 測試"""
+
+    def test_write_lines(self, tmp_path):
+        """測試：每份結果一行 JSON（numpy 數值可序列化）"""
+        with JsonlSink(tmp_path / "out" / "results.jsonl") as sink:
+            sink.write_many(make_result(i) for i in range(3))
+
+        lines = (tmp_path / "out" / "results.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["document_id"] for line in lines] == ["doc-0", "doc-1", "doc-2"]
+        assert json.loads(lines[0])["fields"]["invoice_number"]["bbox"] == [100, 100, 300, 50]
+
+    def test_rotation_and_compression(self, tmp_path):
+        """測試：超過 max_bytes 換下一個分段，gzip 壓縮"""
+        line_size = len(json.dumps(make_result(0), ensure_ascii=False, default=float)) + 1
+        with JsonlSink(tmp_path / "results.jsonl", max_bytes=line_size * 2,
+                       compress=True, batch_size=5) as sink:
+            sink.write_many(make_result(i) for i in range(5))
+
+        assert [p.name for p in sink.files] == [
+            "results-00000.jsonl.gz", "results-00001.jsonl.gz", "results-00002.jsonl.gz"
+        ]
+        with gzip.open(sink.files[0], "rt", encoding="utf-8") as f:
+            assert len(f.read().splitlines()) == 2
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_retry_after_partial_write_does_not_duplicate(self, tmp_path, compress):
+        """測試：寫到一半失敗（已換過分段）後重試，每筆結果只寫出一次且沒有不完整的行"""
+        line_size = len(json.dumps(make_result(0), ensure_ascii=False, default=float)) + 1
+        sink = JsonlSink(tmp_path / "results.jsonl", max_bytes=line_size * 2,
+                         compress=compress, batch_size=100)
+        sink.write_many(make_result(i) for i in range(5))
+
+        class FlakyFile:
+            """第一次寫入只寫出一半資料後失敗"""
+
+            def __init__(self, file):
+                self._file = file
+                self.failed = False
+
+            def write(self, data):
+                if self.failed:
+                    return self._file.write(data)
+                self.failed = True
+                self._file.write(bytes(data[:len(data) // 2]))
+                raise OSError("disk full")
+
+            def __getattr__(self, name):
+                return getattr(self._file, name)
+
+        original_open = sink._open
+
+        def flaky_open():
+            original_open()
+            if len(sink.files) == 2:
+                sink._file = FlakyFile(sink._file)
+
+        sink._open = flaky_open
+        with pytest.raises(OSError):
+            sink.flush()
+        assert sink.written == 2
+
+        sink.close()
+
+        opener = gzip.open if compress else open
+        lines = []
+        for path in sink.files:
+            with opener(path, "rt", encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+        assert [json.loads(line)["document_id"] for line in lines] == [
+            f"doc-{i}" for i in range(5)
+        ]
+        assert sink.written == 5
+
+    def test_restart_starts_new_part(self, tmp_path):
+        """測試：重新啟動時不附加到舊分段"""
+        for _ in range(2):
+            with JsonlSink(tmp_path / "results.jsonl", max_bytes=10_000) as sink:
+                sink.write(make_result(0))
+
+        assert sink.files == [tmp_path / "results-00001.jsonl"]
+
+
+class TestCsvSink:
+    """CsvSink 測試"""
+
+    def test_one_column_per_field(self, tmp_path):
+        """測試：每個範本欄位一欄，找不到的欄位為空字串"""
+        path = tmp_path / "results.csv"
+        with CsvSink(path, fields=TEMPLATE["regions"], include_scores=True) as sink:
+            sink.write(make_result(1, note="memo"))
+            sink.write(make_result(2))
+
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["document_id", "template_id", "invoice_number",
+                           "invoice_number_score", "note", "note_score"]
+        assert rows[1] == ["doc-1", "sink_test_v1", "AB00000001", "0.9", "memo", "0.7"]
+        assert rows[2][4:] == ["", ""]
+
+    def test_append_without_header(self, tmp_path):
+        """測試：附加到既有檔案時不重寫標題列；未指定欄位時以第一份結果為準"""
+        path = tmp_path / "results.csv"
+        for index in range(2):
+            with CsvSink(path) as sink:
+                sink.write(make_result(index))
+
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["document_id", "template_id", "invoice_number", "note"]
+        assert len(rows) == 3
+
+
+class TestSqliteSink:
+    """SqliteSink 測試"""
+
+    def test_batched_insert(self, tmp_path):
+        """測試：批次寫入結果資料表"""
+        path = tmp_path / "results.db"
+        with SqliteSink(path, batch_size=2) as sink:
+            sink.write_many(make_result(i) for i in range(3))
+
+        conn = sqlite3.connect(str(path))
+        rows = conn.execute("SELECT document_id, fields FROM results ORDER BY id").fetchall()
+        conn.close()
+        assert [row[0] for row in rows] == ["doc-0", "doc-1", "doc-2"]
+        assert json.loads(rows[0][1])["invoice_number"]["text"] == "AB00000000"
+
+    def test_invalid_table_name(self, tmp_path):
+        """測試：無效的資料表名稱"""
+        with pytest.raises(ValueError):
+            SqliteSink(tmp_path / "results.db", table="results; DROP TABLE x")
+
+
+class TestSinkIntegration:
+    """結果儲存與批次 / 串流 API 整合測試"""
+
+    def test_process_stream_with_sink(self, tmp_path):
+        """測試：process_stream 寫入結果儲存，結束時 flush"""
+        orchestrator = Orchestrator(MockOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+        image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        sink = RecordingSink(batch_size=100, flush_interval=3600)
+
+        results = list(orchestrator.process_stream([("a", image), ("b", image)], sink=sink))
+
+        assert len(results) == 2
+        assert sink.batches == [["a", "b"]]
+
+    def test_batch_runner_flushes_sink_before_checkpoint(self, tmp_path):
+        """測試：寫入檢查點前先寫出結果"""
+        orchestrator = Orchestrator(MockOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+        image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        sink = RecordingSink(batch_size=100, flush_interval=3600)
+        checkpoint = tmp_path / "ckpt.db"
+
+        BatchRunner(orchestrator, checkpoint, flush_every=2, sink=sink).run(
+            [(f"doc-{i}", image) for i in range(3)]
+        )
+
+        assert sink.batches == [["doc-0", "doc-1"], ["doc-2"]]
+
+    def test_batch_runner_sink_failure_aborts_without_checkpoint(self, tmp_path):
+        """測試：結果寫出失敗時中止批次，不記錄完成"""
+        orchestrator = Orchestrator(MockOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+        image = np.zeros((1000, 1000, 3), dtype=np.uint8)
+        sink = RecordingSink(batch_size=100, flush_interval=3600)
+        sink.fail = True
+        checkpoint = tmp_path / "ckpt.db"
+
+        with pytest.raises(IOError):
+            BatchRunner(orchestrator, checkpoint, sink=sink).run([("doc-0", image)])
+
+        with CheckpointStore(checkpoint) as store:
+            assert store.load() == {}
@@ -0,0 +1,174 @@
+"""
+測試 JobScheduler - 具優先序與截止時間的工作排程器
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.scheduler import (
+    JobScheduler,
+    DeadlineExceededError,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BULK,
+)
+
+
+TEMPLATE = {
+    "template_id": "scheduler_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}"
+        }
+    }
+}
+
+
+class RecordingOCR:
+    """依影像像素值記錄處理順序；像素值 0 的影像會阻塞直到 release"""
+
+    def __init__(self, delay=0.0):
+        self.order = []
+        self.delay = delay
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self._lock = threading.Lock()
+
+    def recognize(self, image):
+        value = int(image[0, 0, 0])
+        if value == 0:
+            self.started.set()
+            self.release.wait(5)
+        time.sleep(self.delay)
+        with self._lock:
+            self.order.append(value)
+        return [((100, 100, 150, 30), ("AB12345678", 0.95))]
+
+
+def make_image(value):
+    return np.full((1000, 1000, 3), value, dtype=np.uint8)
+
+
+class TestJobScheduler:
+    """JobScheduler 測試"""
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="interactive_reserved"):
+            JobScheduler(RecordingOCR(), workers=1, interactive_reserved=1)
+
+        scheduler = JobScheduler(RecordingOCR())
+        with pytest.raises(ValueError, match="No template loaded"):
+            scheduler.submit(make_image(1))
+
+        scheduler.load_template(TEMPLATE)
+        with pytest.raises(ValueError, match="priority"):
+            scheduler.submit(make_image(1), priority="urgent")
+
+    def test_process_returns_result(self):
+        with JobScheduler(RecordingOCR()) as scheduler:
+            scheduler.load_template(TEMPLATE)
+            result = scheduler.submit(make_image(1)).result(timeout=5)
+
+        assert result["fields"]["invoice_number"]["text"] == "AB12345678"
+
+    def test_template_file_reloads_on_every_worker(self, tmp_path):
+        path = tmp_path / "template.json"
+        path.write_text(json.dumps(TEMPLATE), encoding="utf-8")
+        with JobScheduler(RecordingOCR(), workers=2) as scheduler:
+            scheduler.load_template(path)
+            path.write_text(json.dumps({**TEMPLATE, "template_id": "scheduler_v2"}),
+                            encoding="utf-8")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+            ids = [o._current_template()["template_id"] for o in scheduler._orchestrators]
+
+        assert ids == ["scheduler_v2", "scheduler_v2"]
+
+    def test_interactive_before_bulk_and_edf(self):
+        ocr = RecordingOCR()
+        with JobScheduler(ocr) as scheduler:
+            scheduler.load_template(TEMPLATE)
+            blocker = scheduler.submit(make_image(0), priority=PRIORITY_BULK)
+            assert ocr.started.wait(5)
+
+            futures = [
+                scheduler.submit(make_image(1), priority=PRIORITY_BULK),
+                scheduler.submit(make_image(2), priority=PRIORITY_INTERACTIVE, deadline_ms=5000),
+                scheduler.submit(make_image(3), priority=PRIORITY_INTERACTIVE, deadline_ms=2000),
+                scheduler.submit(make_image(4), priority=PRIORITY_INTERACTIVE),
+            ]
+            ocr.release.set()
+            blocker.result(timeout=5)
+            for future in futures:
+                future.result(timeout=5)
+
+        assert ocr.order == [0, 3, 2, 4, 1]
+
+    def test_expired_job_dropped_before_ocr(self):
+        ocr = RecordingOCR()
+        with JobScheduler(ocr) as scheduler:
+            scheduler.load_template(TEMPLATE)
+            blocker = scheduler.submit(make_image(0))
+            assert ocr.started.wait(5)
+
+            late = scheduler.submit(make_image(5), priority=PRIORITY_INTERACTIVE, deadline_ms=1)
+            time.sleep(0.02)
+            ocr.release.set()
+            blocker.result(timeout=5)
+
+            with pytest.raises(DeadlineExceededError):
+                late.result(timeout=5)
+            stats = scheduler.stats()
+
+        assert 5 not in ocr.order
+        assert stats[PRIORITY_INTERACTIVE]["expired"] == 1
+
+    def test_reserved_worker_serves_interactive_during_bulk(self):
+        ocr = RecordingOCR()
+        with JobScheduler(ocr, workers=2, interactive_reserved=1) as scheduler:
+            scheduler.load_template(TEMPLATE)
+            bulk = scheduler.submit(make_image(0), priority=PRIORITY_BULK)
+            assert ocr.started.wait(5)
+            # 共用 worker 被 bulk 佔住，interactive 仍可由保留 worker 處理
+            interactive = scheduler.submit(make_image(7), priority=PRIORITY_INTERACTIVE)
+            interactive.result(timeout=5)
+            assert not bulk.done()
+            ocr.release.set()
+            bulk.result(timeout=5)
+
+        assert ocr.order == [7, 0]
+
+    def test_reserved_worker_ignores_bulk(self):
+        ocr = RecordingOCR()
+        with JobScheduler(ocr, workers=2, interactive_reserved=1) as scheduler:
+            scheduler.load_template(TEMPLATE)
+            blocker = scheduler.submit(make_image(0), priority=PRIORITY_BULK)
+            assert ocr.started.wait(5)
+            other_bulk = scheduler.submit(make_image(8), priority=PRIORITY_BULK)
+            time.sleep(0.05)
+            assert not other_bulk.done()
+            assert scheduler.queue_depth(PRIORITY_BULK) == 1
+            ocr.release.set()
+            other_bulk.result(timeout=5)
+
+    def test_shutdown_cancel_pending(self):
+        ocr = RecordingOCR()
+        scheduler = JobScheduler(ocr)
+        scheduler.load_template(TEMPLATE)
+        scheduler.submit(make_image(0))
+        assert ocr.started.wait(5)
+        pending = scheduler.submit(make_image(9))
+
+        scheduler.shutdown(wait=False, cancel_pending=True)
+        ocr.release.set()
+        scheduler.shutdown()
+
+        assert pending.cancelled()
+        with pytest.raises(RuntimeError, match="shut down"):
+            scheduler.submit(make_image(1))
@@ -0,0 +1,203 @@
+"""
+測試 SingleFlight - 相同工作的進行中合併
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.orchestrator import Orchestrator
+from ocr_pipeline.core.single_flight import SingleFlight
+from ocr_pipeline.utils.image_utils import compute_image_hash
+
+
+TEMPLATE = {
+    "template_id": "single_flight_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}"
+        }
+    }
+}
+
+
+class SlowOCRAdapter:
+    """耗時的模擬 OCR 引擎"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [((100, 100, 150, 30), ("AB12345678", 0.95))]
+
+
+def run_in_threads(fn, count):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestSingleFlight:
+    """SingleFlight 測試"""
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+
+        assert flight.do("k", lambda: 1) == (1, False)
+        assert flight.do("k", lambda: 2) == (2, False)
+        assert flight.stats()["misses"] == 2
+        assert flight.stats()["in_flight"] == 0
+
+    def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "result"
+
+        results = run_in_threads(lambda: flight.do("k", work), 4)
+
+        assert len(calls) == 1
+        assert all(r[0] == "result" for r in results)
+        assert sum(1 for r in results if r[1]) == 3
+        assert flight.stats()["hits"] == 3
+
+    def test_exception_propagates_to_waiters(self):
+        flight = SingleFlight()
+
+        def work():
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        results = run_in_threads(lambda: flight.do("k", work), 3)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["in_flight"] == 0
+
+
+class TestOrchestratorSingleFlight:
+    """Orchestrator 的 single-flight 整合測試"""
+
+    def test_identical_images_run_ocr_once(self):
+        adapter = SlowOCRAdapter()
+        orchestrator = Orchestrator(adapter, single_flight=SingleFlight())
+        orchestrator.load_template(TEMPLATE)
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        results = run_in_threads(lambda: orchestrator.process(img.copy()), 3)
+
+        assert adapter.calls == 1
+        assert all(r["fields"]["invoice_number"]["text"] == "AB12345678" for r in results)
+        # 共用結果各自獨立
+        assert results[0] is not results[1]
+        assert orchestrator.get_metrics()["single_flight"]["hits"] == 2
+
+    def test_shared_results_are_deep_copies(self):
+        """測試：每個呼叫者拿到獨立的結果，修改巢狀欄位不影響其他呼叫者"""
+        orchestrator = Orchestrator(SlowOCRAdapter(), single_flight=SingleFlight())
+        orchestrator.load_template(TEMPLATE)
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        results = run_in_threads(lambda: orchestrator.process(img.copy()), 3)
+        results[0]["fields"]["invoice_number"]["text"] = "changed"
+
+        fields = [r["fields"]["invoice_number"] for r in results]
+        assert len({id(f) for f in fields}) == 3
+        assert [f["text"] for f in fields[1:]] == ["AB12345678", "AB12345678"]
+
+    def test_different_engine_settings_are_not_coalesced(self):
+        """測試：共用 SingleFlight 的 Orchestrator 引擎設定不同時不合併"""
+        flight = SingleFlight()
+        adapters = [SlowOCRAdapter(), SlowOCRAdapter()]
+        adapters[0].lang = "ch"
+        adapters[1].lang = "en"
+        orchestrators = [Orchestrator(a, single_flight=flight) for a in adapters]
+        for orchestrator in orchestrators:
+            orchestrator.load_template(TEMPLATE)
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        run_in_threads(lambda: orchestrators.pop().process(img.copy()), 2)
+
+        assert [a.calls for a in adapters] == [1, 1]
+        assert flight.stats()["hits"] == 0
+
+    def test_different_template_versions_are_not_coalesced(self):
+        """測試：範本 ID 相同但版本不同時不合併"""
+        flight = SingleFlight()
+        adapter = SlowOCRAdapter()
+        orchestrators = []
+        for version in ("1", "2"):
+            orchestrator = Orchestrator(adapter, single_flight=flight)
+            orchestrator.load_template(dict(TEMPLATE, version=version))
+            orchestrators.append(orchestrator)
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        run_in_threads(lambda: orchestrators.pop().process(img.copy()), 2)
+
+        assert adapter.calls == 2
+        assert flight.stats()["hits"] == 0
+
+    def test_different_images_are_not_coalesced(self):
+        adapter = SlowOCRAdapter(delay=0.01)
+        orchestrator = Orchestrator(adapter, single_flight=SingleFlight())
+        orchestrator.load_template(TEMPLATE)
+
+        orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8))
+        orchestrator.process(np.ones((1000, 1000, 3), dtype=np.uint8))
+
+        assert adapter.calls == 2
+
+    def test_budgeted_calls_are_not_coalesced(self):
+        """有預算的請求不與無預算的請求共用（部分）結果"""
+        adapter = SlowOCRAdapter()
+        flight = SingleFlight()
+        orchestrator = Orchestrator(adapter, single_flight=flight)
+        orchestrator.load_template(TEMPLATE)
+        img = np.ones((1000, 1000, 3), dtype=np.uint8)
+
+        calls = [
+            lambda: orchestrator.process(img.copy(), budget_ms=1),
+            lambda: orchestrator.process(img.copy()),
+        ]
+
+        results = run_in_threads(lambda: calls.pop()(), 2)
+
+        plain = [r for r in results if 'incomplete' not in r]
+        assert len(plain) == 1
+        assert plain[0]["fields"]["invoice_number"]["text"] == "AB12345678"
+        assert flight.stats()["hits"] == 0
+
+    def test_metrics_empty_without_single_flight(self):
+        assert Orchestrator(SlowOCRAdapter()).get_metrics() == {}
+
+
+def test_compute_image_hash():
+    a = np.zeros((10, 10, 3), dtype=np.uint8)
+    b = a.copy()
+    b[0, 0, 0] = 1
+
+    assert compute_image_hash(a) == compute_image_hash(a.copy())
+    assert compute_image_hash(a) != compute_image_hash(b)
+    # 相同位元組但不同形狀視為不同影像
+    assert compute_image_hash(a) != compute_image_hash(a.reshape(30, 10))
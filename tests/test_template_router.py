@@ -0,0 +1,242 @@
+"""
+測試 TemplateRouter - 範本路由索引
+"""
+
+import json
+from pathlib import Path
+
+import cv2
+import pytest
+import numpy as np
+
+from ocr_pipeline.template.router import TemplateRouter, extract_literal_fragments
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+def make_template(template_id, patterns, anchor_keywords=None, size_range=None):
+    """建立測試範本"""
+    template = {
+        'template_id': template_id,
+        'sampling_metadata': {'size_range': size_range},
+        'regions': {
+            f'field_{i}': {
+                'rect_ratio': {'x': 0.1, 'y': 0.1 * i, 'width': 0.5, 'height': 0.05},
+                'pattern': pattern,
+                'extract_group': 1,
+                'required': True
+            }
+            for i, pattern in enumerate(patterns)
+        }
+    }
+    if anchor_keywords:
+        template['anchor_keywords'] = anchor_keywords
+    return template
+
+
+class TestExtractLiteralFragments:
+    """正則字面片段抽取測試"""
+
+    def test_cjk_prefix(self):
+        assert extract_literal_fragments(r'隨機碼[:：]\s*(\d{4})') == ['隨機碼']
+
+    def test_no_literal(self):
+        assert extract_literal_fragments(r'[A-Z]{2}-\d{8}') == []
+
+    def test_quantified_char_removed(self):
+        assert extract_literal_fragments(r'統一編號?\d{8}') == ['統一編']
+
+    def test_alternation_branches_are_not_required(self):
+        assert extract_literal_fragments(r'(?:發票號碼|字軌)') == []
+        assert extract_literal_fragments(r'發票|收據') == []
+        assert extract_literal_fragments(r'(?:統一編號|統編)[:：](\d{8})元整') == ['元整']
+
+    def test_optional_groups_are_not_required(self):
+        assert extract_literal_fragments(r'(?:NT\$)?\s*([\d,]+)') == []
+        assert extract_literal_fragments(r'總計(?:金額)*\s*(\d+)') == ['總計']
+        assert extract_literal_fragments(r'(?:發票){0,1}號碼') == ['號碼']
+        assert extract_literal_fragments(r'(?:字軌)+號碼') == ['字軌', '號碼']
+
+    def test_lookaround_groups(self):
+        assert extract_literal_fragments(r'(?<=隨機碼)\d{4}') == ['隨機碼']
+        assert extract_literal_fragments(r'\d{4}(?=元整)') == ['元整']
+        assert extract_literal_fragments(r'(?<!作廢)發票(?!副本)') == ['發票']
+
+    def test_named_groups(self):
+        assert extract_literal_fragments(r'(?P<code>隨機碼)\d{4}') == ['隨機碼']
+
+    def test_inline_ignore_case(self):
+        assert extract_literal_fragments(r'(?i)TOTAL\s*(\d+)') == ['total']
+        assert extract_literal_fragments(r'(?i:Total)\s*Amount') == ['total', 'Amount']
+
+    def test_min_length(self):
+        assert extract_literal_fragments(r'年\d+月', min_length=2) == []
+        assert extract_literal_fragments(r'年\d+月', min_length=1) == ['年', '月']
+
+
+class TestTemplateRouter:
+    """範本路由器測試"""
+
+    @pytest.fixture
+    def router(self):
+        router = TemplateRouter()
+        router.add_templates([
+            make_template('einvoice', [r'隨機碼[:：]\s*(\d{4})', r'賣方[:：]?\s*(\d{8})']),
+            make_template('receipt', [r'統一編號\s*(\d{8})'], anchor_keywords=['收據']),
+            make_template(
+                'small_ticket', [r'隨機碼(\d{4})'],
+                size_range={'width': {'min': 100, 'max': 500},
+                            'height': {'min': 700, 'max': 900}}
+            ),
+        ])
+        return router
+
+    def test_route_by_pattern_fragments(self, router):
+        ocr_results = [
+            ((0, 0, 10, 10), ('隨機碼：3472', 0.9)),
+            ((0, 0, 10, 10), ('賣方42552150', 0.9)),
+        ]
+        candidates = router.route(ocr_results, image_size=(2000, 1300))
+
+        assert candidates[0]['template_id'] == 'einvoice'
+        assert candidates[0]['hits'] == 2
+        # small_ticket 長寬比（直式）不符被排除
+        assert all(c['template_id'] != 'small_ticket' for c in candidates)
+
+    def test_route_by_anchor_keyword(self, router):
+        ocr_results = [((0, 0, 10, 10), ('免用統一發票收據', 0.9))]
+        candidates = router.route(ocr_results)
+
+        assert [c['template_id'] for c in candidates] == ['receipt']
+
+    def test_size_range_allows_matching_page(self, router):
+        ocr_results = [((0, 0, 10, 10), ('隨機碼3472', 0.9))]
+        candidates = router.route(ocr_results, image_size=(400, 800))
+
+        assert {c['template_id'] for c in candidates} == {'einvoice', 'small_ticket'}
+
+    @staticmethod
+    def _sample(image_name):
+        samples = Path(__file__).resolve().parent.parent / 'sample_images'
+        with open(samples / 'tw_einvoice_v1_template.json', encoding='utf-8') as f:
+            template = json.load(f)
+        height, width = cv2.imread(str(samples / image_name)).shape[:2]
+        return template, width, height
+
+    @pytest.mark.parametrize('scale', [1, 2])
+    def test_sample_image_routes_to_own_template(self, scale):
+        """樣本影像（含 2 倍解析度重掃）不會被自己的範本以尺寸排除"""
+        template, width, height = self._sample('2025-12-22 16 09 35.png')
+
+        router = TemplateRouter()
+        router.add_template(template)
+        ocr_results = [((0, 0, 10, 10), ('隨機碼 3472', 0.9))]
+        candidates = router.route(ocr_results, image_size=(width * scale, height * scale))
+
+        assert [c['template_id'] for c in candidates] == [template['template_id']]
+        # 橫式頁面仍被排除
+        assert not TemplateRouter.fits_size(template, (height * scale, width * scale))
+
+    def test_square_page_rejected(self):
+        """正方形頁面不符合直式發票的長寬比"""
+        template, _, _ = self._sample('2025-12-22 16 09 35.png')
+
+        assert not TemplateRouter.fits_size(template, (1000, 1000))
+        assert not TemplateRouter.fits_size(template, (1200, 1200))
+
+    def test_long_receipt_needs_wider_tolerance(self):
+        """較長的熱感紙收據超出預設容許範圍，可調大 aspect_tolerance"""
+        template, width, height = self._sample('2025-12-22 16 08 45.png')
+
+        assert not TemplateRouter.fits_size(template, (width, height))
+        assert TemplateRouter.fits_size(template, (width, height), tolerance=0.75)
+        assert not TemplateRouter.fits_size(template, (1000, 1000), tolerance=0.5)
+
+    def test_invalid_aspect_tolerance(self):
+        with pytest.raises(ValueError, match="aspect_tolerance"):
+            TemplateRouter(aspect_tolerance=-1)
+
+    def test_route_case_insensitive_pattern(self):
+        router = TemplateRouter()
+        router.add_template(make_template('english', [r'(?i)total\s*(\d+)']))
+        router.add_template(make_template('exact', [r'Total\s*(\d+)']))
+
+        candidates = router.route([((0, 0, 10, 10), ('TOTAL 1200', 0.9))])
+
+        assert [c['template_id'] for c in candidates] == ['english']
+        assert candidates[0]['keywords'] == ['total']
+
+    def test_route_with_optional_prefix_pattern(self):
+        router = TemplateRouter()
+        router.add_template(make_template('amount', [r'(?:NT\$)?\s*(\d+)元']))
+
+        # 'NT$' 不是必備字面，不會讓沒有 NT$ 的頁面排除此範本
+        candidates = router.route([((0, 0, 10, 10), ('1200元', 0.9))])
+
+        assert [c['template_id'] for c in candidates] == ['amount']
+
+    def test_min_hits_and_max_candidates(self, router):
+        ocr_results = [((0, 0, 10, 10), ('隨機碼3472', 0.9))]
+
+        assert router.route(ocr_results, min_hits=2) == []
+        assert len(router.route(ocr_results, max_candidates=1)) == 1
+
+    def test_remove_template(self, router):
+        router.remove_template('receipt')
+        ocr_results = [((0, 0, 10, 10), ('收據', 0.9))]
+
+        assert router.route(ocr_results) == []
+        assert len(router) == 2
+
+    def test_template_without_keywords_is_fallback(self):
+        router = TemplateRouter()
+        router.add_template(make_template('generic', [r'\d+']))
+
+        candidates = router.route([((0, 0, 10, 10), ('123', 0.9))])
+
+        assert candidates == [{'template_id': 'generic', 'hits': 0, 'keywords': []}]
+
+    def test_add_template_requires_id(self):
+        with pytest.raises(ValueError, match="template_id"):
+            TemplateRouter().add_template({'regions': {}})
+
+
+class TestOrchestratorProcessRouted:
+    """Orchestrator.process_routed 測試"""
+
+    def test_process_routed_single_ocr_pass(self):
+        calls = []
+
+        class CountingOCR:
+            def recognize(self, image):
+                calls.append(1)
+                return [
+                    ((100, 100, 300, 30), ('隨機碼：3472', 0.95)),
+                    ((100, 200, 300, 30), ('賣方42552150', 0.95)),
+                ]
+
+        router = TemplateRouter()
+        router.add_templates([
+            make_template('einvoice', [r'隨機碼[:：]\s*(\d{4})', r'賣方[:：]?\s*(\d{8})']),
+            make_template('other', [r'隨機碼(\d{4})', r'統一編號(\d{8})']),
+        ])
+
+        orchestrator = Orchestrator(CountingOCR())
+        img = np.ones((1000, 1000, 3), dtype=np.uint8) * 255
+        result = orchestrator.process_routed(img, router)
+
+        assert result['template_id'] == 'einvoice'
+        assert result['fields']['field_0']['text'] == '3472'
+        assert len(result['routing']) == 2
+        assert len(calls) == 1
+
+    def test_process_routed_no_candidate(self):
+        class EmptyOCR:
+            def recognize(self, image):
+                return []
+
+        router = TemplateRouter()
+        router.add_template(make_template('einvoice', [r'隨機碼(\d{4})']))
+        orchestrator = Orchestrator(EmptyOCR())
+
+        with pytest.raises(ValueError, match="No candidate template"):
+            orchestrator.process_routed(np.ones((1000, 1000, 3), dtype=np.uint8), router)
@@ -309,3 +309,14 @@ class TestTemplateValidator:
             validator.validate(valid_template)
 
 
+
+    def test_anchor_keywords(self, validator, valid_template):
+        valid_template["anchor_keywords"] = ["電子發票證明聯"]
+        valid_template["regions"]["invoice_number"]["anchor_keywords"] = ["發票號碼"]
+        assert validator.validate(valid_template) is True
+        valid_template["anchor_keywords"] = "電子發票"
+        with pytest.raises(ValidationError):
+            validator.validate(valid_template)
+        valid_template["anchor_keywords"] = [""]
+        with pytest.raises(ValidationError):
+            validator.validate(valid_template)
@@ -0,0 +1,172 @@
+"""
+測試 OcrTextIndex - OCR 全文索引與 keep_ocr_lines
+"""
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.adapters.storage import OcrTextIndex
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "index_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        }
+    }
+}
+
+
+class MockOCRAdapter:
+    """回傳發票號碼與兩行一般文字"""
+
+    def __init__(self, tax_id="12345678"):
+        self.tax_id = tax_id
+
+    def recognize(self, image, **options):
+        scale = image.shape[1] / 1000
+        return [
+            ((100 * scale, 100 * scale, 300 * scale, 50 * scale), ("AB12345678", 0.95)),
+            ((100 * scale, 300 * scale, 400 * scale, 40 * scale), (f"統一編號:{self.tax_id}", 0.9)),
+            ((100 * scale, 400 * scale, 300 * scale, 40 * scale), ("總計 NT$1,200", 0.85)),
+        ]
+
+
+def make_result(document_id, tax_id="12345678", amount="1,200"):
+    """帶有 ocr_lines 的模擬結果"""
+    return {
+        "document_id": document_id,
+        "template_id": "index_test_v1",
+        "fields": {
+            "invoice_number": {"text": "AB12345678", "bbox": (100, 100, 300, 50),
+                               "total_score": 0.9}
+        },
+        "ocr_lines": [
+            {"text": f"統一編號:{tax_id}", "bbox": [100, 300, 400, 40], "confidence": 0.9},
+            {"text": f"總計 NT${amount}", "bbox": [100, 400, 300, 40], "confidence": 0.85},
+        ]
+    }
+
+
+class TestOcrTextIndex:
+    """OcrTextIndex 測試"""
+
+    def test_search_lines(self, tmp_path):
+        """測試：子字串搜尋回傳文件與行位置"""
+        with OcrTextIndex(tmp_path / "index.db") as index:
+            index.write(make_result("doc-1"))
+            index.write(make_result("doc-2", tax_id="87654321"))
+            index.flush()
+
+            hits = index.search("12345678")
+
+        texts = [(hit["document_id"], hit["text"], hit["field"]) for hit in hits]
+        assert ("doc-1", "統一編號:12345678", None) in texts
+        assert ("doc-2", "統一編號:87654321", None) not in texts
+        line = next(hit for hit in hits if hit["field"] is None)
+        assert line["bbox"] == [100, 300, 400, 40]
+        assert line["confidence"] == pytest.approx(0.9)
+
+    def test_search_documents_and_fields(self, tmp_path):
+        """測試：搜尋文件、限定提取欄位、短查詢"""
+        with OcrTextIndex(tmp_path / "index.db") as index:
+            index.write_many([
+                make_result("doc-1"),
+                make_result("doc-2", amount="3,400"),
+                make_result("doc-3"),
+            ])
+            index.flush()
+
+            assert index.search_documents("1,200") == ["doc-1", "doc-3"]
+            assert index.search_documents("1,200", limit=1) == ["doc-1"]
+            assert [hit["field"] for hit in index.search("AB1234", field="invoice_number")] \
+                == ["invoice_number"] * 3
+            # 少於 3 個字：逐行掃描
+            assert index.search_documents("總計") == ["doc-1", "doc-2", "doc-3"]
+            # FTS 語法字元視為字面文字
+            assert index.search_documents("NT$3,4") == ["doc-2"]
+            assert index.search('"NT$1 OR') == []
+            assert index.get_fields("doc-2")["invoice_number"]["text"] == "AB12345678"
+
+    def test_reindex_replaces_lines(self, tmp_path):
+        """測試：重新索引同一文件時取代舊的文字行"""
+        path = tmp_path / "index.db"
+        with OcrTextIndex(path) as index:
+            index.write(make_result("doc-1"))
+        with OcrTextIndex(path) as index:
+            index.write(make_result("doc-1", tax_id="99999999"))
+            index.flush()
+
+            assert index.document_count() == 1
+            assert index.search("12345678", field=None)[0]["field"] == "invoice_number"
+            assert index.search_documents("99999999") == ["doc-1"]
+
+    def test_duplicate_document_in_one_batch(self, tmp_path):
+        """測試：同一批中重複的 document_id 保留最後一份，後續寫出不受影響"""
+        with OcrTextIndex(tmp_path / "index.db") as index:
+            index.write_many([
+                make_result("doc-1"),
+                make_result("doc-1", tax_id="99999999"),
+            ])
+            index.flush()
+            index.write(make_result("doc-2"))
+            index.flush()
+
+            assert index.document_count() == 2
+            assert index.search_documents("99999999") == ["doc-1"]
+            assert index.search_documents("編號:12345678") == ["doc-2"]
+
+    def test_invalid_input(self, tmp_path):
+        """測試：沒有 document_id 的結果與空白查詢"""
+        with OcrTextIndex(tmp_path / "index.db") as index:
+            with pytest.raises(ValueError):
+                index.write({"fields": {}})
+            with pytest.raises(ValueError):
+                index.search("  ")
+
+
+class TestKeepOcrLines:
+    """Orchestrator keep_ocr_lines 測試"""
+
+    def test_ocr_lines_in_original_coordinates(self):
+        """測試：縮圖處理時 ocr_lines 仍為原圖座標的外接矩形"""
+        orchestrator = Orchestrator(MockOCRAdapter(), profile="fast", keep_ocr_lines=True)
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((2000, 4000, 3), dtype=np.uint8))
+
+        lines = result["ocr_lines"]
+        assert [line["text"] for line in lines] == [
+            "AB12345678", "統一編號:12345678", "總計 NT$1,200"
+        ]
+        scale = 4000 / 1000
+        assert lines[1]["bbox"] == [int(100 * scale), int(300 * scale),
+                                    int(400 * scale), int(40 * scale)]
+
+    def test_disabled_by_default(self):
+        """測試：預設不含 ocr_lines"""
+        orchestrator = Orchestrator(MockOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+
+        result = orchestrator.process(np.zeros((1000, 1000, 3), dtype=np.uint8))
+
+        assert "ocr_lines" not in result
+
+    def test_pages_and_stream_into_index(self, tmp_path):
+        """測試：多頁文件的行帶有頁碼；process_stream 寫入索引"""
+        orchestrator = Orchestrator(MockOCRAdapter(), keep_ocr_lines=True)
+        orchestrator.load_template(TEMPLATE)
+        page = np.zeros((1000, 1000, 3), dtype=np.uint8)
+
+        result = orchestrator.process_pages([page])
+        assert {line["page"] for line in result["ocr_lines"]} == {0}
+
+        with OcrTextIndex(tmp_path / "index.db") as index:
+            list(orchestrator.process_stream([("inv-1", page), ("inv-2", page)], sink=index))
+            hits = index.search("12345678")
+
+        assert {hit["document_id"] for hit in hits} == {"inv-1", "inv-2"}
@@ -0,0 +1,209 @@
+"""
+測試兩段式提取 - 低解析度優先，必要時升級到原解析度
+"""
+
+import numpy as np
+import pytest
+
+from ocr_pipeline.core.extractors import HybridExtractor, transform_bbox
+from ocr_pipeline.core.orchestrator import Orchestrator
+
+
+TEMPLATE = {
+    "template_id": "two_speed_test_v1",
+    "regions": {
+        "invoice_number": {
+            "rect_ratio": {"x": 0.1, "y": 0.1, "width": 0.3, "height": 0.05},
+            "pattern": r"[A-Z]{2}\d{8}",
+            "required": True
+        },
+        "random_code": {
+            "rect_ratio": {"x": 0.6, "y": 0.6, "width": 0.2, "height": 0.05},
+            "pattern": r"^\d{4}$",
+            "required": True
+        }
+    }
+}
+
+# 原圖（1000x1000）座標下的文字位置
+LINES = [
+    ((100, 100, 300, 50), "AB12345678"),
+    ((600, 600, 200, 50), "3472"),
+]
+
+
+class ResolutionAwareOCRAdapter:
+    """
+    依影像尺寸模擬辨識品質的 OCR
+
+    - 全圖：依影像寬度等比例換算文字位置；寬度 < 1000 時 weak 文字信心偏低
+    - 裁切：回傳落在裁切範圍內的文字（相對裁切座標），信心正常
+    """
+
+    def __init__(self, weak=("3472",), full_width=1000):
+        self.weak = set(weak)
+        self.full_width = full_width
+        self.calls = []
+        self.crop_origin = None
+
+    def recognize(self, image):
+        h, w = image.shape[:2]
+        self.calls.append((w, h))
+
+        if self.crop_origin is not None:
+            ox, oy, cw, ch = self.crop_origin
+            results = []
+            for (x, y, bw, bh), text in LINES:
+                if ox <= x and x + bw <= ox + cw and oy <= y and y + bh <= oy + ch:
+                    results.append(((x - ox, y - oy, bw, bh), (text, 0.95)))
+            return results
+
+        scale = w / self.full_width
+        results = []
+        for (x, y, bw, bh), text in LINES:
+            conf = 0.95
+            if scale < 1 and text in self.weak:
+                conf = 0.2
+            bbox = tuple(int(round(v * scale)) for v in (x, y, bw, bh))
+            results.append((bbox, (text, conf)))
+        return results
+
+
+class CropTrackingExtractor(HybridExtractor):
+    """讓模擬 OCR 知道目前的裁切位置"""
+
+    def recognize_region(self, image, region, **kwargs):
+        self.ocr_adapter.crop_origin = (
+            region['x'], region['y'], region['width'], region['height']
+        )
+        try:
+            return super().recognize_region(image, region, **kwargs)
+        finally:
+            self.ocr_adapter.crop_origin = None
+
+
+def _build(adapter, **two_speed):
+    orchestrator = Orchestrator(adapter, two_speed=two_speed)
+    orchestrator.extractor = CropTrackingExtractor(adapter)
+    orchestrator.load_template(TEMPLATE)
+    return orchestrator
+
+
+IMAGE = np.zeros((1000, 1000, 3), dtype=np.uint8)
+
+
+class TestTransformBbox:
+    """transform_bbox 測試"""
+
+    def test_rect(self):
+        assert transform_bbox((10, 20, 30, 40), 2.0, (5, 5)) == (25, 45, 60, 80)
+
+    def test_polygon(self):
+        polygon = [[0, 0], [10, 0], [10, 10], [0, 10]]
+        assert transform_bbox(polygon, 0.5, (100, 200)) == [
+            [100, 200], [105, 200], [105, 205], [100, 205]
+        ]
+
+    def test_numpy_polygon(self):
+        polygon = np.array([[0.0, 0.0], [4.0, 2.0]])
+        assert transform_bbox(polygon, 2.0) == [[0.0, 0.0], [8.0, 4.0]]
+
+
+class TestRecognizeRegion:
+    """HybridExtractor.recognize_region 測試"""
+
+    def test_maps_back_and_pads_small_crop(self):
+        adapter = ResolutionAwareOCRAdapter()
+        extractor = CropTrackingExtractor(adapter)
+        results = extractor.recognize_region(
+            IMAGE, {'x': 550, 'y': 580, 'width': 300, 'height': 90}
+        )
+
+        # 高度 90 < 100，補齊到最小尺寸
+        assert adapter.calls[-1] == (300, 100)
+        assert results == [((600, 600, 200, 50), ("3472", 0.95))]
+
+    def test_empty_region(self):
+        extractor = HybridExtractor(ResolutionAwareOCRAdapter())
+        assert extractor.recognize_region(
+            IMAGE, {'x': 0, 'y': 0, 'width': 0, 'height': 0}
+        ) == []
+
+    def test_get_field_region_is_clipped(self):
+        extractor = HybridExtractor(ResolutionAwareOCRAdapter())
+        config = {"rect_ratio": {"x": 0.9, "y": 0.0, "width": 0.2, "height": 0.1}}
+        region = extractor.get_field_region(config, (1000, 1000))
+        assert region['x'] + region['width'] <= 1000
+        assert region['y'] == 0
+
+
+class TestTwoSpeed:
+    """Orchestrator two_speed 測試"""
+
+    def test_all_confident_at_low_res(self):
+        adapter = ResolutionAwareOCRAdapter(weak=())
+        result = _build(adapter).process(IMAGE)
+
+        assert adapter.calls == [(500, 500)]
+        assert result['field_sources'] == {
+            'invoice_number': 'low_res',
+            'random_code': 'low_res'
+        }
+        # bbox 換算回原圖座標
+        assert result['fields']['random_code']['bbox'] == (600, 600, 200, 50)
+
+    def test_roi_escalation_only_for_weak_field(self):
+        adapter = ResolutionAwareOCRAdapter()
+        result = _build(adapter).process(IMAGE)
+
+        assert result['field_sources']['invoice_number'] == 'low_res'
+        assert result['field_sources']['random_code'] == 'roi_crop'
+        assert result['fields']['random_code']['text'] == '3472'
+        assert result['fields']['random_code']['confidence'] == 0.95
+        assert result['fields']['random_code']['bbox'] == (600, 600, 200, 50)
+        # 低解析度全圖 + 一次 ROI 裁切，沒有原解析度全圖 OCR
+        assert len(adapter.calls) == 2
+        assert (1000, 1000) not in adapter.calls
+
+    def test_full_escalation(self):
+        adapter = ResolutionAwareOCRAdapter()
+        result = _build(adapter, escalation='full').process(IMAGE)
+
+        assert result['field_sources']['random_code'] == 'full_res'
+        assert adapter.calls == [(500, 500), (1000, 1000)]
+
+    def test_roi_failure_falls_back_to_full_res(self):
+        adapter = ResolutionAwareOCRAdapter()
+        orchestrator = _build(adapter)
+        # 裁切 OCR 什麼都沒讀到
+        orchestrator.extractor.recognize_region = lambda *args, **kwargs: []
+
+        result = orchestrator.process(IMAGE)
+
+        assert result['field_sources']['random_code'] == 'full_res'
+        assert adapter.calls[-1] == (1000, 1000)
+
+    def test_without_two_speed_has_no_sources(self):
+        orchestrator = Orchestrator(ResolutionAwareOCRAdapter())
+        orchestrator.load_template(TEMPLATE)
+        assert 'field_sources' not in orchestrator.process(IMAGE)
+
+    def test_expired_budget_skips_escalation(self):
+        adapter = ResolutionAwareOCRAdapter(weak=("AB12345678", "3472"))
+        orchestrator = _build(adapter)
+        orchestrator.extractor.recognize_region = pytest.fail
+
+        result = orchestrator.process(IMAGE, budget_ms=0)
+
+        assert result['incomplete'] is True
+        assert adapter.calls == []
+
+    @pytest.mark.parametrize("options", [
+        {'scale': 1.0},
+        {'scale': 0},
+        {'escalation': 'page'},
+        {'threshold': 0.5},
+    ])
+    def test_invalid_options(self, options):
+        with pytest.raises(ValueError):
+            Orchestrator(ResolutionAwareOCRAdapter(), two_speed=options)